@@ -1,4 +1,5 @@
 """MineTracker Ultra - Tesla-Grade Main Application with Animated Transitions"""
+import os
 import sys
 
 # CRITICAL: Import QtWebEngine components FIRST!
@@ -17,6 +18,9 @@ from theme.theme import MineTrackerTheme
 from services.i18n import I18nService
 from services.advanced_tracking_service import AdvancedTrackingService
 from services.tcp_server_service import TCPServerService
+from services.udp_listener_service import UDPListenerService
+from services.mqtt_ingest_service import MQTTIngestService
+from services.position_publisher import PositionPublisherService
 from store.store import Store
 from components.animations import AnimatedStackedWidget
 from components.notification_island import DynamicIsland
@@ -44,19 +48,62 @@ class MineTrackerApp(QMainWindow):
         self.tracking = AdvancedTrackingService(mode='hybrid')
         self.store = Store()
 
-        # TCP Server
-        self.tcp_server = TCPServerService(host='0.0.0.0', port=8888)
-        self.tcp_server.data_received.connect(self.on_tcp_data_received)
+        # TCP Server (MINETRACKER_CAPTURE=<dosya> ile ham akışlar kaydedilir)
+        self.tcp_server = TCPServerService(host='0.0.0.0', port=8888, metrics=self.tracking.metrics,
+                                           capture_path=os.environ.get('MINETRACKER_CAPTURE'))
+        self.tcp_server.batch_ready.connect(self.on_tcp_batch_ready)
         self.tcp_server.connection_status.connect(self.on_tcp_connection_status)
         self.tcp_server.error_occurred.connect(self.on_tcp_error)
         self.tcp_server.start()
 
+        # UDP Listener (yüksek frekanslı anchor'lar; MINETRACKER_UDP_PORT / MINETRACKER_UDP_HOST
+        # verilirse açılır, varsayılan yalnızca localhost)
+        self.udp_listener = None
+        udp_host = os.environ.get('MINETRACKER_UDP_HOST')
+        udp_port = os.environ.get('MINETRACKER_UDP_PORT')
+        if udp_host or udp_port:
+            self.udp_listener = UDPListenerService(host=udp_host or '127.0.0.1', port=int(udp_port or 8889),
+                                                   metrics=self.tracking.metrics)
+            self.udp_listener.batch_ready.connect(self.on_udp_batch_ready)
+            self.udp_listener.error_occurred.connect(self.on_tcp_error)
+            self.udp_listener.start()
+
+        # MQTT Ingest (MINETRACKER_MQTT_HOST verilirse gateway topic'lerine abone olunur)
+        self.mqtt_ingest = None
+        mqtt_host = os.environ.get('MINETRACKER_MQTT_HOST')
+        if mqtt_host:
+            self.mqtt_ingest = MQTTIngestService(host=mqtt_host,
+                                                 port=int(os.environ.get('MINETRACKER_MQTT_PORT', 1883)),
+                                                 metrics=self.tracking.metrics)
+            self.mqtt_ingest.batch_ready.connect(self.on_mqtt_batch_ready)
+            self.mqtt_ingest.error_occurred.connect(self.on_tcp_error)
+            self.mqtt_ingest.start()
+
+        # WebSocket konum yayını (kontrol odası / duvar ekranları). Kimlik doğrulaması
+        # yoktur: MINETRACKER_WS_PORT / MINETRACKER_WS_HOST verilirse açılır, varsayılan
+        # yalnızca localhost
+        self.position_publisher = None
+        ws_host = os.environ.get('MINETRACKER_WS_HOST')
+        ws_port = os.environ.get('MINETRACKER_WS_PORT')
+        if ws_host or ws_port:
+            self.position_publisher = PositionPublisherService(host=ws_host or '127.0.0.1',
+                                                               port=int(ws_port or 8890))
+            self.position_publisher.error_occurred.connect(self.on_tcp_error)
+            self.tracking.position_calculated.connect(self.position_publisher.publish)
+            self.position_publisher.start()
+
         # Init UI
         self.init_ui()
         self.init_connections()
 
         print("MineTracker Ultra started!")
         print(f"TCP Server: 0.0.0.0:8888")
+        if self.udp_listener is not None:
+            print(f"UDP Listener: {self.udp_listener.host}:{self.udp_listener.port}")
+        if self.position_publisher is not None:
+            print(f"Position Publisher: ws://{self.position_publisher.host}:{self.position_publisher.port}")
+        if self.mqtt_ingest is not None:
+            print(f"MQTT Ingest: {mqtt_host}")
         print(f"Tracking Mode: {self.tracking.mode}")
         print(f"3D Map: {'Active' if WEBENGINE_AVAILABLE else 'Disabled'}")
 
@@ -151,13 +198,19 @@ class MineTrackerApp(QMainWindow):
         self.i18n.language_changed.connect(self.update_window_title)
         self.tracking.position_calculated.connect(self.on_position_calculated)
 
-    def on_tcp_data_received(self, data):
-        self.tracking.process_tcp_data(data)
+    def on_tcp_batch_ready(self):
+        self.tracking.process_tcp_batch(*self.tcp_server.take_batch(with_timestamps=True))
         stats = self.tcp_server.get_statistics()
         self.tcp_status_label.setText(
             f"TCP: {stats['connected_clients']} clients  |  {stats['total_messages']} msgs  |  {stats['messages_per_second']:.1f} msg/s"
         )
 
+    def on_udp_batch_ready(self):
+        self.tracking.process_tcp_batch(*self.udp_listener.take_batch(with_timestamps=True))
+
+    def on_mqtt_batch_ready(self):
+        self.tracking.process_tcp_batch(*self.mqtt_ingest.take_batch(with_timestamps=True))
+
     def on_tcp_connection_status(self, client_address, connected):
         if connected:
             print(f"TCP Client connected: {client_address}")
@@ -299,5 +352,14 @@ This will:
         if hasattr(self, 'tcp_server') and self.tcp_server.running:
             self.tcp_server.stop()
             self.tcp_server.wait(2000)
+        if getattr(self, 'udp_listener', None) is not None and self.udp_listener.running:
+            self.udp_listener.stop()
+            self.udp_listener.wait(2000)
+        if getattr(self, 'mqtt_ingest', None) is not None and self.mqtt_ingest.running:
+            self.mqtt_ingest.stop()
+            self.mqtt_ingest.wait(2000)
+        if getattr(self, 'position_publisher', None) is not None and self.position_publisher.running:
+            self.position_publisher.stop()
+            self.position_publisher.wait(2000)
         print("Clean shutdown complete!")
         event.accept()
@@ -0,0 +1,102 @@
+"""JSON çözme micro-benchmark'ı - json.loads + .get() zinciri vs. PayloadDecoder
+
+Aynı NDJSON paketleri (bench_framing.synthesize_stream) üç yolla çözülüp
+(anchor, tag, mesafe) üçlülerine çevrilir:
+
+    legacy           json.loads(bytes) + kuyruktaki ve store_measurements'taki
+                     is_priority_payload taramaları + eski ölçüm başına
+                     .get() / isinstance zinciri
+    decoder:<ad>     PayloadDecoder (SOS kontrolü çözümde) ve seçilen JSON
+                     backend'i; ölçümler orjson / ujson'da derlenmiş şemayla,
+                     json'da plain_columns ile çözülür. Sonraki öncelik
+                     kontrolleri MeasurementReport için tek isinstance'tır
+
+Kurulu olmayan backend'ler atlanır. Paketler memoryview olarak verilir
+(IngestEngine'deki gibi alım tamponunun dilimleri).
+
+Kullanım:
+    python -m benchmarks.bench_decoder --packets 20000 --tags 12
+"""
+import argparse
+import json
+import time
+
+from benchmarks.bench_framing import synthesize_stream
+from services.payload_decoder import JSON_BACKENDS, MeasurementReport, PayloadDecoder, is_priority_payload
+
+
+def legacy_decode(frame):
+    data = json.loads(bytes(frame))
+    # Önceki hat: BoundedIngestQueue.put ve store_measurements paketi ayrı ayrı tarıyordu
+    if is_priority_payload(data) or is_priority_payload(data):
+        return 0
+    anchor_id = data.get('anchor_id')
+    if 'measurements' not in data or not anchor_id:
+        return 0
+    count = 0
+    for measurement in data['measurements']:
+        tag_id = measurement.get('tag_id')
+        if 'distance(m)' in measurement and isinstance(measurement['distance(m)'], dict):
+            distance = measurement['distance(m)'].get('distance')
+        else:
+            distance = measurement.get('distance') or measurement.get('distance_m')
+        if distance is None or tag_id is None:
+            continue
+        distance = float(distance)
+        if 0 <= distance <= 20:
+            count += 1
+    return count
+
+
+def decoder_path(backend):
+    decode = PayloadDecoder(backend).decode
+
+    def run(frame):
+        report = decode(frame)
+        if is_priority_payload(report) or is_priority_payload(report):
+            return 0
+        if not isinstance(report, MeasurementReport):
+            return 0
+        return sum(1 for distance in report.distances if distance <= 20)
+    return run
+
+
+def available_paths():
+    paths = [('legacy', legacy_decode)]
+    for name, factory in JSON_BACKENDS.items():
+        try:
+            factory()
+        except ImportError:
+            print(f"⚠️  {name} kurulu değil, atlandı")
+            continue
+        paths.append((f'decoder:{name}', decoder_path(name)))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packets', type=int, default=20000)
+    parser.add_argument('--tags', type=int, default=12, help='Paket başına ölçüm')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    stream = synthesize_stream(args.packets, args.tags)
+    frames = [memoryview(line) for line in stream.split(b'\n') if line]
+    print(f"{len(frames)} paket, paket başına {args.tags} ölçüm (~{len(stream) / len(frames):.0f} byte)\n")
+    print(f"{'Yol':<16}{'paket/s':>12}{'ölçüm/s':>14}{'µs/paket':>10}{'hız':>7}")
+
+    baseline = None
+    for name, run in available_paths():
+        best = float('inf')
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            measurements = sum(run(frame) for frame in frames)
+            best = min(best, time.perf_counter() - started)
+        rate = len(frames) / best
+        baseline = baseline or rate
+        print(f"{name:<16}{rate:>12.0f}{measurements / best:>14.0f}{best / len(frames) * 1e6:>10.1f}"
+              f"{rate / baseline:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
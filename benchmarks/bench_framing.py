@@ -0,0 +1,115 @@
+"""Framing micro-benchmark - eski str tabanlı parantez sayma vs. BraceFramer
+
+Kayıtlı bir anchor akışı (ham byte dosyası) verilirse onu, verilmezse
+gerçekçi ölçüm paketlerinden üretilmiş bir akışı kullanır. Akış 4096 byte'lık
+recv parçaları halinde beslenir.
+
+Kullanım:
+    python -m benchmarks.bench_framing --stream capture.raw
+    python -m benchmarks.bench_framing --packets 20000 --tags 12
+"""
+import argparse
+import json
+import random
+import time
+
+from services.stream_framing import create_framer
+
+
+def synthesize_stream(packets, tags_per_packet):
+    """Anchor firmware'ine benzer NDJSON akışı üret."""
+    rng = random.Random(42)
+    chunks = []
+    for i in range(packets):
+        packet = {
+            'anchor_id': f'ANC{rng.randint(1, 6):03d}',
+            'timestamp': 1700000000.0 + i * 0.02,
+            'measurements': [
+                {
+                    'tag_id': f'TAG{rng.randint(1, 500):03d}',
+                    'distance(m)': {'distance': round(rng.uniform(0.3, 19.5), 3)},
+                    'rssi': rng.randint(-95, -40),
+                }
+                for _ in range(tags_per_packet)
+            ],
+        }
+        chunks.append(json.dumps(packet).encode('utf-8'))
+        chunks.append(b'\n')
+    return b''.join(chunks)
+
+
+def legacy_frames(chunks):
+    """Eski TCPServerService.handle_client paketleme döngüsü."""
+    count = 0
+    buffer = ""
+    for data in chunks:
+        buffer += data.decode('utf-8')
+        while buffer:
+            buffer = buffer.strip()
+            if not buffer:
+                break
+            brace_count = 0
+            end_pos = -1
+            for i, char in enumerate(buffer):
+                if char == '{':
+                    brace_count += 1
+                elif char == '}':
+                    brace_count -= 1
+                    if brace_count == 0:
+                        end_pos = i + 1
+                        break
+            if end_pos > 0:
+                buffer = buffer[end_pos:].strip()
+                count += 1
+            else:
+                break
+    return count
+
+
+def framer_frames(chunks, framing):
+    framer = create_framer(framing, max_frame_size=64 * 1024 * 1024)
+    count = 0
+    for data in chunks:
+        count += len(framer.feed(data))
+    return count
+
+
+def measure(name, func, chunks, total_bytes):
+    start = time.perf_counter()
+    frames = func(chunks)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {frames:>9} {elapsed:>9.3f} {total_bytes / elapsed / 1e6:>9.1f} {frames / elapsed:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stream', help='Ham anchor akışı dosyası')
+    parser.add_argument('--packets', type=int, default=20000)
+    parser.add_argument('--tags', type=int, default=8, help='Paket başına ölçüm sayısı')
+    parser.add_argument('--chunk', type=int, default=4096)
+    args = parser.parse_args()
+
+    if args.stream:
+        with open(args.stream, 'rb') as f:
+            stream = f.read()
+    else:
+        stream = synthesize_stream(args.packets, args.tags)
+
+    chunks = [stream[i:i + args.chunk] for i in range(0, len(stream), args.chunk)]
+
+    print(f"Akış: {len(stream) / 1e6:.2f} MB, {len(chunks)} parça")
+    print(f"{'Yöntem':<22} {'paket':>9} {'süre(s)':>9} {'MB/s':>9} {'paket/s':>12}")
+    measure('legacy (str)', legacy_frames, chunks, len(stream))
+    measure('BraceFramer', lambda c: framer_frames(c, 'brace'), chunks, len(stream))
+    measure('NdjsonFramer', lambda c: framer_frames(c, 'ndjson'), chunks, len(stream))
+
+    # Tek büyük paketin parça parça gelmesi (eski yöntemde O(n²))
+    big = synthesize_stream(1, 8000)
+    big_chunks = [big[i:i + args.chunk] for i in range(0, len(big), args.chunk)]
+    print(f"\nTek büyük paket: {len(big) / 1e6:.2f} MB")
+    measure('legacy (str)', legacy_frames, big_chunks, len(big))
+    measure('BraceFramer', lambda c: framer_frames(c, 'brace'), big_chunks, len(big))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Ingest worker ölçekleme benchmark'ı - tek süreç vs. SO_REUSEPORT worker'ları
+
+İstemci süreçleri sabit sayıda bağlantıdan süre boyunca olabildiğince hızlı
+JSON ölçüm paketi gönderir. Ana süreçte teslim alınan ölçüm sayısı sayılır.
+
+    workers=0: IngestEngine ana süreçte (framing + JSON çözümü ana süreçte)
+    workers=N: IngestWorkerPool, ana süreç yalnızca MeasurementBatch alır
+
+Ölçülenler:
+    - Saniyede teslim alınan ölçüm (messages/s)
+    - Ana sürecin CPU kullanımı (GUI / Kalman için kalan pay)
+
+Ölçekleme çekirdek sayısıyla sınırlıdır (os.cpu_count()).
+
+Kullanım:
+    python -m benchmarks.bench_ingest_workers --workers 0 1 2 4 --duration 5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import time
+
+from services.ingest_engine import IngestEngine
+from services.ingest_workers import IngestWorkerPool, MeasurementBatch
+
+PACKETS_PER_CHUNK = 200
+
+
+def build_chunk(anchor_number):
+    """Bir anchor'ın art arda gönderdiği paketler (tek sendall)."""
+    packets = []
+    for i in range(PACKETS_PER_CHUNK):
+        packets.append(json.dumps({
+            'anchor_id': f'ANC{anchor_number:03d}',
+            'measurements': [{'tag_id': f'TAG{i % 50:03d}', 'distance(m)': {'distance': 4.21}}]
+        }))
+    return ''.join(packets).encode('utf-8')
+
+
+def run_client(port, connections, first_anchor, duration, start_event):
+    """Alt süreç: bağlantıları aç, süre boyunca paket bas."""
+    sockets = [socket.create_connection(('127.0.0.1', port)) for _ in range(connections)]
+    chunks = [build_chunk(first_anchor + i) for i in range(connections)]
+    start_event.wait()
+
+    deadline = time.time() + duration
+    try:
+        while time.time() < deadline:
+            for sock, chunk in zip(sockets, chunks):
+                sock.sendall(chunk)
+    except OSError:
+        # Sunucu ölçümü bitirip kapattı
+        pass
+    for sock in sockets:
+        sock.close()
+
+
+def bench(workers, port, clients, connections, duration):
+    state = {'count': 0, 'connections': 0}
+
+    def on_message(payload, address=None):
+        if isinstance(payload, MeasurementBatch):
+            state['count'] += len(payload.distances)
+        else:
+            state['count'] += len(payload.tag_ids)
+
+    def on_connection(address, connected):
+        state['connections'] += 1 if connected else -1
+
+    if workers:
+        engine = IngestWorkerPool(host='127.0.0.1', port=port, workers=workers,
+                                  on_message=on_message, on_connection=on_connection)
+    else:
+        engine = IngestEngine(host='127.0.0.1', port=port,
+                              on_message=on_message, on_connection=on_connection)
+    engine.open()
+
+    ctx = multiprocessing.get_context('spawn')
+    start_event = ctx.Event()
+    procs = [ctx.Process(target=run_client,
+                         args=(port, connections, i * connections + 1, duration, start_event))
+             for i in range(clients)]
+    for proc in procs:
+        proc.start()
+
+    # Bağlantıların kabul edilmesini bekle
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        engine.poll(timeout=0.05)
+        if state['connections'] >= clients * connections:
+            break
+
+    start_event.set()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    end = start + duration
+    while time.perf_counter() < end:
+        engine.poll(timeout=0.05)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    count = state['count']
+
+    for proc in procs:
+        proc.join(timeout=duration + 10)
+    engine.close()
+
+    return {
+        'workers': workers,
+        'messages': count,
+        'messages_per_second': count / elapsed,
+        'main_cpu_percent': 100.0 * cpu / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--clients', type=int, default=2, help='İstemci süreç sayısı')
+    parser.add_argument('--connections', type=int, default=8, help='İstemci başına bağlantı')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--port', type=int, default=18890)
+    args = parser.parse_args()
+
+    print(f"CPU: {os.cpu_count()}  istemci: {args.clients}x{args.connections} bağlantı  süre: {args.duration}s")
+    print(f"{'workers':>8} {'ölçüm':>10} {'ölçüm/s':>12} {'ana CPU %':>10}")
+    for i, workers in enumerate(args.workers):
+        result = bench(workers, args.port + i, args.clients, args.connections, args.duration)
+        print(f"{result['workers']:>8} {result['messages']:>10} {result['messages_per_second']:>12.0f} "
+              f"{result['main_cpu_percent']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
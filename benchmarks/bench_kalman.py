@@ -0,0 +1,80 @@
+"""Kalman filtre benchmark'ı - tag başına KalmanFilter2D nesneleri vs. KalmanFilterBank
+
+N tag için her tur bir predict + update yapılır; tur başına tüm tag'ler
+veya bir alt kümesi (--fraction, tek tick'te ölçüm gelen tag'ler) işlenir.
+
+    objects     Tag başına KalmanFilter2D / 3D (sözlükte), Python döngüsü
+    bank        KalmanFilterBank.predict + update, alt küme için tek çağrı
+
+Sonuçlar aynı olmalıdır; maks. fark sütunu bunu doğrular.
+
+Kullanım:
+    python -m benchmarks.bench_kalman --tags 1000 10000 --dimensions 2
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.kalman_filter import KalmanFilter2D, KalmanFilter3D, KalmanFilterBank
+
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tags', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--dimensions', type=int, choices=(2, 3), default=2)
+    parser.add_argument('--fraction', type=float, default=1.0, help='Tur başına güncellenen tag oranı')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    dim = args.dimensions
+    filter_class = KalmanFilter3D if dim == 3 else KalmanFilter2D
+    print(f"{dim}D sabit hız modeli, tur başına tag'lerin %{args.fraction * 100:.0f}'i\n")
+    print(f"{'Tag':>7}  {'Yol':<10}{'süre ms':>10}{'µs/tag':>9}{'hız':>8}{'maks. fark':>12}")
+    for tags in args.tags:
+        rng = np.random.default_rng(5)
+        start = rng.uniform(-300, 300, (tags, dim))
+        measurements = start + rng.normal(0, 0.5, start.shape)
+        tag_ids = [f'TAG{i:05d}' for i in range(tags)]
+        chosen = np.sort(rng.choice(tags, max(1, int(tags * args.fraction)), replace=False))
+        chosen_ids = [tag_ids[i] for i in chosen.tolist()]
+        chosen_measurements = measurements[chosen]
+
+        objects = {tag_id: filter_class(initial_value=tuple(p)) for tag_id, p in zip(tag_ids, start.tolist())}
+        bank = KalmanFilterBank(dim)
+        for tag_id, position in zip(tag_ids, start):
+            bank.add(tag_id, position)
+
+        def run_objects():
+            out = []
+            for tag_id, measurement in zip(chosen_ids, chosen_measurements.tolist()):
+                kalman = objects[tag_id]
+                kalman.predict()
+                out.append(kalman.update(measurement))
+            return np.array(out, dtype=np.float64)
+
+        def run_bank():
+            bank.predict(chosen_ids)
+            return bank.update(chosen_ids, chosen_measurements)
+
+        object_time, object_result = timed(run_objects, args.repeat)
+        bank_time, bank_result = timed(run_bank, args.repeat)
+        difference = float(np.abs(object_result - bank_result).max())
+        count = len(chosen_ids)
+        for name, elapsed in (('objects', object_time), ('bank', bank_time)):
+            print(f"{tags:>7}  {name:<10}{elapsed * 1000:>10.2f}{elapsed / count * 1e6:>9.2f}"
+                  f"{object_time / elapsed:>7.1f}x{difference:>12.2e}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
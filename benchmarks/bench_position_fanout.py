@@ -0,0 +1,123 @@
+"""WebSocket konum yayını benchmark'ı - PositionPublisherService fan-out
+
+Sunucu bu süreçte çalışır ve --tags adet tag için --update-hz ile sentetik
+konum yayınlar. İstemciler ayrı bir süreçte asyncio ile --clients bağlantı
+açar; --slow-clients kadarı mesajları okumaz (tampon dolar, snapshot ile
+yeniden eşitlenmeli veya bağlantısı kesilmeli).
+
+Ölçülenler:
+    - İstemci başına çerçeve/s ve KB/s
+    - Çerçeve yaşı (yayın zamanı → istemcide alınma) p50 / p99
+    - Sunucu: paylaşılan çerçeve oranı, snapshot, yavaş istemci sayaçları, CPU
+
+Kullanım:
+    python -m benchmarks.bench_position_fanout --clients 200 --tags 500 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import math
+import time
+
+from services.position_publisher import PositionPublisherService
+
+
+def run_clients(port, clients, slow_clients, duration, results):
+    """Alt süreç: istemcileri aç, çerçeveleri say."""
+    import websockets
+
+    async def reader(index, stats, ages):
+        async with websockets.connect(f'ws://127.0.0.1:{port}', max_size=None, compression=None) as ws:
+            if index < slow_clients:
+                # Okumayan istemci: bağlantıyı açık tut
+                await asyncio.sleep(duration)
+                return
+            end = time.monotonic() + duration
+            while time.monotonic() < end:
+                try:
+                    message = await asyncio.wait_for(ws.recv(), end - time.monotonic())
+                except (asyncio.TimeoutError, websockets.ConnectionClosed):
+                    break
+                frame = json.loads(message)
+                stats['frames'] += 1
+                stats['bytes'] += len(message)
+                stats[frame['type']] += 1
+                ages.append(time.time() - frame['t'])
+
+    async def main():
+        stats = {'frames': 0, 'bytes': 0, 'snapshot': 0, 'delta': 0}
+        ages = []
+        tasks = [asyncio.create_task(reader(i, stats, ages)) for i in range(clients)]
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        stats['errors'] = sum(1 for outcome in outcomes if isinstance(outcome, Exception))
+        ages.sort()
+        stats['age_p50'] = ages[len(ages) // 2] if ages else 0
+        stats['age_p99'] = ages[int(len(ages) * 0.99)] if ages else 0
+        results.put(stats)
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--slow-clients', type=int, default=5)
+    parser.add_argument('--tags', type=int, default=500)
+    parser.add_argument('--update-hz', type=float, default=10.0, help='Tag başına konum güncellemesi')
+    parser.add_argument('--rate', type=float, default=10.0, help='Yayın hızı (çerçeve/s)')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=18890)
+    args = parser.parse_args()
+
+    publisher = PositionPublisherService(host='127.0.0.1', port=args.port, rate_hz=args.rate,
+                                         max_lag_seconds=args.duration / 2)
+    publisher.start()
+    while not publisher.running:
+        time.sleep(0.01)
+
+    results = multiprocessing.get_context('spawn').Queue()
+    client_process = multiprocessing.get_context('spawn').Process(
+        target=run_clients, args=(args.port, args.clients, args.slow_clients, args.duration, results))
+    client_process.start()
+
+    cpu_started = time.process_time()
+    started = time.monotonic()
+    interval = 1.0 / args.update_hz
+    tick = 0
+    while client_process.is_alive() and time.monotonic() - started < args.duration + 30:
+        t = tick * interval
+        for i in range(args.tags):
+            angle = t * 0.1 + i
+            publisher.publish({'tag_id': f'TAG{i + 1:03d}', 'person_id': f'P{i + 1:03d}',
+                               'final': (50 + 40 * math.cos(angle), 50 + 40 * math.sin(angle), -10.0),
+                               'accuracy': 0.3})
+        tick += 1
+        time.sleep(max(0.0, started + tick * interval - time.monotonic()))
+        if results.qsize():
+            break
+    client_stats = results.get(timeout=60)
+    client_process.join()
+    cpu = time.process_time() - cpu_started
+    elapsed = time.monotonic() - started
+
+    server = publisher.get_statistics()
+    publisher.stop()
+    publisher.wait(3000)
+
+    readers = max(1, args.clients - args.slow_clients)
+    print(f"🎯 {args.clients} istemci ({args.slow_clients} yavaş), {args.tags} tag × {args.update_hz:.0f} Hz, "
+          f"yayın {args.rate:.0f} çerçeve/s, {args.duration:.0f} s")
+    print(f"📥 İstemci başına: {client_stats['frames'] / readers / args.duration:.1f} çerçeve/s, "
+          f"{client_stats['bytes'] / readers / args.duration / 1024:.1f} KB/s  "
+          f"(snapshot {client_stats['snapshot']}, delta {client_stats['delta']}, hata {client_stats['errors']})")
+    print(f"⏳ Çerçeve yaşı: p50 {client_stats['age_p50'] * 1000:.1f} ms  "
+          f"p99 {client_stats['age_p99'] * 1000:.1f} ms")
+    print(f"📤 Sunucu: {server['frames_sent']} çerçeve ({server['frames_shared']} paylaşılan), "
+          f"{server['bytes_sent'] / 1024 / 1024:.1f} MB, snapshot {server['snapshots_sent']}, "
+          f"meşgul atlama {server['skipped_busy']}, yavaş kesilen {server['slow_disconnects']}")
+    print(f"🖥️  Sunucu süreci CPU: %{100 * cpu / elapsed:.0f} (yayın dahil)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""Alım yolu bellek ayırma benchmark'ı (tracemalloc)
+
+Aynı anchor akışı ayrı bir süreçten TCP ile gönderilir ve üç alım yolu
+ile okunup çözülür:
+
+    legacy (str)     Eski handle_client: recv(4096) -> .decode() ->
+                     buffer += str -> parantez sayma -> json.loads(str)
+    recv() + bytes   recv() ile yeni bytes, framer'dan bytes paket,
+                     json.loads(bytes) (önceki IngestEngine davranışı)
+    recv_into        ReceiveBuffer'a recv_into, memoryview paket,
+                     decode_json_frame (tek kopyayla str)
+
+Framer yolları varsayılan olarak NDJSON framing kullanır. BraceFramer'ın
+NumPy tarama geçicileri iki yolda da aynıdır ve tepe ölçümünde paket
+kopyalarını gölgeler (--framing brace ile görülebilir).
+
+Okuyucular her aşamadan sonra durur (alım, paketleme, her paketin
+çözülmesi); her adımda tracemalloc tepe noktası sıfırlanır ve adımın
+geçici bellek tepesi (peak - başlangıç) aşama bazında toplanıp paket
+sayısına bölünür. Bir adımın ara nesneleri (recv bytes'ı, paket kopyası,
+str, dict) birlikte yaşadığından bu toplam paket başına ayrılan belleğe
+yakındır. Hız ölçümü ayrı, tracemalloc kapalı bir çalıştırmadan gelir.
+
+Kullanım:
+    python -m benchmarks.bench_receive_allocations --packets 20000 --tags 12
+"""
+import argparse
+import json
+import multiprocessing
+import socket
+import time
+import tracemalloc
+
+from benchmarks.bench_framing import synthesize_stream
+from services.stream_framing import create_framer, decode_json_frame
+
+
+def send_stream(port, stream):
+    """Alt süreç: akışı gönder ve kapat."""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall(stream)
+    sock.close()
+
+
+def legacy_reader(sock, on_payload, framing=None):
+    buffer = ""
+    while True:
+        data = sock.recv(4096)
+        if not data:
+            return
+        buffer += data.decode('utf-8')
+        yield 'recv'
+        while buffer:
+            buffer = buffer.strip()
+            if not buffer:
+                break
+            brace_count = 0
+            end_pos = -1
+            for i, char in enumerate(buffer):
+                if char == '{':
+                    brace_count += 1
+                elif char == '}':
+                    brace_count -= 1
+                    if brace_count == 0:
+                        end_pos = i + 1
+                        break
+            if end_pos > 0:
+                frame = buffer[:end_pos]
+                buffer = buffer[end_pos:].strip()
+                yield 'frame'
+                on_payload(json.loads(frame))
+                yield 'decode'
+            else:
+                break
+
+
+def bytes_reader(sock, on_payload, framing):
+    framer = create_framer(framing)
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            return
+        yield 'recv'
+        # Önceki framer her paketi bytes(buf[start:end]) ile kopyalıyordu
+        frames = [bytes(bytearray(frame)) for frame in framer.feed(data)]
+        yield 'frame'
+        for frame in frames:
+            on_payload(json.loads(frame))
+            yield 'decode'
+
+
+def recv_into_reader(sock, on_payload, framing):
+    framer = create_framer(framing)
+    buffer = framer.buffer
+    while True:
+        size = buffer.recv_into(sock, 65536)
+        if not size:
+            return
+        yield 'recv'
+        frames = framer.parse_received(size)
+        yield 'frame'
+        for frame in frames:
+            on_payload(decode_json_frame(frame))
+            yield 'decode'
+
+
+READERS = [
+    ('legacy (str)', legacy_reader),
+    ('recv() + bytes', bytes_reader),
+    ('recv_into', recv_into_reader),
+]
+
+STAGES = ('recv', 'frame', 'decode')
+
+
+def run_reader(reader, stream, port, traced, framing):
+    """
+    Akışı okuyucuyla tüket.
+
+    Returns:
+        (paket sayısı, süre, {aşama: paket başına geçici byte}, tepe bellek)
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', port))
+    server.listen(1)
+    sender = multiprocessing.get_context('spawn').Process(target=send_stream, args=(port, stream))
+    sender.start()
+    sock, _ = server.accept()
+    server.close()
+
+    count = 0
+
+    def on_payload(payload):
+        nonlocal count
+        count += 1
+
+    transient = dict.fromkeys(STAGES, 0)
+    peak = 0
+    if traced:
+        tracemalloc.start()
+    started = time.perf_counter()
+    steps = reader(sock, on_payload, framing)
+    while True:
+        if traced:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        try:
+            stage = next(steps)
+        except StopIteration:
+            break
+        if traced:
+            current, step_peak = tracemalloc.get_traced_memory()
+            transient[stage] += step_peak - before
+            peak = max(peak, step_peak)
+    elapsed = time.perf_counter() - started
+    if traced:
+        tracemalloc.stop()
+
+    sock.close()
+    sender.join()
+    per_packet = {stage: total / max(count, 1) for stage, total in transient.items()}
+    return count, elapsed, per_packet, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packets', type=int, default=20000)
+    parser.add_argument('--tags', type=int, default=12, help='Paket başına ölçüm')
+    parser.add_argument('--port', type=int, default=18893)
+    parser.add_argument('--framing', choices=('ndjson', 'brace'), default='ndjson',
+                        help="Framer yolları için framing (brace: NumPy tarama geçicileri paket "
+                             "kopyalarını tepe ölçümünde gölgeler)")
+    args = parser.parse_args()
+
+    stream = synthesize_stream(args.packets, args.tags)
+    packet_size = len(stream) / args.packets
+    print(f"Akış: {len(stream) / 1024 / 1024:.1f} MB, {args.packets} paket (~{packet_size:.0f} byte/paket)\n")
+    print(f"Paket başına ayrılan byte (aşama bazında, framer yolları: {args.framing}):")
+    print(f"{'Yol':<18}{'paket':>8}{'MB/s':>8}{'alım':>8}{'paketleme':>11}{'çözme':>8}"
+          f"{'toplam':>12}{'tepe KB':>9}")
+
+    for name, reader in READERS:
+        count, elapsed, _, _ = run_reader(reader, stream, args.port, False, args.framing)
+        _, _, per_packet, peak = run_reader(reader, stream, args.port, True, args.framing)
+        print(f"{name:<18}{count:>8}{len(stream) / elapsed / 1024 / 1024:>8.1f}"
+              f"{per_packet['recv']:>8.0f}{per_packet['frame']:>11.0f}{per_packet['decode']:>8.0f}"
+              f"{sum(per_packet.values()):>12.0f}{peak / 1024:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""RTS iz yumuşatıcı benchmark'ı - vardiya uzunluğunda iz, tek tag ve çok tag
+
+Tag başına T nokta (varsayılan 8 saat, ~2 Hz, düzensiz aralık) sentetik
+iz üretilir; doğru iz bilindiği için hata da raporlanır.
+
+    per-step    Adım adım 4x4 / 6x6 matrisli klasik ileri + geri RTS döngüsü
+    vectorized  smooth_trajectory (paylaşılan kovaryans + blok afin tarama)
+    causal      Aynı modelle yalnızca ileri filtre (canlı izleme karşılığı)
+
+Ardından --tags iz için smooth_trajectories sırayla ve süreç havuzunda
+çalıştırılır.
+
+Kullanım:
+    python -m benchmarks.bench_smoother --points 57600 --tags 16 --processes 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.kalman_filter import process_noise_blocks
+from services.trajectory_smoother import smooth_trajectories, smooth_trajectory
+
+
+def synthetic_track(points, dim, seed, noise=0.7):
+    rng = np.random.default_rng(seed)
+    timestamps = np.cumsum(rng.uniform(0.3, 0.7, points))
+    velocity = np.cumsum(rng.normal(0, 0.05, (points, dim)), axis=0)
+    velocity = np.clip(velocity, -1.5, 1.5)  # Yürüme hızı
+    steps = np.diff(timestamps, prepend=timestamps[0])[:, None]
+    truth = np.cumsum(velocity * steps, axis=0)
+    return timestamps, truth + rng.normal(0, noise, truth.shape), truth
+
+
+def per_step_rts(timestamps, measurements, q, r, v0=1.0):
+    """Referans: genel matrislerle adım adım ileri filtre + geri RTS."""
+    count, dim = measurements.shape
+    n = 2 * dim
+    H = np.hstack([np.eye(dim), np.zeros((dim, dim))])
+    R = r * np.eye(dim)
+    x = np.concatenate([measurements[0], np.zeros(dim)])
+    P = np.diag([r] * dim + [v0] * dim)
+    xf, Pf, xp, Pp, Fs = [x], [P], [x], [P], [np.eye(n)]
+    for k in range(1, count):
+        dt = timestamps[k] - timestamps[k - 1]
+        F = np.eye(n)
+        F[:dim, dim:] = dt * np.eye(dim)
+        pp, pv, vv = process_noise_blocks(q, dt)
+        Q = np.block([[pp * np.eye(dim), pv * np.eye(dim)], [pv * np.eye(dim), vv * np.eye(dim)]])
+        x = F @ x
+        P = F @ P @ F.T + Q
+        xp.append(x)
+        Pp.append(P)
+        Fs.append(F)
+        K = P @ H.T @ np.linalg.inv(H @ P @ H.T + R)
+        x = x + K @ (measurements[k] - H @ x)
+        P = (np.eye(n) - K @ H) @ P
+        xf.append(x)
+        Pf.append(P)
+    smoothed = [None] * count
+    smoothed[-1] = xf[-1]
+    for k in range(count - 2, -1, -1):
+        C = Pf[k] @ Fs[k + 1].T @ np.linalg.inv(Pp[k + 1])
+        smoothed[k] = xf[k] + C @ (smoothed[k + 1] - xp[k + 1])
+    smoothed = np.array(smoothed)
+    return smoothed[:, :dim], np.array(xf)[:, :dim]
+
+
+def rms(estimate, truth):
+    return float(np.sqrt(((estimate - truth) ** 2).sum(axis=1).mean()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=57600, help='Tag başına nokta (8 saat × 2 Hz)')
+    parser.add_argument('--dimensions', type=int, choices=(2, 3), default=2)
+    parser.add_argument('--tags', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-reference', action='store_true', help='Adım adım referansı çalıştırma')
+    args = parser.parse_args()
+
+    q, r = 0.05, 0.5
+    timestamps, measurements, truth = synthetic_track(args.points, args.dimensions, seed=7)
+    print(f"{args.dimensions}D, {args.points} nokta ({timestamps[-1] / 3600:.1f} saat)\n")
+    print(f"{'Yol':<12}{'süre ms':>10}{'µs/nokta':>10}{'RMS m':>8}{'maks. fark':>12}")
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        track = smooth_trajectory(timestamps, measurements, q, r)
+        best = min(best, time.perf_counter() - started)
+
+    print(f"{'raw':<12}{'':>10}{'':>10}{rms(measurements, truth):>8.3f}")
+    if not args.skip_reference:
+        started = time.perf_counter()
+        reference, causal = per_step_rts(timestamps, measurements, q, r)
+        elapsed = time.perf_counter() - started
+        difference = float(np.abs(reference - track.positions).max())
+        print(f"{'causal':<12}{'':>10}{'':>10}{rms(causal, truth):>8.3f}")
+        print(f"{'per-step':<12}{elapsed * 1000:>10.1f}{elapsed / args.points * 1e6:>10.2f}"
+              f"{rms(reference, truth):>8.3f}")
+    else:
+        difference = float('nan')
+    print(f"{'vectorized':<12}{best * 1000:>10.1f}{best / args.points * 1e6:>10.2f}"
+          f"{rms(track.positions, truth):>8.3f}{difference:>12.2e}")
+
+    tracks = {}
+    for index in range(args.tags):
+        tag_timestamps, tag_measurements, _ = synthetic_track(args.points, args.dimensions, seed=100 + index)
+        tracks[f'TAG{index:03d}'] = (tag_timestamps, tag_measurements)
+    print(f"\n{args.tags} tag × {args.points} nokta")
+    for label, processes in (('sıralı', 1), (f'havuz ({args.processes or "cpu"})', args.processes)):
+        started = time.perf_counter()
+        smooth_trajectories(tracks, processes=processes, process_variance=q, measurement_variance=r)
+        print(f"  {label:<14}{(time.perf_counter() - started) * 1000:>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
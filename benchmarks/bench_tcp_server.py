@@ -0,0 +1,179 @@
+"""TCP ingest benchmark - thread-per-client vs. event-loop IngestEngine
+
+Her sunucu ayrı bir süreçte çalıştırılır; istemci tarafı N bağlantıyı
+olabildiğince hızlı açar ve her bağlantıdan bir ölçüm paketi gönderir.
+
+Ölçülenler:
+    - Saniyede kabul edilen bağlantı (connections/s)
+    - Bağlantı başına sunucu belleği (RSS farkı / bağlantı)
+    - Sunucudaki thread sayısı
+
+Kullanım:
+    python -m benchmarks.bench_tcp_server --connections 1000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from services.ingest_engine import IngestEngine
+
+SAMPLE_PACKET = json.dumps({
+    'anchor_id': 'ANC001',
+    'measurements': [{'tag_id': 'TAG001', 'distance(m)': {'distance': 4.21}}]
+}).encode('utf-8')
+
+
+def read_rss_kb():
+    """Sürecin RSS değerini KB olarak oku (Linux /proc)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class LegacyThreadedServer:
+    """Eski TCPServerService davranışı: listen(5) + bağlantı başına thread."""
+
+    def __init__(self, port, on_message):
+        self.port = port
+        self.on_message = on_message
+        self.running = True
+
+    def serve(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(('127.0.0.1', self.port))
+        server.listen(5)
+        server.settimeout(1.0)
+        while self.running:
+            try:
+                client, _ = server.accept()
+            except socket.timeout:
+                continue
+            threading.Thread(target=self.handle_client, args=(client,), daemon=True).start()
+        server.close()
+
+    def handle_client(self, client):
+        buffer = ""
+        while self.running:
+            data = client.recv(4096).decode('utf-8')
+            if not data:
+                break
+            buffer += data
+            while buffer:
+                buffer = buffer.strip()
+                brace_count = 0
+                end_pos = -1
+                for i, char in enumerate(buffer):
+                    if char == '{':
+                        brace_count += 1
+                    elif char == '}':
+                        brace_count -= 1
+                        if brace_count == 0:
+                            end_pos = i + 1
+                            break
+                if end_pos <= 0:
+                    break
+                self.on_message(json.loads(buffer[:end_pos]))
+                buffer = buffer[end_pos:]
+        client.close()
+
+
+def run_server(kind, port, expected, pipe):
+    """Alt süreç: sunucuyu başlat, beklenen mesaj sayısına ulaşınca raporla."""
+    lock = threading.Lock()
+    state = {'count': 0, 'first': None, 'last': None}
+
+    def on_message(payload, address=None):
+        now = time.perf_counter()
+        with lock:
+            if state['first'] is None:
+                state['first'] = now
+            state['count'] += 1
+            state['last'] = now
+
+    baseline_rss = read_rss_kb()
+
+    if kind == 'legacy':
+        server = LegacyThreadedServer(port, on_message)
+        threading.Thread(target=server.serve, daemon=True).start()
+        pipe.send(('ready', baseline_rss))
+        deadline = time.time() + 120
+        while state['count'] < expected and time.time() < deadline:
+            time.sleep(0.01)
+    else:
+        engine = IngestEngine(host='127.0.0.1', port=port, on_message=on_message)
+        engine.open()
+        pipe.send(('ready', baseline_rss))
+        deadline = time.time() + 120
+        while state['count'] < expected and time.time() < deadline:
+            engine.poll(timeout=0.05)
+
+    pipe.send(('done', state['count'], state['first'], state['last'],
+               read_rss_kb(), threading.active_count()))
+    # İstemciler bağlantıları kapatana kadar bekle
+    pipe.recv()
+
+
+def run_clients(port, connections):
+    """N bağlantı aç, her birinden bir paket gönder, açık tut."""
+    sockets = []
+    start = time.perf_counter()
+    for _ in range(connections):
+        sock = socket.create_connection(('127.0.0.1', port), timeout=30)
+        sock.sendall(SAMPLE_PACKET)
+        sockets.append(sock)
+    return start, sockets
+
+
+def bench(kind, port, connections):
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=run_server, args=(kind, port, connections, child))
+    proc.start()
+
+    _, baseline_rss = parent.recv()
+    client_start, sockets = run_clients(port, connections)
+
+    _, count, first, last, rss, threads = parent.recv()
+    elapsed = (last - first) if (first and last and last > first) else 0.0
+
+    for sock in sockets:
+        sock.close()
+    parent.send('close')
+    proc.join(timeout=10)
+
+    return {
+        'server': kind,
+        'connections': count,
+        'elapsed_s': elapsed,
+        'connections_per_second': count / elapsed if elapsed > 0 else float('inf'),
+        'rss_per_connection_kb': (rss - baseline_rss) / max(count, 1),
+        'server_threads': threads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--port', type=int, default=18888)
+    args = parser.parse_args()
+
+    print(f"Bağlantı sayısı: {args.connections}")
+    print(f"{'Sunucu':<10} {'bağl.':>7} {'süre(s)':>9} {'bağl./s':>10} {'KB/bağl.':>10} {'thread':>7}")
+    for i, kind in enumerate(('legacy', 'engine')):
+        result = bench(kind, args.port + i, args.connections)
+        print(f"{result['server']:<10} {result['connections']:>7} {result['elapsed_s']:>9.3f} "
+              f"{result['connections_per_second']:>10.0f} {result['rss_per_connection_kb']:>10.1f} "
+              f"{result['server_threads']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Trilateration benchmark'ı - tag başına Python döngüsü vs. toplu çözücüler
+
+Galeri boyunca dizilmiş anchor'lar ve rastgele tag konumları üretilir;
+her tag yalnızca menzilindeki anchor'ları görür (diğerleri maskelenir) ve
+mesafelere gürültü eklenir. Üç yol aynı çözümü hesaplar:
+
+    legacy loop     Önceki trilaterate_2d (Python skalerleri), tag başına
+                    ilk üç geçerli anchor Python'da seçilir
+    wrapper loop    Tag başına trilaterate_2d (artık toplu çözücünün
+                    tek satırlık sarmalayıcısı)
+    batch           Tek trilaterate_2d_batch çağrısı (maske dahil)
+    lm cold         multilaterate_batch, menzildeki tüm anchor'lar,
+                    lineer çözümden başlar
+    lm warm         Aynı, önceki konumdan (gerçek konum + --warm-noise)
+                    sıcak başlangıç (tracking'de Kalman durumu)
+    cached lsq      Tag'ler anchor alt kümesine göre gruplanır; menzildeki
+                    tüm anchor'larla lineer en küçük kareler, alt küme
+                    başına önbellekteki sözde ters ile (AnchorGeometryCache)
+    lm robust       robust_multilaterate_batch: lm warm + aykırı / NLOS
+                    ölçüm ayıklama (ret sütunu çıkarılan ölçüm sayısıdır)
+
+--nlos ile ölçümlerin bir kısmına NLOS benzeri pozitif sapma (1-5 m) eklenir.
+
+Doğruluk sütunu gerçek konuma ortalama hatadır; uzun galerilerde ilk üç
+anchor çoğu zaman neredeyse doğrusaldır ve lineer çözüm hatası büyür.
+
+Kullanım:
+    python -m benchmarks.bench_trilateration --tags 1000 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.trilateration import (AnchorGeometryCache, multilaterate_batch, robust_multilaterate_batch,
+                                    trilaterate_2d, trilaterate_2d_batch)
+
+
+def legacy_trilaterate_2d(anchors, distances):
+    """Önceki skaler uygulama (karşılaştırma için)."""
+    x1, y1 = anchors[0]
+    x2, y2 = anchors[1]
+    x3, y3 = anchors[2]
+    r1, r2, r3 = distances[0], distances[1], distances[2]
+    A = 2 * (x2 - x1)
+    B = 2 * (y2 - y1)
+    C = r1**2 - r2**2 - x1**2 + x2**2 - y1**2 + y2**2
+    D = 2 * (x3 - x2)
+    E = 2 * (y3 - y2)
+    F = r2**2 - r3**2 - x2**2 + x3**2 - y2**2 + y3**2
+    det = A * E - B * D
+    if abs(det) < 0.001:
+        return None
+    return ((C * E - F * B) / det, (A * F - D * C) / det)
+
+
+def synthesize(tags, anchors, spacing, max_range, noise, nlos=0.0, seed=7):
+    rng = np.random.default_rng(seed)
+    # İki sıra anchor (galeri duvarları), zikzak dizilim
+    anchor_xy = np.column_stack([np.arange(anchors) * spacing / 2, np.where(np.arange(anchors) % 2, 8.0, 0.0)])
+    tag_xy = np.column_stack([rng.uniform(0, anchor_xy[-1, 0], tags), rng.uniform(0.5, 7.5, tags)])
+    true_distance = np.linalg.norm(anchor_xy[None] - tag_xy[:, None], axis=-1)
+    valid = true_distance <= max_range
+    distances = np.where(valid, true_distance + rng.normal(0, noise, true_distance.shape), np.nan)
+    # NLOS: duvar/kaya arkasından gelen sinyal yolu uzatır (yalnızca pozitif sapma)
+    biased = rng.random(distances.shape) < nlos
+    distances = np.where(biased, distances + rng.uniform(1.0, 5.0, distances.shape), distances)
+    return anchor_xy, tag_xy, distances, valid
+
+
+def run_legacy(anchor_xy, distances, valid, solver):
+    anchors = [tuple(a) for a in anchor_xy.tolist()]
+    positions = []
+    for row, mask in zip(distances.tolist(), valid.tolist()):
+        used = [i for i, ok in enumerate(mask) if ok][:3]
+        if len(used) < 3:
+            positions.append(None)
+            continue
+        positions.append(solver([anchors[i] for i in used], [row[i] for i in used]))
+    return positions
+
+
+def run_cached(anchor_xy, distances, valid, cache):
+    anchors = {i: (x, y, 0.0) for i, (x, y) in enumerate(anchor_xy.tolist())}
+    positions = np.full((len(distances), 2), np.nan)
+    # Aynı alt kümeyi gören tag'ler tek matris çarpımıyla çözülür
+    subsets, inverse = np.unique(valid, axis=0, return_inverse=True)
+    for group, mask in enumerate(subsets):
+        columns = tuple(np.flatnonzero(mask).tolist())
+        geometry = cache.get(columns, anchors.get)
+        rows = np.flatnonzero(inverse.ravel() == group)
+        solved = AnchorGeometryCache.solve(geometry, distances[np.ix_(rows, list(geometry.anchor_ids))])
+        if solved is not None:
+            positions[rows] = solved
+    return [None if np.isnan(x) else (x, y) for x, y in positions.tolist()]
+
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tags', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--anchors', type=int, default=24)
+    parser.add_argument('--spacing', type=float, default=20.0)
+    parser.add_argument('--range', type=float, default=25.0, help='Anchor menzili (m)')
+    parser.add_argument('--noise', type=float, default=0.1, help='Mesafe gürültüsü (m, std)')
+    parser.add_argument('--nlos', type=float, default=0.0, help='NLOS sapmalı ölçüm oranı (0-1)')
+    parser.add_argument('--warm-noise', type=float, default=0.1, help='Sıcak başlangıç hatası (m, std)')
+    parser.add_argument('--iterations', type=int, default=8, help='LM iterasyon sınırı')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.anchors} anchor, menzil {args.range:.0f} m, gürültü σ={args.noise} m, NLOS %{args.nlos * 100:.0f}\n")
+    print(f"{'Tag':>7}  {'Yol':<14}{'süre ms':>10}{'µs/tag':>9}{'hız':>8}{'çözülen':>9}{'ort. hata m':>13}"
+          f"{'iter':>6}{'ret':>7}")
+    for tags in args.tags:
+        anchor_xy, tag_xy, distances, valid = synthesize(tags, args.anchors, args.spacing, args.range, args.noise,
+                                                      args.nlos)
+
+        legacy_time, legacy = timed(lambda: run_legacy(anchor_xy, distances, valid, legacy_trilaterate_2d),
+                                    args.repeat)
+        wrapper_time, wrapped = timed(lambda: run_legacy(anchor_xy, distances, valid, trilaterate_2d),
+                                      args.repeat)
+        batch_time, result = timed(lambda: trilaterate_2d_batch(anchor_xy, distances, valid), args.repeat)
+        warm_start = tag_xy + np.random.default_rng(3).normal(0, args.warm_noise, tag_xy.shape)
+        cold_time, cold = timed(lambda: multilaterate_batch(anchor_xy, distances, valid,
+                                                            max_iterations=args.iterations), args.repeat)
+        warm_time, warm = timed(lambda: multilaterate_batch(anchor_xy, distances, valid, initial=warm_start,
+                                                            max_iterations=args.iterations), args.repeat)
+        robust_time, robust = timed(lambda: robust_multilaterate_batch(
+            anchor_xy, distances, valid, initial=warm_start, max_iterations=args.iterations), args.repeat)
+        cache = AnchorGeometryCache()
+        cached_time, cached = timed(lambda: run_cached(anchor_xy, distances, valid, cache), args.repeat)
+
+        def summary(positions):
+            solved = [(i, p) for i, p in enumerate(positions) if p is not None]
+            error = np.mean([np.hypot(p[0] - tag_xy[i, 0], p[1] - tag_xy[i, 1]) for i, p in solved])
+            return len(solved), error
+
+        def rows(solution):
+            return [None if singular else position
+                    for position, singular in zip(solution.positions.tolist(), solution.singular.tolist())]
+
+        for name, elapsed, positions, iterations, rejected in (
+                ('legacy loop', legacy_time, legacy, None, None),
+                ('wrapper loop', wrapper_time, wrapped, None, None),
+                ('batch', batch_time, rows(result), None, None),
+                ('lm cold', cold_time, rows(cold), cold.iterations.mean(), None),
+                ('lm warm', warm_time, rows(warm), warm.iterations.mean(), None),
+                ('lm robust', robust_time, rows(robust), robust.iterations.mean(), int(robust.rejected.sum())),
+                ('cached lsq', cached_time, cached, None, None)):
+            solved, error = summary(positions)
+            print(f"{tags:>7}  {name:<14}{elapsed * 1000:>10.1f}{elapsed / tags * 1e6:>9.2f}"
+                  f"{legacy_time / elapsed:>7.1f}x{solved:>9}{error:>13.3f}"
+                  + (f"{iterations:>6.1f}" if iterations is not None else '')
+                  + (f"{rejected:>7}" if rejected is not None else ''))
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -1190,7 +1190,7 @@ class Mine3DView(BaseClass):
         update_info = {
             'id': entity_data['id'],
             'type': entity_type,
-            'location': entity_data['location'],
+            'location': dict(entity_data['location']),
             'battery': entity_data['battery'],
             'status': entity_data.get('status', 'active')
         }
@@ -396,6 +396,8 @@ class DashboardScreen(QWidget):
         anchors_used = data.get('anchors_used', [])
         timestamp = datetime.now().strftime('%H:%M:%S')
         item_text = f"[{timestamp}] {tag_id} → ({final_pos[0]:.1f}, {final_pos[1]:.1f}) ±{accuracy:.2f}m [{', '.join(anchors_used)}]"
+        if data.get('anchors_rejected'):
+            item_text += f" ⚠️ NLOS: {data['anchors_rejected']}"
         self.calculations_list.insertItem(0, item_text)
         while self.calculations_list.count() > 15:
             self.calculations_list.takeItem(self.calculations_list.count() - 1)
@@ -239,6 +239,18 @@ class SettingsScreen(QWidget):
             item = self.create_status_item(label, value)
             layout.addWidget(item)
         
+        # Ingest metrikleri (canlı)
+        self.ingest_rate_item = self.create_status_item('📶 Veri Akışı (1s/10s/60s)', '-')
+        self.ingest_anchor_item = self.create_status_item('📡 Aktif Anchor', '-')
+        self.ingest_latency_item = self.create_status_item('⏱️ Konum Gecikmesi', '-')
+        layout.addWidget(self.ingest_rate_item)
+        layout.addWidget(self.ingest_anchor_item)
+        layout.addWidget(self.ingest_latency_item)
+        
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_ingest_metrics)
+        self.metrics_timer.start(1000)
+        
         layout.addStretch()
         
         # Versi on bilgisi
@@ -290,8 +302,27 @@ class SettingsScreen(QWidget):
         layout.addStretch()
         layout.addWidget(value_widget)
         
+        widget.value_label = value_widget
         return widget
     
+    def update_ingest_metrics(self):
+        """Ingest hızları ve gecikme yüzdeliklerini güncelle (ekran görünürken)"""
+        if not self.isVisible():
+            return
+        
+        snapshot = self.tracking.metrics.snapshot()
+        latency = snapshot['latency']
+        active_anchors = sum(1 for rate in snapshot['anchor_rates'].values() if rate > 0)
+        
+        self.ingest_rate_item.value_label.setText(
+            f"{snapshot['rate_1s']:.0f} / {snapshot['rate_10s']:.0f} / {snapshot['rate_60s']:.0f} paket/s"
+        )
+        self.ingest_anchor_item.value_label.setText(f"{active_anchors} Anchor")
+        if latency['count']:
+            self.ingest_latency_item.value_label.setText(
+                f"p50 {latency['p50'] * 1000:.1f} ms  |  p99 {latency['p99'] * 1000:.1f} ms"
+            )
+    
     def on_language_changed(self, index):
         """Dil değiştiğinde"""
         lang_code = self.language_combo.itemData(index)
@@ -2,14 +2,25 @@
 from PyQt6.QtCore import QObject, pyqtSignal, QTimer
 import random
 import math
+import time
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
-from services.kalman_filter import KalmanFilter2D
+import numpy as np
+
+from services.kalman_filter import KalmanFilterBank
+from services.binary_protocol import RangeReport, tag_id_from_number
+from services.ingest_queue import is_priority_payload
+from services.anchor_selection import AnchorSelectionGrid
+from services.entity_registry import EntityRegistry
+from services.ingest_workers import MeasurementBatch
+from services.ingest_metrics import IngestMetrics
+from services.payload_decoder import MeasurementReport, PayloadDecoder, is_flag_set
+from services.site_layout import SITE_DIMENSIONS, default_anchor_layout
 from services.trilateration import (
-    trilaterate_2d, trilaterate_3d, 
+    trilaterate_2d, trilaterate_3d, robust_multilaterate_batch, AnchorGeometry, AnchorGeometryCache,
     calculate_distance, calculate_distance_3d,
-    select_best_anchors, estimate_position_accuracy
+    estimate_position_accuracy
 )
 
 class AdvancedTrackingService(QObject):
@@ -33,25 +44,35 @@ class AdvancedTrackingService(QObject):
     anchor_status_changed = pyqtSignal(dict)
     tag_status_changed = pyqtSignal(dict)
     
-    def __init__(self, mode='hybrid'):
+    def __init__(self, mode='hybrid', dimensions=SITE_DIMENSIONS):
         """
         Args:
             mode: 'simulation', 'tcp', 'hybrid'
+            dimensions: 2 (yatay konum, z anchor ortalaması) veya 3 (çok katlı sahalar)
         """
         super().__init__()
         
+        if dimensions not in (2, 3):
+            raise ValueError(f"dimensions 2 veya 3 olmalı: {dimensions}")
         self.mode = mode  # simulation, tcp, hybrid
-        self.anchors = []
-        self.tags = []
-        self.personnel = []
+        self.dimensions = dimensions
+        self.registry = EntityRegistry()  # anchor / tag / personel, ID indeksli
         self.zones = []
         
         # Tag tracking data
-        self.tag_filters = {}  # tag_id -> KalmanFilter2D
+        self.tag_filters = self.create_filter_bank()  # tag_id -> Kalman durumu (tüm tag'ler tek dizide)
         self.tag_raw_positions = {}  # tag_id -> [recent raw positions]
         self.tag_trails = {}  # tag_id -> [position history for visualization]
         self.tag_distances = {}  # tag_id -> {anchor_id: distance}
         self.snap_tags = {}  # anchor_id -> [tag_ids] (snapped within 45cm)
+        self.binary_tag_ids = {}  # binary tag numarası -> tag_id
+        self.geometry_cache = AnchorGeometryCache()  # anchor alt kümesi -> çözüm geometrisi
+        self.anchor_selector = AnchorSelectionGrid(dimensions=dimensions)  # konum -> GDOP'a göre en iyi anchor alt kümesi
+        
+        # Ingest metrikleri (TCP/UDP servisleri de buraya yazar)
+        self.metrics = IngestMetrics()
+        self.payload_decoder = PayloadDecoder()  # Ham sözlük yolu için ortak şema
+        self.positions_emitted = 0
         
         # Configuration
         self.smoothing_factor = 0.3
@@ -59,6 +80,10 @@ class AdvancedTrackingService(QObject):
         self.trail_max_length = 50
         self.snap_distance = 0.45  # 45cm
         self.min_position_change = 0.20  # 20cm - prevent jitter
+        self.solver_max_iterations = 8  # Tag başına LM iterasyon sınırı
+        self.nlos_threshold = 1.0  # Aykırı / NLOS mesafe sapması sınırı (m)
+        self.nlos_max_rejections = 2  # Tag başına çözümden çıkarılabilecek en fazla ölçüm
+        self.anchors_rejected = 0  # Toplam çıkarılan ölçüm
         
         self.init_anchors()
         self.init_zones()
@@ -70,52 +95,27 @@ class AdvancedTrackingService(QObject):
         if self.mode in ['simulation', 'hybrid']:
             self.update_timer.start(2000)
     
+    @property
+    def anchors(self) -> List[dict]:
+        return self.registry.anchors
+    
+    @property
+    def tags(self) -> List[dict]:
+        return self.registry.tags
+    
+    @property
+    def personnel(self) -> List[dict]:
+        return self.registry.personnel
+    
     def init_anchors(self):
         """6 Anchor'ı başlat (mevcut sistem)"""
-        self.anchors = [
-            {
-                'id': 'ANC001', 'name': 'Ana Şaft Anchor', 'zone': 'Ana Şaft',
-                'color': '#00D4FF', 'x': 0, 'y': 0, 'z': -10,
-                'status': 'online', 'battery': 95, 'signal_strength': 98,
-                'firmware_version': '2.1.0', 'last_maintenance': '2025-01-15',
-                'coverage_radius': 100, 'type': 'anchor'
-            },
-            {
-                'id': 'ANC002', 'name': 'Sektör A Anchor', 'zone': 'Sektör A',
-                'color': '#00FF88', 'x': -350, 'y': -200, 'z': -25,
-                'status': 'online', 'battery': 88, 'signal_strength': 95,
-                'firmware_version': '2.1.0', 'last_maintenance': '2025-01-15',
-                'coverage_radius': 100, 'type': 'anchor'
-            },
-            {
-                'id': 'ANC003', 'name': 'Sektör B Anchor', 'zone': 'Sektör B',
-                'color': '#FFB800', 'x': 350, 'y': -200, 'z': -30,
-                'status': 'online', 'battery': 92, 'signal_strength': 96,
-                'firmware_version': '2.1.0', 'last_maintenance': '2025-01-15',
-                'coverage_radius': 100, 'type': 'anchor'
-            },
-            {
-                'id': 'ANC004', 'name': 'Sektör C Anchor', 'zone': 'Sektör C',
-                'color': '#9966FF', 'x': 0, 'y': 280, 'z': -20,
-                'status': 'online', 'battery': 78, 'signal_strength': 92,
-                'firmware_version': '2.0.5', 'last_maintenance': '2025-01-10',
-                'coverage_radius': 100, 'type': 'anchor'
-            },
-            {
-                'id': 'ANC005', 'name': 'İşleme Anchor', 'zone': 'İşleme',
-                'color': '#FF3366', 'x': -250, 'y': 350, 'z': -15,
-                'status': 'online', 'battery': 85, 'signal_strength': 94,
-                'firmware_version': '2.1.0', 'last_maintenance': '2025-01-15',
-                'coverage_radius': 100, 'type': 'anchor'
-            },
-            {
-                'id': 'ANC006', 'name': 'Atölye Anchor', 'zone': 'Atölye',
-                'color': '#00CCFF', 'x': 250, 'y': 350, 'z': -12,
-                'status': 'online', 'battery': 90, 'signal_strength': 97,
-                'firmware_version': '2.1.0', 'last_maintenance': '2025-01-15',
-                'coverage_radius': 100, 'type': 'anchor'
-            }
-        ]
+        self.set_anchors(default_anchor_layout())
+    
+    def set_anchors(self, anchors: List[dict]):
+        """Anchor listesini değiştir (geometri önbelleği sıfırlanır, seçim ızgarası yeniden kurulur)"""
+        self.registry.set_anchors(anchors)
+        self.geometry_cache.invalidate()
+        self.anchor_selector.rebuild_async(self.anchors)
     
     def init_zones(self):
         """Bölgeleri başlat"""
@@ -182,7 +182,7 @@ class AdvancedTrackingService(QObject):
                 'phone': f'+90 555 {random.randint(100, 999)} {random.randint(10, 99)} {random.randint(10, 99)}',
                 'email': f'{first_name.lower()}.{last_name.lower()}@minetracker.com'
             }
-            self.personnel.append(person)
+            self.registry.add_person(person)
             
             # Tag
             tag = {
@@ -196,24 +196,46 @@ class AdvancedTrackingService(QObject):
                 'last_seen': datetime.now(),
                 'type': 'tag'
             }
-            self.tags.append(tag)
+            self.registry.add_tag(tag)
             
             # Kalman filter başlat
-            self.tag_filters[tag_id] = KalmanFilter2D(
-                process_variance=0.005,
-                measurement_variance=0.5,
-                initial_value=(initial_x, initial_y)
-            )
+            self.tag_filters.add(tag_id, (initial_x, initial_y, initial_z))
             
             # Boş geçmiş
             self.tag_raw_positions[tag_id] = []
             self.tag_trails[tag_id] = []
     
+    def create_filter_bank(self) -> KalmanFilterBank:
+        """Konum boyutuna uygun sabit hız Kalman filtre bankası"""
+        return KalmanFilterBank(
+            self.dimensions,
+            process_variance=0.05,  # Yürüyen personel: ~0.2 m/s² ivme belirsizliği
+            measurement_variance=0.5
+        )
+    
+    def set_dimensions(self, dimensions: int):
+        """2D / 3D konumlama arasında geç (filtre durumları yeni boyutla yeniden kurulur)"""
+        if dimensions not in (2, 3):
+            raise ValueError(f"dimensions 2 veya 3 olmalı: {dimensions}")
+        if dimensions == self.dimensions:
+            return
+        self.dimensions = dimensions
+        # 3D'de alt kümeler 3D DOP ile ve NLOS ayıklamaya yetecek boyutta (dim + 2) seçilir
+        self.anchor_selector = AnchorSelectionGrid(dimensions=dimensions)
+        self.anchor_selector.rebuild_async(self.anchors)
+        previous, self.tag_filters = self.tag_filters, self.create_filter_bank()
+        # Konumu bilinen (personele bağlı) tag'ler son konumdan, diğerleri soğuk başlar
+        for person in self.personnel:
+            if person['tag_id'] in previous:
+                self.tag_filters.add(person['tag_id'], person.get_location())
+        self.tag_raw_positions = {tag_id: [] for tag_id in self.tag_raw_positions}
+    
     def update_simulation(self):
         """Simülasyon - konumları güncelle"""
         if self.mode not in ['simulation', 'hybrid']:
             return
         
+        moved = []
         for person in self.personnel:
             if person['status'] != 'active':
                 continue
@@ -233,8 +255,7 @@ class AdvancedTrackingService(QObject):
                 tag_id = person['tag_id']
                 self.simulate_anchor_distances(tag_id, person['location'])
                 
-                # Trilateration ile konum hesapla
-                self.calculate_tag_position(tag_id)
+                moved.append(person)
                 
                 # Kalp atışı
                 person['heart_rate'] = max(60, min(110, person['heart_rate'] + random.randint(-3, 3)))
@@ -251,9 +272,13 @@ class AdvancedTrackingService(QObject):
                         })
                 
                 person['last_update'] = datetime.now()
-                
-                # Signal emit
-                self.location_updated.emit({'type': 'personnel', 'data': person})
+        
+        # Multilateration ile konum hesapla (hareket eden tüm tag'ler tek seferde)
+        self.calculate_tag_positions([person['tag_id'] for person in moved])
+        
+        # Signal emit
+        for person in moved:
+            self.location_updated.emit({'type': 'personnel', 'data': person})
     
     def simulate_anchor_distances(self, tag_id: str, location: dict):
         """Simülasyon için anchor mesafelerini hesapla"""
@@ -278,31 +303,69 @@ class AdvancedTrackingService(QObject):
             # Kaydet
             self.tag_distances[tag_id][anchor['id']] = measured_distance
     
-    def process_tcp_data(self, data: dict):
-        """TCP'den gelen gerçek veriyi işle"""
-        if 'measurements' not in data:
-            return
+    def process_tcp_data(self, data):
+        """TCP'den gelen gerçek veriyi işle (JSON dict veya binary RangeReport)"""
+        self.calculate_tag_positions(dict.fromkeys(self.store_measurements(data)))
+    
+    def process_tcp_batch(self, batch: list, received_at: Optional[list] = None):
+        """
+        TCP'den gelen paket listesini tek seferde işle.
         
-        anchor_id = data.get('anchor_id')
-        if not anchor_id:
-            return
+        Önce tüm mesafeler kaydedilir, sonra batch içinde güncellenen tüm
+        tag'lerin konumu tek toplu multilateration ile bir kez hesaplanır.
         
-        for measurement in data['measurements']:
-            tag_id = measurement.get('tag_id')
-            
-            # Mesafe
-            distance = None
-            if 'distance(m)' in measurement and isinstance(measurement['distance(m)'], dict):
-                distance = measurement['distance(m)'].get('distance')
-            else:
-                distance = measurement.get('distance') or measurement.get('distance_m')
-            
-            if distance is None or tag_id is None:
-                continue
-            
+        received_at verilirse (paket başına time.monotonic() alınma zamanı)
+        tag'in batch'teki en eski ölçümünden position_calculated'a kadar
+        geçen süre metrics.latency histogramına yazılır.
+        """
+        touched = {}
+        measured_at = None
+        if received_at is None:
+            for data in batch:
+                for tag_id in self.store_measurements(data):
+                    touched[tag_id] = None
+        else:
+            measured_at = {}  # tag -> en yeni ölçümün alınma zamanı (Kalman dt)
+            for data, received in zip(batch, received_at):
+                for tag_id in self.store_measurements(data):
+                    if touched.get(tag_id) is None:
+                        touched[tag_id] = received
+                    measured_at[tag_id] = received
+        
+        emitted = self.calculate_tag_positions(touched, measured_at)
+        if received_at is not None:
+            latency = self.metrics.latency
+            now = time.monotonic()
+            for tag_id in emitted:
+                latency.record(now - touched[tag_id])
+    
+    def store_measurements(self, data) -> List[str]:
+        """Paketteki mesafeleri kaydet, güncellenen tag ID'lerini döndür"""
+        if isinstance(data, MeasurementReport):
+            return self.store_measurement_report(data)
+        
+        if isinstance(data, RangeReport):
+            return self.store_range_report(data)
+        
+        if isinstance(data, MeasurementBatch):
+            return self.store_measurement_batch(data)
+        
+        if is_priority_payload(data):
+            self.handle_device_alert(data)
+        
+        # Ham sözlük (ör. alarm paketindeki ölçümler): ingest ile aynı şemayla normalize et
+        report = self.payload_decoder.normalize(data)
+        if isinstance(report, MeasurementReport):
+            return self.store_measurement_report(report)
+        return []
+    
+    def store_measurement_report(self, report: MeasurementReport) -> List[str]:
+        """Normalize edilmiş JSON paketini kaydet (şema doğrulaması ingest'te yapıldı)"""
+        anchor_id = report.anchor_id
+        updated = []
+        for tag_id, distance in zip(report.tag_ids, report.distances):
             # Filtrele (0-20m arası)
-            distance = float(distance)
-            if distance < 0 or distance > 20:
+            if not 0 < distance < 20:
                 continue
             
             # Kaydet
@@ -312,82 +375,252 @@ class AdvancedTrackingService(QObject):
             self.tag_distances[tag_id][anchor_id] = distance
             
             # Tag yoksa oluştur (dinamik)
-            if not any(t['id'] == tag_id for t in self.tags):
+            if not self.registry.has_tag(tag_id):
                 self.create_dynamic_tag(tag_id)
             
-            # Konum hesapla
-            self.calculate_tag_position(tag_id)
+            updated.append(tag_id)
+        
+        return updated
+    
+    def store_range_report(self, report: RangeReport) -> List[str]:
+        """
+        Binary range report kayıtlarını kaydet.
+        
+        Kayıtlar NumPy structured array olarak gelir; birim dönüşümü ve
+        0-20m filtresi vektörize yapılır, ara dict oluşturulmaz.
+        """
+        records = report.records
+        if records.size == 0:
+            return []
+        
+        distances = records['distance_mm'] * 0.001
+        valid = (distances > 0) & (distances < 20)
+        
+        anchor_id = report.anchor_id
+        updated = []
+        for tag_number, distance in zip(records['tag'][valid].tolist(), distances[valid].tolist()):
+            tag_id = self.binary_tag_ids.get(tag_number)
+            if tag_id is None:
+                tag_id = self.binary_tag_ids[tag_number] = tag_id_from_number(tag_number)
+            
+            if tag_id not in self.tag_distances:
+                self.tag_distances[tag_id] = {}
+            
+            self.tag_distances[tag_id][anchor_id] = distance
+            
+            if not self.registry.has_tag(tag_id):
+                self.create_dynamic_tag(tag_id)
+            
+            updated.append(tag_id)
+        
+        return updated
+    
+    def store_measurement_batch(self, batch: MeasurementBatch) -> List[str]:
+        """Ingest worker'larından gelen kompakt ölçümleri kaydet"""
+        valid = (batch.distances > 0) & (batch.distances < 20)
+        
+        updated = []
+        for anchor_id, tag_id, distance, ok in zip(batch.anchor_ids, batch.tag_ids,
+                                                   batch.distances.tolist(), valid.tolist()):
+            if not ok:
+                continue
+            
+            if tag_id not in self.tag_distances:
+                self.tag_distances[tag_id] = {}
+            
+            self.tag_distances[tag_id][anchor_id] = distance
+            
+            if not self.registry.has_tag(tag_id):
+                self.create_dynamic_tag(tag_id)
+            
+            updated.append(tag_id)
+        
+        return updated
     
     def calculate_tag_position(self, tag_id: str):
         """Trilateration + Kalman filter ile konum hesapla"""
+        self.calculate_tag_positions([tag_id])
+    
+    def calculate_tag_positions(self, tag_ids, measured_at: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        Birden fazla tag'in konumunu hesapla; multilateration tek toplu çağrıdır.
+        
+        Args:
+            measured_at: tag_id -> ölçüm zamanı (time.monotonic()); verilmeyen tag'ler için
+                şimdi. Kalman filtresi önceki ölçümden bu yana geçen süre kadar ilerletilir.
+        
+        Returns:
+            position_calculated yayınlanan tag ID'leri
+        """
+        now = time.monotonic()
+        solves = []
+        for tag_id in tag_ids:
+            solve = self.prepare_tag_solve(tag_id)
+            if solve is not None:
+                solves.append(solve)
+        
+        if not solves:
+            return []
+        
+        # Tüm tag'ler için tek en küçük kareler çözümü (tag başına tüm anchor'lar,
+        # eksik sütunlar maskelenir); önceki Kalman durumundan sıcak başlangıç
+        dim = self.dimensions
+        width = max(len(geometry.anchor_ids) for _, _, _, geometry, _ in solves)
+        anchors = np.zeros((len(solves), width, 3))
+        distances = np.full((len(solves), width), np.nan)
+        initial = np.full((len(solves), dim), np.nan)
+        counts = np.zeros(len(solves), dtype=np.intp)
+        depths = np.zeros(len(solves))  # Anchor ortalama z (düzlemsel çözümde z)
+        cold = {}  # anchor alt kümesi -> (geometri, satırlar) - Kalman durumu olmayan tag'ler
+        for row, (tag_id, _, _, geometry, tag_distances) in enumerate(solves):
+            count = counts[row] = len(tag_distances)
+            anchors[row, :count] = geometry.positions
+            depths[row] = geometry.positions[:, 2].mean()
+            distances[row, :count] = tag_distances
+            if tag_id not in self.tag_filters:
+                cold.setdefault(geometry.anchor_ids, (geometry, []))[1].append(row)
+        if measured_at:
+            timestamps = np.array([measured_at.get(solve[0], now) for solve in solves])
+        else:
+            timestamps = np.full(len(solves), now)
+        # Sıcak başlangıç: Kalman durumu ölçüm zamanına ekstrapole edilir
+        warm = [row for row, solve in enumerate(solves) if solve[0] in self.tag_filters]
+        if warm:
+            initial[warm] = self.tag_filters.extrapolate([solves[row][0] for row in warm], timestamps[warm])
+        
+        # Soğuk başlangıç: alt küme başına önbellekteki lineer çözüm (tek matris çarpımı)
+        for geometry, rows in cold.values():
+            linear = self.geometry_cache.solve(geometry, distances[rows, :len(geometry.anchor_ids)])
+            if linear is not None:
+                initial[rows, :2] = linear
+                if dim == 3:
+                    initial[rows, 2] = depths[rows]
+        
+        # 3D'de dört anchor'dan azını gören tag'ler düzlemde çözülür (z: anchor ortalaması)
+        positions = np.column_stack([np.full((len(solves), 2), np.nan), depths])
+        singular = np.ones(len(solves), dtype=bool)
+        rejected = np.zeros((len(solves), width), dtype=bool)
+        solid = counts >= 4 if dim == 3 else np.zeros(len(solves), dtype=bool)
+        for rows, solve_dim in ((np.flatnonzero(solid), 3), (np.flatnonzero(~solid), 2)):
+            if not len(rows):
+                continue
+            # NLOS ayıklamalı çözüm: aykırı mesafeler uzlaşı aramasıyla çıkarılır
+            result = robust_multilaterate_batch(anchors[rows, :, :solve_dim], distances[rows],
+                                                initial=initial[rows, :solve_dim],
+                                                threshold=self.nlos_threshold,
+                                                max_rejections=self.nlos_max_rejections,
+                                                max_iterations=self.solver_max_iterations)
+            positions[rows, :solve_dim] = result.positions
+            singular[rows] = result.singular
+            rejected[rows] = result.rejected
+        self.anchors_rejected += int(rejected.sum())
+        
+        # Çözülen tüm tag'lerin Kalman güncellemesi tek vektörel adım
+        solved = np.flatnonzero(~singular)
+        solved_tags = [solves[row][0] for row in solved]
+        for tag_id, row in zip(solved_tags, solved.tolist()):
+            if tag_id not in self.tag_filters:
+                self.tag_filters.add(tag_id, positions[row, :dim])
+        filtered = self.tag_filters.update(solved_tags, positions[solved, :dim], timestamps[solved])
+        
+        emitted = []
+        for row, position, kalman_filtered in zip(solved.tolist(), positions[solved, :dim].tolist(),
+                                                  filtered.tolist()):
+            solve = solves[row]
+            if self.apply_tag_position(*solve, tuple(position), rejected[row, :len(solve[4])].tolist(),
+                                       tuple(kalman_filtered)):
+                emitted.append(solve[0])
+        return emitted
+    
+    def prepare_tag_solve(self, tag_id: str):
+        """
+        Snap kontrolü ve çözüme girecek anchor'lar.
+        
+        Returns:
+            (tag_id, person, mevcut konum, AnchorGeometry, mesafeler) veya None
+            (snap edildi / yeterli anchor yok); mesafeler geometrinin anchor sırasında
+        """
         if tag_id not in self.tag_distances:
-            return
+            return None
         
         # Snap kontrolü - anchor'a çok yakınsa snap et
         for anchor_id, distance in self.tag_distances[tag_id].items():
             if distance <= self.snap_distance:
                 self.snap_tag_to_anchor(tag_id, anchor_id)
-                return
+                return None
         
         # Snap'ten çıkar
         self.unsnap_tag(tag_id)
         
         # En az 3 anchor gerekli
-        if len(self.tag_distances[tag_id]) < 3:
-            return
-        
-        # Anchor ve mesafe listelerini hazırla
-        anchor_data = []
-        for anchor_id, distance in self.tag_distances[tag_id].items():
-            anchor = next((a for a in self.anchors if a['id'] == anchor_id), None)
-            if anchor and anchor['status'] == 'online':
-                anchor_data.append({
-                    'id': anchor_id,
-                    'position': (anchor['x'], anchor['y'], anchor['z']),
-                    'distance': distance
-                })
-        
-        if len(anchor_data) < 3:
-            return
+        tag_distances = self.tag_distances[tag_id]
+        if len(tag_distances) < 3:
+            return None
         
         # Mevcut konumu al (varsa)
-        person = next((p for p in self.personnel if p['tag_id'] == tag_id), None)
-        current_position = None
-        if person:
-            current_position = (
-                person['location']['x'],
-                person['location']['y'],
-                person['location']['z']
-            )
+        person = self.registry.person_for_tag(tag_id)
+        current_position = person.get_location() if person else None
+        
+        # Çevrimiçi anchor'lar ve konumları (alt küme başına önbellekte); çok
+        # anchor görülüyorsa tahmini konumun hücresindeki en iyi GDOP alt kümesi
+        geometry = None
+        if len(tag_distances) > self.anchor_selector.subset_size:
+            if tag_id in self.tag_filters:
+                estimate = self.tag_filters.get_position(tag_id)
+            else:
+                estimate = current_position
+            subset = self.anchor_selector.select(estimate, tag_distances) if estimate else None
+            if subset is not None:
+                geometry = self.geometry_cache.get(subset, self.online_anchor_position)
+                if len(geometry.anchor_ids) < self.dimensions + 2:
+                    # Hücrede menzilde az anchor var veya ızgara yeniden kurulurken anchor
+                    # çevrimdışı oldu: NLOS ayıklama fazlalık ister, tüm anchor'lar kullanılır
+                    geometry = None
+        if geometry is None:
+            geometry = self.geometry_cache.get(tuple(sorted(tag_distances)), self.online_anchor_position)
+            if len(geometry.anchor_ids) < 3:
+                return None
+        distances = [tag_distances[anchor_id] for anchor_id in geometry.anchor_ids]
+        
+        return tag_id, person, current_position, geometry, distances
+    
+    def apply_tag_position(self, tag_id: str, person, current_position, geometry: AnchorGeometry,
+                           distances: List[float], raw_position: Tuple[float, ...],
+                           rejected: Optional[List[bool]] = None,
+                           kalman_filtered: Optional[Tuple[float, ...]] = None) -> bool:
+        """
+        Trilateration sonucunu filtrele ve personele uygula.
         
-        # Smart anchor selection (en iyi 3-4 anchor)
-        if current_position and len(anchor_data) > 3:
-            anchor_data = select_best_anchors(current_position, anchor_data)[:3]
-        else:
-            anchor_data = anchor_data[:3]
+        Args:
+            raw_position: Çözüm (x, y) veya 3D modda (x, y, z)
+            rejected: Ölçüm başına çözümden çıkarıldı mı (aykırı / NLOS), geometri sırasında
+            kalman_filtered: Toplu Kalman güncellemesinin sonucu; None ise burada güncellenir
         
-        # Trilateration
-        anchors_2d = [(a['position'][0], a['position'][1]) for a in anchor_data]
-        distances = [a['distance'] for a in anchor_data]
+        Returns:
+            position_calculated yayınlandıysa True
+        """
+        anchor_positions = geometry.positions[:, :self.dimensions].tolist()
+        anchors_used = list(geometry.anchor_ids)
+        if rejected and any(rejected):
+            kept = [i for i, out in enumerate(rejected) if not out]
+            anchor_positions = [anchor_positions[i] for i in kept]
+            distances = [distances[i] for i in kept]
+            anchors_used = [anchors_used[i] for i in kept]
         
-        raw_position = trilaterate_2d(anchors_2d, distances)
+        # 2D modda Z koordinatını anchor ortalamasından tahmin et
+        avg_z = float(geometry.positions[:, 2].mean())
         
-        if not raw_position:
-            return
+        def to_3d(position):
+            return tuple(position) if len(position) == 3 else (position[0], position[1], avg_z)
         
-        # Z koordinatını anchor ortalamasından tahmin et
-        avg_z = sum(a['position'][2] for a in anchor_data) / len(anchor_data)
-        raw_position_3d = (raw_position[0], raw_position[1], avg_z)
+        raw_position_3d = to_3d(raw_position)
         
         # Kalman filter
-        if tag_id not in self.tag_filters:
-            self.tag_filters[tag_id] = KalmanFilter2D(
-                process_variance=0.005,
-                measurement_variance=0.5,
-                initial_value=raw_position
-            )
-        
-        kalman_filtered = self.tag_filters[tag_id].update(raw_position)
+        if kalman_filtered is None:
+            if tag_id not in self.tag_filters:
+                self.tag_filters.add(tag_id, raw_position)
+            kalman_filtered = tuple(
+                self.tag_filters.update([tag_id], [raw_position], time.monotonic())[0].tolist())
         
         # Moving average smoothing
         if tag_id not in self.tag_raw_positions:
@@ -401,24 +634,24 @@ class AdvancedTrackingService(QObject):
         
         # Hybrid (Kalman + Moving Average)
         if smoothed_position:
-            final_position = (
-                0.6 * kalman_filtered[0] + 0.4 * smoothed_position[0],
-                0.6 * kalman_filtered[1] + 0.4 * smoothed_position[1]
+            final_position = tuple(
+                0.6 * filtered + 0.4 * smoothed
+                for filtered, smoothed in zip(kalman_filtered, smoothed_position)
             )
         else:
             final_position = kalman_filtered
         
-        final_position_3d = (final_position[0], final_position[1], avg_z)
+        final_position_3d = to_3d(final_position)
         
         # Jitter önleme (20cm'den az değişim varsa güncelleme)
         if person and current_position:
             distance_change = calculate_distance_3d(final_position_3d, current_position)
             if distance_change < self.min_position_change:
-                return
+                return False
         
         # Accuracy estimation
         accuracy = estimate_position_accuracy(
-            anchors_2d, distances, final_position
+            anchor_positions, distances, final_position
         )
         
         # Personeli güncelle
@@ -427,51 +660,40 @@ class AdvancedTrackingService(QObject):
             if tag_id not in self.tag_trails:
                 self.tag_trails[tag_id] = []
             
-            self.tag_trails[tag_id].append({
-                'x': person['location']['x'],
-                'y': person['location']['y'],
-                'z': person['location']['z'],
-                'timestamp': datetime.now()
-            })
+            x, y, z = current_position
+            self.tag_trails[tag_id].append({'x': x, 'y': y, 'z': z, 'timestamp': datetime.now()})
             
             if len(self.tag_trails[tag_id]) > self.trail_max_length:
                 self.tag_trails[tag_id].pop(0)
             
-            # Konumu güncelle
-            person['raw_location'] = {
-                'x': raw_position_3d[0],
-                'y': raw_position_3d[1],
-                'z': raw_position_3d[2]
-            }
-            person['filtered_location'] = {
-                'x': final_position_3d[0],
-                'y': final_position_3d[1],
-                'z': final_position_3d[2]
-            }
-            person['location'] = {
-                'x': final_position_3d[0],
-                'y': final_position_3d[1],
-                'z': final_position_3d[2]
-            }
+            # Konumu güncelle (kayıt sütunlarına yazılır, sözlük oluşturulmaz)
+            person.set_location('raw_location', raw_position_3d)
+            person.set_location('filtered_location', final_position_3d)
+            person.set_location('location', final_position_3d)
             person['position_accuracy'] = accuracy
             
             # Bölge güncelle
             person['zone_id'], person['zone_name'] = self.determine_zone(person['location'])
             
             # Signal emit
+            self.positions_emitted += 1
             self.position_calculated.emit({
                 'tag_id': tag_id,
                 'person_id': person['id'],
                 'raw': raw_position_3d,
-                'kalman': (kalman_filtered[0], kalman_filtered[1], avg_z),
-                'smoothed': (smoothed_position[0], smoothed_position[1], avg_z) if smoothed_position else None,
+                'kalman': to_3d(kalman_filtered),
+                'smoothed': to_3d(smoothed_position) if smoothed_position else None,
                 'final': final_position_3d,
                 'accuracy': accuracy,
-                'anchors_used': [a['id'] for a in anchor_data]
+                'anchors_used': anchors_used,
+                'anchors_rejected': len(geometry.anchor_ids) - len(anchors_used)
             })
+            return True
+        
+        return False
     
-    def apply_moving_average(self, tag_id: str) -> Optional[Tuple[float, float]]:
-        """Moving average smoothing"""
+    def apply_moving_average(self, tag_id: str) -> Optional[Tuple[float, ...]]:
+        """Moving average smoothing (2D veya 3D)"""
         if tag_id not in self.tag_raw_positions or not self.tag_raw_positions[tag_id]:
             return None
         
@@ -480,18 +702,15 @@ class AdvancedTrackingService(QObject):
         if len(positions) == 0:
             return None
         
-        avg_x = sum(p[0] for p in positions) / len(positions)
-        avg_y = sum(p[1] for p in positions) / len(positions)
-        
-        return (avg_x, avg_y)
+        return tuple(sum(axis) / len(positions) for axis in zip(*positions))
     
     def snap_tag_to_anchor(self, tag_id: str, anchor_id: str):
         """Tag'ı anchor'a snap et (45cm içinde)"""
-        anchor = next((a for a in self.anchors if a['id'] == anchor_id), None)
+        anchor = self.registry.get_anchor(anchor_id)
         if not anchor:
             return
         
-        person = next((p for p in self.personnel if p['tag_id'] == tag_id), None)
+        person = self.registry.person_for_tag(tag_id)
         if not person:
             return
         
@@ -506,7 +725,7 @@ class AdvancedTrackingService(QObject):
         index = self.snap_tags[anchor_id].index(tag_id)
         
         if num_tags == 1:
-            person['location'] = {'x': anchor['x'], 'y': anchor['y'], 'z': anchor['z']}
+            person.set_location('location', (anchor['x'], anchor['y'], anchor['z']))
         else:
             # Dairesel dağılım
             radius = 0.2  # 20cm
@@ -514,11 +733,7 @@ class AdvancedTrackingService(QObject):
             offset_x = radius * math.cos(angle)
             offset_y = radius * math.sin(angle)
             
-            person['location'] = {
-                'x': anchor['x'] + offset_x,
-                'y': anchor['y'] + offset_y,
-                'z': anchor['z']
-            }
+            person.set_location('location', (anchor['x'] + offset_x, anchor['y'] + offset_y, anchor['z']))
         
         person['position_accuracy'] = 0.1  # Çok doğru (snap)
     
@@ -533,7 +748,7 @@ class AdvancedTrackingService(QObject):
     def create_dynamic_tag(self, tag_id: str):
         """Dinamik olarak yeni tag oluştur (TCP'den gelen veriler için)"""
         # Tag zaten varsa çık
-        if any(t['id'] == tag_id for t in self.tags):
+        if self.registry.has_tag(tag_id):
             return
         
         # Yeni tag
@@ -548,7 +763,7 @@ class AdvancedTrackingService(QObject):
             'last_seen': datetime.now(),
             'type': 'tag'
         }
-        self.tags.append(tag)
+        self.registry.add_tag(tag)
         
         # Dummy personel (opsiyonel - UI için)
         # Veya sadece tag olarak bırakabilirsin
@@ -589,6 +804,91 @@ class AdvancedTrackingService(QObject):
         """Tüm bölgeleri al"""
         return self.zones
     
+    def get_anchor_by_id(self, anchor_id: str) -> Optional[dict]:
+        """ID'ye göre anchor bul"""
+        return self.registry.get_anchor(anchor_id)
+    
+    def get_tag_by_id(self, tag_id: str) -> Optional[dict]:
+        """ID'ye göre tag bul"""
+        return self.registry.get_tag(tag_id)
+    
+    def get_person_by_id(self, person_id: str) -> Optional[dict]:
+        """ID'ye göre personel bul"""
+        return self.registry.get_person(person_id)
+    
+    def get_person_by_tag(self, tag_id: str) -> Optional[dict]:
+        """Tag'i taşıyan personel"""
+        return self.registry.person_for_tag(tag_id)
+    
+    def assign_tag(self, person_id: str, tag_id: Optional[str]):
+        """Personele tag ata (None: tag'i çöz)"""
+        self.registry.assign_tag(person_id, tag_id)
+    
+    def online_anchor_position(self, anchor_id: str) -> Optional[Tuple[float, float, float]]:
+        """Çevrimiçi anchor'ın konumu; bilinmiyor veya çevrimdışıysa None"""
+        anchor = self.registry.get_anchor(anchor_id)
+        if anchor is None or anchor['status'] != 'online':
+            return None
+        return (anchor['x'], anchor['y'], anchor['z'])
+    
+    def update_anchor_status(self, anchor_id: str, status: str):
+        """Anchor durumunu güncelle"""
+        anchor = self.registry.get_anchor(anchor_id)
+        if anchor:
+            changed = anchor['status'] != status
+            anchor['status'] = status
+            if changed:
+                self.geometry_cache.invalidate(anchor_id)
+                self.anchor_selector.rebuild_async(self.anchors)
+            self.anchor_status_changed.emit({
+                'id': anchor_id,
+                'status': status,
+                'anchor': anchor
+            })
+    
+    def update_tag_status(self, tag_id: str, status: str):
+        """Tag durumunu güncelle"""
+        tag = self.registry.get_tag(tag_id)
+        if tag:
+            tag['status'] = status
+            self.tag_status_changed.emit({
+                'id': tag_id,
+                'status': status,
+                'tag': tag
+            })
+    
+    def update_anchor_position(self, anchor_id: str, x: float, y: float, z: Optional[float] = None):
+        """Anchor'ı taşı (yeniden konumlandırma / kalibrasyon)"""
+        anchor = self.registry.get_anchor(anchor_id)
+        if anchor:
+            anchor['x'], anchor['y'] = x, y
+            if z is not None:
+                anchor['z'] = z
+            self.geometry_cache.invalidate(anchor_id)
+            self.anchor_selector.rebuild_async(self.anchors)
+            self.anchor_status_changed.emit({
+                'id': anchor_id,
+                'status': anchor['status'],
+                'anchor': anchor
+            })
+    
+    def predict_positions(self, tag_ids=None, at: Optional[float] = None) -> Dict[str, Tuple[float, ...]]:
+        """
+        Kalman durumundan "şimdiye" ekstrapole edilmiş konumlar (yeni ölçüm gerekmez).
+        
+        Arayüz ölçümler arasında işaretçileri akıcı hareket ettirmek için
+        kullanır; filtre durumu değişmez.
+        
+        Args:
+            tag_ids: Tag ID'leri; None ise filtresi olan tüm tag'ler
+            at: time.monotonic() zamanı; None ise şimdi
+        """
+        tag_ids = list(self.tag_filters) if tag_ids is None else [t for t in tag_ids if t in self.tag_filters]
+        if not tag_ids:
+            return {}
+        positions = self.tag_filters.extrapolate(tag_ids, time.monotonic() if at is None else at)
+        return {tag_id: tuple(position) for tag_id, position in zip(tag_ids, positions.tolist())}
+    
     def get_tag_trail(self, tag_id: str) -> List[dict]:
         """Tag'ın hareket geçmişini al"""
         return self.tag_trails.get(tag_id, [])
@@ -603,16 +903,20 @@ class AdvancedTrackingService(QObject):
         on_break = sum(1 for p in self.personnel if p['status'] == 'break')
         emergency_count = sum(1 for p in self.personnel if p['status'] == 'emergency')
         
-        avg_battery_personnel = sum(p['battery'] for p in self.personnel) / len(self.personnel) if self.personnel else 0
-        low_battery_personnel = sum(1 for p in self.personnel if p['battery'] < 20)
+        # Batarya alanları kayıt sütunlarından toplu okunur
+        personnel_battery = self.registry.person_columns.column('battery')
+        avg_battery_personnel = float(personnel_battery.mean()) if len(personnel_battery) else 0
+        low_battery_personnel = int((personnel_battery < 20).sum())
         
         online_anchors = sum(1 for a in self.anchors if a['status'] == 'online')
-        avg_battery_anchors = sum(a['battery'] for a in self.anchors) / len(self.anchors) if self.anchors else 0
-        low_battery_anchors = sum(1 for a in self.anchors if a['battery'] < 70)
+        anchor_battery = self.registry.anchor_columns.column('battery')
+        avg_battery_anchors = float(anchor_battery.mean()) if len(anchor_battery) else 0
+        low_battery_anchors = int((anchor_battery < 70).sum())
         
         active_tags = sum(1 for t in self.tags if t['status'] == 'active')
-        avg_battery_tags = sum(t['battery'] for t in self.tags) / len(self.tags) if self.tags else 0
-        low_battery_tags = sum(1 for t in self.tags if t['battery'] < 20)
+        tag_battery = self.registry.tag_columns.column('battery')
+        avg_battery_tags = float(tag_battery.mean()) if len(tag_battery) else 0
+        low_battery_tags = int((tag_battery < 20).sum())
         
         return {
             'personnel': {
@@ -641,12 +945,18 @@ class AdvancedTrackingService(QObject):
                 'total': len(self.anchors),
                 'online': online_anchors,
                 'offline': len(self.anchors) - online_anchors
-            }
+            },
+            'positioning': {
+                'positions_emitted': self.positions_emitted,
+                'anchors_rejected': self.anchors_rejected
+            },
+            'geometry_cache': self.geometry_cache.get_statistics(),
+            'anchor_selection': self.anchor_selector.get_statistics()
         }
     
     def trigger_emergency(self, entity_id: str, entity_type='personnel'):
         """Acil durum tetikle"""
-        entity = next((p for p in self.personnel if p['id'] == entity_id), None)
+        entity = self.registry.get_person(entity_id)
         if entity:
             entity['status'] = 'emergency'
             self.emergency_signal.emit({
@@ -654,11 +964,22 @@ class AdvancedTrackingService(QObject):
                 'id': entity_id,
                 'name': entity['full_name'],
                 'position': entity['position'],
-                'location': entity['location'],
+                'location': entity['location'].copy(),  # Olay anındaki konum
                 'zone': entity['zone_name'],
                 'timestamp': datetime.now().isoformat()
             })
     
+    def handle_device_alert(self, data: dict):
+        """Tag'den gelen SOS / acil durum paketini ilgili personele uygula"""
+        tag_ids = [data.get('tag_id')]
+        tag_ids.extend(m.get('tag_id') for m in data.get('measurements') or ()
+                       if isinstance(m, dict) and (is_flag_set(m.get('sos')) or is_flag_set(m.get('emergency'))))
+        
+        for tag_id in tag_ids:
+            person = self.registry.person_for_tag(tag_id)
+            if person and person['status'] != 'emergency':
+                self.trigger_emergency(person['id'])
+    
     def set_mode(self, mode: str):
         """Tracking modunu değiştir"""
         self.mode = mode
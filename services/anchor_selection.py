@@ -0,0 +1,227 @@
+"""Anchor Selection - GDOP tabanlı anchor alt kümesi seçimi (önceden hesaplanmış ızgara)"""
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def weighted_dop(points: np.ndarray, anchors: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Ağırlıklı geometrik hassasiyet kaybı (DOP), 2D veya 3D.
+
+    DOP = sqrt(iz((Hᵀ W H)⁻¹)), H satırları anchor'dan noktaya birim vektörler.
+    2x2 sistemin tersi kapalı formda, 3x3 sistemin izi özdeğerlerden alınır.
+
+    Args:
+        points: (G, boyut) noktalar
+        anchors: (G, S, boyut) nokta başına alt küme anchor konumları
+        weights: (G, S) anchor ağırlıkları (sinyal kalitesi)
+
+    Returns:
+        (G,) DOP değerleri (singüler geometri için inf)
+    """
+    delta = points[:, None, :] - anchors
+    if points.shape[-1] == 3:
+        unit = delta / np.maximum(np.linalg.norm(delta, axis=-1), 1e-6)[..., None]
+        normal = np.einsum('gs,gsi,gsj->gij', weights, unit, unit)
+        eigenvalues = np.linalg.eigvalsh(normal)
+        smallest = eigenvalues[:, 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dop = np.sqrt((1.0 / eigenvalues).sum(axis=1))
+        return np.where(smallest > 1e-9, dop, np.inf)
+
+    norm = np.maximum(np.hypot(delta[..., 0], delta[..., 1]), 1e-6)
+    ux = delta[..., 0] / norm
+    uy = delta[..., 1] / norm
+    a = (weights * ux * ux).sum(axis=1)
+    b = (weights * ux * uy).sum(axis=1)
+    c = (weights * uy * uy).sum(axis=1)
+    det = a * c - b * b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dop = np.sqrt((a + c) / det)
+    return np.where(det > 1e-9, dop, np.inf)
+
+
+class AnchorSelectionGrid:
+    """
+    Saha ızgarası üzerinde hücre başına en iyi anchor alt kümeleri.
+
+    Her hücre merkezi için menzildeki en yakın anchor'lardan subset_size
+    boyutlu tüm kombinasyonlar ağırlıklı DOP'a göre sıralanır (3D'de hücre
+    merkezi anchor ortalama yüksekliğinde alınır ve 3D DOP kullanılır); yalnızca
+    çevrimiçi anchor'lar aday olur ve sinyal gücü ağırlık olarak kullanılır.
+    Çalışma anında seçim, hücre araması (O(1)) ve tag'in ölçtüğü anchor'lara
+    göre geçerlilik kontrolüdür.
+
+    Anchor'lar değiştiğinde rebuild_async() ızgarayı arka planda yeniden
+    kurar; kurulum bitene kadar eski ızgara kullanılmaya devam eder.
+    """
+
+    def __init__(self, cell_size: float = 5.0, subset_size: Optional[int] = None,
+                 candidates: int = 8, subsets_per_cell: int = 4, margin: float = 20.0,
+                 dimensions: int = 2):
+        """
+        Args:
+            cell_size: Hücre kenarı (m)
+            subset_size: Seçilen alt küme boyutu (menzilde daha az varsa daha küçük);
+                None ise dimensions + 2 - NLOS ayıklamanın (robust_multilaterate_batch)
+                bir ölçümü dışarıda bırakıp yine de fazlalıkla çözebildiği en küçük boyut
+            candidates: Hücre başına değerlendirilen en yakın anchor sayısı
+            subsets_per_cell: Hücre başına saklanan sıralı alt küme sayısı
+            margin: Anchor sınırlarının dışına taşan ızgara payı (m)
+            dimensions: DOP boyutu (2 veya 3)
+        """
+        if dimensions not in (2, 3):
+            raise ValueError(f"dimensions 2 veya 3 olmalı: {dimensions}")
+        self.dimensions = dimensions
+        self.cell_size = cell_size
+        self.subset_size = dimensions + 2 if subset_size is None else subset_size
+        self.candidates = candidates
+        self.subsets_per_cell = subsets_per_cell
+        self.margin = margin
+
+        # (origin_x, origin_y, nx, ny, hücreler) - tek atamayla değiştirilir
+        self._grid = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        # İstatistikler
+        self.rebuilds = 0
+        self.last_build_ms = 0.0
+        self.lookups = 0
+        self.selected = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._grid is not None
+
+    def rebuild(self, anchors: List[dict]):
+        """Izgarayı senkron kur (anchor listesinin anlık görüntüsünden)."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._build(self._snapshot(anchors), generation)
+
+    def rebuild_async(self, anchors: List[dict]):
+        """Izgarayı arka plan thread'inde kur; daha yeni bir istek gelirse sonuç atılır."""
+        snapshot = self._snapshot(anchors)
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._thread = threading.Thread(target=self._build, args=(snapshot, generation),
+                                        name='anchor-selection-grid', daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Süren arka plan kurulumunu bekle."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def select(self, position: Sequence[float], available) -> Optional[Tuple[str, ...]]:
+        """
+        Konumdaki hücre için en iyi geçerli alt küme.
+
+        Args:
+            position: Tahmini tag konumu (x, y, ...)
+            available: Tag'in ölçümü olan anchor ID'leri (set / dict)
+
+        Returns:
+            Anchor ID demeti veya None (ızgara yok / hücre dışı / geçerli alt küme yok)
+        """
+        grid = self._grid
+        if grid is None:
+            return None
+        self.lookups += 1
+        origin_x, origin_y, nx, ny, cells = grid
+        ix = int((position[0] - origin_x) // self.cell_size)
+        iy = int((position[1] - origin_y) // self.cell_size)
+        if not (0 <= ix < nx and 0 <= iy < ny):
+            return None
+        for subset in cells[iy * nx + ix]:
+            if all(anchor_id in available for anchor_id in subset):
+                self.selected += 1
+                return subset
+        return None
+
+    def _snapshot(self, anchors: List[dict]):
+        online = [a for a in anchors if a.get('status') == 'online']
+        ids = [a['id'] for a in online]
+        xyz = np.array([(a['x'], a['y'], a.get('z', 0.0)) for a in online], dtype=np.float64).reshape(-1, 3)
+        radius = np.array([a.get('coverage_radius', np.inf) for a in online], dtype=np.float64)
+        weights = np.array([min(max(a.get('signal_strength', 100), 10), 100) / 100.0 for a in online])
+        return ids, xyz, radius, weights
+
+    def _build(self, snapshot, generation: int):
+        started = time.perf_counter()
+        ids, xyz, radius, weights = snapshot
+        if len(ids) < 3:
+            grid = None
+        else:
+            grid = self._compute(ids, xyz, radius, weights)
+        with self._lock:
+            if generation != self._generation:
+                return  # Daha yeni bir kurulum başladı
+            self._grid = grid
+            self.rebuilds += 1
+            self.last_build_ms = (time.perf_counter() - started) * 1000
+
+    def _compute(self, ids, xyz, radius, weights):
+        xy = xyz[:, :2]
+        origin = xy.min(axis=0) - self.margin
+        extent = xy.max(axis=0) + self.margin - origin
+        nx, ny = np.maximum(np.ceil(extent / self.cell_size).astype(int), 1)
+        gx, gy = np.meshgrid(origin[0] + (np.arange(nx) + 0.5) * self.cell_size,
+                             origin[1] + (np.arange(ny) + 0.5) * self.cell_size)
+        centers = np.column_stack([gx.ravel(), gy.ravel()])
+        if self.dimensions == 3:
+            points, positions = np.column_stack([centers, np.full(len(centers), xyz[:, 2].mean())]), xyz
+        else:
+            points, positions = centers, xy
+
+        # Hücre başına menzildeki en yakın aday anchor'lar (menzil dışı = inf)
+        distance = np.linalg.norm(centers[:, None, :] - xy[None], axis=-1)
+        distance = np.where(distance <= radius, distance, np.inf)
+        k = min(self.candidates, len(ids))
+        nearest = np.argsort(distance, axis=1)[:, :k]
+        in_range = np.isfinite(np.take_along_axis(distance, nearest, axis=1)).sum(axis=1)
+
+        cells = [()] * len(centers)
+        keep = self.subsets_per_cell
+        # Menzildeki aday sayısına göre grupla: alt küme boyutu min(subset_size, sayı)
+        for count in range(3, k + 1):
+            rows = np.flatnonzero(in_range == count)
+            if not len(rows):
+                continue
+            size = min(self.subset_size, count)
+            combos = np.array(list(itertools.combinations(range(count), size)))
+            members = nearest[rows][:, combos]  # (R, C, size) anchor indeksleri
+            R, C = members.shape[:2]
+            dop = weighted_dop(np.repeat(points[rows], C, axis=0),
+                               positions[members.reshape(R * C, size)],
+                               weights[members.reshape(R * C, size)]).reshape(R, C)
+            order = np.argsort(dop, axis=1)[:, :keep]
+            for row, cell_members, cell_order, cell_dop in zip(rows.tolist(), members, order, dop):
+                cells[row] = tuple(
+                    tuple(sorted(ids[i] for i in cell_members[c].tolist()))
+                    for c in cell_order.tolist() if np.isfinite(cell_dop[c])
+                )
+        return float(origin[0]), float(origin[1]), int(nx), int(ny), cells
+
+    def get_statistics(self) -> Dict:
+        grid = self._grid
+        return {
+            'ready': grid is not None,
+            'cells': grid[2] * grid[3] if grid is not None else 0,
+            'cell_size': self.cell_size,
+            'rebuilds': self.rebuilds,
+            'last_build_ms': self.last_build_ms,
+            'lookups': self.lookups,
+            'selected': self.selected,
+            'selection_rate': self.selected / self.lookups if self.lookups else 0.0
+        }
@@ -0,0 +1,174 @@
+"""Binary Range-Report Protocol - JSON'a alternatif kompakt anchor formatı
+
+Paket yapısı (little-endian):
+
+    Header (12 byte)
+        magic        2s   b'MT'
+        version      u8   PROTOCOL_VERSION
+        msg_type     u8   MSG_RANGE_REPORT
+        anchor       u16  Anchor numarası (ANC001 -> 1)
+        count        u16  Kayıt sayısı
+        sequence     u32  Anchor başına artan sıra numarası
+
+    Kayıt (18 byte, count adet)
+        tag          u32  Tag numarası (TAG001 -> 1)
+        distance_mm  u32  Mesafe (milimetre)
+        rssi         i16  Sinyal gücü (dBm)
+        timestamp_ms u64  Cihaz zaman damgası (ms)
+
+Bir ölçüm JSON'da ~70 byte tutarken burada 18 byte'tır ve json.loads
+gerektirmeden doğrudan NumPy structured array olarak çözülür.
+
+Format bağlantı bazında seçilir: bağlantının ilk byte'ları MAGIC ise
+IngestEngine bu bağlantıyı binary olarak işler (bkz. sniff_framing).
+"""
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from services.stream_framing import BINARY_MAGIC, FrameTooLargeError, ReceiveBuffer
+
+MAGIC = BINARY_MAGIC
+PROTOCOL_VERSION = 1
+MSG_RANGE_REPORT = 1
+
+HEADER = struct.Struct('<2sBBHHI')
+
+RECORD_DTYPE = np.dtype([
+    ('tag', '<u4'),
+    ('distance_mm', '<u4'),
+    ('rssi', '<i2'),
+    ('timestamp_ms', '<u8'),
+])
+
+MAX_RECORDS = 0xFFFF
+
+RangeReport = namedtuple('RangeReport', ['anchor_id', 'sequence', 'records'])
+RangeReport.__doc__ = """Çözülmüş binary paket: records bir RECORD_DTYPE structured array'idir."""
+
+
+class ProtocolError(ValueError):
+    """Geçersiz binary paket."""
+
+
+def anchor_id_from_number(number):
+    """1 -> 'ANC001'"""
+    return f'ANC{number:03d}'
+
+
+def tag_id_from_number(number):
+    """1 -> 'TAG001'"""
+    return f'TAG{number:03d}'
+
+
+def id_to_number(entity_id):
+    """'ANC001' / 'TAG042' -> 1 / 42 (sondaki rakamlar)"""
+    digits = entity_id.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ_-')
+    return int(digits)
+
+
+def encode_report(anchor_number, records, sequence=0):
+    """
+    Range report paketini kodla.
+
+    Args:
+        anchor_number: Anchor numarası
+        records: RECORD_DTYPE array'i veya (tag, distance_mm, rssi, timestamp_ms) listesi
+        sequence: Sıra numarası
+
+    Returns:
+        bytes
+    """
+    records = np.asarray(records, dtype=RECORD_DTYPE) if not isinstance(records, np.ndarray) \
+        else records.astype(RECORD_DTYPE, copy=False)
+    if records.size > MAX_RECORDS:
+        raise ProtocolError(f"Bir pakette en fazla {MAX_RECORDS} kayıt olabilir")
+
+    header = HEADER.pack(MAGIC, PROTOCOL_VERSION, MSG_RANGE_REPORT,
+                         anchor_number, records.size, sequence & 0xFFFFFFFF)
+    return header + records.tobytes()
+
+
+def decode_report(frame, copy=False):
+    """
+    Tam bir paketi çöz.
+
+    Kayıtlar frame üzerinde kopyasız bir görünüm (np.frombuffer) olarak döner.
+    frame yeniden kullanılan bir alım tamponunun dilimiyse (framer'lar,
+    UDP) copy=True ile kayıtlar tek seferde kopyalanır.
+    """
+    if len(frame) < HEADER.size:
+        raise ProtocolError("Paket header'dan kısa")
+
+    magic, version, msg_type, anchor, count, sequence = HEADER.unpack_from(frame, 0)
+    if magic != MAGIC:
+        raise ProtocolError("Geçersiz magic")
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Desteklenmeyen protokol sürümü: {version}")
+    if msg_type != MSG_RANGE_REPORT:
+        raise ProtocolError(f"Bilinmeyen mesaj tipi: {msg_type}")
+    if len(frame) != HEADER.size + count * RECORD_DTYPE.itemsize:
+        raise ProtocolError("Paket uzunluğu kayıt sayısıyla uyuşmuyor")
+
+    records = np.frombuffer(frame, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+    if copy:
+        records = records.copy()
+    return RangeReport(anchor_id_from_number(anchor), sequence, records)
+
+
+class BinaryReportFramer:
+    """
+    Binary range report akışını paketlere ayırır.
+
+    Header'daki kayıt sayısından paket uzunluğu hesaplanır. Geçersiz
+    magic/sürüm görülürse bir sonraki MAGIC'e atlanarak yeniden senkronize olunur.
+    Paketler alım tamponu üzerinde memoryview dilimleridir (bkz. BraceFramer).
+    """
+
+    def __init__(self, max_frame_size=None, buffer_size=4096):
+        self.max_frame_size = max_frame_size or HEADER.size + MAX_RECORDS * RECORD_DTYPE.itemsize
+        self.buffer = ReceiveBuffer(buffer_size)
+        self.resyncs = 0
+
+    def reset(self):
+        self.buffer.clear()
+
+    @property
+    def pending(self):
+        return len(self.buffer)
+
+    def feed(self, data):
+        self.buffer.write(data)
+        return self.parse_received(len(data))
+
+    def parse_received(self, size):
+        buf = self.buffer
+        data = buf.data
+        base = buf.start
+        frames = []
+
+        offset = 0
+        end = len(buf)
+        record_size = RECORD_DTYPE.itemsize
+        while end - offset >= HEADER.size:
+            magic, version, msg_type, _, count, _ = HEADER.unpack_from(data, base + offset)
+            if magic != MAGIC or version != PROTOCOL_VERSION or msg_type != MSG_RANGE_REPORT:
+                # Yeniden senkronizasyon
+                self.resyncs += 1
+                next_magic = buf.find(MAGIC, offset + 1)
+                offset = next_magic if next_magic >= 0 else end - 1
+                continue
+
+            frame_end = offset + HEADER.size + count * record_size
+            if frame_end - offset > self.max_frame_size:
+                self.reset()
+                raise FrameTooLargeError(f"Paket {self.max_frame_size} byte sınırını aştı", frames)
+            if frame_end > end:
+                break
+            frames.append(buf.view(offset, frame_end))
+            offset = frame_end
+
+        if offset:
+            buf.consume(offset)
+        return frames
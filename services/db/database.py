@@ -248,7 +248,21 @@ class DatabaseService:
             LIMIT ?
         """, (person_id, limit))
         return [dict(row) for row in cursor.fetchall()]
-    
+
+    def get_location_track(self, person_id, start=None, end=None):
+        """Get chronological location track for a person (for offline smoothing)"""
+        cursor = self.conn.cursor()
+        query = "SELECT timestamp, x, y, z FROM location_history WHERE person_id = ?"
+        params = [person_id]
+        if start is not None:
+            query += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND timestamp <= ?"
+            params.append(end)
+        cursor.execute(query + " ORDER BY timestamp ASC, id ASC", params)
+        return [dict(row) for row in cursor.fetchall()]
+
     # Anchor operations
     def add_anchor(self, anchor_data):
         """Add or update anchor"""
@@ -0,0 +1,323 @@
+"""Entity Model - __slots__ kayıtları + NumPy sütunları (anchor, tag, personel)"""
+from collections.abc import Mapping, MutableMapping
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Sütun türleri: NumPy dtype ve boş değer
+_KINDS = {
+    'float': (np.float64, 0.0),
+    'int': (np.int32, 0),
+    'number': (np.float64, 0.0),  # Telemetri (batarya, nabız): tamsayıysa int okunur; NaN: None
+    'time': (np.float64, np.nan),  # epoch saniye; NaN: bilinmiyor (None)
+}
+
+
+class EntityColumns:
+    """
+    Bir varlık türünün sıcak sayısal alanları için paylaşılan diziler.
+
+    Her kayıt bir slot alır; dizi satırı = slot. Kapasite dolunca diziler
+    ikiye katlanır (KalmanFilterBank ile aynı düzen), bu yüzden kayıtlar
+    dizi referansı değil slot numarası tutar.
+    """
+
+    def __init__(self, spec: Dict[str, Tuple[str, int]], capacity: int = 64):
+        """
+        Args:
+            spec: sütun adı -> (tür, genişlik); tür 'float' / 'int' / 'number' / 'time',
+                genişlik 1 ise (N,), aksi halde (N, genişlik) dizi
+            capacity: Başlangıç slot sayısı (>= 1)
+        """
+        capacity = max(1, capacity)
+        self.spec = dict(spec)
+        self.arrays = {}
+        for name, (kind, width) in self.spec.items():
+            dtype, empty = _KINDS[kind]
+            shape = (capacity,) if width == 1 else (capacity, width)
+            self.arrays[name] = np.full(shape, empty, dtype=dtype)
+        self._free = list(range(capacity - 1, -1, -1))  # pop() en küçük slotu verir
+        self._live = set()
+        self._live_slots = None  # live_slots() önbelleği
+
+    def __len__(self):
+        return len(self._live)
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self.arrays.values())))
+
+    def allocate(self) -> int:
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._reset(slot)
+        self._live.add(slot)
+        self._live_slots = None
+        return slot
+
+    def release(self, slot: int):
+        if slot in self._live:
+            self._live.discard(slot)
+            self._free.append(slot)
+            self._live_slots = None
+
+    def live_slots(self) -> np.ndarray:
+        """Kullanımdaki slotlar (artan sırada)"""
+        if self._live_slots is None:
+            self._live_slots = np.fromiter(sorted(self._live), dtype=np.intp, count=len(self._live))
+        return self._live_slots
+
+    def column(self, name: str) -> np.ndarray:
+        """Kullanımdaki tüm kayıtların sütun değerleri (toplu istatistik için)"""
+        return self.arrays[name][self.live_slots()]
+
+    def _reset(self, slot: int):
+        for name, (kind, _) in self.spec.items():
+            self.arrays[name][slot] = _KINDS[kind][1]
+
+    def _grow(self):
+        old = self.capacity
+        for name, array in self.arrays.items():
+            self.arrays[name] = np.concatenate([array, np.full_like(array, _KINDS[self.spec[name][0]][1])])
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+
+def _to_time(value) -> float:
+    """datetime, epoch saniye veya ISO 8601 metni (eski sözlük modelindeki gibi) -> epoch saniye"""
+    if value is None:
+        return np.nan
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.strip().replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return float(value)
+
+
+def _to_number(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _from_number(value):
+    if value != value:
+        return None
+    return int(value) if value.is_integer() else value
+
+
+class LocationView(Mapping):
+    """
+    Bir kaydın (N, 3) konum sütunundaki satırına canlı 'x' / 'y' / 'z' görünümü.
+
+    Slot kayıttan her erişimde okunur; kayıt serbest bırakılıp ayrıldığında
+    (EntityRecord.release) görünüm de ayrık kopyayı izler.
+    """
+
+    __slots__ = ('_record', '_name')
+    _AXES = {'x': 0, 'y': 1, 'z': 2}
+
+    def __init__(self, record: 'EntityRecord', name: str):
+        self._record = record
+        self._name = name
+
+    def _row(self):
+        record = self._record
+        return record._columns.arrays[self._name][record._slot]
+
+    def __getitem__(self, key):
+        return self._row().item(self._AXES[key])
+
+    def __setitem__(self, key, value):
+        self._row()[self._AXES[key]] = value
+
+    def __iter__(self):
+        return iter(self._AXES)
+
+    def __len__(self):
+        return 3
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def copy(self) -> dict:
+        """Anlık değerlerle bağımsız sözlük (olay kayıtları, JSON)"""
+        x, y, z = self._row().tolist()
+        return {'x': x, 'y': y, 'z': z}
+
+
+class EntityRecord(MutableMapping):
+    """
+    Sözlük uyumlu __slots__ kaydı.
+
+    Alt sınıflar anahtarları üç gruba ayırır:
+        FIELDS      Nadiren değişen alanlar; kayıt niteliği (slot)
+        COLUMNS     anahtar -> (sütun, indeks): sıcak sayısal alanlar, EntityColumns'ta
+        LOCATIONS   (N, 3) sütunları; okuma LocationView, yazma x/y/z eşlemesi
+    Tanımsız anahtarlar _extra sözlüğünde tutulur, böylece ekranların
+    eklediği alanlar da çalışır. Geçişte ekranlar kaydı sözlük gibi
+    kullanmaya devam eder; sıcak yollar get_location / set_location ve
+    sütunları doğrudan kullanır.
+    """
+
+    __slots__ = ('_columns', '_slot', '_extra')
+    FIELDS: Tuple[str, ...] = ()
+    COLUMNS: Dict[str, Tuple[str, Optional[int]]] = {}
+    LOCATIONS: Tuple[str, ...] = ()
+    SPEC: Dict[str, Tuple[str, int]] = {}  # EntityColumns şeması
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+        cls._LOCATION_SET = frozenset(cls.LOCATIONS)
+        cls._KEYS = cls.FIELDS + tuple(cls.COLUMNS) + cls.LOCATIONS
+
+    @classmethod
+    def create_columns(cls, capacity: int = 64) -> EntityColumns:
+        return EntityColumns(cls.SPEC, capacity)
+
+    def __init__(self, columns: EntityColumns, data: Mapping = ()):
+        self._columns = columns
+        self._slot = columns.allocate()
+        self._extra = None
+        for name in self.FIELDS:
+            setattr(self, name, None)
+        for key, value in dict(data).items():
+            self[key] = value
+
+    @property
+    def slot(self) -> int:
+        return self._slot
+
+    def release(self):
+        """
+        Slotu serbest bırak (kayıt registry'den çıkarıldığında).
+
+        Slot hemen başka bir varlığa verilebilir; kaydı hâlâ tutan ekranlar /
+        sinyal alıcıları o varlığın verisini okumasın diye değerler kaydın
+        kendi tek satırlık sütunlarına kopyalanır ve kayıt ayrık bir anlık
+        görüntü olarak çalışmaya devam eder.
+        """
+        shared = self._columns
+        detached = EntityColumns(shared.spec, capacity=1)
+        slot = detached.allocate()
+        for name, array in shared.arrays.items():
+            detached.arrays[name][slot] = array[self._slot]
+        shared.release(self._slot)
+        self._columns, self._slot = detached, slot
+
+    def get_location(self, name: str = 'location') -> Tuple[float, float, float]:
+        return tuple(self._columns.arrays[name][self._slot].tolist())
+
+    def set_location(self, name: str, position: Sequence[float]):
+        """Konum sütununa (x, y, z) yaz - ara sözlük oluşturmaz"""
+        self._columns.arrays[name][self._slot] = position
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        column = self.COLUMNS.get(key)
+        if column is not None:
+            name, index = column
+            array = self._columns.arrays[name]
+            value = array.item(self._slot) if index is None else array.item(self._slot, index)
+            kind = self._columns.spec[name][0]
+            if kind == 'time':
+                return None if value != value else datetime.fromtimestamp(value)
+            if kind == 'number':
+                return _from_number(value)
+            return value
+        if key in self._LOCATION_SET:
+            return LocationView(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+            return
+        column = self.COLUMNS.get(key)
+        if column is not None:
+            name, index = column
+            kind = self._columns.spec[name][0]
+            if kind == 'time':
+                value = _to_time(value)
+            elif kind == 'number':
+                value = _to_number(value)
+            if index is None:
+                self._columns.arrays[name][self._slot] = value
+            else:
+                self._columns.arrays[name][self._slot, index] = value
+            return
+        if key in self._LOCATION_SET:
+            if isinstance(value, Mapping):
+                value = (value['x'], value['y'], value['z'])
+            self._columns.arrays[key][self._slot] = value
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if self._extra is not None and key in self._extra:
+            del self._extra[key]
+            return
+        if key in self._FIELD_SET or key in self.COLUMNS or key in self._LOCATION_SET:
+            raise TypeError(f"{type(self).__name__} alanı silinemez: {key}")
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self._KEYS
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return len(self._KEYS) + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key):
+        return (key in self._FIELD_SET or key in self.COLUMNS or key in self._LOCATION_SET
+                or (self._extra is not None and key in self._extra))
+
+    # Sözlük gibi değil kimlikle karşılaştır (listeden çıkarma, eşleme temizliği)
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def copy(self) -> dict:
+        """Anlık değerlerle düz sözlük (konumlar dahil)"""
+        return {key: value.copy() if isinstance(value, LocationView) else value
+                for key, value in self.items()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.copy()!r})"
+
+
+class Anchor(EntityRecord):
+    __slots__ = ('id', 'name', 'zone', 'color', 'status', 'signal_strength', 'firmware_version',
+                 'last_maintenance', 'coverage_radius', 'type')
+    FIELDS = __slots__
+    COLUMNS = {'x': ('position', 0), 'y': ('position', 1), 'z': ('position', 2),
+               'battery': ('battery', None)}
+    SPEC = {'position': ('float', 3), 'battery': ('number', 1)}
+
+
+class Tag(EntityRecord):
+    __slots__ = ('id', 'person_id', 'person_name', 'signal_strength', 'firmware_version',
+                 'status', 'type')
+    FIELDS = __slots__
+    COLUMNS = {'battery': ('battery', None), 'last_seen': ('last_seen', None)}
+    SPEC = {'battery': ('number', 1), 'last_seen': ('time', 1)}
+
+
+class Person(EntityRecord):
+    __slots__ = ('id', 'first_name', 'last_name', 'full_name', 'position', 'zone_id', 'zone_name',
+                 'status', 'signal', 'shift', 'entry_time', 'tag_id', 'phone', 'email')
+    FIELDS = __slots__
+    COLUMNS = {'battery': ('battery', None), 'heart_rate': ('heart_rate', None),
+               'position_accuracy': ('accuracy', None), 'last_update': ('last_update', None)}
+    LOCATIONS = ('location', 'raw_location', 'filtered_location')
+    SPEC = {'location': ('float', 3), 'raw_location': ('float', 3), 'filtered_location': ('float', 3),
+            'battery': ('number', 1), 'heart_rate': ('number', 1), 'accuracy': ('float', 1),
+            'last_update': ('time', 1)}
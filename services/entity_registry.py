@@ -0,0 +1,182 @@
+"""Entity Registry - Anchor, tag ve personel için ID indeksli kayıt"""
+from typing import Dict, Iterable, List, Optional
+
+from services.entity_model import Anchor, Person, Tag
+
+
+class EntityRegistry:
+    """
+    Takip servislerinin anchor / tag / personel kaydı.
+
+    Listeler ekrana ve istatistiklere sıralı görünüm olarak kalır; ölçüm
+    başına yapılan tüm aramalar (ID -> varlık, tag -> personel, personel ->
+    tag) sözlüklerle O(1)'dir. Liste ve indekslerin tutarlı kalması için
+    varlıklar yalnızca buradaki add / remove / assign metotlarıyla
+    değiştirilmelidir; kayıtların alanlarını (konum, durum, batarya)
+    değiştirmek serbesttir.
+
+    Eklenen sözlükler __slots__ kayıtlarına (services.entity_model)
+    dönüştürülür; sıcak sayısal alanlar tür başına paylaşılan NumPy
+    sütunlarındadır (anchor_columns, tag_columns, person_columns).
+    """
+
+    def __init__(self):
+        self.anchor_columns = Anchor.create_columns()
+        self.tag_columns = Tag.create_columns()
+        self.person_columns = Person.create_columns()
+
+        self.anchors: List[Anchor] = []
+        self.tags: List[Tag] = []
+        self.personnel: List[Person] = []
+
+        self._anchors: Dict[str, Anchor] = {}  # anchor_id -> anchor
+        self._tags: Dict[str, Tag] = {}  # tag_id -> tag
+        self._personnel: Dict[str, Person] = {}  # person_id -> personel
+        self._person_by_tag: Dict[str, Person] = {}  # tag_id -> personel
+        self._tag_by_person: Dict[str, Tag] = {}  # person_id -> tag
+
+    # Anchor'lar
+    def set_anchors(self, anchors: Iterable[dict]):
+        """Anchor listesini toptan değiştir"""
+        for anchor in self.anchors:
+            anchor.release()
+        self.anchors = [self._record(Anchor, self.anchor_columns, anchor) for anchor in anchors]
+        self._anchors = {anchor['id']: anchor for anchor in self.anchors}
+
+    def add_anchor(self, anchor: dict) -> Anchor:
+        """Anchor ekle; aynı ID varsa yerine koy"""
+        anchor = self._record(Anchor, self.anchor_columns, anchor)
+        previous = self._anchors.get(anchor['id'])
+        if previous is not None:
+            self.anchors[self.anchors.index(previous)] = anchor
+            previous.release()
+        else:
+            self.anchors.append(anchor)
+        self._anchors[anchor['id']] = anchor
+        return anchor
+
+    def remove_anchor(self, anchor_id: str) -> Optional[Anchor]:
+        anchor = self._anchors.pop(anchor_id, None)
+        if anchor is not None:
+            self.anchors.remove(anchor)
+            anchor.release()
+        return anchor
+
+    def get_anchor(self, anchor_id: str) -> Optional[Anchor]:
+        return self._anchors.get(anchor_id)
+
+    # Tag'ler
+    def add_tag(self, tag: dict) -> Tag:
+        """Tag ekle (ID zaten kayıtlıysa mevcut tag döner); person_id varsa personele bağlanır"""
+        existing = self._tags.get(tag['id'])
+        if existing is not None:
+            return existing
+        tag = self._record(Tag, self.tag_columns, tag)
+        self.tags.append(tag)
+        self._tags[tag['id']] = tag
+        person = self._personnel.get(tag.get('person_id'))
+        if person is not None:
+            self._link(person, tag)
+        return tag
+
+    def remove_tag(self, tag_id: str) -> Optional[Tag]:
+        tag = self._tags.pop(tag_id, None)
+        if tag is None:
+            return None
+        self.tags.remove(tag)
+        tag.release()
+        person = self._person_by_tag.pop(tag_id, None)
+        if person is not None:
+            self._tag_by_person.pop(person['id'], None)
+        return tag
+
+    def get_tag(self, tag_id: str) -> Optional[Tag]:
+        return self._tags.get(tag_id)
+
+    def has_tag(self, tag_id: str) -> bool:
+        return tag_id in self._tags
+
+    # Personel
+    def add_person(self, person: dict) -> Person:
+        """Personel ekle / değiştir; tag_id kayıtlı bir tag'e işaret ediyorsa bağlanır"""
+        person = self._record(Person, self.person_columns, person)
+        previous = self._personnel.get(person['id'])
+        if previous is not None:
+            self._unlink_person(previous)
+            self.personnel[self.personnel.index(previous)] = person
+            previous.release()
+        else:
+            self.personnel.append(person)
+        self._personnel[person['id']] = person
+        tag = self._tags.get(person.get('tag_id'))
+        if tag is not None:
+            self._link(person, tag)
+        elif person.get('tag_id') is not None:
+            # Tag henüz kayıtlı değil (ör. ölçümü gelmedi); eşleme yine de kurulur
+            self._person_by_tag[person['tag_id']] = person
+        return person
+
+    def remove_person(self, person_id: str) -> Optional[Person]:
+        person = self._personnel.pop(person_id, None)
+        if person is not None:
+            self._unlink_person(person)
+            self.personnel.remove(person)
+            person.release()
+        return person
+
+    def get_person(self, person_id: str) -> Optional[Person]:
+        return self._personnel.get(person_id)
+
+    def person_for_tag(self, tag_id: str) -> Optional[Person]:
+        """Tag'i taşıyan personel (yoksa None)"""
+        return self._person_by_tag.get(tag_id)
+
+    def tag_for_person(self, person_id: str) -> Optional[Tag]:
+        """Personelin tag'i (yoksa None)"""
+        return self._tag_by_person.get(person_id)
+
+    def assign_tag(self, person_id: str, tag_id: Optional[str]):
+        """Personele tag ata / tag'i çöz (None); eski eşlemeler iki yönde de temizlenir"""
+        person = self._personnel.get(person_id)
+        if person is None:
+            raise KeyError(f"Personel yok: {person_id}")
+        self._unlink_person(person)
+        person['tag_id'] = tag_id
+        if tag_id is None:
+            return
+        previous = self._person_by_tag.get(tag_id)
+        if previous is not None:
+            self._unlink_person(previous)
+            previous['tag_id'] = None
+        tag = self._tags.get(tag_id)
+        if tag is not None:
+            self._link(person, tag)
+        else:
+            self._person_by_tag[tag_id] = person
+
+    @staticmethod
+    def _record(record_class, columns, data):
+        return data if isinstance(data, record_class) else record_class(columns, data)
+
+    def _link(self, person: Person, tag: Tag):
+        person['tag_id'] = tag['id']
+        tag['person_id'] = person['id']
+        tag['person_name'] = person.get('full_name', tag.get('person_name'))
+        self._person_by_tag[tag['id']] = person
+        self._tag_by_person[person['id']] = tag
+
+    def _unlink_person(self, person: Person):
+        tag_id = person.get('tag_id')
+        if tag_id is not None and self._person_by_tag.get(tag_id) is person:
+            del self._person_by_tag[tag_id]
+        tag = self._tag_by_person.pop(person['id'], None)
+        if tag is not None and tag.get('person_id') == person['id']:
+            tag['person_id'] = None
+
+    def get_statistics(self) -> Dict:
+        return {
+            'anchors': len(self.anchors),
+            'tags': len(self.tags),
+            'personnel': len(self.personnel),
+            'assigned_tags': len(self._tag_by_person)
+        }
@@ -0,0 +1,298 @@
+"""Event-loop Ingest Engine - Tek thread'de binlerce anchor bağlantısı"""
+import selectors
+import socket
+import time
+from functools import partial
+
+from services.stream_framing import create_framer, sniff_framing, FrameTooLargeError
+from services.binary_protocol import BinaryReportFramer, decode_report
+from services.payload_decoder import PayloadDecoder
+
+# Paketler alım tamponu dilimleri olduğundan kayıtlar tampondan kopyalanır
+_decode_binary = partial(decode_report, copy=True)
+
+
+class _Connection:
+    """Tek bir anchor bağlantısının durumu."""
+
+    __slots__ = ('id', 'sock', 'address', 'framer', 'decode', 'connected_at', 'bytes_received', 'messages')
+
+    def __init__(self, connection_id, sock, address, decode):
+        self.id = connection_id
+        self.sock = sock
+        self.address = address
+        self.framer = None  # İlk veride belirlenir
+        self.decode = decode
+        self.connected_at = time.time()
+        self.bytes_received = 0
+        self.messages = 0
+
+
+class IngestEngine:
+    """
+    selectors tabanlı TCP ingest motoru.
+
+    Her anchor için thread açmak yerine tüm soketler tek bir event loop'ta
+    çoğullanır (epoll/kqueue/select). Qt'den bağımsızdır; TCPServerService
+    bu motoru kendi QThread'i içinde çalıştırır.
+
+    Callback'ler:
+        on_message(payload, address): MeasurementReport (JSON), binary RangeReport
+            veya normalize edilemeyen / SOS paketleri için dict
+        on_connection(address, connected): Bağlantı açıldı/kapandı
+        on_error(message): Hata mesajı
+
+    Framing: 'auto' (ilk byte'lardan tahmin), 'brace', 'ndjson', 'length'
+    veya 'binary'. 'auto' modunda format her bağlantı için ayrı belirlenir;
+    aynı sunucuya JSON ve binary anchor'lar birlikte bağlanabilir.
+
+    recorder verilirse (services.stream_capture.StreamRecorder) alınan ham
+    byte'lar bağlantı başına, zaman damgalı olarak kaydedilir.
+
+    Alım yolu kopyasızdır: her bağlantının framer'ı bir ReceiveBuffer tutar
+    ve soket recv_into() ile doğrudan bu tampona okunur (recv başına bytes
+    nesnesi yok). Paketler tampon dilimleri olarak çözülür; JSON tek kopyayla
+    str'e, binary kayıtlar tek kopyayla NumPy dizisine dönüşür.
+
+    reuse_port=True ile SO_REUSEPORT açılır; aynı porta bağlanan birden fazla
+    süreç (bkz. services.ingest_workers) gelen bağlantıları kernel'den
+    paylaşımlı alır.
+    """
+
+    def __init__(self, host='0.0.0.0', port=8888, backlog=1024,
+                 on_message=None, on_connection=None, on_error=None,
+                 recv_size=65536, accept_batch=256, framing='auto',
+                 max_frame_size=1024 * 1024, reuse_port=False, recorder=None, decoder=None):
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        self.recv_size = recv_size
+        self.accept_batch = accept_batch  # Tek olayda kabul edilecek maksimum bağlantı
+        self.framing = framing
+        self.max_frame_size = max_frame_size
+        self.reuse_port = reuse_port
+        self.recorder = recorder
+        self.decoder = decoder if decoder is not None else PayloadDecoder()
+
+        self.on_message = on_message
+        self.on_connection = on_connection
+        self.on_error = on_error
+
+        self.selector = None
+        self.server_socket = None
+        self.connections = {}  # fileno -> _Connection
+        self._wakeup_r = None
+        self._wakeup_w = None
+        self.reading_paused = False
+        # İlk okuma (framing henüz belirlenmemişken) için ortak tampon
+        self._first_read = bytearray(recv_size)
+
+        # İstatistikler (yalnızca event loop thread'i yazar)
+        self.total_messages = 0
+        self.total_bytes = 0
+        self.total_connections = 0
+
+    def open(self):
+        """Dinleyen soketi aç ve event loop'a kaydet."""
+        self.selector = selectors.DefaultSelector()
+
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            if not hasattr(socket, 'SO_REUSEPORT'):
+                raise OSError("Bu platform SO_REUSEPORT desteklemiyor")
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(self.backlog)
+        self.server_socket.setblocking(False)
+        self.selector.register(self.server_socket, selectors.EVENT_READ, None)
+
+        # stop() çağrısında select()'i hemen uyandırmak için
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self.selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+
+    def poll(self, timeout=0.5):
+        """Hazır soketleri bir kez işle."""
+        for key, _ in self.selector.select(timeout):
+            sock = key.fileobj
+            if isinstance(key.data, _Connection):
+                if not self.reading_paused:
+                    self._read(key.data)
+            elif key.data is not None:
+                key.data()
+            elif sock is self.server_socket:
+                self._accept()
+            else:
+                self._drain_wakeup()
+
+    def add_reader(self, fileobj, callback):
+        """Ek bir dosya/soketi event loop'a ekle; okunabilir olunca callback() çağrılır."""
+        self.selector.register(fileobj, selectors.EVENT_READ, callback)
+
+    def remove_reader(self, fileobj):
+        try:
+            self.selector.unregister(fileobj)
+        except (KeyError, ValueError):
+            pass
+
+    def pause_reading(self):
+        """
+        Bağlantılardan okumayı durdur (backpressure).
+
+        Soketler event loop'tan çıkarılır; kernel alım tamponu dolunca TCP
+        akış kontrolü anchor'ların gönderimini yavaşlatır. Yeni bağlantılar
+        kabul edilmeye devam eder.
+        """
+        if self.reading_paused:
+            return
+        self.reading_paused = True
+        for conn in self.connections.values():
+            try:
+                self.selector.unregister(conn.sock)
+            except (KeyError, ValueError):
+                pass
+
+    def resume_reading(self):
+        """pause_reading() ile durdurulan okumayı yeniden başlat."""
+        if not self.reading_paused:
+            return
+        self.reading_paused = False
+        for conn in self.connections.values():
+            self.selector.register(conn.sock, selectors.EVENT_READ, conn)
+
+    def wakeup(self):
+        """Bekleyen select() çağrısını başka bir thread'den uyandır."""
+        if self._wakeup_w is not None:
+            try:
+                self._wakeup_w.send(b'\0')
+            except OSError:
+                pass
+
+    def close(self):
+        """Tüm bağlantıları ve dinleyen soketi kapat."""
+        for conn in list(self.connections.values()):
+            self._close_connection(conn)
+
+        for sock in (self.server_socket, self._wakeup_r, self._wakeup_w):
+            if sock is None:
+                continue
+            try:
+                self.selector.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+            sock.close()
+
+        self.server_socket = None
+        self._wakeup_r = self._wakeup_w = None
+        if self.selector:
+            self.selector.close()
+
+    def _accept(self):
+        """Bekleyen bağlantıları toplu kabul et (güç kesintisi sonrası yeniden bağlanma fırtınası)."""
+        for _ in range(self.accept_batch):
+            try:
+                client_socket, client_address = self.server_socket.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                self._error(f"Accept hatası: {e}")
+                return
+
+            client_socket.setblocking(False)
+            addr_str = f"{client_address[0]}:{client_address[1]}"
+            conn = _Connection(self.total_connections, client_socket, addr_str, self.decoder.decode)
+            self.connections[client_socket.fileno()] = conn
+            if not self.reading_paused:
+                self.selector.register(client_socket, selectors.EVENT_READ, conn)
+            self.total_connections += 1
+            if self.recorder is not None:
+                self.recorder.connection_opened(conn.id, addr_str)
+
+            if self.on_connection:
+                self.on_connection(addr_str, True)
+
+    def _read(self, conn):
+        """Bir bağlantıdan gelen veriyi oku ve paketleri ayıkla."""
+        framer = conn.framer
+        try:
+            if framer is None:
+                size = conn.sock.recv_into(self._first_read)
+            else:
+                size = framer.buffer.recv_into(conn.sock, self.recv_size)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._error(f"İstemci işleme hatası ({conn.address}): {e}")
+            self._close_connection(conn)
+            return
+
+        if not size:
+            self._close_connection(conn)
+            return
+
+        conn.bytes_received += size
+        self.total_bytes += size
+        data = memoryview(self._first_read)[:size] if framer is None else framer.buffer.tail(size)
+        if self.recorder is not None:
+            self.recorder.data_received(conn.id, data)
+
+        try:
+            if framer is None:
+                framing = sniff_framing(data) if self.framing == 'auto' else self.framing
+                if framing == 'binary':
+                    conn.framer = BinaryReportFramer()
+                    conn.decode = _decode_binary
+                else:
+                    conn.framer = create_framer(framing, max_frame_size=self.max_frame_size)
+                frames = conn.framer.feed(data)
+            else:
+                frames = framer.parse_received(size)
+        except FrameTooLargeError as e:
+            # Büyük paket atıldı; aynı okumada ondan önce tamamlananlar yine işlenir
+            self._error(f"Paketleme hatası ({conn.address}): {e}")
+            frames = e.frames
+
+        self._dispatch(conn, frames)
+
+    def _dispatch(self, conn, frames):
+        """Tamamlanan paketleri çözümle ve yayınla."""
+        for frame in frames:
+            try:
+                payload = conn.decode(frame)
+            except ValueError:
+                # Hatalı JSON / binary paket, atla
+                continue
+
+            conn.messages += 1
+            self.total_messages += 1
+            if self.on_message:
+                self.on_message(payload, conn.address)
+
+    def _close_connection(self, conn):
+        """Bağlantıyı event loop'tan çıkar ve kapat."""
+        fileno = conn.sock.fileno()
+        if fileno >= 0:
+            try:
+                self.selector.unregister(conn.sock)
+            except (KeyError, ValueError):
+                pass
+            self.connections.pop(fileno, None)
+        conn.sock.close()
+        if self.recorder is not None:
+            self.recorder.connection_closed(conn.id)
+
+        if self.on_connection:
+            self.on_connection(conn.address, False)
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _error(self, message):
+        if self.on_error:
+            self.on_error(message)
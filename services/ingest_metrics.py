@@ -0,0 +1,228 @@
+"""Ingest Metrics - Paket sayaçları, kayan pencere hızları ve gecikme histogramı"""
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from services.binary_protocol import RangeReport
+from services.ingest_workers import MeasurementBatch
+from services.payload_decoder import MeasurementReport, entity_key
+
+RATE_WINDOWS = (1, 10, 60)
+RATE_HORIZON = 60
+
+
+class RollingCounter:
+    """
+    Saniyelik kovalarla son RATE_HORIZON saniyenin sayacı.
+
+    Hız yalnızca tamamlanmış saniyelerden hesaplanır; böylece 1 s hızı
+    yarım kalmış kovadan dolayı dalgalanmaz.
+    """
+
+    __slots__ = ('stamps', 'counts')
+
+    def __init__(self):
+        self.stamps = [-1] * RATE_HORIZON
+        self.counts = [0] * RATE_HORIZON
+
+    def add(self, amount, second):
+        index = second % RATE_HORIZON
+        if self.stamps[index] != second:
+            self.stamps[index] = second
+            self.counts[index] = amount
+        else:
+            self.counts[index] += amount
+
+    def rate(self, window, second):
+        """Son window tamamlanmış saniyenin ortalama hızı (/s)."""
+        first = second - window
+        total = 0
+        for stamp, count in zip(self.stamps, self.counts):
+            if first <= stamp < second:
+                total += count
+        return total / window
+
+
+class IngestShard:
+    """
+    Tek bir ingest kaynağının (TCP event loop, UDP dinleyici...) sayaçları.
+
+    Her shard'a yalnızca kendi kaynağının thread'i yazar; sıcak yolda kilit
+    yoktur. Okuyucular (Qt thread'i) değerleri kilitsiz okur - izleme için
+    bir kovanın anlık yarım güncellenmiş görülmesi kabul edilebilir.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.packets = 0
+        self.measurements = 0
+        self.bytes = 0
+        self.packet_rate = RollingCounter()
+        self.anchor_rates = {}  # anchor_id -> RollingCounter (ölçüm/s)
+
+    def record(self, payload, now=None):
+        """Ingest'ten gelen paketi türüne göre kaydet (MeasurementReport, RangeReport, MeasurementBatch, dict)."""
+        if isinstance(payload, MeasurementReport):
+            self.record_packet(payload.anchor_id, len(payload.tag_ids), now)
+        elif isinstance(payload, MeasurementBatch):
+            self.record_anchor_counts(payload.anchor_ids, payload.packets, now)
+        elif isinstance(payload, RangeReport):
+            self.record_packet(payload.anchor_id, len(payload.records), now)
+        elif isinstance(payload, dict):
+            # Geçişli ham paket: türler doğrulanmamıştır (bozuk paket sayılır, hata vermez)
+            measurements = payload.get('measurements')
+            self.record_packet(entity_key(payload.get('anchor_id')),
+                               len(measurements) if isinstance(measurements, list) else 0, now)
+        else:
+            self.record_packet(None, 0, now)
+
+    def record_packet(self, anchor_id, measurements=1, now=None):
+        """Çözülmüş bir anchor paketini kaydet."""
+        second = int(time.monotonic() if now is None else now)
+        self.packets += 1
+        self.measurements += measurements
+        self.packet_rate.add(1, second)
+
+        if anchor_id is not None:
+            rolling = self.anchor_rates.get(anchor_id)
+            if rolling is None:
+                rolling = self.anchor_rates[anchor_id] = RollingCounter()
+            rolling.add(measurements, second)
+
+    def record_anchor_counts(self, anchor_ids, packets, now=None):
+        """Worker MeasurementBatch'i gibi çok anchor'lı ölçüm listesini kaydet."""
+        second = int(time.monotonic() if now is None else now)
+        self.packets += packets
+        self.measurements += len(anchor_ids)
+        self.packet_rate.add(packets, second)
+
+        for anchor_id, count in Counter(anchor_ids).items():
+            rolling = self.anchor_rates.get(anchor_id)
+            if rolling is None:
+                rolling = self.anchor_rates[anchor_id] = RollingCounter()
+            rolling.add(count, second)
+
+    def add_bytes(self, amount):
+        self.bytes += amount
+
+    def rates(self, now=None):
+        """{1: paket/s, 10: paket/s, 60: paket/s}"""
+        second = int(time.monotonic() if now is None else now)
+        return {window: self.packet_rate.rate(window, second) for window in RATE_WINDOWS}
+
+    def anchor_rates_snapshot(self, window=10, now=None):
+        """{anchor_id: ölçüm/s} (son window saniye)"""
+        second = int(time.monotonic() if now is None else now)
+        return {anchor_id: rolling.rate(window, second)
+                for anchor_id, rolling in list(self.anchor_rates.items())}
+
+
+class LatencyHistogram:
+    """
+    HDR tarzı log-lineer gecikme histogramı (mikrosaniye).
+
+    Her ikinin kuvveti aralığı 2^sub_bits alt kovaya bölünür; göreli hata
+    ~%3 (sub_bits=5) ile 1 µs - max_seconds arası sabit bellekte tutulur.
+    """
+
+    def __init__(self, max_seconds=60.0, sub_bits=5):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.max_value = int(max_seconds * 1e6)
+        self.counts = np.zeros(self._index(self.max_value) + 1, dtype=np.int64)
+        self.total = 0
+        self.max_recorded = 0
+
+    def _index(self, value):
+        if value < 2 * self.sub_count:
+            return value
+        shift = value.bit_length() - (self.sub_bits + 1)
+        return (shift + 1) * self.sub_count + (value >> shift) - self.sub_count
+
+    def _value(self, index):
+        """Kovanın alt sınırı (µs)."""
+        if index < 2 * self.sub_count:
+            return index
+        shift = index // self.sub_count - 1
+        return (index % self.sub_count + self.sub_count) << shift
+
+    def record(self, seconds):
+        value = min(max(int(seconds * 1e6), 0), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        if value > self.max_recorded:
+            self.max_recorded = value
+
+    def percentile(self, percent):
+        """Gecikme yüzdeliği (saniye)."""
+        if not self.total:
+            return 0.0
+        rank = max(1, int(np.ceil(self.total * percent / 100.0)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return self._value(index) / 1e6
+
+    def reset(self):
+        self.counts[:] = 0
+        self.total = 0
+        self.max_recorded = 0
+
+    def snapshot(self):
+        return {
+            'count': self.total,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9),
+            'max': self.max_recorded / 1e6
+        }
+
+
+class IngestMetrics:
+    """
+    Ingest hattının metrik merkezi.
+
+    - shard(name): kaynak başına kilitsiz sayaç grubu (IngestShard)
+    - latency: paket alımından position_calculated'a gecikme histogramı
+      (Qt thread'i yazar)
+    - snapshot(): ayarlar / sistem durumu ekranı için ucuz özet
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.shards = {}
+        self.latency = LatencyHistogram()
+
+    def shard(self, name):
+        """Kaynak için shard döndür (yoksa oluştur)."""
+        with self._lock:
+            shard = self.shards.get(name)
+            if shard is None:
+                shard = self.shards[name] = IngestShard(name)
+            return shard
+
+    def snapshot(self, now=None):
+        """Tüm kaynakların toplam sayaçları, hızları ve gecikme yüzdelikleri."""
+        now = time.monotonic() if now is None else now
+        shards = list(self.shards.values())
+
+        rates = dict.fromkeys(RATE_WINDOWS, 0.0)
+        anchors = {}
+        for shard in shards:
+            for window, rate in shard.rates(now).items():
+                rates[window] += rate
+            for anchor_id, rate in shard.anchor_rates_snapshot(now=now).items():
+                anchors[anchor_id] = anchors.get(anchor_id, 0.0) + rate
+
+        return {
+            'packets': sum(s.packets for s in shards),
+            'measurements': sum(s.measurements for s in shards),
+            'bytes': sum(s.bytes for s in shards),
+            'rate_1s': rates[1],
+            'rate_10s': rates[10],
+            'rate_60s': rates[60],
+            'anchor_rates': anchors,
+            'sources': {s.name: s.rates(now)[10] for s in shards},
+            'latency': self.latency.snapshot()
+        }
@@ -0,0 +1,319 @@
+"""Bounded Ingest Queue - Ingest thread'i ile Qt thread'i arasında sınırlı kuyruk"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from services.binary_protocol import RangeReport
+from services.payload_decoder import MeasurementReport, entity_key, is_priority_payload
+
+OVERFLOW_POLICIES = ('drop_oldest', 'latest', 'pause')
+
+
+def payload_tags(payload):
+    """
+    Paketin anchor'ı ve tag'leri - kuyruk (anchor, tag) çifti başına birleştirir / atar.
+
+    Returns:
+        (anchor_id, tag listesi) veya anahtarsız paketler için None; ham
+        sözlüklerde ID'lerden biri str / int değilse (bozuk paket) de None
+    """
+    if isinstance(payload, MeasurementReport):
+        return payload.anchor_id, payload.tag_ids
+    if isinstance(payload, dict):
+        anchor_id = entity_key(payload.get('anchor_id'))
+        measurements = payload.get('measurements')
+        if anchor_id is None or not isinstance(measurements, list):
+            return None
+        tags = [m.get('tag_id') for m in measurements if isinstance(m, dict)]
+        if any(entity_key(tag_id) is None for tag_id in tags):
+            return None
+        return anchor_id, tags
+    if isinstance(payload, RangeReport):
+        return payload.anchor_id, payload.records['tag'].tolist()
+    # Worker MeasurementBatch vb. - birleştirilmez, yalnızca genel en eski atılır
+    return None
+
+
+def without_tags(payload, tags):
+    """Paketin verilen tag'lere ait ölçümleri çıkarılmış kopyası (diğer tag'ler korunur)."""
+    if isinstance(payload, MeasurementReport):
+        kept = [index for index, tag_id in enumerate(payload.tag_ids) if tag_id not in tags]
+        return payload._replace(tag_ids=[payload.tag_ids[i] for i in kept],
+                                distances=[payload.distances[i] for i in kept],
+                                rssi=[payload.rssi[i] for i in kept])
+    if isinstance(payload, RangeReport):
+        records = payload.records
+        return payload._replace(records=records[~np.isin(records['tag'], list(tags))])
+    measurements = [m for m in payload.get('measurements') or ()
+                    if not (isinstance(m, dict) and m.get('tag_id') in tags)]
+    return dict(payload, measurements=measurements)
+
+
+class _Entry:
+    __slots__ = ('anchor_id', 'tags', 'payload', 'received_at', 'order')
+
+    def __init__(self, anchor_id, tags, payload, received_at, order=0):
+        self.anchor_id = anchor_id
+        self.tags = tags  # Kuyrukta kalan tag'ler (set) veya anahtarsızsa None
+        self.payload = payload
+        self.received_at = received_at
+        self.order = order  # Ekleme sırası (en eski giriş seçimi)
+
+
+class BoundedIngestQueue:
+    """
+    Ingest → tracking arasında kapasitesi sınırlı, thread-safe kuyruk.
+
+    Qt thread'i takılırsa (ör. modal QMessageBox.exec()) bellek sınırsız
+    büyümez; taşma politikası uygulanır:
+
+        'drop_oldest': Yeni paketle ortak (anchor, tag) çifti taşıyan en eski
+                       paketten o çiftlerin ölçümleri çıkarılır; paket boşalmazsa
+                       kuyruktaki en eski paket atılır
+        'latest':      Aynı (anchor, tag) çiftinin bekleyen ölçümü her zaman
+                       yenisiyle değiştirilir; doluysa en eski paket atılır
+        'pause':       Hiçbir paket atılmaz; kuyruk dolunca ingest soket
+                       okumayı durdurur (TCP akış kontrolü anchor'ları yavaşlatır)
+                       ve kuyruk boşaltılınca devam eder
+
+    SOS / acil durum paketleri ayrı, sınırsız bir öncelik kuyruğunda tutulur
+    ve hiçbir politikada atılmaz.
+
+    Birleştirme (anchor, tag) çifti başınadır: çok tag'li bir paketten yalnızca
+    daha yeni ölçümü gelen tag'ler çıkarılır (without_tags), diğer tag'lerin
+    ölçümleri kuyrukta kalır.
+
+    Teslim zamanlaması: kuyruk max_batch_size pakete ulaşınca veya ilk
+    paketin üzerinden max_delay_ms geçince batch hazırdır.
+    """
+
+    def __init__(self, capacity=10000, policy='drop_oldest', max_batch_size=256, max_delay_ms=25):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Bilinmeyen taşma politikası: {policy}")
+
+        self.capacity = capacity
+        self.policy = policy
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+
+        self._lock = threading.Lock()
+        self._entries = deque()  # Atılan girişler tembel silinir (payload=None)
+        self._by_key = {}  # (anchor, tag) -> deque[_Entry] (çifti taşıyan canlı girişler, eskiden yeniye)
+        # 'drop_oldest' indeksi yalnızca taşmada kurar; 'latest' her pakette kullanır
+        self._indexed = policy == 'latest'
+        self._priority = deque()
+        self._live = 0
+        self._first_at = None
+        self.paused = False
+
+        # İstatistikler
+        self.total_enqueued = 0
+        self.total_dequeued = 0
+        self.total_batches = 0
+        self.dropped_oldest = 0
+        self.coalesced = 0
+        self.priority_enqueued = 0
+        self.pause_count = 0
+        self.high_watermark = 0
+
+    def __len__(self):
+        return self._live + len(self._priority)
+
+    def put(self, payload, received_at=None):
+        """
+        Paketi kuyruğa ekle (ingest thread'i).
+
+        Returns:
+            True ise ingest soket okumayı durdurmalı ('pause' politikası)
+        """
+        received_at = time.monotonic() if received_at is None else received_at
+
+        with self._lock:
+            if not self._live and not self._priority:
+                self._first_at = received_at
+            self.total_enqueued += 1
+
+            if is_priority_payload(payload):
+                self._priority.append(_Entry(None, None, payload, received_at))
+                self.priority_enqueued += 1
+                return self.paused
+
+            # 'pause' hiçbir şey atmaz; çift indeksine gerek yok
+            anchor_tags = payload_tags(payload) if self.policy != 'pause' else None
+            if anchor_tags is None:
+                entry = _Entry(None, None, payload, received_at)
+            else:
+                entry = _Entry(anchor_tags[0], set(anchor_tags[1]), payload, received_at,
+                               self.total_enqueued)
+                if self.policy == 'latest' and entry.tags:
+                    same_key = self._by_key.get((entry.anchor_id, next(iter(entry.tags))))
+                    if same_key and same_key[0].tags == entry.tags:
+                        # Aynı tag kümesi: bekleyen paket yerinde değiştirilir
+                        previous = same_key[0]
+                        previous.payload = payload
+                        previous.received_at = received_at
+                        self.coalesced += len(entry.tags)
+                        return self.paused
+                    self._supersede(entry, oldest_only=False)
+
+            if self._live >= self.capacity:
+                if self.policy == 'pause':
+                    if not self.paused:
+                        self.paused = True
+                        self.pause_count += 1
+                else:
+                    if not self._indexed:
+                        self._build_index()
+                    if not (self.policy == 'drop_oldest' and entry.tags
+                            and self._supersede(entry, oldest_only=True)):
+                        self._evict_oldest()
+
+            self._entries.append(entry)
+            if self._indexed and entry.tags:
+                self._index(entry)
+            self._live += 1
+            if self._live > self.high_watermark:
+                self.high_watermark = self._live
+
+            # Tembel silinmiş girişler birikmesin
+            if len(self._entries) > 2 * self.capacity:
+                self._entries = deque(e for e in self._entries if e.payload is not None)
+
+            return self.paused
+
+    def _index(self, entry):
+        anchor_id = entry.anchor_id
+        for tag_id in entry.tags:
+            same_key = self._by_key.get((anchor_id, tag_id))
+            if same_key is None:
+                same_key = self._by_key[(anchor_id, tag_id)] = deque()
+            same_key.append(entry)
+
+    def _build_index(self):
+        """Kuyruktaki canlı girişlerden (anchor, tag) indeksini kur (ilk taşmada)."""
+        for entry in self._entries:
+            if entry.payload is not None and entry.tags:
+                self._index(entry)
+        self._indexed = True
+
+    def _supersede(self, entry, oldest_only):
+        """
+        Yeni girişle aynı (anchor, tag) çiftlerinin bekleyen ölçümlerini çıkar.
+
+        Her çiftin kuyruğundaki ilk giriş o çifti taşıyan en eski giriştir.
+        oldest_only=True ise yalnızca bu girişlerin en eskisinden çıkarılır.
+
+        Returns:
+            Bir paket tamamen boşaldıysa (kuyrukta yer açıldıysa) True
+        """
+        anchor_id = entry.anchor_id
+        by_key = self._by_key
+        heads = [same_key[0] for same_key in [by_key.get((anchor_id, tag_id)) for tag_id in entry.tags]
+                 if same_key]
+        if not heads:
+            return False
+        # Bir girişin yeni paketle ortak tüm çiftlerinde ilk sıradadır
+        victims = [min(heads, key=lambda head: head.order)] if oldest_only else dict.fromkeys(heads)
+
+        freed = False
+        for victim in victims:
+            tags = victim.tags & entry.tags
+            for tag_id in tags:
+                same_key = by_key[(anchor_id, tag_id)]
+                same_key.popleft()
+                if not same_key:
+                    del by_key[(anchor_id, tag_id)]
+            self.coalesced += len(tags)
+            victim.tags -= tags
+            if victim.tags:
+                victim.payload = without_tags(victim.payload, tags)
+            else:
+                victim.payload = None
+                self._live -= 1
+                freed = True
+        return freed
+
+    def _evict_oldest(self):
+        """Taşmada kuyruktaki en eski paketi at."""
+        victim = None
+        while self._entries:
+            candidate = self._entries.popleft()
+            if candidate.payload is not None:
+                victim = candidate
+                break
+        if victim is None:
+            return
+
+        for tag_id in victim.tags or ():
+            same_key = self._by_key[(victim.anchor_id, tag_id)]
+            same_key.popleft()
+            if not same_key:
+                del self._by_key[(victim.anchor_id, tag_id)]
+        victim.payload = None
+        self._live -= 1
+        self.dropped_oldest += 1
+
+    def take_batch(self, with_timestamps=False):
+        """
+        Bekleyen tüm paketleri al (Qt thread'i). Öncelikli paketler önce gelir.
+
+        Returns:
+            Paket listesi; with_timestamps=True ise (paketler, alınma zamanları)
+            - zamanlar time.monotonic() cinsindendir
+        """
+        with self._lock:
+            entries = list(self._priority)
+            entries.extend(e for e in self._entries if e.payload is not None)
+            self._priority.clear()
+            self._entries.clear()
+            self._by_key.clear()
+            self._indexed = self.policy == 'latest'
+            self._live = 0
+            self._first_at = None
+            self.paused = False
+            self.total_dequeued += len(entries)
+            if entries:
+                self.total_batches += 1
+
+        payloads = [e.payload for e in entries]
+        if with_timestamps:
+            return payloads, [e.received_at for e in entries]
+        return payloads
+
+    def is_due(self, now=None):
+        """Batch teslim zamanı geldi mi?"""
+        if self._priority:
+            return True
+        if not self._live:
+            return False
+        if self._live >= self.max_batch_size:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self._first_at >= self.max_delay
+
+    def time_until_due(self, default=1.0, now=None):
+        """Bir sonraki teslime kalan süre (event loop select() timeout'u için)."""
+        if self._priority:
+            return 0.0
+        if not self._live:
+            return default
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.max_delay - (now - self._first_at))
+
+    def get_statistics(self):
+        return {
+            'policy': self.policy,
+            'capacity': self.capacity,
+            'depth': len(self),
+            'high_watermark': self.high_watermark,
+            'enqueued': self.total_enqueued,
+            'dequeued': self.total_dequeued,
+            'batches': self.total_batches,
+            'dropped_oldest': self.dropped_oldest,
+            'coalesced': self.coalesced,
+            'priority': self.priority_enqueued,
+            'paused': self.paused,
+            'pause_count': self.pause_count
+        }
@@ -0,0 +1,342 @@
+"""Multi-process Ingest Workers - SO_REUSEPORT ile paralel framing ve çözümleme"""
+import multiprocessing
+from multiprocessing.connection import wait
+from collections import namedtuple
+import signal
+import socket
+import time
+
+import numpy as np
+
+from services.ingest_engine import IngestEngine
+from services.stream_capture import StreamRecorder
+from services.ingest_queue import is_priority_payload
+from services.binary_protocol import RangeReport, tag_id_from_number
+from services.payload_decoder import MeasurementReport
+
+MeasurementBatch = namedtuple('MeasurementBatch', ['anchor_ids', 'tag_ids', 'distances', 'packets'])
+MeasurementBatch.__doc__ = """Worker'dan gelen kompakt ölçüm listesi: distances metre cinsinden float64
+array, packets batch'e giren anchor paketi sayısı."""
+
+
+class _BatchBuilder:
+    """Worker içinde çözülen paketleri (MeasurementReport, RangeReport) MeasurementBatch kolonlarında biriktirir."""
+
+    def __init__(self, max_batch_size, max_delay_ms):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self._first_at = None
+        self._reset()
+
+    def _reset(self):
+        self.anchor_ids = []
+        self.tag_ids = []
+        self.distances = []
+        self.packets = 0
+
+    def __len__(self):
+        return len(self.distances)
+
+    def add(self, payload):
+        if not self.distances:
+            self._first_at = time.monotonic()
+
+        if isinstance(payload, MeasurementReport):
+            self.packets += 1
+            self.anchor_ids.extend([payload.anchor_id] * len(payload.tag_ids))
+            self.tag_ids.extend(payload.tag_ids)
+            self.distances.extend(payload.distances)
+            return
+
+        if isinstance(payload, RangeReport):
+            self.packets += 1
+            records = payload.records
+            self.anchor_ids.extend([payload.anchor_id] * len(records))
+            self.tag_ids.extend(tag_id_from_number(tag) for tag in records['tag'].tolist())
+            self.distances.extend((records['distance_mm'] / 1000.0).tolist())
+
+        # Normalize edilemeyen sözlükler (ölçümsüz / anchor_id'siz) atlanır
+
+    def is_due(self):
+        if not self.distances:
+            return False
+        if len(self.distances) >= self.max_batch_size:
+            return True
+        return time.monotonic() - self._first_at >= self.max_delay
+
+    def time_until_due(self, default=0.5):
+        if not self.distances:
+            return default
+        return max(0.0, self.max_delay - (time.monotonic() - self._first_at))
+
+    def drain(self):
+        batch = MeasurementBatch(self.anchor_ids, self.tag_ids,
+                                 np.array(self.distances, dtype=np.float64), self.packets)
+        self._reset()
+        self._first_at = None
+        return batch
+
+
+def _worker_main(index, host, port, backlog, conn, batch_size, batch_interval_ms, framing,
+                 capture_path=None):
+    """
+    Worker süreci: SO_REUSEPORT ile aynı porta bağlanan bir IngestEngine çalıştırır.
+
+    Ana sürece giden mesajlar (Pipe üzerinden):
+        ('ready', index)
+        ('batch', MeasurementBatch, total_messages, total_bytes)
+        ('alert', payload)  SOS / acil durum paketleri, gecikmeden
+        ('connection', address, connected)
+        ('error', message)
+
+    Ana süreçten gelen komutlar: 'stop', 'pause', 'resume'
+
+    capture_path verilirse worker kendi akışlarını '<capture_path>.<index>'
+    dosyasına kaydeder.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    builder = _BatchBuilder(batch_size, batch_interval_ms)
+    state = {'running': True}
+
+    def send(message):
+        try:
+            conn.send(message)
+        except OSError:
+            # Ana süreç gitti
+            state['running'] = False
+
+    def on_message(payload, address):
+        if is_priority_payload(payload):
+            send(('alert', payload))
+        else:
+            builder.add(payload)
+
+    recorder = StreamRecorder(f'{capture_path}.{index}') if capture_path else None
+    engine = IngestEngine(
+        host=host,
+        port=port,
+        backlog=backlog,
+        on_message=on_message,
+        on_connection=lambda address, connected: send(('connection', address, connected)),
+        on_error=lambda message: send(('error', message)),
+        framing=framing,
+        reuse_port=True,
+        recorder=recorder
+    )
+
+    def on_command():
+        try:
+            command = conn.recv()
+        except EOFError:
+            state['running'] = False
+            return
+        if command == 'stop':
+            state['running'] = False
+        elif command == 'pause':
+            engine.pause_reading()
+        elif command == 'resume':
+            engine.resume_reading()
+
+    try:
+        engine.open()
+    except OSError as e:
+        send(('error', f"Worker {index} başlatma hatası: {e}"))
+        return
+
+    engine.add_reader(conn, on_command)
+    send(('ready', index))
+
+    try:
+        while state['running']:
+            engine.poll(timeout=builder.time_until_due())
+            if builder.is_due():
+                send(('batch', builder.drain(), engine.total_messages, engine.total_bytes))
+    finally:
+        if len(builder):
+            send(('batch', builder.drain(), engine.total_messages, engine.total_bytes))
+        engine.remove_reader(conn)
+        engine.close()
+        if recorder is not None:
+            recorder.close()
+
+
+class IngestWorkerPool:
+    """
+    N ingest worker süreci - framing ve JSON çözümleme GIL dışında.
+
+    Her worker SO_REUSEPORT ile aynı portu dinler; kernel yeni bağlantıları
+    worker'lar arasında dağıtır. Worker'lar paketleri çözüp kompakt
+    MeasurementBatch olarak Pipe üzerinden ana sürece gönderir; ana süreçte
+    yalnızca pickle çözümü kalır. SOS / acil durum paketleri batch'e
+    girmeden ayrı gönderilir.
+
+    IngestEngine ile aynı arayüzü sunar (open/poll/wakeup/close,
+    pause_reading/resume_reading); TCPServerService workers>0 verildiğinde
+    IngestEngine yerine bunu kullanır. on_message çağrılarında payload
+    MeasurementBatch veya acil durum dict'idir.
+
+    Worker'lar 'spawn' ile başlatılır (Qt thread'leri çalışan bir süreçte
+    fork güvenli değildir).
+    """
+
+    def __init__(self, host='0.0.0.0', port=8888, workers=2, backlog=1024,
+                 on_message=None, on_connection=None, on_error=None,
+                 batch_size=1024, batch_interval_ms=10, framing='auto', capture_path=None):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.backlog = backlog
+        self.batch_size = batch_size
+        self.batch_interval_ms = batch_interval_ms
+        self.framing = framing
+        self.capture_path = capture_path
+
+        self.on_message = on_message
+        self.on_connection = on_connection
+        self.on_error = on_error
+
+        self.processes = []
+        self.pipes = []
+        self._wakeup_r = None
+        self._wakeup_w = None
+        self.reading_paused = False
+
+        # Worker başına kümülatif sayaçlar
+        self.worker_messages = [0] * workers
+        self.worker_bytes = [0] * workers
+
+    @property
+    def total_messages(self):
+        return sum(self.worker_messages)
+
+    @property
+    def total_bytes(self):
+        return sum(self.worker_bytes)
+
+    def open(self, timeout=10.0):
+        """Worker süreçlerini başlat ve dinlemeye hazır olmalarını bekle."""
+        ctx = multiprocessing.get_context('spawn')
+
+        for index in range(self.workers):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker_main,
+                args=(index, self.host, self.port, self.backlog, child_conn,
+                      self.batch_size, self.batch_interval_ms, self.framing, self.capture_path),
+                name=f'ingest-worker-{index}',
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self.processes.append(process)
+            self.pipes.append(parent_conn)
+
+        for pipe in self.pipes:
+            message = pipe.recv() if pipe.poll(timeout) else ('error', "Worker zaman aşımı")
+            if message[0] != 'ready':
+                self.close()
+                raise OSError(message[1])
+
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+
+    def poll(self, timeout=0.5):
+        """Worker'lardan gelen mesajları bir kez işle."""
+        readers = [pipe for pipe in self.pipes if not pipe.closed]
+        for ready in wait(readers + [self._wakeup_r], timeout):
+            if ready is self._wakeup_r:
+                self._drain_wakeup()
+                continue
+
+            index = self.pipes.index(ready)
+            try:
+                while ready.poll():
+                    self._handle(index, ready.recv())
+            except EOFError:
+                ready.close()
+                self._error(f"Ingest worker {index} beklenmedik şekilde durdu")
+
+    def _handle(self, index, message):
+        kind = message[0]
+        if kind == 'batch':
+            _, batch, messages, received_bytes = message
+            self.worker_messages[index] = messages
+            self.worker_bytes[index] = received_bytes
+            if self.on_message and len(batch.distances):
+                self.on_message(batch, None)
+        elif kind == 'alert':
+            if self.on_message:
+                self.on_message(message[1], None)
+        elif kind == 'connection':
+            if self.on_connection:
+                self.on_connection(message[1], message[2])
+        elif kind == 'error':
+            self._error(message[1])
+
+    def pause_reading(self):
+        """Tüm worker'larda soket okumayı durdur (backpressure)."""
+        if not self.reading_paused:
+            self.reading_paused = True
+            self._broadcast('pause')
+
+    def resume_reading(self):
+        if self.reading_paused:
+            self.reading_paused = False
+            self._broadcast('resume')
+
+    def wakeup(self):
+        """Bekleyen poll() çağrısını başka bir thread'den uyandır."""
+        if self._wakeup_w is not None:
+            try:
+                self._wakeup_w.send(b'\0')
+            except OSError:
+                pass
+
+    def close(self, timeout=2.0):
+        """Worker'ları durdur; son batch'leri işle."""
+        self._broadcast('stop')
+
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join(0.5)
+
+        for index, pipe in enumerate(self.pipes):
+            if pipe.closed:
+                continue
+            try:
+                while pipe.poll():
+                    self._handle(index, pipe.recv())
+            except (EOFError, OSError):
+                pass
+            pipe.close()
+
+        for sock in (self._wakeup_r, self._wakeup_w):
+            if sock is not None:
+                sock.close()
+
+        self.processes = []
+        self.pipes = []
+        self._wakeup_r = self._wakeup_w = None
+
+    def _broadcast(self, command):
+        for pipe in self.pipes:
+            try:
+                pipe.send(command)
+            except OSError:
+                pass
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _error(self, message):
+        if self.on_error:
+            self.on_error(message)
+
@@ -1,74 +1,109 @@
-"""2D Kalman Filter for Position Tracking - Enterprise Grade"""
+"""2D / 3D Kalman Filter for Position Tracking - Enterprise Grade"""
 import numpy as np
 
+DEFAULT_DT = 0.1  # Zaman damgası verilmeyen predict() adımı (s)
+MAX_DT = 5.0  # Tek adımda ileri taşınabilecek en uzun süre (s); uzun boşluklarda hız ekstrapolasyonu sınırlanır
+
+
+def process_noise_blocks(process_variance, dt):
+    """
+    Sürekli beyaz ivme gürültüsü modelinin Q blokları (eksen başına).
+    
+    Q = q · [[dt³/3, dt²/2], [dt²/2, dt]]; dt skaler veya dizi olabilir.
+    
+    Returns:
+        (konum-konum, konum-hız, hız-hız) varyansları
+    """
+    return (process_variance * dt ** 3 / 3,
+            process_variance * dt ** 2 / 2,
+            process_variance * dt)
+
+
 class KalmanFilter2D:
     """2D konum için Kalman filtresi - Gelişmiş tracking için."""
     
-    def __init__(self, process_variance=0.005, measurement_variance=0.5, initial_value=(0, 0)):
+    dim = 2  # Konum boyutu; durum [konum, hız] (2 × dim)
+    
+    def __init__(self, process_variance=0.005, measurement_variance=0.5, initial_value=(0, 0),
+                 timestamp=None):
         """
         Initialize Kalman Filter.
         
         Args:
-            process_variance: İşlem varyansı (sistem belirsizliği)
+            process_variance: İvme gürültüsü yoğunluğu (m²/s³, sistem belirsizliği)
             measurement_variance: Ölçüm varyansı (sensor gürültüsü)
-            initial_value: Başlangıç konumu (x, y)
+            initial_value: Başlangıç konumu (x, y) / 3D'de (x, y, z)
+            timestamp: Başlangıç konumunun zamanı (s); update() zaman damgalarıyla aynı saat
         """
         self.process_variance = process_variance
         self.measurement_variance = measurement_variance
+        self.last_timestamp = timestamp
+        dim = self.dim
         
-        # Durum vektörü: [x, y, vx, vy]
-        self.state = np.array([
-            initial_value[0], 
-            initial_value[1], 
-            0.0,  # x hızı
-            0.0   # y hızı
-        ], dtype=float)
+        # Durum vektörü: [x, y, (z), vx, vy, (vz)]
+        self.state = np.zeros(2 * dim)
+        self.state[:dim] = initial_value[:dim]
         
         # Kovaryans matrisi (belirsizlik)
-        self.P = np.eye(4) * 1.0
+        self.P = np.eye(2 * dim) * 1.0
         
-        # Durum geçiş matrisi (hareket modeli)
-        dt = 0.1  # Zaman adımı
-        self.F = np.array([
-            [1, 0, dt, 0],
-            [0, 1, 0, dt],
-            [0, 0, 1, 0],
-            [0, 0, 0, 1]
-        ], dtype=float)
+        # Durum geçiş matrisi (sabit hız modeli) ve işlem gürültüsü - her adımda dt ile kurulur
+        self.F, self.Q = self.transition(DEFAULT_DT)
         
         # Ölçüm matrisi (sadece pozisyon ölçülür)
-        self.H = np.array([
-            [1, 0, 0, 0],
-            [0, 1, 0, 0]
-        ], dtype=float)
-        
-        # İşlem gürültüsü kovaryansı
-        self.Q = np.eye(4) * process_variance
+        self.H = np.eye(dim, 2 * dim)
         
         # Ölçüm gürültüsü kovaryansı
-        self.R = np.eye(2) * measurement_variance
+        self.R = np.eye(dim) * measurement_variance
     
-    def predict(self):
-        """Durumu bir zaman adımı ileriye tahmin et."""
+    def transition(self, dt):
+        """dt için F ve Q (sabit hız, sürekli beyaz ivme gürültüsü) - yalnızca köşegenler yazılır."""
+        dim = self.dim
+        position, velocity = np.arange(dim), np.arange(dim, 2 * dim)
+        F = np.eye(2 * dim)
+        F[position, velocity] = dt
+        q_pp, q_pv, q_vv = process_noise_blocks(self.process_variance, dt)
+        Q = np.zeros((2 * dim, 2 * dim))
+        Q[position, position] = q_pp
+        Q[position, velocity] = Q[velocity, position] = q_pv
+        Q[velocity, velocity] = q_vv
+        return F, Q
+    
+    def predict(self, dt=None):
+        """
+        Durumu dt saniye ileriye tahmin et.
+        
+        Args:
+            dt: Zaman adımı (s); None ise DEFAULT_DT
+        """
+        self.F, self.Q = self.transition(DEFAULT_DT if dt is None else min(dt, MAX_DT))
+        
         # Durum tahmini
         self.state = self.F @ self.state
         
         # Kovaryans tahmini
         self.P = self.F @ self.P @ self.F.T + self.Q
         
-        return (self.state[0], self.state[1])
+        return tuple(self.state[:self.dim])
     
-    def update(self, measurement):
+    def update(self, measurement, timestamp=None):
         """
         Ölçüm ile durumu güncelle.
         
         Args:
-            measurement: Ölçüm (x, y) tuple
+            measurement: Ölçüm (x, y) / 3D'de (x, y, z) tuple
+            timestamp: Ölçüm zamanı (s); verilirse önceki ölçümden bu yana geçen
+                süre kadar predict edilir (düzensiz ölçüm aralıkları)
             
         Returns:
-            Filtrelenmiş konum (x, y)
+            Filtrelenmiş konum
         """
-        measurement = np.array([measurement[0], measurement[1]], dtype=float)
+        if timestamp is not None:
+            if self.last_timestamp is not None and timestamp > self.last_timestamp:
+                self.predict(timestamp - self.last_timestamp)
+            self.last_timestamp = timestamp
+        
+        measurement = np.array(measurement[:self.dim], dtype=float)
         
         # Yenilik (innovation) - ölçüm vs tahmin farkı
         y = measurement - self.H @ self.state
@@ -83,24 +118,259 @@ class KalmanFilter2D:
         self.state = self.state + K @ y
         
         # Kovariyansı güncelle (Joseph form - numerical stability)
-        I_KH = np.eye(4) - K @ self.H
+        I_KH = np.eye(2 * self.dim) - K @ self.H
         self.P = I_KH @ self.P @ I_KH.T + K @ self.R @ K.T
         
-        return (self.state[0], self.state[1])
+        return tuple(self.state[:self.dim])
     
     def get_position(self):
         """Filtrelenmiş mevcut konumu döndür."""
-        return (self.state[0], self.state[1])
+        return tuple(self.state[:self.dim])
+    
+    def predict_at(self, timestamp):
+        """Son ölçümden timestamp'e ekstrapole edilmiş konum (durum değişmez)."""
+        if self.last_timestamp is None:
+            return self.get_position()
+        dt = min(max(timestamp - self.last_timestamp, 0.0), MAX_DT)
+        return tuple(self.state[:self.dim] + self.state[self.dim:] * dt)
     
     def get_velocity(self):
         """Tahmini hızı döndür."""
-        return (self.state[2], self.state[3])
+        return tuple(self.state[self.dim:])
     
     def get_uncertainty(self):
         """Pozisyon belirsizliğini döndür (kovariyans)."""
-        return (self.P[0, 0], self.P[1, 1])
+        return tuple(np.diagonal(self.P)[:self.dim])
     
-    def reset(self, position):
+    def reset(self, position, timestamp=None):
         """Filtreyi yeni bir pozisyonla sıfırla."""
-        self.state = np.array([position[0], position[1], 0.0, 0.0], dtype=float)
-        self.P = np.eye(4) * 1.0
+        self.last_timestamp = timestamp
+        self.state = np.zeros(2 * self.dim)
+        self.state[:self.dim] = position[:self.dim]
+        self.P = np.eye(2 * self.dim) * 1.0
+
+
+class KalmanFilter3D(KalmanFilter2D):
+    """3D konum için sabit hız Kalman filtresi - çok katlı çalışma alanları için."""
+    
+    dim = 3
+    
+    def __init__(self, process_variance=0.005, measurement_variance=0.5, initial_value=(0, 0, 0),
+                 timestamp=None):
+        super().__init__(process_variance, measurement_variance, initial_value, timestamp)
+
+
+def _inverse_small(S):
+    """(M, d, d) simetrik matrislerin kapalı form tersi (d = 2 veya 3, adjoint / determinant)."""
+    if S.shape[-1] == 2:
+        a, b, c = S[:, 0, 0], S[:, 0, 1], S[:, 1, 1]
+        det = a * c - b * b
+        inverse = np.empty_like(S)
+        inverse[:, 0, 0] = c
+        inverse[:, 1, 1] = a
+        inverse[:, 0, 1] = inverse[:, 1, 0] = -b
+        return inverse / det[:, None, None]
+    # 3x3: kofaktörler (simetrik olduğundan adjoint = kofaktör matrisi)
+    a, b, c = S[:, 0, 0], S[:, 0, 1], S[:, 0, 2]
+    d, e, f = S[:, 1, 1], S[:, 1, 2], S[:, 2, 2]
+    inverse = np.empty_like(S)
+    inverse[:, 0, 0] = d * f - e * e
+    inverse[:, 0, 1] = inverse[:, 1, 0] = c * e - b * f
+    inverse[:, 0, 2] = inverse[:, 2, 0] = b * e - c * d
+    inverse[:, 1, 1] = a * f - c * c
+    inverse[:, 1, 2] = inverse[:, 2, 1] = b * c - a * e
+    inverse[:, 2, 2] = a * d - b * b
+    det = a * inverse[:, 0, 0] + b * inverse[:, 0, 1] + c * inverse[:, 0, 2]
+    return inverse / det[:, None, None]
+
+
+class KalmanFilterBank:
+    """
+    Tüm tag'lerin Kalman filtreleri tek dizide - KalmanFilter2D / 3D ile aynı model.
+    
+    Durumlar (kapasite, 2·dim), kovaryanslar (kapasite, 2·dim, 2·dim)
+    dizilerinde tutulur; predict / update herhangi bir tag alt kümesi için
+    tek vektörel çağrıdır ve yenilik kovaryansı kapalı formda ters çevrilir.
+    Tag başına nesne ve küçük matris ayırma maliyeti ortadan kalkar.
+    
+    Eklenen tag'e boş slot verilir; silinen tag'in slotu yeniden kullanılır.
+    Kapasite dolunca diziler iki katına büyür (ekleme başına amortize sabit).
+    
+    Zaman damgalı update() her tag'i kendi son ölçümünden bu yana geçen
+    süre kadar predict eder (satır başına dt); extrapolate() durumu
+    değiştirmeden "şimdiki" konumu verir.
+    """
+    
+    def __init__(self, dim=2, process_variance=0.005, measurement_variance=0.5, capacity=64):
+        """
+        Args:
+            dim: Konum boyutu (2 veya 3)
+            process_variance: İvme gürültüsü yoğunluğu (m²/s³, sistem belirsizliği)
+            measurement_variance: Ölçüm varyansı (sensor gürültüsü)
+            capacity: Başlangıç slot sayısı
+        """
+        if dim not in (2, 3):
+            raise ValueError(f"dim 2 veya 3 olmalı: {dim}")
+        self.dim = dim
+        self.process_variance = process_variance
+        self.measurement_variance = measurement_variance
+        
+        size = 2 * dim
+        self.state = np.zeros((capacity, size))
+        self.P = np.zeros((capacity, size, size))
+        self.last_timestamp = np.full(capacity, np.nan)  # Son ölçüm zamanı (s); NaN: bilinmiyor
+        self._slots = {}  # tag_id -> slot
+        self._free = list(range(capacity - 1, -1, -1))  # pop() en küçük slotu verir
+    
+    def __len__(self):
+        return len(self._slots)
+    
+    def __contains__(self, tag_id):
+        return tag_id in self._slots
+    
+    def __iter__(self):
+        return iter(self._slots)
+    
+    @property
+    def capacity(self) -> int:
+        return len(self.state)
+    
+    def add(self, tag_id, position, timestamp=None):
+        """Tag ekle (varsa konumla sıfırla)."""
+        slot = self._slots.get(tag_id)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._slots[tag_id] = self._free.pop()
+        self.state[slot] = 0.0
+        self.state[slot, :self.dim] = position[:self.dim]
+        self.P[slot] = np.eye(2 * self.dim)
+        self.last_timestamp[slot] = np.nan if timestamp is None else timestamp
+    
+    reset = add
+    
+    def remove(self, tag_id):
+        """Tag'ı sil; slotu sonraki eklemede yeniden kullanılır."""
+        slot = self._slots.pop(tag_id, None)
+        if slot is not None:
+            self._free.append(slot)
+    
+    def clear(self):
+        self._slots.clear()
+        self._free = list(range(self.capacity - 1, -1, -1))
+    
+    def _grow(self):
+        old = self.capacity
+        self.state = np.concatenate([self.state, np.zeros_like(self.state)])
+        self.P = np.concatenate([self.P, np.zeros_like(self.P)])
+        self.last_timestamp = np.concatenate([self.last_timestamp, np.full(old, np.nan)])
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+    
+    def slots(self, tag_ids) -> np.ndarray:
+        """Tag ID'lerinin slot indeksleri (bilinmeyen tag KeyError)."""
+        slots = self._slots
+        return np.fromiter((slots[tag_id] for tag_id in tag_ids), dtype=np.intp)
+    
+    def get_position(self, tag_id):
+        """Tek tag'in filtrelenmiş konumu."""
+        return tuple(self.state[self._slots[tag_id], :self.dim].tolist())
+    
+    def get_velocity(self, tag_id):
+        return tuple(self.state[self._slots[tag_id], self.dim:].tolist())
+    
+    def positions(self, tag_ids) -> np.ndarray:
+        """(M, dim) filtrelenmiş konumlar."""
+        return self.state[self.slots(tag_ids), :self.dim]
+    
+    def predict(self, tag_ids=None, dt=None) -> np.ndarray:
+        """
+        Seçilen tag'leri (None ise tümünü) dt saniye ileri taşı.
+        
+        Args:
+            dt: Skaler veya (M,) tag başına adım (s); None ise DEFAULT_DT
+        
+        Returns:
+            (M, dim) tahmin edilen konumlar
+        """
+        slots = np.fromiter(self._slots.values(), dtype=np.intp) if tag_ids is None else self.slots(tag_ids)
+        dt = np.broadcast_to(np.minimum(DEFAULT_DT if dt is None else dt, MAX_DT), slots.shape)
+        x, P = self._predict(self.state[slots], self.P[slots], dt)
+        self.state[slots] = x
+        self.P[slots] = P
+        return x[:, :self.dim].copy()
+    
+    def _predict(self, x, P, dt):
+        """x = F x, P = F P Fᵀ + Q; F = [[I, dt·I], [0, I]] blok yapısı açık yazılır (satır başına dt)."""
+        dim = self.dim
+        step = dt[:, None]
+        x[:, :dim] += step * x[:, dim:]
+        P[:, :dim, :] += step[:, :, None] * P[:, dim:, :]
+        P[:, :, :dim] += step[:, None, :] * P[:, :, dim:]
+        
+        # Q blokları yalnızca köşegenlerdedir (eksenler bağımsız)
+        q_pp, q_pv, q_vv = process_noise_blocks(self.process_variance, dt)
+        axes = np.arange(dim)
+        P[:, axes, axes] += q_pp[:, None]
+        P[:, axes, axes + dim] += q_pv[:, None]
+        P[:, axes + dim, axes] += q_pv[:, None]
+        P[:, axes + dim, axes + dim] += q_vv[:, None]
+        return x, P
+    
+    def update(self, tag_ids, measurements, timestamps=None) -> np.ndarray:
+        """
+        Seçilen tag'leri ölçümlerle güncelle (tek vektörel adım).
+        
+        Args:
+            tag_ids: Tekrarsız tag ID'leri (bankada olmalı)
+            measurements: (M, dim) ölçülen konumlar
+            timestamps: Skaler veya (M,) ölçüm zamanları (s); verilirse her tag son
+                ölçümünden bu yana geçen süre kadar predict edilir
+            
+        Returns:
+            (M, dim) filtrelenmiş konumlar
+        """
+        slots = self.slots(tag_ids)
+        dim = self.dim
+        z = np.asarray(measurements, dtype=np.float64)[:, :dim]
+        x = self.state[slots]
+        P = self.P[slots]
+        r = self.measurement_variance
+        
+        if timestamps is not None:
+            timestamps = np.broadcast_to(np.asarray(timestamps, dtype=np.float64), slots.shape)
+            elapsed = timestamps - self.last_timestamp[slots]
+            # İlk ölçüm (NaN) veya sıra dışı zaman damgası: predict yok
+            dt = np.where(elapsed > 0, np.minimum(elapsed, MAX_DT), 0.0)
+            x, P = self._predict(x, P, dt)
+            self.last_timestamp[slots] = np.fmax(timestamps, self.last_timestamp[slots])
+        
+        # H = [I, 0]: H P Hᵀ ve P Hᵀ yalnızca dilimlerdir
+        S = P[:, :dim, :dim] + np.eye(dim) * r
+        K = P[:, :, :dim] @ _inverse_small(S)  # (M, 2·dim, dim)
+        x += (K @ (z - x[:, :dim])[:, :, None])[:, :, 0]
+        
+        # Joseph formu: (I - K H) P (I - K H)ᵀ + K R Kᵀ
+        I_KH = np.broadcast_to(np.eye(2 * dim), P.shape).copy()
+        I_KH[:, :, :dim] -= K
+        P = I_KH @ P @ I_KH.transpose(0, 2, 1) + r * (K @ K.transpose(0, 2, 1))
+        
+        self.state[slots] = x
+        self.P[slots] = P
+        return x[:, :dim].copy()
+    
+    def extrapolate(self, tag_ids, timestamp) -> np.ndarray:
+        """
+        Son ölçümden timestamp'e ekstrapole edilmiş konumlar (yalnızca tahmin, durum değişmez).
+        
+        Arayüzün yeni ölçüm beklemeden "şimdiki" konumu çizmesi için; zamanı
+        bilinmeyen tag'ler son konumda kalır.
+        
+        Returns:
+            (M, dim) konumlar
+        """
+        slots = self.slots(tag_ids)
+        dim = self.dim
+        elapsed = np.asarray(timestamp, dtype=np.float64) - self.last_timestamp[slots]
+        dt = np.where(elapsed > 0, np.minimum(elapsed, MAX_DT), 0.0)
+        x = self.state[slots]
+        return x[:, :dim] + x[:, dim:] * dt[:, None]
@@ -0,0 +1,421 @@
+"""MQTT Ingest - Gateway'lerin MQTT topic'lerine yayınladığı mesafe raporlarının alımı"""
+from PyQt6.QtCore import QThread, pyqtSignal
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+
+try:
+    import paho.mqtt.client as paho_mqtt
+    PAHO_AVAILABLE = True
+except ImportError:
+    paho_mqtt = None
+    PAHO_AVAILABLE = False
+
+from services.ingest_queue import BoundedIngestQueue, is_priority_payload
+from services.ingest_metrics import IngestMetrics
+from services.binary_protocol import MAGIC, RangeReport, decode_report, tag_id_from_number
+from services.payload_decoder import MeasurementReport, PayloadDecoder
+
+DEFAULT_TOPICS = ('minetracker/+/ranges', 'minetracker/+/alerts')
+
+LocalMessage = namedtuple('LocalMessage', ['topic', 'payload', 'qos', 'retain'])
+
+
+def topic_matches(pattern, topic):
+    """MQTT topic filtresi eşleşmesi ('+' tek seviye, '#' kalan tüm seviyeler)."""
+    pattern_levels = pattern.split('/')
+    topic_levels = topic.split('/')
+    for index, level in enumerate(pattern_levels):
+        if level == '#':
+            return True
+        if index >= len(topic_levels):
+            return False
+        if level != '+' and level != topic_levels[index]:
+            return False
+    return len(pattern_levels) == len(topic_levels)
+
+
+def split_per_tag(payload):
+    """
+    Raporu (anchor, tag) başına tek ölçümlü paketlere böl.
+
+    'latest' politikasında kuyruk aynı (anchor, tag) anahtarlı bekleyen
+    paketi yenisiyle değiştirir; böylece tag başına yalnızca en son mesafe
+    teslim edilir.
+    """
+    if isinstance(payload, RangeReport):
+        return [MeasurementReport(payload.anchor_id, payload.sequence, None,
+                                  [tag_id_from_number(int(record['tag']))],
+                                  [record['distance_mm'] / 1000.0], [int(record['rssi'])])
+                for record in payload.records]
+
+    if not isinstance(payload, MeasurementReport) or len(payload.tag_ids) <= 1:
+        return [payload]
+    return [payload._replace(tag_ids=[tag_id], distances=[distance], rssi=[signal])
+            for tag_id, distance, signal in zip(payload.tag_ids, payload.distances, payload.rssi)]
+
+
+class MQTTIngestService(QThread):
+    """
+    MQTT abonesi - range report'ları gateway'lerin topic'lerinden alır.
+
+    Ağ döngüsü (client.loop) bu thread'de çalışır; mesajlar aynı thread'de
+    çözülür (JSON veya binary range report) ve TCPServerService ile aynı
+    sınırlı kuyruk / batch_ready / take_batch() hattına verilir.
+
+    QoS 0 ve 'latest' politikası (varsayılan) ile her rapor (anchor, tag)
+    başına bölünür; Qt thread'i yetişemezse tag başına yalnızca en son
+    değer bekler. SOS / alarm mesajları bölünmez ve öncelik kuyruğuna gider.
+
+    client_factory verilirse paho yerine kullanılır (ör. LocalBroker.client).
+    """
+
+    # Signals
+    data_received = pyqtSignal(object)  # Tek paket (batching kapalı)
+    batch_ready = pyqtSignal()  # Kuyrukta teslim edilecek paketler var (take_batch)
+    connection_status = pyqtSignal(str, bool)  # (broker, bağlı mı)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, host='127.0.0.1', port=1883, topics=DEFAULT_TOPICS, qos=0,
+                 client_id=None, username=None, password=None, keepalive=30,
+                 batch_interval_ms=25, batch_size=256, queue_capacity=10000,
+                 overflow_policy='latest', metrics=None, client_factory=None,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.topics = [topics] if isinstance(topics, str) else list(topics)
+        self.qos = qos
+        self.client_id = client_id or f'minetracker-{uuid.uuid4().hex[:8]}'
+        self.username = username
+        self.password = password
+        self.keepalive = keepalive
+        self.client_factory = client_factory
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.running = False
+        self.connected = False
+        self.client = None
+
+        self.queue = BoundedIngestQueue(queue_capacity, overflow_policy, batch_size, batch_interval_ms) \
+            if batch_interval_ms else None
+        self.split_per_tag = qos == 0 and overflow_policy == 'latest'
+        self._notified = False  # batch_ready gönderildi, take_batch() bekleniyor
+        self.metrics = metrics if metrics is not None else IngestMetrics()
+        self.metrics_shard = self.metrics.shard('mqtt')
+
+        # İstatistikler
+        self.total_messages = 0
+        self.total_bytes = 0
+        self.decode_errors = 0
+        self.decoder = PayloadDecoder()
+        self.reconnects = 0
+        self.start_time = None
+
+    def _create_client(self):
+        if self.client_factory is not None:
+            return self.client_factory(self.client_id)
+        if not PAHO_AVAILABLE:
+            raise RuntimeError("paho-mqtt kurulu değil (pip install paho-mqtt)")
+        if hasattr(paho_mqtt, 'CallbackAPIVersion'):
+            # paho-mqtt 2.x
+            return paho_mqtt.Client(paho_mqtt.CallbackAPIVersion.VERSION2, client_id=self.client_id)
+        return paho_mqtt.Client(client_id=self.client_id)
+
+    def run(self):
+        """Thread'in ana döngüsü."""
+        try:
+            self.client = self._create_client()
+            if self.username:
+                self.client.username_pw_set(self.username, self.password)
+            self.client.on_connect = self._on_connect
+            self.client.on_disconnect = self._on_disconnect
+            self.client.on_message = self._on_message
+            self.client.connect(self.host, self.port, self.keepalive)
+        except Exception as e:
+            self.error_occurred.emit(f"MQTT bağlantı hatası: {e}")
+            print(f"❌ MQTT Ingest hatası: {e}")
+            return
+
+        self.running = True
+        self.start_time = time.time()
+        print(f"✅ MQTT Ingest başlatıldı: {self.host}:{self.port} {', '.join(self.topics)}")
+
+        delay = self.reconnect_delay
+        try:
+            while self.running:
+                timeout = 1.0
+                if self.queue is not None and not self._notified:
+                    timeout = self.queue.time_until_due()
+
+                if self.client.loop(timeout=timeout) != 0:
+                    # Bağlantı koptu; artan beklemeyle yeniden dene
+                    if self._wait(delay) and self._reconnect():
+                        delay = self.reconnect_delay
+                    else:
+                        delay = min(delay * 2, self.max_reconnect_delay)
+
+                if self.queue is not None and not self._notified and self.queue.is_due():
+                    self._notify_batch()
+        except Exception as e:
+            if self.running:
+                self.error_occurred.emit(f"MQTT hatası: {e}")
+        finally:
+            self.running = False
+            if self.queue is not None and len(self.queue):
+                self._notify_batch()
+            try:
+                self.client.disconnect()
+            except Exception:
+                pass
+
+    def _wait(self, seconds):
+        """Durdurulmadıkça bekle; hâlâ çalışıyorsa True."""
+        until = time.monotonic() + seconds
+        while self.running and time.monotonic() < until:
+            time.sleep(min(0.1, until - time.monotonic()))
+        return self.running
+
+    def _reconnect(self):
+        try:
+            self.client.reconnect()
+        except Exception as e:
+            print(f"⚠️  MQTT yeniden bağlanılamadı: {e}")
+            return False
+        self.reconnects += 1
+        return True
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
+        if reason_code != 0:
+            self.error_occurred.emit(f"MQTT broker bağlantıyı reddetti: {reason_code}")
+            return
+        # Temiz oturumda abonelikler kaybolur; her bağlantıda yeniden abone ol
+        client.subscribe([(topic, self.qos) for topic in self.topics])
+        self.connected = True
+        self.connection_status.emit(f"{self.host}:{self.port}", True)
+
+    def _on_disconnect(self, client, userdata, *args):
+        if self.connected:
+            self.connected = False
+            self.connection_status.emit(f"{self.host}:{self.port}", False)
+
+    def _on_message(self, client, userdata, message):
+        now = time.monotonic()
+        data = message.payload
+        self.total_messages += 1
+        self.total_bytes += len(data)
+        self.metrics_shard.add_bytes(len(data))
+
+        try:
+            if data[:len(MAGIC)] == MAGIC:
+                payload = decode_report(data)
+            else:
+                payload = self.decoder.decode(data)
+        except (ValueError, UnicodeDecodeError):
+            self.decode_errors += 1
+            return
+
+        self.metrics_shard.record(payload, now)
+        if self.queue is None:
+            self.data_received.emit(payload)
+        elif self.split_per_tag and not is_priority_payload(payload):
+            for part in split_per_tag(payload):
+                self.queue.put(part, now)
+        else:
+            self.queue.put(payload, now)
+
+    def _notify_batch(self):
+        self._notified = True
+        self.batch_ready.emit()
+
+    def take_batch(self, with_timestamps=False):
+        """Kuyruktaki paketleri al (Qt thread'inden, batch_ready sinyaline yanıt olarak)."""
+        if self.queue is None:
+            return ([], []) if with_timestamps else []
+        batch = self.queue.take_batch(with_timestamps)
+        self._notified = False
+        return batch
+
+    def stop(self):
+        """Aboneliği durdur."""
+        print("⏸️  MQTT Ingest durduruluyor...")
+        self.running = False
+
+    def get_statistics(self):
+        """Servis istatistiklerini döndür."""
+        runtime = 0
+        if self.start_time:
+            runtime = time.time() - self.start_time
+
+        queue_stats = self.queue.get_statistics() if self.queue is not None else {}
+        rates = self.metrics_shard.rates()
+        return {
+            'running': self.running,
+            'connected': self.connected,
+            'broker': f"{self.host}:{self.port}",
+            'topics': list(self.topics),
+            'qos': self.qos,
+            'total_messages': self.total_messages,
+            'total_bytes': self.total_bytes,
+            'decode_errors': self.decode_errors,
+            'reconnects': self.reconnects,
+            'overflow_policy': queue_stats.get('policy'),
+            'queue_depth': queue_stats.get('depth', 0),
+            'dropped_oldest': queue_stats.get('dropped_oldest', 0),
+            'coalesced': queue_stats.get('coalesced', 0),
+            'runtime_seconds': runtime,
+            'messages_per_second': rates[10],
+            'rate_1s': rates[1],
+            'rate_10s': rates[10],
+            'rate_60s': rates[60]
+        }
+
+
+class LocalBroker:
+    """
+    Süreç içi MQTT broker yerine geçen basit yayıncı.
+
+    Yerel test ve yük denemeleri için: MQTTIngestService(client_factory=
+    broker.client) ile kullanılır, publish() ile abonelere mesaj iletilir.
+    Yalnızca QoS 0 anlamı vardır (kalıcı oturum, ack yok); retain=True ile
+    yayınlanan son mesaj topic başına saklanır ve her yeni abonelikte
+    (yeniden bağlanma dahil) aboneye tekrar iletilir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clients = []
+        self.retained = {}  # topic -> LocalMessage
+        self.published = 0
+
+    def client(self, client_id=None):
+        """paho Client arayüzünün kullanılan alt kümesini sunan istemci."""
+        return LocalBrokerClient(self, client_id)
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        """Mesajı eşleşen tüm abonelere ilet; alıcı sayısını döndür."""
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        message = LocalMessage(topic, bytes(payload), qos, retain)
+        with self._lock:
+            self.published += 1
+            if retain:
+                # Boş retain mesajı saklananı siler (MQTT anlamı)
+                if message.payload:
+                    self.retained[topic] = message
+                else:
+                    self.retained.pop(topic, None)
+            clients = list(self.clients)
+
+        delivered = 0
+        for client in clients:
+            if client.matches(topic):
+                client.deliver(message)
+                delivered += 1
+        return delivered
+
+    def disconnect_all(self):
+        """Tüm istemcilerin bağlantısını kopar (yeniden bağlanma denemeleri için)."""
+        with self._lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.drop()
+
+    def _attach(self, client):
+        with self._lock:
+            if client not in self.clients:
+                self.clients.append(client)
+
+    def retained_for(self, pattern):
+        """Topic filtresiyle eşleşen saklı (retain) mesajlar."""
+        with self._lock:
+            return [message for topic, message in self.retained.items() if topic_matches(pattern, topic)]
+
+    def _detach(self, client):
+        with self._lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+
+class LocalBrokerClient:
+    """LocalBroker istemcisi - callback'ler loop() çağıran thread'de çalışır."""
+
+    def __init__(self, broker, client_id=None):
+        self.broker = broker
+        self.client_id = client_id
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_message = None
+        self.subscriptions = {}  # topic filtresi -> qos
+        self._inbox = deque()
+        self._events = deque()
+        self._wakeup = threading.Event()
+        self._connected = False
+
+    def username_pw_set(self, username, password=None):
+        pass
+
+    def connect(self, host=None, port=None, keepalive=60):
+        self.broker._attach(self)
+        self._connected = True
+        self._events.append('connect')
+        self._wakeup.set()
+        return 0
+
+    def reconnect(self):
+        return self.connect()
+
+    def disconnect(self):
+        if self._connected:
+            self._connected = False
+            self.broker._detach(self)
+            if self.on_disconnect is not None:
+                self.on_disconnect(self, None, 0)
+        return 0
+
+    def drop(self):
+        """Broker tarafından bağlantı koparıldı."""
+        self._connected = False
+        self.broker._detach(self)
+        self._events.append('disconnect')
+        self._wakeup.set()
+
+    def subscribe(self, topic, qos=0):
+        topics = topic if isinstance(topic, list) else [(topic, qos)]
+        for pattern, pattern_qos in topics:
+            self.subscriptions[pattern] = pattern_qos
+            for message in self.broker.retained_for(pattern):
+                self.deliver(message)
+        return 0, len(topics)
+
+    def matches(self, topic):
+        return any(topic_matches(pattern, topic) for pattern in list(self.subscriptions))
+
+    def deliver(self, message):
+        self._inbox.append(message)
+        self._wakeup.set()
+
+    def loop(self, timeout=1.0):
+        """Bekleyen olayları ve mesajları callback'lere ver (paho Client.loop gibi)."""
+        if not self._inbox and not self._events:
+            self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+        while self._events:
+            event = self._events.popleft()
+            if event == 'connect' and self.on_connect is not None:
+                self.on_connect(self, None, {}, 0, None)
+            elif event == 'disconnect':
+                self._inbox.clear()
+                if self.on_disconnect is not None:
+                    self.on_disconnect(self, None, 1)
+
+        if not self._connected:
+            return 1
+
+        while self._inbox:
+            message = self._inbox.popleft()
+            if self.on_message is not None:
+                self.on_message(self, None, message)
+        return 0
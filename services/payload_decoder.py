@@ -0,0 +1,299 @@
+"""Payload Decoder - Hızlı JSON çözümü ve anchor paketlerinin tek tip ölçüm kaydına dönüşümü
+
+JSON backend'i başlangıçta seçilir: kuruluysa orjson, yoksa ujson, yoksa
+standart kütüphane. orjson / ujson isteğe bağlıdır (pip install orjson);
+MINETRACKER_JSON_BACKEND ile zorlanabilir.
+
+Bilinen anchor firmware varyantları (ölçüm başına):
+
+    {"tag_id": "TAG001", "distance(m)": {"distance": 4.21}, "rssi": -71}
+    {"tag_id": "TAG001", "distance": 4.21}
+    {"tag_id": "TAG001", "distance_m": 4.21}
+    {"tag_id": 1, ...}                          (sayısal tag -> 'TAG001')
+
+Paket düzeyinde 'anchor_id' (sayısal ise 'ANC001'), isteğe bağlı 'seq' / 'sequence' ve
+'timestamp' / 'ts'. Paketler tek geçişte MeasurementReport'a çevrilir:
+başlık derlenmiş şemayla (utils.validators), ölçümler hızlı backend'lerde
+derlenmiş şemayla, standart kütüphanede aynı kuralları uygulayan elle
+yazılmış döngüyle (plain_columns). SOS / alarm paketleri ve ölçüm listesi
+olmayan paketler sözlük olarak olduğu gibi döner.
+"""
+import json
+import math
+import os
+from collections import namedtuple
+
+from utils.validators import Field, RecordSchema, ValidationError, to_bool, to_int, to_non_negative
+from services.stream_framing import decode_json_frame
+from services.binary_protocol import anchor_id_from_number, tag_id_from_number
+
+PRIORITY_TYPES = frozenset(('sos', 'emergency', 'alarm', 'panic'))
+
+MeasurementReport = namedtuple('MeasurementReport',
+                               ['anchor_id', 'sequence', 'timestamp', 'tag_ids', 'distances', 'rssi'])
+MeasurementReport.__doc__ = """Normalize edilmiş JSON anchor paketi: tag_ids / distances (metre) /
+rssi (None olabilir) paralel listelerdir."""
+
+
+def is_flag_set(value):
+    """SOS / emergency bayrağı şemadaki gibi katı okunur ("false" bayrak değildir)."""
+    if value is None:
+        return False
+    try:
+        return to_bool(value)
+    except ValidationError:
+        return False
+
+
+def entity_key(value):
+    """
+    Ham paketten gelen ID sözlük anahtarı olarak kullanılabiliyorsa kendisi, değilse None.
+
+    Geçişli (normalize edilmemiş) sözlüklerde anchor_id / tag_id herhangi bir
+    JSON değeri olabilir; yalnızca str / int ID'ler kuyruk ve metrik anahtarıdır.
+    """
+    if isinstance(value, (str, int)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def is_priority_payload(payload):
+    """SOS / acil durum paketi mi? Bu paketler asla atılmaz."""
+    if not isinstance(payload, dict):
+        return False
+    if str(payload.get('type', '')).lower() in PRIORITY_TYPES:
+        return True
+    if is_flag_set(payload.get('sos')) or is_flag_set(payload.get('emergency')):
+        return True
+    measurements = payload.get('measurements')
+    if not isinstance(measurements, list):
+        return False
+    for measurement in measurements:
+        if isinstance(measurement, dict) and (is_flag_set(measurement.get('sos'))
+                                              or is_flag_set(measurement.get('emergency'))):
+            return True
+    return False
+
+
+def _id_converter(from_number):
+    """Metin kimlikleri olduğu gibi, sayısal kimlikleri binary protokoldeki adlara çevirir."""
+    def convert(value):
+        if isinstance(value, str) and value:
+            return value
+        if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            return from_number(value)
+        raise ValidationError(f"Geçersiz kimlik: {value!r}")
+    convert.fast_check = 'value.__class__ is str and value'
+    return convert
+
+
+REPORT_SCHEMA = RecordSchema([
+    Field('anchor_id', _id_converter(anchor_id_from_number), required=True),
+    Field('measurements', list, required=True),
+    Field('seq', int, aliases=('sequence',)),
+    Field('timestamp', float, aliases=('ts',)),
+    Field('type', str),
+    Field('sos', bool, default=False),
+    Field('emergency', bool, default=False),
+])
+
+MEASUREMENT_SCHEMA = RecordSchema([
+    Field('tag_id', _id_converter(tag_id_from_number), required=True),
+    Field('distance', 'non_negative', aliases=(('distance(m)', 'distance'), 'distance', 'distance_m'),
+          required=True),
+    Field('rssi', int),
+])
+
+
+def _measurement_flagged(measurement):
+    sos, emergency = measurement.get('sos'), measurement.get('emergency')
+    return (sos is not None or emergency is not None) and (is_flag_set(sos) or is_flag_set(emergency))
+
+
+def schema_columns(measurements):
+    """
+    Ölçüm listesini MEASUREMENT_SCHEMA ile sütunlara çevir.
+
+    Returns:
+        (tag_ids, distances, rssi, geçersiz ölçüm sayısı) veya ölçüm düzeyinde
+        SOS / emergency varsa None
+    """
+    for measurement in measurements:
+        # Bayraklar çoğu pakette yoktur; şema sütunu yerine tek tarama
+        if measurement.__class__ is dict and _measurement_flagged(measurement):
+            return None
+    (tag_ids, distances, rssi), invalid = MEASUREMENT_SCHEMA.columns(measurements)
+    return tag_ids, distances, rssi, invalid
+
+
+_tag_id = _id_converter(tag_id_from_number)
+
+
+def plain_columns(measurements):
+    """
+    schema_columns'ın elle yazılmış karşılığı (standart kütüphane backend'i).
+
+    Paket süresinin çoğu zaten json.loads'ta geçer; bayrak taraması ve alan
+    okuması ölçüm başına tek döngüde yapılır. Kurallar MEASUREMENT_SCHEMA
+    ile aynıdır (kaynak sırası, sayısal tag, negatif olmayan mesafe,
+    geçersiz rssi -> None).
+    """
+    tag_ids, distances, rssi = [], [], []
+    add_tag, add_distance, add_rssi = tag_ids.append, distances.append, rssi.append
+    invalid = 0
+    for measurement in measurements:
+        if measurement.__class__ is not dict and not isinstance(measurement, dict):
+            invalid += 1
+            continue
+        if ('sos' in measurement or 'emergency' in measurement) and _measurement_flagged(measurement):
+            return None
+        get = measurement.get
+
+        tag_id = get('tag_id')
+        if tag_id.__class__ is not str or not tag_id:
+            try:
+                tag_id = _tag_id(tag_id)
+            except ValidationError:
+                invalid += 1
+                continue
+
+        distance = get('distance(m)')
+        distance = distance.get('distance') if isinstance(distance, dict) else None
+        if distance is None:
+            distance = get('distance')
+            if distance is None:
+                distance = get('distance_m')
+        if distance.__class__ is not float or not 0.0 <= distance < math.inf:
+            try:
+                distance = to_non_negative(distance)
+            except ValidationError:
+                invalid += 1
+                continue
+
+        signal = get('rssi')
+        if signal is not None and signal.__class__ is not int:
+            try:
+                signal = to_int(signal)
+            except ValidationError:
+                signal = None
+
+        add_tag(tag_id)
+        add_distance(distance)
+        add_rssi(signal)
+    return tag_ids, distances, rssi, invalid
+
+
+def _orjson_backend():
+    import orjson
+    return orjson.loads  # bytes / bytearray / memoryview / str kabul eder
+
+
+def _ujson_backend():
+    import ujson
+
+    def loads(frame):
+        return ujson.loads(frame if isinstance(frame, (bytes, str)) else bytes(frame))
+    return loads
+
+
+def _stdlib_backend():
+    def loads(frame):
+        return json.loads(frame) if isinstance(frame, str) else decode_json_frame(frame)
+    return loads
+
+
+JSON_BACKENDS = {
+    'orjson': _orjson_backend,
+    'ujson': _ujson_backend,
+    'json': _stdlib_backend,
+}
+
+
+def select_json_backend(preferred=None):
+    """
+    Kullanılabilir en hızlı JSON backend'ini seç.
+
+    Returns:
+        (ad, loads) - loads bytes / memoryview / str kabul eder, hatada ValueError
+    """
+    order = [preferred] if preferred else []
+    order += [name for name in JSON_BACKENDS if name != preferred]
+    for name in order:
+        factory = JSON_BACKENDS.get(name)
+        if factory is None:
+            continue
+        try:
+            return name, factory()
+        except ImportError:
+            continue
+    return 'json', _stdlib_backend()
+
+
+JSON_BACKEND, json_loads = select_json_backend(os.environ.get('MINETRACKER_JSON_BACKEND'))
+
+
+class PayloadDecoder:
+    """
+    Anchor paketi çözücü (IngestEngine, UDP ve MQTT ortak kullanır).
+
+    decode(frame): ham paket (bytes / memoryview) -> MeasurementReport veya dict
+    normalize(payload): çözülmüş sözlük -> MeasurementReport veya dict
+
+    Geçersiz ölçümler atlanır ve sayılır; ölçümü olmayan veya anchor_id'siz
+    paketler sözlük olarak döner (tracking bunları yok sayar ya da alarm
+    olarak işler). Tek thread'den kullanılmalıdır (sayaçlar kilitsiz).
+    """
+
+    def __init__(self, backend=None):
+        if backend is None:
+            self.backend, self._loads = JSON_BACKEND, json_loads
+        else:
+            self.backend, self._loads = select_json_backend(backend)
+        # Derlenmiş şema orjson / ujson ile kazançlıdır; yavaş stdlib json.loads'un
+        # yanında ek yük olmaması için stdlib'de elle yazılmış döngü kullanılır
+        self._columns = plain_columns if self.backend == 'json' else schema_columns
+
+        # İstatistikler
+        self.packets = 0
+        self.normalized = 0
+        self.passthrough = 0
+        self.invalid_measurements = 0
+
+    def decode(self, frame):
+        """Ham JSON paketini çöz ve normalize et (geçersiz JSON: ValueError)."""
+        payload = self._loads(frame)
+        if not isinstance(payload, dict):
+            raise ValueError("JSON nesnesi bekleniyordu")
+        return self.normalize(payload)
+
+    def normalize(self, payload):
+        self.packets += 1
+        try:
+            anchor_id, measurements, sequence, timestamp, kind, sos, emergency = \
+                REPORT_SCHEMA.normalize(payload)
+        except ValidationError:
+            self.passthrough += 1
+            return payload
+        if sos or emergency or (kind is not None and kind.lower() in PRIORITY_TYPES):
+            self.passthrough += 1
+            return payload
+
+        columns = self._columns(measurements)
+        if columns is None:
+            # Ölçüm düzeyinde SOS: paket öncelik kuyruğuna sözlük olarak gider
+            self.passthrough += 1
+            return payload
+        tag_ids, distances, rssi, invalid = columns
+        self.invalid_measurements += invalid
+
+        self.normalized += 1
+        return MeasurementReport(anchor_id, sequence, timestamp, tag_ids, distances, rssi)
+
+    def get_statistics(self):
+        return {
+            'backend': self.backend,
+            'packets': self.packets,
+            'normalized': self.normalized,
+            'passthrough': self.passthrough,
+            'invalid_measurements': self.invalid_measurements
+        }
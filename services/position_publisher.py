@@ -0,0 +1,305 @@
+"""Position Publisher - Canlı konumların WebSocket ile uzak izleyicilere dağıtımı"""
+from PyQt6.QtCore import QThread, pyqtSignal
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    websockets = None
+    WEBSOCKETS_AVAILABLE = False
+
+POSITION_DECIMALS = 2  # cm çözünürlük; altındaki titreşim değişiklik sayılmaz
+
+
+def position_record(data):
+    """position_calculated verisinden gönderilecek kayıt: [x, y, z, doğruluk, person_id]."""
+    x, y, z = data['final']
+    return [round(float(x), POSITION_DECIMALS), round(float(y), POSITION_DECIMALS),
+            round(float(z), POSITION_DECIMALS), round(float(data.get('accuracy') or 0.0), 2),
+            data.get('person_id')]
+
+
+def encode_frame(kind, version, positions):
+    return json.dumps({'type': kind, 'version': version, 't': round(time.time(), 3),
+                       'positions': positions}, separators=(',', ':'))
+
+
+class _Subscriber:
+    __slots__ = ('connection', 'address', 'version', 'tags', 'busy_since', 'needs_snapshot',
+                 'frames', 'snapshots')
+
+    def __init__(self, connection, address):
+        self.connection = connection
+        self.address = address
+        self.version = 0  # Gönderilen son durum sürümü
+        self.tags = None  # None: tüm tag'ler, aksi halde frozenset
+        self.busy_since = None  # Yazma tamponu dolu olduğundan beri (monotonic)
+        self.needs_snapshot = True
+        self.frames = 0
+        self.snapshots = 0
+
+
+class PositionPublisherService(QThread):
+    """
+    WebSocket yayıncısı - kontrol odası ve duvar ekranı istemcileri için.
+
+    publish() position_calculated sinyaline bağlanır (Qt thread'i) ve yalnızca
+    tag başına son konumu saklar. asyncio döngüsü bu thread'de rate_hz ile
+    çalışır; her tick'te değişen tag'lere yeni bir durum sürümü verir ve her
+    aboneye son aldığı sürümden bu yana değişenleri (delta) gönderir. Aynı
+    sürümdeki ve aynı filtreli aboneler aynı kodlanmış çerçeveyi paylaşır.
+
+    Yavaş istemciler: Yazma tamponu write_limit'i aşan aboneye yeni çerçeve
+    kuyruklanmaz, delta'sı birikir. Geçmiş (history_seconds) aşılırsa
+    tamponu boşaldığında tam snapshot ile yeniden eşitlenir; max_lag_seconds
+    boyunca boşalmazsa bağlantı kapatılır. Sunucu belleği abone başına
+    en fazla bir çerçeve + write_limit ile sınırlıdır.
+
+    Çerçeveler (JSON):
+        {"type": "snapshot" | "delta", "version": n, "t": unix,
+         "positions": {"TAG001": [x, y, z, doğruluk, person_id], ...}}
+
+    İstemci mesajları:
+        {"type": "filter", "tags": ["TAG001", ...]}  (null: tüm tag'ler)
+        {"type": "snapshot"}
+    """
+
+    # Signals
+    subscriber_count_changed = pyqtSignal(int)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, host='127.0.0.1', port=8890, rate_hz=10.0, history_seconds=5.0,
+                 write_limit=256 * 1024, max_lag_seconds=10.0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.interval = 1.0 / rate_hz
+        self.history_ticks = max(1, int(history_seconds * rate_hz))
+        self.write_limit = write_limit
+        self.max_lag_seconds = max_lag_seconds
+        self.running = False
+
+        self._lock = threading.Lock()
+        self._pending = {}  # tag_id -> kayıt (Qt thread'i yazar)
+        self.positions = {}  # tag_id -> kayıt (yalnızca asyncio döngüsü)
+        self.version = 0
+        self._history = deque(maxlen=self.history_ticks)  # (sürüm, değişen tag'ler)
+        self.subscribers = set()
+        self._loop = None
+        self._stop = None
+
+        # İstatistikler
+        self.published = 0
+        self.ticks = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.snapshots_sent = 0
+        self.frames_shared = 0
+        self.skipped_busy = 0
+        self.slow_disconnects = 0
+        self.start_time = None
+
+    def publish(self, data):
+        """position_calculated slot'u - son konumu sakla (kuyruk büyümez)."""
+        if data.get('final') is None:
+            return
+        record = position_record(data)
+        with self._lock:
+            self._pending[data['tag_id']] = record
+        self.published += 1
+
+    def run(self):
+        """Thread'in ana döngüsü."""
+        if not WEBSOCKETS_AVAILABLE:
+            self.error_occurred.emit("websockets kurulu değil (pip install websockets)")
+            return
+
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        except Exception as e:
+            self.error_occurred.emit(f"WebSocket yayıncı hatası: {e}")
+            print(f"❌ Position Publisher hatası: {e}")
+        finally:
+            self.running = False
+            self._loop.close()
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handle, self.host, self.port,
+                                    write_limit=self.write_limit, compression=None):
+            self.running = True
+            self.start_time = time.time()
+            print(f"✅ Position Publisher başlatıldı: ws://{self.host}:{self.port}")
+
+            next_tick = time.monotonic()
+            while not self._stop.is_set():
+                self._tick()
+                next_tick += self.interval
+                delay = next_tick - time.monotonic()
+                if delay < 0:
+                    next_tick = time.monotonic()
+                    delay = 0
+                try:
+                    await asyncio.wait_for(self._stop.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            for subscriber in list(self.subscribers):
+                await subscriber.connection.close()
+
+    async def _handle(self, connection, path=None):
+        address = '%s:%s' % connection.remote_address[:2] if connection.remote_address else '?'
+        subscriber = _Subscriber(connection, address)
+        self.subscribers.add(subscriber)
+        self.subscriber_count_changed.emit(len(self.subscribers))
+        try:
+            async for message in connection:
+                self._handle_request(subscriber, message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            self.subscriber_count_changed.emit(len(self.subscribers))
+
+    def _handle_request(self, subscriber, message):
+        try:
+            request = json.loads(message)
+        except ValueError:
+            return
+        if not isinstance(request, dict):
+            return
+        if request.get('type') == 'filter':
+            tags = request.get('tags')
+            if tags is not None and not isinstance(tags, list):
+                return  # "TAG001" gibi tek değer karakter kümesine dönüşmesin
+            subscriber.tags = frozenset(tag for tag in tags if isinstance(tag, str)) if tags is not None else None
+            subscriber.needs_snapshot = True
+        elif request.get('type') == 'snapshot':
+            subscriber.needs_snapshot = True
+
+    def _advance_state(self):
+        """Bekleyen konumları duruma uygula; değişen tag'lere yeni sürüm ver."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        changed = [tag_id for tag_id, record in pending.items() if self.positions.get(tag_id) != record]
+        if changed:
+            self.version += 1
+            for tag_id in changed:
+                self.positions[tag_id] = pending[tag_id]
+            self._history.append((self.version, changed))
+
+    def _changed_since(self, version):
+        """Sürümden bu yana değişen tag'ler; geçmiş yetmiyorsa None (snapshot gerekir)."""
+        if self._history and self._history[0][0] > version + 1:
+            return None
+        changed = set()
+        for entry_version, tags in reversed(self._history):
+            if entry_version <= version:
+                break
+            changed.update(tags)
+        return changed
+
+    def _tick(self):
+        self.ticks += 1
+        self._advance_state()
+        now = time.monotonic()
+        frames = {}  # (tür, sürüm, filtre) -> çerçeve
+
+        for subscriber in list(self.subscribers):
+            transport = subscriber.connection.transport
+            if transport is None or transport.is_closing():
+                continue
+
+            if transport.get_write_buffer_size() > self.write_limit:
+                # Yavaş istemci: kuyruklama yok, delta birikir
+                self.skipped_busy += 1
+                if subscriber.busy_since is None:
+                    subscriber.busy_since = now
+                elif now - subscriber.busy_since > self.max_lag_seconds:
+                    self.slow_disconnects += 1
+                    transport.abort()
+                continue
+            subscriber.busy_since = None
+
+            if subscriber.version == self.version and not subscriber.needs_snapshot:
+                continue
+
+            changed = None if subscriber.needs_snapshot else self._changed_since(subscriber.version)
+            kind = 'snapshot' if changed is None else 'delta'
+            key = (kind, subscriber.version if changed is not None else None, subscriber.tags)
+
+            frame = frames.get(key)
+            if frame is None:
+                frame = frames[key] = self._build_frame(kind, changed, subscriber.tags)
+            else:
+                self.frames_shared += 1
+
+            subscriber.version = self.version
+            subscriber.needs_snapshot = False
+            if frame is False:
+                continue  # Filtreye uyan değişiklik yok
+
+            asyncio.ensure_future(self._send(subscriber, frame))
+            subscriber.frames += 1
+            self.frames_sent += 1
+            self.bytes_sent += len(frame)
+            if kind == 'snapshot':
+                subscriber.snapshots += 1
+                self.snapshots_sent += 1
+
+    def _build_frame(self, kind, changed, tags):
+        positions = self.positions
+        if changed is None:
+            selected = positions if tags is None else \
+                {tag_id: record for tag_id, record in positions.items() if tag_id in tags}
+        else:
+            if tags is not None:
+                changed = changed & tags
+            if not changed:
+                return False
+            selected = {tag_id: positions[tag_id] for tag_id in changed}
+        return encode_frame(kind, self.version, selected)
+
+    async def _send(self, subscriber, frame):
+        try:
+            await subscriber.connection.send(frame)
+        except websockets.ConnectionClosed:
+            pass
+
+    def stop(self):
+        """Yayıncıyı durdur."""
+        print("⏸️  Position Publisher durduruluyor...")
+        if self._loop is not None and self._stop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def get_statistics(self):
+        """Yayıncı istatistiklerini döndür."""
+        runtime = 0
+        if self.start_time:
+            runtime = time.time() - self.start_time
+
+        return {
+            'running': self.running,
+            'host': self.host,
+            'port': self.port,
+            'subscribers': len(self.subscribers),
+            'tracked_tags': len(self.positions),
+            'version': self.version,
+            'published': self.published,
+            'ticks': self.ticks,
+            'frames_sent': self.frames_sent,
+            'frames_shared': self.frames_shared,
+            'bytes_sent': self.bytes_sent,
+            'snapshots_sent': self.snapshots_sent,
+            'skipped_busy': self.skipped_busy,
+            'slow_disconnects': self.slow_disconnects,
+            'runtime_seconds': runtime,
+            'bytes_per_second': self.bytes_sent / runtime if runtime > 0 else 0
+        }
@@ -0,0 +1,217 @@
+"""Stream Capture - Anchor byte akışlarının kaydı ve yeniden oynatılması
+
+Dosya yapısı (little-endian, yalnızca sona ekleme):
+
+    Header (14 byte)
+        magic        5s   b'MTCAP'
+        version      u8   CAPTURE_VERSION
+        started_at   f64  Kaydın başladığı duvar saati (time.time())
+
+    Kayıt (17 byte + veri)
+        kind         u8   REC_OPEN / REC_DATA / REC_CLOSE
+        connection   u32  Bağlantı numarası (kayıt içinde tekil)
+        timestamp    f64  Kayıt başından itibaren saniye (monotonic)
+        length       u32  Veri uzunluğu
+        data              REC_OPEN: adres (utf-8), REC_DATA: alınan ham byte'lar
+
+Ham byte'lar recv() ile geldiği parçalar halinde saklanır; böylece yeniden
+oynatmada framing dahil tüm ingest hattı aynı girdiyle çalışır. Dosya
+yarıda kesilmişse (çökme) okuma son tam kayıtta durur.
+"""
+import heapq
+import socket
+import struct
+import time
+from collections import namedtuple
+
+CAPTURE_MAGIC = b'MTCAP'
+CAPTURE_VERSION = 1
+
+FILE_HEADER = struct.Struct('<5sBd')
+RECORD_HEADER = struct.Struct('<BIdI')
+
+REC_OPEN = 1
+REC_DATA = 2
+REC_CLOSE = 3
+
+CaptureRecord = namedtuple('CaptureRecord', ['kind', 'connection', 'timestamp', 'data'])
+
+
+class CaptureFormatError(ValueError):
+    """Geçersiz capture dosyası."""
+
+
+class StreamRecorder:
+    """
+    IngestEngine'e bağlanan kayıt tutucu.
+
+    Yalnızca ingest event loop thread'i yazar. Yazımlar tamponlanır ve en
+    geç flush_interval saniyede bir diske aktarılır.
+    """
+
+    def __init__(self, path, flush_interval=1.0, buffer_size=1024 * 1024):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.file = open(path, 'ab', buffering=buffer_size)
+        self.started = time.monotonic()
+        self._last_flush = self.started
+
+        # Her oturum kendi header'ını yazar (dosyaya ekleniyorsa da): zaman damgaları
+        # oturum başına göredir, read_capture oturumlar arası farkı header'dan alır
+        self.file.write(FILE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time()))
+
+        # İstatistikler
+        self.records = 0
+        self.bytes_recorded = 0
+
+    def connection_opened(self, connection, address):
+        self._write(REC_OPEN, connection, address.encode('utf-8'))
+
+    def data_received(self, connection, data):
+        self._write(REC_DATA, connection, data)
+
+    def connection_closed(self, connection):
+        self._write(REC_CLOSE, connection, b'')
+
+    def _write(self, kind, connection, data):
+        now = time.monotonic()
+        self.file.write(RECORD_HEADER.pack(kind, connection, now - self.started, len(data)))
+        if data:
+            self.file.write(data)
+        self.records += 1
+        self.bytes_recorded += len(data)
+
+        if now - self._last_flush >= self.flush_interval:
+            self.file.flush()
+            self._last_flush = now
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_capture(path):
+    """
+    Capture dosyasını oku.
+
+    Dosya birden fazla oturumu içerebilir (append); her header'da zaman
+    damgaları oturumlar arası süre korunarak sürekli hale getirilir.
+
+    Yields:
+        CaptureRecord
+    """
+    with open(path, 'rb') as f:
+        offset = 0.0
+        session_start = None
+        while True:
+            head = f.read(RECORD_HEADER.size)
+            if head[:len(CAPTURE_MAGIC)] == CAPTURE_MAGIC:
+                # Oturum header'ı (RECORD_HEADER'dan kısa, geri sar)
+                if len(head) < FILE_HEADER.size:
+                    return  # Header yazılırken kesilmiş
+                f.seek(FILE_HEADER.size - len(head), 1)
+                magic, version, started_at = FILE_HEADER.unpack(head[:FILE_HEADER.size])
+                if version != CAPTURE_VERSION:
+                    raise CaptureFormatError(f"Desteklenmeyen capture sürümü: {version}")
+                if session_start is not None:
+                    offset += max(0.0, started_at - session_start)
+                session_start = started_at
+                continue
+            if session_start is None:
+                raise CaptureFormatError(f"Capture dosyası değil: {path}")
+            if len(head) < RECORD_HEADER.size:
+                return
+
+            kind, connection, timestamp, length = RECORD_HEADER.unpack(head)
+            data = f.read(length) if length else b''
+            if len(data) < length:
+                # Yarıda kesilmiş son kayıt
+                return
+            yield CaptureRecord(kind, connection, offset + timestamp, data)
+
+
+def merge_captures(paths):
+    """
+    Birden fazla capture dosyasını (ör. worker başına) zamana göre birleştir.
+
+    Bağlantı numaraları dosyalar arasında çakışmasın diye (dosya, bağlantı)
+    çifti tek bir numaraya eşlenir.
+    """
+    def numbered(index, path):
+        for record in read_capture(path):
+            yield record._replace(connection=(index, record.connection))
+
+    ids = {}
+    streams = [numbered(i, path) for i, path in enumerate(paths)]
+    for record in heapq.merge(*streams, key=lambda r: r.timestamp):
+        connection = ids.setdefault(record.connection, len(ids))
+        yield record._replace(connection=connection)
+
+
+class StreamReplayer:
+    """
+    Kaydedilmiş akışları TCP üzerinden yeniden oynatır.
+
+    Her kayıtlı bağlantı için ayrı bir TCP bağlantısı açılır ve veri
+    kaydedildiği parçalarla gönderilir. speed=1.0 gerçek zamanlı, speed=N
+    N kat hızlı, speed=None beklemesiz (maksimum hız).
+    """
+
+    def __init__(self, paths, host='127.0.0.1', port=8888, speed=1.0):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.host = host
+        self.port = port
+        self.speed = speed
+
+        # İstatistikler
+        self.connections_opened = 0
+        self.bytes_sent = 0
+        self.records_replayed = 0
+        self.elapsed = 0.0
+
+    def replay(self, stop_event=None):
+        """Tüm kaydı oynat (bloklar). stop_event verilirse set edildiğinde durur."""
+        sockets = {}
+        started = time.monotonic()
+        try:
+            for record in merge_captures(self.paths):
+                if stop_event is not None and stop_event.is_set():
+                    break
+
+                if self.speed:
+                    delay = started + record.timestamp / self.speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                if record.kind == REC_OPEN:
+                    sockets[record.connection] = socket.create_connection((self.host, self.port))
+                    self.connections_opened += 1
+                elif record.kind == REC_DATA:
+                    sock = sockets.get(record.connection)
+                    if sock is None:
+                        # Kayıt, bağlantı açıkken başlamış
+                        sock = sockets[record.connection] = socket.create_connection((self.host, self.port))
+                        self.connections_opened += 1
+                    sock.sendall(record.data)
+                    self.bytes_sent += len(record.data)
+                elif record.kind == REC_CLOSE:
+                    sock = sockets.pop(record.connection, None)
+                    if sock is not None:
+                        sock.close()
+
+                self.records_replayed += 1
+        finally:
+            for sock in sockets.values():
+                sock.close()
+            self.elapsed = time.monotonic() - started
+
+        return self.get_statistics()
+
+    def get_statistics(self):
+        return {
+            'records': self.records_replayed,
+            'connections': self.connections_opened,
+            'bytes_sent': self.bytes_sent,
+            'elapsed_seconds': self.elapsed,
+            'bytes_per_second': self.bytes_sent / self.elapsed if self.elapsed > 0 else 0
+        }
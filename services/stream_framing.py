@@ -0,0 +1,431 @@
+"""Streaming Frame Parsers - Anchor byte akışlarından paket ayıklama"""
+import json
+import struct
+import numpy as np
+
+_OPEN, _CLOSE, _QUOTE, _BACKSLASH, _NEWLINE = b'{}"\\\n'
+_SPECIAL = np.zeros(256, dtype=bool)
+_SPECIAL[[_OPEN, _CLOSE, _QUOTE, _BACKSLASH, _NEWLINE]] = True
+
+DEFAULT_MAX_FRAME_SIZE = 1024 * 1024  # 1 MB
+BINARY_MAGIC = b'MT'  # services.binary_protocol paket başlangıcı
+
+
+class FrameTooLargeError(Exception):
+    """
+    Paket maksimum boyutu aştı (framer kendini yeniden senkronize eder).
+
+    frames: Aynı okumada hatadan önce tamamlanan paketler; tampona bir
+    sonraki okumaya kadar geçerlidir ve çağıran tarafından işlenmelidir.
+    """
+
+    def __init__(self, message, frames=()):
+        super().__init__(message)
+        self.frames = frames
+
+
+class ReceiveBuffer:
+    """
+    Bağlantı başına önceden ayrılmış alım tamponu.
+
+    Soketten recv_into() ile doğrudan tamponun boş kuyruğuna okunur; her
+    recv için yeni bytes nesnesi oluşmaz. Okunmamış veri [start, end)
+    aralığındadır. Yer kalmayınca bekleyen (yarım paket) kısım başa
+    taşınır; yarım paket tamponu doldurmuşsa kapasite ikiye katlanır.
+    Okumalar tamponu sürekli dolduruyorsa kapasite max_read'e kadar büyür
+    (hızlı anchor'larda daha az sistem çağrısı), boşaldığında başlangıç
+    boyutuna döner.
+
+    view(a, b) kopyasız dilimler verir; dilimler bir sonraki okuma veya
+    yazmaya kadar geçerlidir.
+    """
+
+    __slots__ = ('initial_size', 'min_free', 'data', 'memory', 'start', 'end', '_filled')
+
+    def __init__(self, initial_size=4096, min_free=1024):
+        self.initial_size = initial_size
+        self.min_free = min_free
+        self.data = bytearray(initial_size)
+        self.memory = memoryview(self.data)
+        self.start = 0
+        self.end = 0
+        self._filled = False  # Son okuma tüm boş alanı doldurdu
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def capacity(self):
+        return len(self.data)
+
+    def view(self, lo, hi):
+        """Okunmamış veri içinde [lo, hi) (start'a göre) kopyasız dilim."""
+        return self.memory[self.start + lo:self.start + hi]
+
+    def tail(self, size):
+        """Son eklenen size byte."""
+        return self.memory[self.end - size:self.end]
+
+    def find(self, sub, lo=0):
+        """Okunmamış veride sub'ın start'a göre konumu (-1: yok)."""
+        index = self.data.find(sub, self.start + lo, self.end)
+        return index - self.start if index >= 0 else -1
+
+    def consume(self, size):
+        """Baştan size byte'ı tüketilmiş say."""
+        self.start += size
+        if self.start >= self.end:
+            self.start = self.end = 0
+            if self._filled is False and len(self.data) > self.initial_size:
+                self._reallocate(self.initial_size)
+
+    def clear(self):
+        self.start = self.end = 0
+
+    def reserve(self, size):
+        """Kuyrukta en az size byte boş yer aç ve boş kuyruğu döndür."""
+        if len(self.data) - self.end < size:
+            pending = self.end - self.start
+            capacity = len(self.data)
+            while capacity - pending < size:
+                capacity *= 2
+            if capacity != len(self.data) or self.start:
+                self._reallocate(capacity)
+        return self.memory[self.end:]
+
+    def write(self, data):
+        """data'yı kuyruğa kopyala (recv_into kullanılamayan kaynaklar için)."""
+        size = len(data)
+        self.reserve(size)
+        self.data[self.end:self.end + size] = data
+        self.end += size
+
+    def recv_into(self, sock, max_read=65536):
+        """
+        Soketten doğrudan tampona oku.
+
+        Returns:
+            Okunan byte sayısı (0: bağlantı kapandı)
+        """
+        want = self.min_free
+        if self._filled and len(self.data) < max_read:
+            # Kapasiteyi ikiye katla (tampon boşken de: boş alan zaten kapasite kadar)
+            want = min(len(self.data) * 2, max_read)
+        free = self.reserve(want)
+        if len(free) > max_read:
+            free = free[:max_read]
+        size = sock.recv_into(free)
+        self.end += size
+        self._filled = size == len(free)
+        return size
+
+    def _reallocate(self, capacity):
+        """Bekleyen veriyi başa taşıyarak (gerekirse yeni) tampona kopyala."""
+        pending = self.memory[self.start:self.end]
+        if capacity == len(self.data):
+            # Aynı tampon içinde örtüşen kopya: önce ayrı bir nesneye al
+            pending = bytes(pending)
+        else:
+            # Eski tampona ait dilimler hâlâ kullanılıyor olabilir, yerinde büyütme yok
+            self.data = bytearray(capacity)
+            self.memory = memoryview(self.data)
+        size = len(pending)
+        self.data[:size] = pending
+        self.start = 0
+        self.end = size
+
+
+def decode_json_frame(frame):
+    """
+    JSON paketini çöz.
+
+    Paket bir tampon dilimi (memoryview) olabilir; tek kopya ile doğrudan
+    str'e çözülür. json.loads(bytes) kodlama tespiti + ek bir ara kopya yapardı.
+    """
+    return json.loads(str(frame, 'utf-8'))
+
+
+class BraceFramer:
+    """
+    Süslü parantez ile sınırlandırılmış JSON paketleri (mevcut anchor formatı).
+
+    Her okumada yalnızca yeni gelen byte'lar taranır; parantez derinliği,
+    string içi durumu ve bekleyen '\\' kaçışları okumalar arasında taşınır.
+    Tarama NumPy ile vektörize edilir ve yalnızca özel karakterler üzerinde
+    çalışır:
+
+        - Kaçışsız '"' karakterlerinin kümülatif paritesi string içini verir
+          (JSON string'i ham satır sonu içeremez; parite her '\\n'de sıfırlanır)
+        - String dışındaki '{' / '}' için +1/-1 kümülatif toplamı derinliği verir
+        - Derinlik 0'ın altına inemez (başıboş '}' yok sayılır)
+
+    String içindeki '{' / '}' karakterleri paketlemeyi bozmaz.
+
+    Tüm framer'lar veriyi bir ReceiveBuffer'da (self.buffer) tutar.
+    feed(data) veriyi tampona kopyalar; soketten doğrudan okumak için
+    buffer.recv_into(sock) ardından parse_received(size) çağrılır.
+    Dönen paketler tampon üzerinde kopyasız memoryview dilimleridir ve bir
+    sonraki feed / recv_into çağrısına kadar geçerlidir.
+    """
+
+    def __init__(self, max_frame_size=DEFAULT_MAX_FRAME_SIZE, buffer_size=4096):
+        self.max_frame_size = max_frame_size
+        self.buffer = ReceiveBuffer(buffer_size)
+        self.reset()
+
+    def reset(self):
+        """Tüm tarama durumunu sıfırla."""
+        self.buffer.clear()
+        self._start = -1  # Açık paketin buffer içindeki başlangıcı (-1: paket dışında)
+        self._depth = 0
+        self._in_string = False
+        self._backslashes = 0  # Buffer sonundaki ardışık '\\' sayısı
+
+    @property
+    def pending(self):
+        """Henüz paket olarak çıkmamış byte sayısı."""
+        return len(self.buffer)
+
+    def feed(self, data):
+        """
+        Yeni gelen byte'ları ekle ve tamamlanan paketleri döndür.
+
+        Args:
+            data: bytes / bytearray / memoryview
+
+        Returns:
+            Tamamlanan paketlerin listesi (memoryview)
+        """
+        self.buffer.write(data)
+        return self.parse_received(len(data))
+
+    def parse_received(self, size):
+        """Tampona son eklenen size byte'ı tara ve tamamlanan paketleri döndür."""
+        if size == 0:
+            return []
+        buf = self.buffer
+        chunk = np.frombuffer(buf.tail(size), dtype=np.uint8)
+        n = size
+        offset = len(buf) - size
+
+        # Yalnızca özel karakterler ({ } " \\ \n) üzerinde çalış
+        positions = np.flatnonzero(_SPECIAL[chunk])
+        chars = chunk[positions]
+        del chunk
+        m = positions.size
+        if m:
+            index = np.arange(m)
+            adjacent = np.empty(m, dtype=bool)  # Bir önceki özel karakterle bitişik mi
+            adjacent[0] = positions[0] == 0
+            adjacent[1:] = positions[1:] == positions[:-1] + 1
+
+            # Kaçışlı '"': önünde tek sayıda ardışık '\\' olanlar
+            is_backslash = chars == _BACKSLASH
+            if is_backslash.any() or self._backslashes:
+                prev_backslash = np.empty(m, dtype=bool)
+                prev_backslash[0] = self._backslashes > 0
+                prev_backslash[1:] = is_backslash[:-1]
+                continues = is_backslash & prev_backslash & adjacent
+                run_start = np.maximum.accumulate(np.where(is_backslash & ~continues, index, -1))
+                run = np.where(is_backslash, index - run_start + 1, 0)
+                carried = is_backslash & (run_start < 0)
+                run[carried] = index[carried] + 1 + self._backslashes
+                run_before = np.empty(m, dtype=run.dtype)
+                run_before[0] = self._backslashes if adjacent[0] else 0
+                run_before[1:] = np.where(adjacent[1:], run[:-1], 0)
+                quote = (chars == _QUOTE) & (run_before % 2 == 0)
+                trailing = int(run[-1]) if positions[-1] == n - 1 else 0
+            else:
+                quote = chars == _QUOTE
+                trailing = 0
+
+            # String paritesi (satır sonlarında sıfırlanır)
+            quotes = np.cumsum(quote)
+            is_newline = chars == _NEWLINE
+            if is_newline.any():
+                parity = quotes - np.maximum.accumulate(np.where(is_newline, quotes, 0))
+                if self._in_string:
+                    parity[~np.maximum.accumulate(is_newline)] += 1
+            else:
+                parity = quotes + self._in_string
+            in_string = (parity - quote) % 2 == 1  # Karakterden önceki durum
+
+            opening = (chars == _OPEN) & ~in_string
+            closing = (chars == _CLOSE) & ~in_string
+
+            # Derinlik: 0'da yansıtılmış kümülatif toplam
+            level = np.cumsum(opening.astype(np.int64) - closing) + self._depth
+            depth = level - np.minimum(np.minimum.accumulate(level), 0)
+            depth_before = np.empty(m, dtype=depth.dtype)
+            depth_before[0] = self._depth
+            depth_before[1:] = depth[:-1]
+
+            starts = (positions[opening & (depth_before == 0)] + offset).tolist()
+            ends = (positions[closing & (depth_before == 1)] + (offset + 1)).tolist()
+
+            self._depth = int(depth[-1])
+            self._in_string = bool(parity[-1] % 2)
+            self._backslashes = trailing
+        else:
+            starts = ends = ()
+            self._backslashes = 0
+
+        # Başlangıç/bitişler sırayla değişir: (start, end), (start, end), ...
+        frames = []
+        start = self._start
+        si = 0
+        for end in ends:
+            if start < 0:
+                start = starts[si]
+                si += 1
+            frames.append(buf.view(start, end))
+            start = -1
+        if si < len(starts):
+            start = starts[si]
+
+        # Tüketilen kısmı at (tampon kaydırılmaz, yalnızca start ilerler)
+        consumed = start if start >= 0 else len(buf)
+        if consumed:
+            buf.consume(consumed)
+        self._start = 0 if start >= 0 else -1
+
+        if start >= 0 and len(buf) > self.max_frame_size:
+            self.reset()
+            raise FrameTooLargeError(f"Paket {self.max_frame_size} byte sınırını aştı", frames)
+
+        return frames
+
+
+def _strip_bounds(buf, lo, hi):
+    """[lo, hi) aralığının baş/son boşluklarını atlayan sınırlar."""
+    data = buf.data
+    base = buf.start
+    while lo < hi and data[base + lo] in b' \t\r':
+        lo += 1
+    while hi > lo and data[base + hi - 1] in b' \t\r':
+        hi -= 1
+    return lo, hi
+
+
+class NdjsonFramer:
+    """Satır sonu ile ayrılmış JSON (NDJSON) paketleri."""
+
+    def __init__(self, max_frame_size=DEFAULT_MAX_FRAME_SIZE, buffer_size=4096):
+        self.max_frame_size = max_frame_size
+        self.buffer = ReceiveBuffer(buffer_size)
+        self._pos = 0
+
+    def reset(self):
+        self.buffer.clear()
+        self._pos = 0
+
+    @property
+    def pending(self):
+        return len(self.buffer)
+
+    def feed(self, data):
+        self.buffer.write(data)
+        return self.parse_received(len(data))
+
+    def parse_received(self, size):
+        buf = self.buffer
+        frames = []
+
+        line_start = 0
+        pos = self._pos
+        while True:
+            newline = buf.find(b'\n', pos)
+            if newline < 0:
+                break
+            lo, hi = _strip_bounds(buf, line_start, newline)
+            if hi > lo:
+                frames.append(buf.view(lo, hi))
+            line_start = pos = newline + 1
+
+        if line_start:
+            buf.consume(line_start)
+        # Yarım satırın taranmış kısmını tekrar tarama
+        self._pos = len(buf)
+
+        if len(buf) > self.max_frame_size:
+            self.reset()
+            raise FrameTooLargeError(f"Satır {self.max_frame_size} byte sınırını aştı", frames)
+
+        return frames
+
+
+class LengthPrefixedFramer:
+    """
+    Uzunluk önekli paketler: [uzunluk][payload].
+
+    Varsayılan önek 4 byte big-endian işaretsiz tamsayıdır ('!I').
+    """
+
+    def __init__(self, max_frame_size=DEFAULT_MAX_FRAME_SIZE, prefix_format='!I', buffer_size=4096):
+        self.max_frame_size = max_frame_size
+        self._prefix = struct.Struct(prefix_format)
+        self.buffer = ReceiveBuffer(buffer_size)
+
+    def reset(self):
+        self.buffer.clear()
+
+    @property
+    def pending(self):
+        return len(self.buffer)
+
+    def feed(self, data):
+        self.buffer.write(data)
+        return self.parse_received(len(data))
+
+    def parse_received(self, size):
+        buf = self.buffer
+        frames = []
+
+        prefix_size = self._prefix.size
+        offset = 0
+        end = len(buf)
+        while end - offset >= prefix_size:
+            (length,) = self._prefix.unpack_from(buf.data, buf.start + offset)
+            if length > self.max_frame_size:
+                self.reset()
+                raise FrameTooLargeError(f"Paket uzunluğu {length} > {self.max_frame_size}", frames)
+            frame_end = offset + prefix_size + length
+            if frame_end > end:
+                break
+            frames.append(buf.view(offset + prefix_size, frame_end))
+            offset = frame_end
+
+        if offset:
+            buf.consume(offset)
+        return frames
+
+
+FRAMERS = {
+    'brace': BraceFramer,
+    'ndjson': NdjsonFramer,
+    'length': LengthPrefixedFramer,
+}
+
+
+def create_framer(framing='brace', **kwargs):
+    """İsme göre framer oluştur ('brace', 'ndjson', 'length')."""
+    try:
+        return FRAMERS[framing](**kwargs)
+    except KeyError:
+        raise ValueError(f"Bilinmeyen framing: {framing}") from None
+
+
+def sniff_framing(first_bytes):
+    """
+    Bağlantının ilk byte'larından framing türünü tahmin et.
+
+    JSON (brace veya NDJSON) '{' ya da boşlukla başlar; brace framer
+    NDJSON akışlarını da doğru ayırır. 4 byte uzunluk önekinin ilk byte'ı
+    makul paket boyutlarında her zaman 0x00'dır. Binary range report
+    bağlantıları BINARY_MAGIC ile başlar.
+    """
+    if first_bytes[:len(BINARY_MAGIC)] == BINARY_MAGIC:
+        return 'binary'
+    if first_bytes[:1] == b'\x00':
+        return 'length'
+    return 'brace'
@@ -1,156 +1,184 @@
 """TCP Server for Real-time Data Reception from Tracking Devices"""
 from PyQt6.QtCore import QThread, pyqtSignal
-import socket
-import json
-import threading
 import time
 
+from services.ingest_engine import IngestEngine
+from services.ingest_workers import IngestWorkerPool
+from services.ingest_queue import BoundedIngestQueue
+from services.ingest_metrics import IngestMetrics
+from services.stream_capture import StreamRecorder
+from services.payload_decoder import JSON_BACKEND
+
 class TCPServerService(QThread):
     """
     TCP sunucusu - Anchor cihazlarından gerçek zamanlı veri alır.
-    Port 8888 üzerinden JSON formatında mesafe verilerini dinler.
+    Port 8888 üzerinden JSON veya binary (services.binary_protocol) formatında
+    mesafe verilerini dinler; format her bağlantı için ayrı belirlenir.
+
+    Tüm anchor bağlantıları tek bir QThread içinde, selectors tabanlı
+    IngestEngine event loop'u ile işlenir (bağlantı başına thread yok).
+    workers>0 ise framing ve JSON çözümleme SO_REUSEPORT ile aynı portu
+    dinleyen N ayrı süreçte yapılır (IngestWorkerPool); paketler kompakt
+    MeasurementBatch olarak gelir ve GUI thread'i ile GIL için yarışmaz.
+
+    Batching açıkken paketler sınırlı bir BoundedIngestQueue'da birikir;
+    batch_interval_ms dolunca (veya batch_size pakete ulaşınca) batch_ready
+    sinyali gönderilir ve Qt thread'i take_batch() ile kuyruğu boşaltır.
+    Qt thread'i yanıt verene kadar yeni sinyal gönderilmez; Qt thread'i
+    takılırsa (ör. modal dialog) kuyruk overflow_policy'ye göre sınırlı kalır.
+    batch_interval_ms=0 ise her paket ayrı data_received sinyaliyle gider.
+
+    Paket sayaçları ve 1/10/60 s hızları metrics (IngestMetrics) içindeki
+    'tcp' shard'ına kilitsiz yazılır; metrics verilmezse servis kendi
+    örneğini oluşturur.
+
+    capture_path verilirse gelen ham byte akışları bağlantı başına ve zaman
+    damgalı olarak kaydedilir (services.stream_capture); kayıt daha sonra
+    StreamReplayer ile aynı hatta yeniden oynatılabilir. workers>0 ise her
+    worker '<capture_path>.<index>' dosyasına yazar.
     """
-    
+
     # Signals
-    data_received = pyqtSignal(dict)  # JSON verisi geldiğinde
+    data_received = pyqtSignal(object)  # JSON dict veya RangeReport (batching kapalı)
+    batch_ready = pyqtSignal()  # Kuyrukta teslim edilecek paketler var (take_batch)
     connection_status = pyqtSignal(str, bool)  # (client_address, connected)
     error_occurred = pyqtSignal(str)  # Hata mesajı
-    
-    def __init__(self, host='0.0.0.0', port=8888):
+
+    def __init__(self, host='0.0.0.0', port=8888, backlog=1024,
+                 batch_interval_ms=25, batch_size=256,
+                 queue_capacity=10000, overflow_policy='drop_oldest', workers=0,
+                 metrics=None, capture_path=None):
         super().__init__()
         self.host = host
         self.port = port
+        self.backlog = backlog
+        self.workers = workers
+        self.capture_path = capture_path
+        self.recorder = None
         self.running = False
-        self.server_socket = None
+        self.engine = None
+        self.queue = BoundedIngestQueue(queue_capacity, overflow_policy, batch_size, batch_interval_ms) \
+            if batch_interval_ms else None
+        self._notified = False  # batch_ready gönderildi, take_batch() bekleniyor
         self.connected_clients = set()
-        
+        self.metrics = metrics if metrics is not None else IngestMetrics()
+        self.metrics_shard = self.metrics.shard('tcp')
+
         # İstatistikler
         self.total_messages = 0
         self.total_bytes = 0
+        self.rejected_messages = 0  # İşlenemeyen (bozuk) paketler; event loop'u durdurmaz
         self.start_time = None
-    
+
     def run(self):
-        """Thread'in ana döngüsü."""
+        """Thread'in ana döngüsü (event loop)."""
+        callbacks = {
+            'on_message': self._on_message,
+            'on_connection': self._on_connection,
+            'on_error': self.error_occurred.emit
+        }
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
-            self.server_socket.settimeout(1.0)  # Non-blocking accept
-            
-            self.running = True
-            self.start_time = time.time()
-            
-            print(f"✅ TCP Server başlatıldı: {self.host}:{self.port}")
-            
-            while self.running:
-                try:
-                    client_socket, client_address = self.server_socket.accept()
-                    
-                    # Yeni istemci
-                    addr_str = f"{client_address[0]}:{client_address[1]}"
-                    self.connected_clients.add(addr_str)
-                    self.connection_status.emit(addr_str, True)
-                    print(f"🔌 Yeni bağlantı: {addr_str}")
-                    
-                    # İstemciyi ayrı thread'de işle
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, client_address),
-                        daemon=True
-                    )
-                    client_thread.start()
-                    
-                except socket.timeout:
-                    continue
-                except socket.error as e:
-                    if self.running:
-                        self.error_occurred.emit(f"Socket hatası: {e}")
-                    break
-        
+            if self.workers:
+                self.engine = IngestWorkerPool(self.host, self.port, self.workers, self.backlog,
+                                               capture_path=self.capture_path, **callbacks)
+            else:
+                if self.capture_path:
+                    self.recorder = StreamRecorder(self.capture_path)
+                self.engine = IngestEngine(self.host, self.port, self.backlog,
+                                           recorder=self.recorder, **callbacks)
+            self.engine.open()
         except Exception as e:
             self.error_occurred.emit(f"Sunucu başlatma hatası: {e}")
             print(f"❌ TCP Server hatası: {e}")
-    
-    def handle_client(self, client_socket, client_address):
-        """Bağlı bir istemciyi işler."""
-        buffer = ""
-        addr_str = f"{client_address[0]}:{client_address[1]}"
-        
+            if self.recorder is not None:
+                self.recorder.close()
+            self.engine = None
+            return
+
+        self.running = True
+        self.start_time = time.time()
+
+        print(f"✅ TCP Server başlatıldı: {self.host}:{self.port} "
+              f"(backlog={self.backlog}, workers={self.workers})")
+
         try:
             while self.running:
-                data = client_socket.recv(4096).decode('utf-8')
-                
-                if not data:
-                    break
-                
-                buffer += data
-                self.total_bytes += len(data)
-                
-                # JSON mesajlarını ayıkla
-                while buffer:
-                    buffer = buffer.strip()
-                    if not buffer:
-                        break
-                    
-                    try:
-                        # JSON paketini bul (süslü parantez sayma)
-                        brace_count = 0
-                        end_pos = -1
-                        
-                        for i, char in enumerate(buffer):
-                            if char == '{':
-                                brace_count += 1
-                            elif char == '}':
-                                brace_count -= 1
-                                if brace_count == 0:
-                                    end_pos = i + 1
-                                    break
-                        
-                        if end_pos > 0:
-                            json_str = buffer[:end_pos]
-                            buffer = buffer[end_pos:].strip()
-                            
-                            # JSON parse et
-                            json_data = json.loads(json_str)
-                            
-                            # İstatistik güncelle
-                            self.total_messages += 1
-                            
-                            # Signal emit et
-                            self.data_received.emit(json_data)
-                        else:
-                            break
-                    
-                    except json.JSONDecodeError as e:
-                        # Hatalı JSON, buffer'ı temizle
-                        if '{' in buffer:
-                            buffer = buffer[buffer.find('{'):]
-                        else:
-                            buffer = ""
-                        break
-        
+                if self.queue is not None:
+                    if self.engine.reading_paused and not self.queue.paused:
+                        self.engine.resume_reading()
+                    timeout = 1.0 if self._notified else self.queue.time_until_due()
+                    self.engine.poll(timeout=timeout)
+                    if not self._notified and self.queue.is_due():
+                        self._notify_batch()
+                else:
+                    self.engine.poll(timeout=1.0)
+                self.total_messages = self.engine.total_messages
+                self.total_bytes = self.metrics_shard.bytes = self.engine.total_bytes
         except Exception as e:
-            self.error_occurred.emit(f"İstemci işleme hatası ({addr_str}): {e}")
-        
+            if self.running:
+                self.error_occurred.emit(f"Socket hatası: {e}")
         finally:
-            client_socket.close()
-            if addr_str in self.connected_clients:
-                self.connected_clients.remove(addr_str)
-            self.connection_status.emit(addr_str, False)
-            print(f"🔌 Bağlantı kesildi: {addr_str}")
-    
+            self.running = False
+            if self.queue is not None and len(self.queue):
+                self._notify_batch()
+            self.engine.close()
+            if self.recorder is not None:
+                self.recorder.close()
+
+    def _on_message(self, payload, address):
+        """Ayrıştırılmış paketi Qt thread'ine ilet (veya kuyruğa ekle)."""
+        now = time.monotonic()
+        try:
+            self.metrics_shard.record(payload, now)
+            if self.queue is None:
+                self.data_received.emit(payload)
+            elif self.queue.put(payload, now):
+                # 'pause' politikası: kuyruk dolu, Qt thread'i boşaltana kadar okuma yok
+                self.engine.pause_reading()
+        except Exception as e:
+            # Tek bir bozuk paket tüm anchor'ların ingest'ini durdurmamalı
+            self.rejected_messages += 1
+            if self.rejected_messages == 1:
+                print(f"⚠️ İşlenemeyen paket atlandı ({address}): {e}")
+
+    def _notify_batch(self):
+        self._notified = True
+        self.batch_ready.emit()
+
+    def take_batch(self, with_timestamps=False):
+        """
+        Kuyruktaki paketleri al (Qt thread'inden, batch_ready sinyaline yanıt olarak).
+
+        Returns:
+            Paket listesi (SOS / acil durum paketleri önce); with_timestamps=True
+            ise (paketler, time.monotonic() alınma zamanları)
+        """
+        if self.queue is None:
+            return ([], []) if with_timestamps else []
+        batch = self.queue.take_batch(with_timestamps)
+        self._notified = False
+        if self.engine is not None:
+            # Event loop bir sonraki teslimi planlasın / okumaya devam etsin
+            self.engine.wakeup()
+        return batch
+
+    def _on_connection(self, address, connected):
+        if connected:
+            self.connected_clients.add(address)
+            print(f"🔌 Yeni bağlantı: {address}")
+        else:
+            self.connected_clients.discard(address)
+            print(f"🔌 Bağlantı kesildi: {address}")
+        self.connection_status.emit(address, connected)
+
     def stop(self):
         """Sunucuyu durdur."""
         print("⏸️  TCP Server durduruluyor...")
         self.running = False
-        
-        if self.server_socket:
-            try:
-                self.server_socket.close()
-            except:
-                pass
-        
+
+        if self.engine:
+            self.engine.wakeup()
+
         # İstatistikler
         if self.start_time:
             runtime = time.time() - self.start_time
@@ -160,13 +188,17 @@ class TCPServerService(QThread):
             print(f"   • Toplam veri: {self.total_bytes / 1024:.2f} KB")
             if runtime > 0:
                 print(f"   • Mesaj/saniye: {self.total_messages / runtime:.2f}")
-    
+            if self.queue is not None:
+                print(f"   • Atılan paket: {self.queue.dropped_oldest}, birleştirilen: {self.queue.coalesced}")
+
     def get_statistics(self):
         """Sunucu istatistiklerini döndür."""
         runtime = 0
         if self.start_time:
             runtime = time.time() - self.start_time
-        
+
+        queue_stats = self.queue.get_statistics() if self.queue is not None else {}
+        rates = self.metrics_shard.rates()
         return {
             'running': self.running,
             'host': self.host,
@@ -174,6 +206,20 @@ class TCPServerService(QThread):
             'connected_clients': len(self.connected_clients),
             'total_messages': self.total_messages,
             'total_bytes': self.total_bytes,
+            'rejected_messages': self.rejected_messages,
+            'json_backend': JSON_BACKEND,
             'runtime_seconds': runtime,
-            'messages_per_second': self.total_messages / runtime if runtime > 0 else 0
+            'messages_per_second': rates[10],  # Son 10 s (ömür boyu ortalama patlamaları gizler)
+            'rate_1s': rates[1],
+            'rate_10s': rates[10],
+            'rate_60s': rates[60],
+            'total_batches': queue_stats.get('batches', 0),
+            'overflow_policy': queue_stats.get('policy'),
+            'queue_depth': queue_stats.get('depth', 0),
+            'queue_high_watermark': queue_stats.get('high_watermark', 0),
+            'dropped_oldest': queue_stats.get('dropped_oldest', 0),
+            'coalesced': queue_stats.get('coalesced', 0),
+            'priority_messages': queue_stats.get('priority', 0),
+            'read_pauses': queue_stats.get('pause_count', 0),
+            'reading_paused': queue_stats.get('paused', False)
         }
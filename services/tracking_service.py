@@ -3,6 +3,8 @@ from PyQt6.QtCore import QObject, pyqtSignal, QTimer
 import random
 from datetime import datetime
 
+from services.entity_registry import EntityRegistry
+
 class TrackingService(QObject):
     """Enterprise-grade tracking service - Anchor (Gateway) & Tag based"""
     
@@ -16,11 +18,10 @@ class TrackingService(QObject):
     
     def __init__(self):
         super().__init__()
-        self.personnel = []
-        self.tags = []  # Personnel tracking tags
+        self.registry = EntityRegistry()  # Anchor / tag / personel, ID indeksli
         
         # Anchors (Fixed position gateway devices)
-        self.anchors = [
+        self.registry.set_anchors([
             {
                 'id': 'ANC001', 'name': 'Ana Şaft Anchor', 'zone': 'Ana Şaft', 
                 'color': '#00D4FF', 'x': 0, 'y': 0, 'z': -10,
@@ -63,10 +64,7 @@ class TrackingService(QObject):
                 'firmware_version': '2.1.0', 'last_maintenance': '2025-01-15',
                 'coverage_radius': 100, 'type': 'anchor'
             }
-        ]
-        
-        # For backward compatibility
-        self.gateways = self.anchors
+        ])
         
         # Bölgeler (Gateway konumlarıyla aynı)
         self.zones = [
@@ -84,6 +82,23 @@ class TrackingService(QObject):
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_locations)
         self.update_timer.start(2000)  # Her 2 saniyede bir güncelle
+    
+    @property
+    def anchors(self):
+        return self.registry.anchors
+    
+    @property
+    def gateways(self):
+        """Geriye dönük uyumluluk: set_anchors sonrasında da güncel anchor listesi"""
+        return self.anchors
+    
+    @property
+    def tags(self):
+        return self.registry.tags
+    
+    @property
+    def personnel(self):
+        return self.registry.personnel
         
     def init_personnel(self):
         """Demo personel verisi oluştur"""
@@ -135,7 +150,7 @@ class TrackingService(QObject):
                 'phone': f'+90 555 {random.randint(100, 999)} {random.randint(10, 99)} {random.randint(10, 99)}',
                 'email': f'{first_name.lower()}.{last_name.lower()}@minetracker.com'
             }
-            self.personnel.append(person)
+            self.registry.add_person(person)
             
             # Create corresponding tag
             tag = {
@@ -149,7 +164,7 @@ class TrackingService(QObject):
                 'last_seen': datetime.now(),
                 'type': 'tag'
             }
-            self.tags.append(tag)
+            self.registry.add_tag(tag)
     
     def update_locations(self):
         """Konumları güncelle (Anchor ve Tag simülasyonu)"""
@@ -184,7 +199,7 @@ class TrackingService(QObject):
                         })
                 
                 # Update tag info
-                tag = next((t for t in self.tags if t['person_id'] == person['id']), None)
+                tag = self.registry.tag_for_person(person['id'])
                 if tag:
                     tag['battery'] = person['battery']
                     tag['signal_strength'] = person['signal']
@@ -226,17 +241,11 @@ class TrackingService(QObject):
     
     def get_tag_by_id(self, tag_id):
         """ID'ye göre tag bul"""
-        for tag in self.tags:
-            if tag['id'] == tag_id:
-                return tag
-        return None
+        return self.registry.get_tag(tag_id)
     
     def get_anchor_by_id(self, anchor_id):
         """ID'ye göre anchor bul"""
-        for anchor in self.anchors:
-            if anchor['id'] == anchor_id:
-                return anchor
-        return None
+        return self.registry.get_anchor(anchor_id)
     
     def update_anchor_status(self, anchor_id, status):
         """Anchor durumunu güncelle"""
@@ -290,10 +299,7 @@ class TrackingService(QObject):
     
     def get_person_by_id(self, person_id):
         """ID'ye göre personel bul"""
-        for person in self.personnel:
-            if person['id'] == person_id:
-                return person
-        return None
+        return self.registry.get_person(person_id)
     
     def trigger_emergency(self, entity_id, entity_type='personnel'):
         """Acil durum tetikle"""
@@ -305,7 +311,7 @@ class TrackingService(QObject):
                 'id': entity_id,
                 'name': entity['full_name'],
                 'position': entity['position'],
-                'location': entity['location'],
+                'location': entity['location'].copy(),  # Olay anındaki konum
                 'zone': entity['zone_name'],
                 'timestamp': datetime.now().isoformat()
             })
@@ -316,18 +322,22 @@ class TrackingService(QObject):
         on_break = sum(1 for p in self.personnel if p['status'] == 'break')
         emergency_count = sum(1 for p in self.personnel if p['status'] == 'emergency')
         
-        avg_battery_personnel = sum(p['battery'] for p in self.personnel) / len(self.personnel) if self.personnel else 0
-        low_battery_personnel = sum(1 for p in self.personnel if p['battery'] < 20)
+        # Batarya alanları kayıt sütunlarından toplu okunur
+        personnel_battery = self.registry.person_columns.column('battery')
+        avg_battery_personnel = float(personnel_battery.mean()) if len(personnel_battery) else 0
+        low_battery_personnel = int((personnel_battery < 20).sum())
         
         # Anchor stats
         online_anchors = sum(1 for a in self.anchors if a['status'] == 'online')
-        avg_battery_anchors = sum(a['battery'] for a in self.anchors) / len(self.anchors) if self.anchors else 0
-        low_battery_anchors = sum(1 for a in self.anchors if a['battery'] < 70)
+        anchor_battery = self.registry.anchor_columns.column('battery')
+        avg_battery_anchors = float(anchor_battery.mean()) if len(anchor_battery) else 0
+        low_battery_anchors = int((anchor_battery < 70).sum())
         
         # Tag stats
         active_tags = sum(1 for t in self.tags if t['status'] == 'active')
-        avg_battery_tags = sum(t['battery'] for t in self.tags) / len(self.tags) if self.tags else 0
-        low_battery_tags = sum(1 for t in self.tags if t['battery'] < 20)
+        tag_battery = self.registry.tag_columns.column('battery')
+        avg_battery_tags = float(tag_battery.mean()) if len(tag_battery) else 0
+        low_battery_tags = int((tag_battery < 20).sum())
         
         return {
             'personnel': {
@@ -0,0 +1,216 @@
+"""Trajectory Smoother - Olay incelemesi için çevrimdışı iz yeniden kurma (Rauch-Tung-Striebel)"""
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from services.kalman_filter import _inverse_small, process_noise_blocks
+
+SmoothedTrack = namedtuple('SmoothedTrack', ['timestamps', 'positions', 'velocities', 'variances'])
+SmoothedTrack.__doc__ = """Yumuşatılmış iz: timestamps (T,) saniye, positions / velocities (T, boyut),
+variances (T,) eksen başına konum varyansı (m²)."""
+
+
+def _affine_scan(A, b):
+    """
+    x_k = A_k x_{k-1} + b_k yinelemesinin tüm çözümleri (A_0 = 0, yani x_0 = b_0).
+
+    İki seviyeli blok tarama: T ≈ B² olacak şekilde bloklara bölünür; blok
+    içi yineleme tüm bloklar için aynı anda (B vektörel adım), ardından
+    blok başlangıç durumları bloklar boyunca (T/B adım) yürütülür ve her
+    bloğa birikmiş dönüşümle eklenir. İş O(T), Python adımı O(√T).
+
+    Args:
+        A: (T, n, n); b: (T, n, m)
+    """
+    count, n, m = b.shape
+    size = max(1, int(np.ceil(np.sqrt(count))))
+    blocks = -(-count // size)
+    padding = blocks * size - count
+    if padding:
+        A = np.concatenate([A, np.broadcast_to(np.eye(n), (padding, n, n))])
+        b = np.concatenate([b, np.zeros((padding, n, m))])
+    A = A.reshape(blocks, size, n, n)
+    b = b.reshape(blocks, size, n, m)
+
+    # Blok içi: sıfır başlangıçla çözüm ve birikmiş dönüşüm (A_i ... A_0)
+    local = np.empty_like(b)
+    cumulative = np.empty_like(A)
+    local[:, 0] = b[:, 0]
+    cumulative[:, 0] = A[:, 0]
+    for i in range(1, size):
+        local[:, i] = A[:, i] @ local[:, i - 1] + b[:, i]
+        cumulative[:, i] = A[:, i] @ cumulative[:, i - 1]
+
+    # Bloklar arası: her bloğa giren durum (ilk blok için x_{-1} = 0)
+    incoming = np.zeros((blocks, n, m))
+    for j in range(1, blocks):
+        incoming[j] = local[j - 1, -1] + cumulative[j - 1, -1] @ incoming[j - 1]
+
+    x = local + cumulative @ incoming[:, None]
+    return x.reshape(blocks * size, n, m)[:count]
+
+
+def smooth_trajectory(timestamps, positions, process_variance: float = 0.05,
+                      measurement_variance: float = 0.5,
+                      initial_velocity_variance: float = 1.0) -> SmoothedTrack:
+    """
+    Tek tag için ileri Kalman filtresi + geri RTS geçişi (sabit hız modeli).
+
+    Model eksen başına aynı olduğundan kovaryans ve kazançlar tüm eksenler
+    için ortaktır; yalnızca kovaryans yinelemesi (ölçümden bağımsız,
+    skaler 2x2) adım adım yürür. Ortalama için ileri filtre ve geri RTS
+    yinelemeleri afin olduğundan zaman ekseninde paralel önekle vektörel
+    çözülür; düzgün kovaryanslar da aynı şekilde.
+
+    Args:
+        timestamps: (T,) ölçüm zamanları (s); sıralı değilse sıralanır
+        positions: (T, boyut) ölçülen / kaydedilen konumlar
+        process_variance: İvme gürültüsü yoğunluğu (m²/s³)
+        measurement_variance: Konum ölçüm varyansı (m²)
+        initial_velocity_variance: İlk hız belirsizliği ((m/s)²)
+
+    Returns:
+        SmoothedTrack
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    if positions.ndim != 2 or len(positions) != len(timestamps):
+        raise ValueError(f"positions (T, boyut) olmalı: {positions.shape}, timestamps {timestamps.shape}")
+    if len(timestamps) > 1 and np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, positions = timestamps[order], positions[order]
+
+    count, dim = positions.shape
+    if count == 0:
+        return SmoothedTrack(timestamps, positions.copy(), positions.copy(), np.zeros(0))
+
+    q, r = process_variance, measurement_variance
+    dt = np.diff(timestamps, prepend=timestamps[0])
+    q_pp, q_pv, q_vv = process_noise_blocks(q, dt)
+
+    # Kovaryans yinelemesi: simetrik 2x2 (a, b, c) skalerleri; ölçümden bağımsız
+    a, b, c = r, 0.0, initial_velocity_variance
+    filtered = [(a, b, c)]  # P_k|k
+    predicted = [(a, b, c)]  # P_k|k-1
+    gains = [(1.0, 0.0)]
+    for step, pp, pv, vv in zip(dt[1:].tolist(), q_pp[1:].tolist(), q_pv[1:].tolist(), q_vv[1:].tolist()):
+        # Predict: F P Fᵀ + Q
+        a, b, c = a + step * (2 * b + step * c) + pp, b + step * c + pv, c + vv
+        predicted.append((a, b, c))
+        # Update (H = [1, 0])
+        k0, k1 = a / (a + r), b / (a + r)
+        a, b, c = a - k0 * a, b - k0 * b, c - k1 * b
+        gains.append((k0, k1))
+        filtered.append((a, b, c))
+    filtered, predicted, gains = np.array(filtered), np.array(predicted), np.array(gains)
+
+    # İleri ortalama: x_k = (I - K H) F_k x_{k-1} + K z_k
+    k0, k1 = gains[:, 0], gains[:, 1]
+    A = np.empty((count, 2, 2))
+    A[:, 0, 0] = 1 - k0
+    A[:, 0, 1] = (1 - k0) * dt
+    A[:, 1, 0] = -k1
+    A[:, 1, 1] = 1 - k1 * dt
+    A[0] = 0.0
+    offsets = gains[:, :, None] * positions[:, None, :]  # (T, 2, boyut)
+    offsets[0, 0], offsets[0, 1] = positions[0], 0.0
+    forward = _affine_scan(A, offsets)  # (T, 2, boyut): [konum; hız]
+
+    # Geri RTS: C_k = P_k Fᵀ_{k+1} P_{k+1|k}⁻¹, xs_k = C_k xs_{k+1} + (I - C_k F_{k+1}) x_k
+    def matrices(values):
+        out = np.empty((len(values), 2, 2))
+        out[:, 0, 0], out[:, 0, 1], out[:, 1, 1] = values.T
+        out[:, 1, 0] = out[:, 0, 1]
+        return out
+
+    following = dt[1:]
+    P = matrices(filtered[:-1])
+    F = np.zeros((count - 1, 2, 2))
+    F[:, 0, 0] = F[:, 1, 1] = 1.0
+    F[:, 0, 1] = following
+    C = P @ F.transpose(0, 2, 1) @ _inverse_small(matrices(predicted[1:]))
+
+    gain = np.zeros((count, 2, 2))
+    gain[:-1] = C
+    carry = forward.copy()
+    carry[:-1] -= C @ (F @ forward[:-1])
+    smoothed = _affine_scan(gain[::-1], carry[::-1])[::-1]
+
+    # Düzgün kovaryans: Ps_k = C_k Ps_{k+1} C_kᵀ + (P_k - C_k P_{k+1|k} C_kᵀ); (a, b, c) üzerinde doğrusal
+    def congruence(C):
+        p, q_, r_, s = C[:, 0, 0], C[:, 0, 1], C[:, 1, 0], C[:, 1, 1]
+        return np.stack([
+            np.stack([p * p, 2 * p * q_, q_ * q_], axis=-1),
+            np.stack([p * r_, p * s + q_ * r_, q_ * s], axis=-1),
+            np.stack([r_ * r_, 2 * r_ * s, s * s], axis=-1),
+        ], axis=1)
+
+    transfer = np.zeros((count, 3, 3))
+    transfer[:-1] = congruence(C)
+    constant = filtered[:, :, None].copy()
+    constant[:-1] -= transfer[:-1] @ predicted[1:, :, None]
+    covariance = _affine_scan(transfer[::-1], constant[::-1])[::-1]
+
+    return SmoothedTrack(timestamps, smoothed[:, 0, :], smoothed[:, 1, :], covariance[:, 0, 0])
+
+
+def _smooth_item(item):
+    tag_id, (timestamps, positions), options = item
+    return tag_id, smooth_trajectory(timestamps, positions, **options)
+
+
+def smooth_trajectories(tracks: Dict[str, tuple], processes: Optional[int] = None,
+                        **options) -> Dict[str, SmoothedTrack]:
+    """
+    Birden fazla tag'i süreç havuzunda paralel yumuşat.
+
+    Args:
+        tracks: tag_id -> (timestamps, positions)
+        processes: Süreç sayısı; None ise CPU sayısı, 1 ise bu süreçte sırayla
+        **options: smooth_trajectory parametreleri
+
+    Returns:
+        tag_id -> SmoothedTrack
+    """
+    items = [(tag_id, track, options) for tag_id, track in tracks.items()]
+    if processes == 1 or len(items) < 2:
+        return dict(map(_smooth_item, items))
+
+    # spawn: Qt / soket durumu alt süreçlere kopyalanmaz (ingest worker'larıyla aynı)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        return dict(pool.map(_smooth_item, items))
+
+
+def parse_timestamp(value) -> float:
+    """SQLite CURRENT_TIMESTAMP ('YYYY-MM-DD HH:MM:SS', UTC) veya sayı -> epoch saniye."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def load_location_history(database, person_ids: Iterable[str], start=None, end=None,
+                          dimensions: int = 2) -> Dict[str, tuple]:
+    """
+    DatabaseService.location_history kayıtlarından smooth_trajectories girdisi.
+
+    Returns:
+        person_id -> (timestamps, positions); kaydı olmayan personel atlanır
+    """
+    columns = ('x', 'y', 'z')[:dimensions]
+    tracks = {}
+    for person_id in person_ids:
+        rows = database.get_location_track(person_id, start, end)
+        if not rows:
+            continue
+        timestamps = np.array([parse_timestamp(row['timestamp']) for row in rows])
+        positions = np.array([[row[column] for column in columns] for row in rows], dtype=np.float64)
+        tracks[person_id] = (timestamps, positions)
+    return tracks
@@ -1,11 +1,94 @@
 """Trilateration Algorithm - 3D Position Calculation from Anchor Distances"""
 import math
+from collections import namedtuple
+
 import numpy as np
 from typing import List, Tuple, Optional
 
+TrilaterationResult = namedtuple('TrilaterationResult', ['positions', 'residuals', 'singular'])
+TrilaterationResult.__doc__ = """Toplu çözüm: positions (N, 2) (çözümsüz satırlar NaN), residuals (N,)
+geçerli tüm anchor'lar üzerinden mesafe RMSE'si (metre), singular (N,) bool."""
+
+
+def trilaterate_2d_batch(anchors, distances, valid=None, min_det: float = 0.001) -> TrilaterationResult:
+    """
+    2D Trilateration - tüm tag'ler için tek NumPy çağrısı.
+    
+    Her satır için ilk üç geçerli anchor kullanılır (trilaterate_2d ile aynı
+    lineer sistem); döngü yoktur, hesap broadcasting ile yapılır.
+    
+    Args:
+        anchors: Ortak anchor konumları (A, 2) veya tag başına anchor'lar (N, K, 2);
+                 fazla sütunlar (z) yok sayılır
+        distances: Mesafeler (N, K) - K, A ile aynı
+        valid: (N, K) bool maske; None ise sonlu ve negatif olmayan mesafeler
+        min_det: Bu değerin altındaki determinantlar singüler sayılır
+        
+    Returns:
+        TrilaterationResult - üçten az geçerli anchor'ı olan veya anchor'ları
+        doğrusal olan satırlar singular=True
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    if distances.ndim != 2:
+        raise ValueError(f"distances (N, K) olmalı: {distances.shape}")
+    anchors = np.asarray(anchors, dtype=np.float64)[..., :2]
+    shared = anchors.ndim == 2
+    if (anchors.shape[0] if shared else anchors.shape[:2]) != \
+            (distances.shape[1] if shared else distances.shape):
+        raise ValueError(f"anchors {anchors.shape} ile distances {distances.shape} uyuşmuyor")
+    
+    usable = np.isfinite(distances) & (distances >= 0)
+    if valid is not None:
+        usable &= np.asarray(valid, dtype=bool)
+    
+    # Geçerli (tag, anchor) çiftleri satır sırasında; tipik olarak matrisin küçük bir kısmı
+    n = distances.shape[0]
+    rows, cols = np.nonzero(usable)
+    count = np.bincount(rows, minlength=n)
+    singular = count < 3
+    if singular.all():
+        return TrilaterationResult(np.full((n, 2), np.nan), np.full(n, np.nan), singular)
+    
+    # Satır başına ilk üç geçerli anchor (üçten azsa satır zaten singüler)
+    first = np.cumsum(count) - count
+    order = cols[np.minimum(first[:, None] + np.arange(3), len(cols) - 1)]  # (N, 3)
+    row_index = np.arange(n)[:, None]
+    p = anchors[order] if shared else anchors[row_index, order]  # (N, 3, 2)
+    r = distances[row_index, order]  # (N, 3)
+    
+    x, y = p[..., 0], p[..., 1]
+    sq = r * r - x * x - y * y  # r² - x² - y²
+    
+    # Lineer denklem sistemi (trilaterate_2d ile aynı)
+    A = 2 * (x[:, 1] - x[:, 0])
+    B = 2 * (y[:, 1] - y[:, 0])
+    C = sq[:, 0] - sq[:, 1]
+    D = 2 * (x[:, 2] - x[:, 1])
+    E = 2 * (y[:, 2] - y[:, 1])
+    F = sq[:, 1] - sq[:, 2]
+    
+    det = A * E - B * D
+    singular |= ~(np.abs(det) >= min_det)
+    det = np.where(singular, 1.0, det)
+    
+    positions = np.empty((n, 2))
+    positions[:, 0] = (C * E - F * B) / det
+    positions[:, 1] = (A * F - D * C) / det
+    positions[singular] = np.nan
+    
+    # Kalan hata: geçerli tüm anchor'lara ölçülen ve hesaplanan mesafe farkı
+    used = anchors[cols] if shared else anchors[rows, cols]
+    dx = used[:, 0] - positions[rows, 0]
+    dy = used[:, 1] - positions[rows, 1]
+    error = np.sqrt(dx * dx + dy * dy) - distances[rows, cols]
+    residuals = np.sqrt(np.bincount(rows, error * error, minlength=n) / np.maximum(count, 1))
+    residuals[singular] = np.nan
+    
+    return TrilaterationResult(positions, residuals, singular)
+
 def trilaterate_2d(anchors: List[Tuple[float, float]], distances: List[float]) -> Optional[Tuple[float, float]]:
     """
-    2D Trilateration - 3 anchor ile konum hesapla.
+    2D Trilateration - 3 anchor ile konum hesapla (trilaterate_2d_batch'in tek tag'lik sarmalayıcısı).
     
     Args:
         anchors: Anchor konumları [(x1,y1), (x2,y2), (x3,y3)]
@@ -17,46 +100,308 @@ def trilaterate_2d(anchors: List[Tuple[float, float]], distances: List[float]) -
     if len(anchors) < 3 or len(distances) < 3:
         return None
     
-    # İlk 3 anchor'ı kullan
-    x1, y1 = anchors[0]
-    x2, y2 = anchors[1]
-    x3, y3 = anchors[2]
+    try:
+        # İlk 3 anchor'ı kullan
+        result = trilaterate_2d_batch([anchors[:3]], [distances[:3]])
+    except (TypeError, ValueError) as e:
+        print(f"Trilateration error: {e}")
+        return None
+    
+    if result.singular[0]:
+        return None
+    x, y = result.positions[0].tolist()
+    return (x, y)
+
+MultilaterationResult = namedtuple('MultilaterationResult', ['positions', 'residuals', 'singular', 'iterations'])
+MultilaterationResult.__doc__ = """Toplu en küçük kareler çözümü: positions (N, boyut) (çözümsüz satırlar
+NaN), residuals (N,) ağırlıklı mesafe RMSE'si (metre), singular (N,) bool,
+iterations (N,) yapılan iterasyon sayısı."""
+
+
+def multilaterate_batch(anchors, distances, valid=None, initial=None, weights=None,
+                        max_iterations: int = 8, tolerance: float = 1e-3,
+                        damping: float = 1e-3) -> MultilaterationResult:
+    """
+    Ağırlıklı doğrusal olmayan en küçük kareler (Levenberg-Marquardt) - tüm tag'ler tek seferde.
     
-    r1, r2, r3 = distances[0], distances[1], distances[2]
+    Her tag için geçerli tüm anchor'lar kullanılır:
+        min Σ w_i (||x - a_i|| - d_i)²
+    Başlangıç noktası initial (ör. önceki Kalman durumu) veya yoksa ilk üç
+    anchor'la lineer 2D çözüm (z: anchor ortalaması); o da yoksa anchor
+    ağırlık merkezi. Her iterasyon tag başına boyut×boyut'luk bir denklem
+    çözer; adım maliyeti düşürmezse sönümleme artırılır ve adım reddedilir.
+    Tag başına maliyet max_iterations ile sınırlıdır.
     
-    try:
-        # Trilateration formülü (lineer denklem sistemi çözümü)
-        A = 2 * (x2 - x1)
-        B = 2 * (y2 - y1)
-        C = r1**2 - r2**2 - x1**2 + x2**2 - y1**2 + y2**2
+    Args:
+        anchors: Ortak anchor konumları (A, boyut) veya tag başına (N, K, boyut); boyut 2 veya 3
+        distances: Mesafeler (N, K)
+        valid: (N, K) bool maske; None ise sonlu ve negatif olmayan mesafeler
+        initial: (N, boyut) başlangıç konumları; NaN satırlar lineer çözümle başlar
+        weights: (N, K) ölçüm ağırlıkları (ör. 1/σ²); None ise eşit
+        max_iterations: Tag başına en fazla iterasyon
+        tolerance: Adım bu değerin (metre) altına inince tag yakınsamış sayılır
+        damping: Başlangıç LM sönümleme katsayısı
         
-        D = 2 * (x3 - x2)
-        E = 2 * (y3 - y2)
-        F = r2**2 - r3**2 - x2**2 + x3**2 - y2**2 + y3**2
+    Returns:
+        MultilaterationResult - boyut+1'den az geçerli anchor'ı olan satırlar singular=True
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    if distances.ndim != 2:
+        raise ValueError(f"distances (N, K) olmalı: {distances.shape}")
+    anchors = np.asarray(anchors, dtype=np.float64)
+    dim = anchors.shape[-1]
+    if dim not in (2, 3):
+        raise ValueError(f"Anchor boyutu 2 veya 3 olmalı: {anchors.shape}")
+    shared = anchors.ndim == 2
+    if (anchors.shape[0] if shared else anchors.shape[:2]) != \
+            (distances.shape[1] if shared else distances.shape):
+        raise ValueError(f"anchors {anchors.shape} ile distances {distances.shape} uyuşmuyor")
+    
+    usable = np.isfinite(distances) & (distances >= 0)
+    if valid is not None:
+        usable &= np.asarray(valid, dtype=bool)
+    
+    # Satırları geçerli anchor'larına sıkıştır: iterasyonlar (N, K) yerine
+    # (N, en fazla geçerli anchor) üzerinde çalışır
+    n = distances.shape[0]
+    rows, cols = np.nonzero(usable)
+    count = np.bincount(rows, minlength=n)
+    width = max(int(count.max()) if n else 0, 1)
+    slot = np.arange(len(rows)) - (np.cumsum(count) - count)[rows]
+    index = np.zeros((n, width), dtype=np.intp)
+    index[rows, slot] = cols
+    present = np.zeros((n, width), dtype=bool)
+    present[rows, slot] = True
+    row_index = np.arange(n)[:, None]
+    
+    linear = trilaterate_2d_batch(anchors, distances, usable)
+    anchors = anchors[index] if shared else anchors[row_index, index]  # (N, genişlik, boyut)
+    d = np.where(present, distances[row_index, index], 0.0)
+    w = present.astype(np.float64)
+    if weights is not None:
+        w *= np.nan_to_num(np.asarray(weights, dtype=np.float64)[row_index, index])
+    singular = count < dim + 1
+    
+    # Başlangıç: lineer çözüm, yoksa anchor ağırlık merkezi
+    weight_sum = np.maximum(w.sum(axis=1), 1e-12)[:, None]
+    x = (anchors * w[..., None]).sum(axis=1) / weight_sum
+    x[~linear.singular, :2] = linear.positions[~linear.singular]
+    if initial is not None:
+        initial = np.asarray(initial, dtype=np.float64)[:, :dim]
+        warm = np.isfinite(initial).all(axis=1)
+        x[warm] = initial[warm]
+    
+    def evaluate(position, anchors, d, w):
+        offset = position[:, None, :] - anchors
+        ranges = np.sqrt((offset * offset).sum(axis=-1))
+        residual = ranges - d
+        return (w * residual * residual).sum(axis=1), offset, ranges, residual
+    
+    cost, offset, ranges, residual = evaluate(x, anchors, d, w)
+    lam = np.full(n, damping)
+    active = ~singular
+    iterations = np.zeros(n, dtype=np.int64)
+    eye = np.eye(dim)
+    
+    for _ in range(max_iterations):
+        # Yalnızca yakınsamamış satırlar işlenir
+        act = np.flatnonzero(active)
+        if not len(act):
+            break
+        iterations[act] += 1
+        w_act = w[act]
         
-        # Determinant hesapla
-        det = A * E - B * D
+        # Jacobian: birim yön vektörleri (n, genişlik, boyut)
+        J = offset[act] / np.maximum(ranges[act], 1e-9)[..., None]
+        JW = J * w_act[..., None]
+        H = np.einsum('nki,nkj->nij', JW, J)
+        g = np.einsum('nki,nk->ni', JW, residual[act])
         
-        if abs(det) < 0.001:  # Singülar matris kontrolü
-            return None
+        # Marquardt sönümlemesi (köşegen ölçekli; gözlenemeyen eksen için küçük taban)
+        lam_act = lam[act]
+        H += (lam_act[:, None] * (np.diagonal(H, axis1=1, axis2=2) + 1e-9))[:, :, None] * eye
+        step = -np.linalg.solve(H, g[..., None])[..., 0]
         
-        # Çözüm
-        x = (C * E - F * B) / det
-        y = (A * F - D * C) / det
+        candidate = x[act] + step
+        new_cost, new_offset, new_ranges, new_residual = evaluate(candidate, anchors[act], d[act], w_act)
+        improved = new_cost < cost[act]
+        accepted = act[improved]
+        x[accepted] = candidate[improved]
+        cost[accepted] = new_cost[improved]
+        offset[accepted] = new_offset[improved]
+        ranges[accepted] = new_ranges[improved]
+        residual[accepted] = new_residual[improved]
+        lam_act = np.where(improved, np.maximum(lam_act * 0.3, 1e-9), lam_act * 10.0)
+        lam[act] = lam_act
         
-        return (x, y)
+        done = (np.sqrt((step * step).sum(axis=1)) < tolerance) | (lam_act > 1e6)
+        active[act[done]] = False
     
-    except Exception as e:
-        print(f"Trilateration error: {e}")
+    positions = x.copy()
+    positions[singular] = np.nan
+    residuals = np.sqrt(cost / weight_sum[:, 0])
+    residuals[singular] = np.nan
+    return MultilaterationResult(positions, residuals, singular, iterations)
+
+def multilaterate(anchors, distances, initial=None, weights=None,
+                  max_iterations: int = 8) -> Optional[Tuple[float, ...]]:
+    """
+    Tek tag için en küçük kareler konumu (multilaterate_batch sarmalayıcısı).
+    
+    Args:
+        anchors: Anchor konumları [(x, y), ...] veya [(x, y, z), ...] - tümü kullanılır
+        distances: Her anchor'dan mesafeler
+        initial: Başlangıç konumu (ör. önceki Kalman durumu)
+        
+    Returns:
+        Hesaplanan konum veya None
+    """
+    dim = len(anchors[0]) if len(anchors) else 2
+    if len(anchors) < dim + 1 or len(distances) < len(anchors):
         return None
+    
+    try:
+        result = multilaterate_batch(
+            [anchors], [distances[:len(anchors)]],
+            initial=None if initial is None else [initial],
+            weights=None if weights is None else [weights],
+            max_iterations=max_iterations
+        )
+    except (TypeError, ValueError, np.linalg.LinAlgError) as e:
+        print(f"Multilateration error: {e}")
+        return None
+    
+    if result.singular[0]:
+        return None
+    return tuple(result.positions[0].tolist())
+
+RobustMultilaterationResult = namedtuple('RobustMultilaterationResult',
+                                         ['positions', 'residuals', 'singular', 'iterations', 'rejected'])
+RobustMultilaterationResult.__doc__ = """MultilaterationResult alanları + rejected (N, K) bool: çözümden
+çıkarılan (aykırı / NLOS) ölçümler."""
+
+
+def range_bias(positions, anchors, distances, usable) -> np.ndarray:
+    """
+    Ölçüm başına mesafe sapması d_i - ||x - a_i|| (NLOS'ta pozitif).
+    
+    Args:
+        positions: (N, boyut); anchors: (A, boyut) veya (N, K, boyut)
+        distances, usable: (N, K)
+        
+    Returns:
+        (N, K) sapmalar; kullanılmayan ölçümler NaN
+    """
+    anchors = anchors[None] if anchors.ndim == 2 else anchors
+    offset = positions[:, None, :] - anchors
+    bias = distances - np.sqrt((offset * offset).sum(axis=-1))
+    return np.where(usable, bias, np.nan)
+
+
+def robust_multilaterate_batch(anchors, distances, valid=None, initial=None, weights=None,
+                               threshold: float = 1.0, max_rejections: int = 2, candidates: int = 3,
+                               max_iterations: int = 8) -> RobustMultilaterationResult:
+    """
+    Aykırı / NLOS ölçüm ayıklamalı multilateration - tüm tag'ler tek seferde.
+    
+    Yeraltında görüş hattı olmayan (NLOS) mesafeler büyük pozitif sapma
+    taşır ve en küçük kareler çözümünü çeker. Önce tüm ölçümlerle
+    multilaterate_batch çözülür; |sapma| > threshold olan ve ayıklamaya
+    yetecek fazlalığı (boyut+2 anchor) bulunan tag'ler için:
+    
+        1. Sapmaya göre aday seçimi: en büyük pozitif sapmalı `candidates`
+           ölçüm (NLOS yalnızca mesafeyi uzatır)
+        2. Uzlaşı araması: her aday dışarıda bırakılarak yeniden çözülür
+           (mevcut konumdan sıcak başlangıç); en çok iç nokta (|sapma| <=
+           threshold), eşitlikte en düşük RMSE veren alt küme seçilir
+        3. Dışarıda bırakılan ölçüm yeni çözüme göre de aykırıysa ve RMSE
+           düştüyse ret kabul edilir; aksi halde tag için arama biter
+    
+    Tüm adaylar tek bir multilaterate_batch çağrısında çözülür; maliyet tag
+    başına en fazla max_rejections × candidates ek çözümle sınırlıdır.
+    
+    Args:
+        anchors, distances, valid, initial, weights, max_iterations: multilaterate_batch ile aynı
+        threshold: Aykırı sayılma sınırı (metre)
+        max_rejections: Tag başına en fazla çıkarılan ölçüm
+        candidates: Tur başına denenen en fazla aday ölçüm
+        
+    Returns:
+        RobustMultilaterationResult
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    anchors = np.asarray(anchors, dtype=np.float64)
+    shared = anchors.ndim == 2
+    dim = anchors.shape[-1]
+    usable = np.isfinite(distances) & (distances >= 0)
+    if valid is not None:
+        usable &= np.asarray(valid, dtype=bool)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+    
+    result = multilaterate_batch(anchors, distances, usable, initial=initial, weights=weights,
+                                 max_iterations=max_iterations)
+    positions = result.positions
+    residuals = result.residuals
+    iterations = result.iterations
+    rejected = np.zeros(usable.shape, dtype=bool)
+    searching = ~result.singular
+    
+    for _ in range(max_rejections):
+        bias = range_bias(positions, anchors, distances, usable)
+        magnitude = np.where(usable, np.abs(bias), 0.0)
+        searching &= (usable.sum(axis=1) >= dim + 2) & (magnitude.max(axis=1) > threshold)
+        rows = np.flatnonzero(searching)
+        if not len(rows):
+            break
+        
+        # Adaylar: en büyük pozitif sapmalı ölçümler (satır, sütun) çiftleri
+        score = np.where(usable[rows], bias[rows], -np.inf)
+        width = min(candidates, score.shape[1])
+        order = np.argsort(-score, axis=1)[:, :width]
+        tried = np.isfinite(np.take_along_axis(score, order, axis=1)).ravel()
+        cand_row = np.repeat(rows, width)[tried]
+        cand_col = order.ravel()[tried]
+        
+        # Uzlaşı: her adayı dışarıda bırakıp hepsini tek çağrıda çöz
+        mask = usable[cand_row]
+        mask[np.arange(len(cand_row)), cand_col] = False
+        cand_anchors = anchors if shared else anchors[cand_row]
+        sub = multilaterate_batch(cand_anchors, distances[cand_row], mask,
+                                  initial=positions[cand_row],
+                                  weights=None if weights is None else weights[cand_row],
+                                  max_iterations=max_iterations)
+        cand_bias = range_bias(sub.positions, cand_anchors, distances[cand_row], usable[cand_row])
+        excluded = np.abs(cand_bias[np.arange(len(cand_row)), cand_col])
+        inliers = (mask & (np.abs(np.nan_to_num(cand_bias, nan=np.inf)) <= threshold)).sum(axis=1)
+        
+        # Satır başına en iyi aday: en çok iç nokta, sonra en düşük RMSE
+        key = np.where(sub.singular, -np.inf, inliers * 1e6 - np.minimum(sub.residuals, 1e5))
+        ranked = np.lexsort((key, cand_row))  # satıra göre, satır içinde artan anahtar
+        last = np.append(cand_row[ranked][1:] != cand_row[ranked][:-1], True)
+        chosen = ranked[last]
+        chosen = chosen[np.isfinite(key[chosen])]
+        accept = chosen[(excluded[chosen] > threshold) &
+                        (sub.residuals[chosen] < residuals[cand_row[chosen]])]
+        
+        searching[rows] = False
+        target = cand_row[accept]
+        searching[target] = True
+        usable[target, cand_col[accept]] = False
+        rejected[target, cand_col[accept]] = True
+        positions[target] = sub.positions[accept]
+        residuals[target] = sub.residuals[accept]
+        iterations[target] += sub.iterations[accept]
+    
+    return RobustMultilaterationResult(positions, residuals, result.singular, iterations, rejected)
 
 def trilaterate_3d(anchors: List[Tuple[float, float, float]], distances: List[float]) -> Optional[Tuple[float, float, float]]:
     """
-    3D Trilateration - 4 anchor ile 3D konum hesapla.
+    3D konum - 4+ anchor ile en küçük kareler (multilaterate), 3 anchor ile 2D.
     
     Args:
-        anchors: Anchor konumları [(x1,y1,z1), (x2,y2,z2), ...]
-        distances: Her anchor'dan mesafeler [r1, r2, r3, r4]
+        anchors: Anchor konumları [(x1,y1,z1), (x2,y2,z2), ...] - tümü kullanılır
+        distances: Her anchor'dan mesafeler [r1, r2, r3, r4, ...]
         
     Returns:
         Hesaplanan konum (x, y, z) veya None
@@ -73,34 +418,109 @@ def trilaterate_3d(anchors: List[Tuple[float, float, float]], distances: List[fl
             return (result_2d[0], result_2d[1], avg_z)
         return None
     
-    try:
-        # 4 anchor ile least squares çözümü
-        A = []
-        b = []
+    return multilaterate(anchors, distances)
+
+AnchorGeometry = namedtuple('AnchorGeometry', ['anchor_ids', 'positions', 'pinv', 'offsets'])
+AnchorGeometry.__doc__ = """Bir anchor alt kümesinin önceden hesaplanmış geometrisi: positions (m, 3),
+pinv (2, m-1) lineer sistemin sözde tersi (singülerse None), offsets (m-1,)."""
+
+
+class AnchorGeometryCache:
+    """
+    Anchor alt kümesine göre geometri önbelleği.
+    
+    2D lineer sistem (ilk anchor'a göre) yalnızca anchor konumlarına bağlıdır:
+        2 (a_i - a_0) · x = r_0² - r_i² + |a_i|² - |a_0|²
+    Sol tarafın sözde tersi alt küme başına bir kez hesaplanır; çözüm tek
+    bir matris-vektör çarpımıdır. Aynı bölmedeki tag'ler aynı alt kümeleri
+    tekrar tekrar kullanır.
+    
+    Anchor durumu değiştiğinde veya anchor taşındığında invalidate()
+    çağrılmalıdır; aksi halde eski konumlarla çözülür.
+    """
+    
+    def __init__(self, max_entries: int = 4096, min_singular_value: float = 1e-3):
+        self.max_entries = max_entries
+        self.min_singular_value = min_singular_value
+        self._entries = {}  # anchor_id demeti -> AnchorGeometry
         
-        x1, y1, z1 = anchors[0]
-        r1 = distances[0]
+        # İstatistikler
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def get(self, key, resolve) -> AnchorGeometry:
+        """
+        Alt kümenin geometrisini döndür (yoksa hesapla).
         
-        for i in range(1, 4):
-            xi, yi, zi = anchors[i]
-            ri = distances[i]
-            
-            A.append([2*(xi - x1), 2*(yi - y1), 2*(zi - z1)])
-            b.append([
-                r1**2 - ri**2 - x1**2 + xi**2 - y1**2 + yi**2 - z1**2 + zi**2
-            ])
+        Args:
+            key: Ölçümü olan anchor ID'leri (sıralı demet)
+            resolve: anchor_id -> (x, y, z) veya None (bilinmiyor / çevrimdışı)
+        """
+        geometry = self._entries.get(key)
+        if geometry is not None:
+            self.hits += 1
+            return geometry
         
-        A = np.array(A)
-        b = np.array(b)
+        self.misses += 1
+        anchor_ids = []
+        positions = []
+        for anchor_id in key:
+            position = resolve(anchor_id)
+            if position is not None:
+                anchor_ids.append(anchor_id)
+                positions.append(position)
+        positions = np.array(positions, dtype=np.float64).reshape(-1, 3)
         
-        # Pseudo-inverse ile çözüm
-        result = np.linalg.lstsq(A, b, rcond=None)[0]
+        pinv = offsets = None
+        if len(positions) >= 3:
+            xy = positions[:, :2]
+            A = 2 * (xy[1:] - xy[0])
+            if np.linalg.svd(A, compute_uv=False)[-1] >= self.min_singular_value:
+                pinv = np.linalg.pinv(A)
+                squared = (xy * xy).sum(axis=1)
+                offsets = squared[1:] - squared[0]
         
-        return (float(result[0][0]), float(result[1][0]), float(result[2][0]))
+        if len(self._entries) >= self.max_entries:
+            # En eski girdiyi at (sözlük ekleme sırası)
+            del self._entries[next(iter(self._entries))]
+        geometry = self._entries[key] = AnchorGeometry(tuple(anchor_ids), positions, pinv, offsets)
+        return geometry
     
-    except Exception as e:
-        print(f"3D Trilateration error: {e}")
-        return None
+    @staticmethod
+    def solve(geometry: AnchorGeometry, distances) -> Optional[np.ndarray]:
+        """
+        Lineer 2D çözüm - satır başına bir matris-vektör çarpımı.
+        
+        Args:
+            distances: (M, m) mesafeler, sütunlar geometry.anchor_ids sırasında
+            
+        Returns:
+            (M, 2) konumlar veya None (alt küme singüler)
+        """
+        if geometry.pinv is None:
+            return None
+        r2 = np.square(np.asarray(distances, dtype=np.float64))
+        return (r2[:, :1] - r2[:, 1:] + geometry.offsets) @ geometry.pinv.T
+    
+    def invalidate(self, anchor_id=None):
+        """anchor_id'yi içeren girdileri (None ise tümünü) sil."""
+        self.invalidations += 1
+        if anchor_id is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if anchor_id in key]:
+            del self._entries[key]
+    
+    def get_statistics(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'invalidations': self.invalidations
+        }
 
 def calculate_distance(point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
     """İki nokta arasındaki Öklid mesafesi."""
@@ -151,11 +571,11 @@ def select_best_anchors(tag_position: Tuple[float, float, float],
     # En iyi 3-4'ünü döndür
     return [item['anchor'] for item in anchor_scores[:4]]
 
-def estimate_position_accuracy(anchors: List[Tuple[float, float]], 
+def estimate_position_accuracy(anchors: List[Tuple[float, ...]], 
                               distances: List[float],
-                              calculated_position: Tuple[float, float]) -> float:
+                              calculated_position: Tuple[float, ...]) -> float:
     """
-    Hesaplanan pozisyonun doğruluk tahmini.
+    Hesaplanan pozisyonun doğruluk tahmini (2D veya 3D; anchor'lar ve konum aynı boyutta).
     
     Returns:
         Tahmin edilen hata (metre)
@@ -165,7 +585,7 @@ def estimate_position_accuracy(anchors: List[Tuple[float, float]],
     
     # Her anchor'dan hesaplanan mesafe
     calculated_distances = [
-        calculate_distance(calculated_position, anchor)
+        math.dist(calculated_position, anchor)
         for anchor in anchors
     ]
     
@@ -0,0 +1,353 @@
+"""UDP Listener for High-rate Anchors - Datagram tabanlı ölçüm alımı"""
+from PyQt6.QtCore import QThread, pyqtSignal
+import selectors
+import socket
+import time
+
+from services.ingest_queue import BoundedIngestQueue
+from services.ingest_metrics import IngestMetrics
+from services.binary_protocol import MAGIC, decode_report
+from services.payload_decoder import PayloadDecoder, entity_key, is_priority_payload
+from utils.validators import to_int
+
+SEQUENCE_MODULO = 1 << 32
+
+
+class SequenceTracker:
+    """
+    Anchor başına sıra numarası takibi.
+
+    - Kayıp tespiti: atlanan sıra numaraları 'lost' olarak sayılır
+    - Yeniden sıralama: window kadar ileriden gelen paketler bekletilir,
+      eksik paket gelirse sıraya konur
+    - Tekrarlanan / pencere içinde geç gelen paketler atılır
+    - Sıfırlama: pencereden daha geriye sıçrama (ör. anchor yeniden başladı,
+      sıra 0'dan başlıyor) veya idle_reset_ms sessizlikten sonra beklenmeyen
+      sıra numarası akışı yeniden başlatır; kayıp / tekrar sayılmaz
+
+    Sıra numaraları 32 bit'tir ve taşmada başa döner (serial arithmetic).
+    """
+
+    def __init__(self, window=8, max_hold_ms=50, idle_reset_ms=2000):
+        self.window = window
+        self.max_hold = max_hold_ms / 1000.0
+        self.idle_reset = idle_reset_ms / 1000.0
+        self.anchors = {}  # anchor_id -> _AnchorSequence
+
+        # İstatistikler
+        self.received = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.resets = 0
+
+    def push(self, anchor_id, sequence, item, now=None):
+        """
+        Paketi ekle.
+
+        Returns:
+            Sırası gelmiş paketlerin listesi
+        """
+        now = time.monotonic() if now is None else now
+        self.received += 1
+        state = self.anchors.get(anchor_id)
+        if state is None:
+            state = self.anchors[anchor_id] = _AnchorSequence(sequence)
+        idle = now - state.last_seen >= self.idle_reset
+        state.last_seen = now
+
+        ahead = (sequence - state.next) % SEQUENCE_MODULO
+        if ahead == 0:
+            state.next = (sequence + 1) % SEQUENCE_MODULO
+            released = [item]
+            if state.pending:
+                # Eksik paket geç geldi, bekleyenler sıraya girdi
+                self.reordered += 1
+                released.extend(self._release_consecutive(state))
+            return released
+
+        if idle:
+            return self._reset(state, sequence, item, now)
+
+        if ahead >= SEQUENCE_MODULO // 2:
+            if SEQUENCE_MODULO - ahead > self.window:
+                # Pencereden çok geride: anchor sırayı yeniden başlattı
+                return self._reset(state, sequence, item, now)
+            # Pencere içinde geç gelen veya tekrar
+            self.duplicates += 1
+            return []
+
+        if sequence in state.pending:
+            self.duplicates += 1
+            return []
+
+        if not state.pending:
+            state.held_since = now
+        state.pending[sequence] = item
+
+        if ahead >= self.window:
+            return self._skip_gap(state, now)
+        return []
+
+    def expire(self, now=None):
+        """max_hold_ms'den uzun bekleyen boşlukları kayıp say ve paketleri bırak."""
+        now = time.monotonic() if now is None else now
+        released = []
+        for state in self.anchors.values():
+            if state.pending and now - state.held_since >= self.max_hold:
+                released.extend(self._skip_gap(state, now, drain=True))
+        return released
+
+    def _reset(self, state, sequence, item, now):
+        """Bekleyenleri sırayla bırak ve akışı bu sıra numarasından yeniden başlat."""
+        self.resets += 1
+        released = [state.pending[seq] for seq in
+                    sorted(state.pending, key=lambda seq: (seq - state.next) % SEQUENCE_MODULO)]
+        state.pending.clear()
+        state.next = (sequence + 1) % SEQUENCE_MODULO
+        state.held_since = now
+        released.append(item)
+        return released
+
+    def _skip_gap(self, state, now, drain=False):
+        """En eski bekleyen pakete atla; aradaki sıra numaraları kayıp."""
+        released = []
+        while state.pending:
+            oldest = min(state.pending, key=lambda seq: (seq - state.next) % SEQUENCE_MODULO)
+            self.lost += (oldest - state.next) % SEQUENCE_MODULO
+            state.next = oldest
+            released.extend(self._release_consecutive(state))
+            if not drain:
+                newest = max((seq - state.next) % SEQUENCE_MODULO for seq in state.pending) \
+                    if state.pending else 0
+                if newest < self.window:
+                    break
+        if state.pending:
+            state.held_since = now
+        return released
+
+    def _release_consecutive(self, state):
+        released = []
+        while state.next in state.pending:
+            released.append(state.pending.pop(state.next))
+            state.next = (state.next + 1) % SEQUENCE_MODULO
+        return released
+
+    def get_statistics(self):
+        return {
+            'received': self.received,
+            'lost': self.lost,
+            'duplicates': self.duplicates,
+            'reordered': self.reordered,
+            'resets': self.resets,
+            'pending': sum(len(s.pending) for s in self.anchors.values()),
+            'loss_rate': self.lost / (self.received + self.lost) if self.received + self.lost else 0.0
+        }
+
+
+class _AnchorSequence:
+    __slots__ = ('next', 'pending', 'held_since', 'last_seen')
+
+    def __init__(self, first_sequence):
+        self.next = first_sequence
+        self.pending = {}  # sequence -> paket
+        self.held_since = 0.0
+        self.last_seen = float('-inf')
+
+
+class UDPListenerService(QThread):
+    """
+    UDP dinleyici - 10-50 Hz rapor gönderen yeni nesil anchor'lar için.
+
+    Her datagram tek bir paket taşır: binary range report (binary_protocol)
+    veya JSON ('seq' alanı opsiyonel). Soket her uyanmada EAGAIN'e kadar
+    boşaltılır (recvmmsg benzeri toplu okuma); paketler sıra takibinden
+    geçip TCPServerService ile aynı sınırlı kuyruk / batch_ready hattına verilir.
+    'pause' politikasında kuyruk doluyken soket okunmaz; fazla datagramları
+    kernel tamponu atar.
+    """
+
+    # Signals
+    data_received = pyqtSignal(object)  # Tek paket (batching kapalı)
+    batch_ready = pyqtSignal()  # Kuyrukta teslim edilecek paketler var (take_batch)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, host='127.0.0.1', port=8889, batch_interval_ms=25, batch_size=256,
+                 reorder_window=8, max_hold_ms=50, max_datagrams_per_wakeup=512,
+                 receive_buffer_bytes=4 * 1024 * 1024, queue_capacity=10000,
+                 overflow_policy='drop_oldest', metrics=None):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.running = False
+        self.socket = None
+        self.max_datagrams_per_wakeup = max_datagrams_per_wakeup
+        self.receive_buffer_bytes = receive_buffer_bytes
+
+        self.queue = BoundedIngestQueue(queue_capacity, overflow_policy, batch_size, batch_interval_ms) \
+            if batch_interval_ms else None
+        self._notified = False  # batch_ready gönderildi, take_batch() bekleniyor
+        self.sequences = SequenceTracker(window=reorder_window, max_hold_ms=max_hold_ms)
+        self.metrics = metrics if metrics is not None else IngestMetrics()
+        self.metrics_shard = self.metrics.shard('udp')
+
+        # İstatistikler
+        self.total_datagrams = 0
+        self.total_bytes = 0
+        self.decode_errors = 0
+        self.decoder = PayloadDecoder()
+        self.wakeups = 0
+        self.start_time = None
+
+    def run(self):
+        """Thread'in ana döngüsü."""
+        try:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer_bytes)
+            except OSError:
+                pass
+            self.socket.bind((self.host, self.port))
+            self.socket.setblocking(False)
+        except Exception as e:
+            self.error_occurred.emit(f"UDP dinleyici başlatma hatası: {e}")
+            print(f"❌ UDP Listener hatası: {e}")
+            return
+
+        selector = selectors.DefaultSelector()
+        selector.register(self.socket, selectors.EVENT_READ)
+        buffer = bytearray(65536)
+        view = memoryview(buffer)
+
+        self.running = True
+        self.start_time = time.time()
+        print(f"✅ UDP Listener başlatıldı: {self.host}:{self.port}")
+
+        try:
+            while self.running:
+                timeout = self.sequences.max_hold
+                if self.queue is not None and not self._notified:
+                    timeout = min(timeout, self.queue.time_until_due())
+
+                if self.queue is not None and self.queue.paused:
+                    # Okunmayan soket select()'ten hemen döner; kuyruk boşalana
+                    # kadar uyu, fazla datagramları kernel tamponu atar
+                    time.sleep(timeout)
+                elif selector.select(timeout):
+                    self.wakeups += 1
+                    self._drain_socket(buffer, view)
+
+                for item in self.sequences.expire():
+                    self._deliver(item)
+                if self.queue is not None and not self._notified and self.queue.is_due():
+                    self._notify_batch()
+        except Exception as e:
+            if self.running:
+                self.error_occurred.emit(f"UDP hatası: {e}")
+        finally:
+            self.running = False
+            if self.queue is not None and len(self.queue):
+                self._notify_batch()
+            selector.close()
+            self.socket.close()
+
+    def _drain_socket(self, buffer, view):
+        """Soketteki tüm datagramları tek uyanmada oku."""
+        for _ in range(self.max_datagrams_per_wakeup):
+            try:
+                size = self.socket.recv_into(buffer)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.error_occurred.emit(f"UDP okuma hatası: {e}")
+                return
+
+            self.total_datagrams += 1
+            self.total_bytes += size
+            self.metrics_shard.add_bytes(size)
+            self._handle_datagram(view[:size])
+
+    def _handle_datagram(self, datagram):
+        """Datagram okuma tamponunun dilimidir; çözülen paket tampona referans tutmaz."""
+        try:
+            if datagram[:len(MAGIC)] == MAGIC:
+                payload = decode_report(datagram, copy=True)
+                anchor_id, sequence = payload.anchor_id, payload.sequence
+            else:
+                payload = self.decoder.decode(datagram)
+                if isinstance(payload, dict):
+                    # Normalize edilemeyen / SOS paketi; SOS sıralama penceresinde
+                    # bekletilmez ve tekrar sayılıp atılmaz, doğrudan öncelik kuyruğuna gider
+                    anchor_id = entity_key(payload.get('anchor_id'))
+                    sequence = None if is_priority_payload(payload) else payload.get('seq')
+                    if sequence is not None:
+                        sequence = to_int(sequence) % SEQUENCE_MODULO  # Geçersizse ValidationError
+                else:
+                    anchor_id, sequence = payload.anchor_id, payload.sequence
+        except ValueError:
+            self.decode_errors += 1
+            return
+
+        self.metrics_shard.record(payload)
+        if anchor_id is None or sequence is None:
+            self._deliver(payload)
+            return
+
+        for item in self.sequences.push(anchor_id, sequence, payload):
+            self._deliver(item)
+
+    def _deliver(self, payload):
+        if self.queue is None:
+            self.data_received.emit(payload)
+        else:
+            self.queue.put(payload)
+
+    def _notify_batch(self):
+        self._notified = True
+        self.batch_ready.emit()
+
+    def take_batch(self, with_timestamps=False):
+        """Kuyruktaki paketleri al (Qt thread'inden, batch_ready sinyaline yanıt olarak)."""
+        if self.queue is None:
+            return ([], []) if with_timestamps else []
+        batch = self.queue.take_batch(with_timestamps)
+        self._notified = False
+        return batch
+
+    def stop(self):
+        """Dinleyiciyi durdur."""
+        print("⏸️  UDP Listener durduruluyor...")
+        self.running = False
+
+    def get_statistics(self):
+        """Dinleyici istatistiklerini döndür."""
+        runtime = 0
+        if self.start_time:
+            runtime = time.time() - self.start_time
+
+        sequence_stats = self.sequences.get_statistics()
+        queue_stats = self.queue.get_statistics() if self.queue is not None else {}
+        rates = self.metrics_shard.rates()
+        return {
+            'running': self.running,
+            'host': self.host,
+            'port': self.port,
+            'total_datagrams': self.total_datagrams,
+            'total_bytes': self.total_bytes,
+            'decode_errors': self.decode_errors,
+            'datagrams_per_wakeup': self.total_datagrams / self.wakeups if self.wakeups else 0,
+            'packets_lost': sequence_stats['lost'],
+            'duplicates': sequence_stats['duplicates'],
+            'reordered': sequence_stats['reordered'],
+            'sequence_resets': sequence_stats['resets'],
+            'loss_rate': sequence_stats['loss_rate'],
+            'queue_depth': queue_stats.get('depth', 0),
+            'dropped_oldest': queue_stats.get('dropped_oldest', 0),
+            'coalesced': queue_stats.get('coalesced', 0),
+            'runtime_seconds': runtime,
+            'datagrams_per_second': self.total_datagrams / runtime if runtime > 0 else 0,
+            'rate_1s': rates[1],
+            'rate_10s': rates[10],
+            'rate_60s': rates[60]
+        }
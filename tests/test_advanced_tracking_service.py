@@ -0,0 +1,95 @@
+"""AdvancedTrackingService - 3D çözümde anchor seçimi, NLOS ayıklama ve mesafe filtresi"""
+import numpy as np
+import pytest
+
+from services.advanced_tracking_service import AdvancedTrackingService
+from services.binary_protocol import decode_report, encode_report
+from services.ingest_workers import MeasurementBatch
+from services.payload_decoder import MeasurementReport
+
+ANCHORS_3D = [(0, 0, 0.5), (25, 0, 4.0), (0, 20, 4.0), (25, 20, 0.5),
+              (12, -6, 2.5), (12, 26, 1.0), (-6, 10, 3.5), (31, 10, 1.5)]
+ANCHOR_IDS = [f'ANC{i + 1:03d}' for i in range(len(ANCHORS_3D))]
+TAG = np.array([12.0, 9.0, 1.5])
+
+
+def create_service(dimensions, coverage=None):
+    service = AdvancedTrackingService(mode='tcp', dimensions=dimensions)
+    coverage = coverage or [60.0] * len(ANCHORS_3D)
+    service.set_anchors([{'id': anchor_id, 'x': x, 'y': y, 'z': z, 'status': 'online',
+                          'signal_strength': 100, 'coverage_radius': radius}
+                         for anchor_id, (x, y, z), radius in zip(ANCHOR_IDS, ANCHORS_3D, coverage)])
+    assert service.anchor_selector.wait(5.0)
+    return service
+
+
+def measure(service, tag_id, dimensions, nlos_anchor=None):
+    """Mesafeler: 2D'de yatay, 3D'de gerçek uzaklık; nlos_anchor +6 m uzar."""
+    ranges = np.linalg.norm(np.array(ANCHORS_3D)[:, :dimensions] - TAG[:dimensions], axis=1)
+    distances = dict(zip(ANCHOR_IDS, ranges.tolist()))
+    if nlos_anchor is not None:
+        distances[nlos_anchor] += 6.0
+    service.tag_filters.add(tag_id, tuple(TAG[:dimensions] + 0.3))
+    service.tag_distances[tag_id] = distances
+
+
+@pytest.mark.parametrize('dimensions', [2, 3])
+def test_nlos_range_in_selected_subset_is_rejected(dimensions):
+    service = create_service(dimensions)
+    assert service.anchor_selector.subset_size == dimensions + 2
+    subset = service.anchor_selector.select(tuple(TAG), set(ANCHOR_IDS))
+    assert len(subset) == dimensions + 2
+
+    measure(service, 'TAG900', dimensions, nlos_anchor=subset[1])
+    assert service.prepare_tag_solve('TAG900')[3].anchor_ids == subset
+    service.calculate_tag_positions(['TAG900'])
+    assert service.anchors_rejected == 1
+    raw = np.array(service.tag_raw_positions['TAG900'][-1])
+    assert np.linalg.norm(raw - TAG[:dimensions]) < 0.05
+
+
+def test_selection_is_skipped_when_subset_is_too_small_for_rejection():
+    # Tag'in hücresinde yalnızca dört anchor menzilde: 3D'de ayıklama için az
+    coverage = [60.0, 60.0, 60.0, 60.0, 5.0, 5.0, 5.0, 5.0]
+    service = create_service(3, coverage)
+    assert len(service.anchor_selector.select(tuple(TAG), set(ANCHOR_IDS))) == 4
+
+    measure(service, 'TAG901', 3, nlos_anchor='ANC002')
+    assert service.prepare_tag_solve('TAG901')[3].anchor_ids == tuple(ANCHOR_IDS)
+    service.calculate_tag_positions(['TAG901'])
+    assert service.anchors_rejected == 1
+
+
+def test_set_dimensions_rebuilds_selector():
+    service = create_service(2)
+    service.set_dimensions(3)
+    assert service.anchor_selector.dimensions == 3
+    assert service.anchor_selector.subset_size == 5
+    assert service.anchor_selector.wait(5.0) and service.anchor_selector.ready
+
+
+def test_distance_filter_is_exclusive_on_every_ingest_path():
+    service = create_service(2)
+    distances = [-1.0, 0.0, 5.0, 20.0, 25.0]
+    tag_ids = [f'TAG{i + 1:03d}' for i in range(len(distances))]
+    report = MeasurementReport('ANC001', 1, None, tag_ids, distances, [None] * len(distances))
+    assert service.store_measurement_report(report) == ['TAG003']
+
+    batch = MeasurementBatch(['ANC002'] * len(distances), tag_ids, np.array(distances), 1)
+    assert service.store_measurement_batch(batch) == ['TAG003']
+
+    range_report = decode_report(encode_report(3, [(1, 0, -60, 0), (2, 5000, -60, 0), (3, 20000, -60, 0)]))
+    assert service.store_range_report(range_report) == ['TAG002']
+
+
+def test_moving_anchor_invalidates_cached_geometry():
+    service = create_service(2)
+    key = tuple(ANCHOR_IDS[:4])
+    geometry = service.geometry_cache.get(key, service.online_anchor_position)
+    service.update_anchor_position('ANC001', -3.0, -2.0)
+    refreshed = service.geometry_cache.get(key, service.online_anchor_position)
+    assert refreshed is not geometry
+    assert refreshed.positions[0].tolist()[:2] == [-3.0, -2.0]
+
+    service.update_anchor_status('ANC002', 'offline')
+    assert 'ANC002' not in service.geometry_cache.get(key, service.online_anchor_position).anchor_ids
@@ -0,0 +1,136 @@
+"""AnchorSelectionGrid - ağırlıklı DOP ile alt küme seçimi, hücre önbelleği ve menzil geri dönüşü"""
+import itertools
+
+import numpy as np
+import pytest
+
+from services.anchor_selection import AnchorSelectionGrid, weighted_dop
+
+POSITIONS = [(0, 0), (20, 0), (20, 20), (0, 20), (10, -8), (28, 10)]
+
+
+def anchors(signal=None, coverage=None, status=None):
+    signal = signal or {}
+    coverage = coverage or {}
+    status = status or {}
+    return [{'id': f'ANC{i + 1:03d}', 'x': x, 'y': y, 'z': 0.0,
+             'status': status.get(i, 'online'), 'signal_strength': signal.get(i, 100),
+             'coverage_radius': coverage.get(i, 100.0)}
+            for i, (x, y) in enumerate(POSITIONS)]
+
+
+def cell_center(grid, position):
+    origin_x, origin_y, _, _, _ = grid._grid
+    ix = (position[0] - origin_x) // grid.cell_size
+    iy = (position[1] - origin_y) // grid.cell_size
+    return np.array([origin_x + (ix + 0.5) * grid.cell_size, origin_y + (iy + 0.5) * grid.cell_size])
+
+
+def best_subset(anchor_list, point, size):
+    """Kaba kuvvet: tüm alt kümeler arasında en küçük ağırlıklı DOP"""
+    def dop(subset):
+        xy = np.array([[a['x'], a['y']] for a in subset], dtype=float)
+        w = np.array([a['signal_strength'] / 100.0 for a in subset])
+        return weighted_dop(point[None], xy[None], w[None])[0]
+    best = min(itertools.combinations(anchor_list, size), key=dop)
+    return tuple(sorted(a['id'] for a in best))
+
+
+def test_weighted_dop_matches_inverse_normal_matrix():
+    rng = np.random.default_rng(3)
+    for dimensions in (2, 3):
+        point = rng.uniform(-5, 5, (1, dimensions))
+        positions = rng.uniform(-20, 20, (1, 5, dimensions))
+        weights = rng.uniform(0.2, 1.0, (1, 5))
+        unit = (point[:, None] - positions)[0]
+        unit /= np.linalg.norm(unit, axis=1, keepdims=True)
+        expected = np.sqrt(np.trace(np.linalg.inv(unit.T @ np.diag(weights[0]) @ unit)))
+        assert weighted_dop(point, positions, weights)[0] == pytest.approx(expected)
+
+
+def test_collinear_subset_is_singular():
+    positions = np.array([[[0.0, 0.0], [10.0, 0.0], [20.0, 0.0]]])
+    assert np.isinf(weighted_dop(np.array([[5.0, 0.0]]), positions, np.ones((1, 3))))
+
+
+@pytest.mark.parametrize('signal', [{}, {0: 10, 2: 10}])
+def test_selects_subset_with_lowest_weighted_dop(signal):
+    anchor_list = anchors(signal=signal)
+    grid = AnchorSelectionGrid(cell_size=5.0, candidates=6)
+    grid.rebuild(anchor_list)
+    position = (9.0, 11.0)
+    subset = grid.select(position, {a['id'] for a in anchor_list})
+    assert subset == best_subset(anchor_list, cell_center(grid, position), grid.subset_size)
+
+
+def test_weak_signal_changes_selected_subset():
+    ids = {a['id'] for a in anchors()}
+    strong = AnchorSelectionGrid(candidates=6)
+    strong.rebuild(anchors())
+    weak = AnchorSelectionGrid(candidates=6)
+    weak.rebuild(anchors(signal={0: 10, 2: 10}))
+    assert strong.select((9.0, 11.0), ids) != weak.select((9.0, 11.0), ids)
+
+
+def test_positions_in_same_cell_share_cached_subsets():
+    grid = AnchorSelectionGrid(cell_size=5.0)
+    grid.rebuild(anchors())
+    ids = {a['id'] for a in anchors()}
+    center = cell_center(grid, (12.0, 12.0))
+    first = grid.select(center - 2.4, ids)
+    second = grid.select(center + 2.4, ids)  # Aynı 5 m hücre
+    assert first is second
+    stats = grid.get_statistics()
+    assert stats['rebuilds'] == 1
+    assert stats['lookups'] == stats['selected'] == 2
+
+
+def test_unavailable_anchor_falls_through_to_next_ranked_subset():
+    grid = AnchorSelectionGrid(cell_size=5.0)
+    grid.rebuild(anchors())
+    ids = {a['id'] for a in anchors()}
+    best = grid.select((9.0, 11.0), ids)
+    missing = best[0]
+    fallback = grid.select((9.0, 11.0), ids - {missing})
+    assert fallback is not None and missing not in fallback
+    # Hiçbir saklı alt küme geçerli değilse None
+    assert grid.select((9.0, 11.0), {best[0], best[1]}) is None
+
+
+def test_fewer_anchors_in_range_than_subset_size_uses_smaller_subset():
+    # Sağ üst köşeye yalnızca ANC002, ANC003, ANC006 erişir
+    coverage = {0: 15.0, 1: 30.0, 2: 30.0, 3: 15.0, 4: 15.0, 5: 30.0}
+    grid = AnchorSelectionGrid(cell_size=5.0)
+    grid.rebuild(anchors(coverage=coverage))
+    subset = grid.select((22.0, 14.0), {a['id'] for a in anchors()})
+    assert grid.subset_size == 4
+    assert subset == ('ANC002', 'ANC003', 'ANC006')
+
+
+def test_cells_with_fewer_than_three_anchors_in_range_have_no_subset():
+    grid = AnchorSelectionGrid(cell_size=5.0)
+    grid.rebuild(anchors(coverage={i: 12.0 for i in range(len(POSITIONS))}))
+    ids = {a['id'] for a in anchors()}
+    assert grid.select((-15.0, -15.0), ids) is None
+    assert grid.select((1000.0, 0.0), ids) is None  # Izgara dışı
+
+
+def test_offline_anchors_are_excluded_and_too_few_disable_grid():
+    grid = AnchorSelectionGrid()
+    grid.rebuild(anchors(status={0: 'offline'}))
+    ids = {a['id'] for a in anchors()}
+    assert 'ANC001' not in grid.select((9.0, 11.0), ids)
+
+    grid.rebuild(anchors(status={i: 'offline' for i in range(4)}))
+    assert not grid.ready
+    assert grid.select((9.0, 11.0), ids) is None
+
+
+def test_async_rebuild_replaces_grid():
+    grid = AnchorSelectionGrid()
+    grid.rebuild(anchors())
+    ids = {a['id'] for a in anchors()}
+    grid.rebuild_async(anchors(status={0: 'offline'}))
+    assert grid.wait(5.0)
+    assert 'ANC001' not in grid.select((9.0, 11.0), ids)
+    assert grid.get_statistics()['rebuilds'] == 2
@@ -0,0 +1,73 @@
+"""Binary range report - kodlama / çözme ve akış ayırma"""
+import numpy as np
+import pytest
+
+from services.binary_protocol import (HEADER, RECORD_DTYPE, BinaryReportFramer, ProtocolError,
+                                      decode_report, encode_report, id_to_number)
+from services.stream_framing import FrameTooLargeError
+
+RECORDS = [(1, 1500, -60, 1_700_000_000_000), (42, 23_250, -87, 1_700_000_000_050)]
+
+
+def test_round_trip():
+    frame = encode_report(7, RECORDS, sequence=123)
+    assert len(frame) == HEADER.size + len(RECORDS) * RECORD_DTYPE.itemsize
+    report = decode_report(frame)
+    assert report.anchor_id == 'ANC007'
+    assert report.sequence == 123
+    assert report.records.tolist() == RECORDS
+
+
+def test_round_trip_from_structured_array_and_empty_report():
+    records = np.array(RECORDS, dtype=RECORD_DTYPE)
+    assert np.array_equal(decode_report(encode_report(1, records)).records, records)
+    assert decode_report(encode_report(1, [])).records.size == 0
+
+
+def test_sequence_wraps_to_u32():
+    assert decode_report(encode_report(1, RECORDS, sequence=2 ** 32 + 5)).sequence == 5
+
+
+def test_copy_detaches_records_from_buffer():
+    buffer = bytearray(encode_report(1, RECORDS))
+    view = decode_report(memoryview(buffer)).records
+    copied = decode_report(memoryview(buffer), copy=True).records
+    buffer[HEADER.size:HEADER.size + 4] = b'\xff\xff\xff\xff'
+    assert view['tag'][0] == 0xFFFFFFFF
+    assert copied['tag'][0] == 1
+
+
+@pytest.mark.parametrize('frame', [
+    b'MT',
+    b'XX' + encode_report(1, RECORDS)[2:],
+    encode_report(1, RECORDS)[:-1],
+])
+def test_invalid_frames_are_rejected(frame):
+    with pytest.raises(ProtocolError):
+        decode_report(frame)
+
+
+def test_id_to_number():
+    assert id_to_number('ANC001') == 1
+    assert id_to_number('TAG042') == 42
+
+
+def test_framer_splits_stream_and_resyncs():
+    frames = [encode_report(i, RECORDS[:i % 2 + 1], sequence=i) for i in range(1, 6)]
+    stream = b'garbage' + frames[0] + frames[1] + b'\x00noise' + b''.join(frames[2:])
+    framer = BinaryReportFramer()
+    decoded = []
+    for i in range(0, len(stream), 5):
+        decoded.extend(decode_report(frame, copy=True) for frame in framer.feed(stream[i:i + 5]))
+    assert [report.sequence for report in decoded] == [1, 2, 3, 4, 5]
+    assert decoded[0].records.tolist() == RECORDS
+    assert framer.resyncs > 0
+
+
+def test_framer_oversized_report_keeps_completed_frames():
+    framer = BinaryReportFramer(max_frame_size=HEADER.size + 4 * RECORD_DTYPE.itemsize)
+    small = encode_report(1, RECORDS, sequence=1)
+    large = encode_report(2, RECORDS * 3, sequence=2)
+    with pytest.raises(FrameTooLargeError) as error:
+        framer.feed(small + large)
+    assert [decode_report(frame).sequence for frame in error.value.frames] == [1]
@@ -0,0 +1,134 @@
+"""Entity model ve registry - slot yeniden kullanımı, sözlük görünümü ve tür dönüşümleri"""
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from services.entity_model import Anchor, EntityColumns, LocationView, Person, Tag
+from services.entity_registry import EntityRegistry
+
+
+def person(person_id, tag_id=None, **fields):
+    return {'id': person_id, 'full_name': f'Personel {person_id}', 'tag_id': tag_id,
+            'location': {'x': 1.0, 'y': 2.0, 'z': 3.0}, 'battery': 80, **fields}
+
+
+def test_columns_reuse_smallest_free_slot_and_grow():
+    columns = EntityColumns({'value': ('float', 1)}, capacity=2)
+    first, second = columns.allocate(), columns.allocate()
+    assert (first, second) == (0, 1)
+    third = columns.allocate()
+    assert columns.capacity == 4 and third == 2
+    columns.arrays['value'][first] = 5.0
+    columns.release(first)
+    assert columns.allocate() == first
+    assert columns.arrays['value'][first] == 0.0  # Yeniden verilen slot sıfırlanır
+    assert columns.live_slots().tolist() == [0, 1, 2]
+
+
+def test_released_record_keeps_its_own_values():
+    registry = EntityRegistry()
+    old = registry.add_person(person('P1', battery=40))
+    location = old['location']
+    registry.remove_person('P1')
+    new = registry.add_person(person('P2', battery=90, location={'x': 9.0, 'y': 9.0, 'z': 9.0}))
+    assert new.slot == 0  # Serbest bırakılan slot hemen yeniden kullanıldı
+
+    # Eski kaydı tutan ekran yeni personelin verisini görmez ve bozmaz
+    assert old['battery'] == 40
+    assert location.copy() == {'x': 1.0, 'y': 2.0, 'z': 3.0}
+    old['battery'] = 5
+    location['x'] = -1.0
+    assert new['battery'] == 90
+    assert new.get_location() == (9.0, 9.0, 9.0)
+
+
+def test_set_anchors_detaches_previous_records():
+    registry = EntityRegistry()
+    registry.set_anchors([{'id': 'ANC001', 'x': 1, 'y': 2, 'z': 3, 'battery': 70}])
+    previous = registry.get_anchor('ANC001')
+    registry.set_anchors([{'id': 'ANC009', 'x': 7, 'y': 8, 'z': 9, 'battery': 99}])
+    assert (previous['x'], previous['battery']) == (1, 70)
+    assert registry.get_anchor('ANC009')['x'] == 7
+    assert registry.get_anchor('ANC001') is None
+    assert registry.anchor_columns.column('battery').tolist() == [99]
+
+
+def test_record_behaves_like_a_mutable_mapping():
+    tag = Tag(Tag.create_columns(), {'id': 'TAG001', 'battery': 77, 'status': 'active'})
+    assert tag['id'] == 'TAG001' and tag.get('person_id') is None
+    assert 'battery' in tag and 'missing' not in tag
+    tag['custom'] = 'ekran alanı'
+    assert dict(tag)['custom'] == 'ekran alanı'
+    assert len(tag) == len(list(tag))
+    del tag['custom']
+    with pytest.raises(KeyError):
+        tag['custom']
+    with pytest.raises(TypeError):
+        del tag['battery']
+    tag.update({'status': 'inactive', 'battery': 12})
+    assert (tag['status'], tag['battery']) == ('inactive', 12)
+    assert tag.copy()['battery'] == 12
+
+
+def test_location_view_is_live():
+    record = Person(Person.create_columns(), person('P1'))
+    view = record['location']
+    assert isinstance(view, LocationView)
+    record.set_location('location', (4.0, 5.0, 6.0))
+    assert dict(view) == {'x': 4.0, 'y': 5.0, 'z': 6.0}
+    record['location'] = {'x': 7.0, 'y': 8.0, 'z': 9.0}
+    assert view['z'] == 9.0
+    assert record.copy()['location'] == {'x': 7.0, 'y': 8.0, 'z': 9.0}
+
+
+@pytest.mark.parametrize('value, expected', [
+    (85, 85), (85.6, 85.6), (0, 0), (None, None), ('42', 42),
+])
+def test_telemetry_numbers_round_trip_without_truncation(value, expected):
+    record = Person(Person.create_columns(), {'id': 'P1', 'battery': value, 'heart_rate': value})
+    assert record['battery'] == expected and record['heart_rate'] == expected
+    assert type(record['battery']) is type(expected)
+
+
+@pytest.mark.parametrize('value', [
+    datetime(2024, 5, 1, 12, 30, 15),
+    '2024-05-01T12:30:15',
+    '2024-05-01 12:30:15',
+    datetime(2024, 5, 1, 12, 30, 15).timestamp(),
+])
+def test_time_fields_accept_datetime_iso_text_and_epoch(value):
+    record = Tag(Tag.create_columns(), {'id': 'TAG001', 'last_seen': value})
+    assert record['last_seen'] == datetime(2024, 5, 1, 12, 30, 15)
+
+
+def test_time_fields_with_timezone_and_none():
+    record = Anchor(Anchor.create_columns(), {'id': 'ANC001'})
+    record['last_maintenance'] = '2024-05-01'  # Sütun değil: olduğu gibi saklanır
+    assert record['last_maintenance'] == '2024-05-01'
+    tag = Tag(Tag.create_columns(), {'id': 'TAG001', 'last_seen': '2024-05-01T12:00:00Z'})
+    assert tag['last_seen'] == datetime(2024, 5, 1, 12, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    tag['last_seen'] = None
+    assert tag['last_seen'] is None
+    assert np.isnan(tag._columns.arrays['last_seen'][tag.slot])
+    with pytest.raises(ValueError):
+        tag['last_seen'] = 'dün'
+
+
+def test_registry_tag_person_links():
+    registry = EntityRegistry()
+    registry.add_person(person('P1', tag_id='TAG001'))  # Tag henüz kayıtlı değil
+    assert registry.person_for_tag('TAG001')['id'] == 'P1'
+    tag = registry.add_tag({'id': 'TAG001', 'person_id': 'P1'})
+    assert tag['person_name'] == 'Personel P1'
+    assert registry.tag_for_person('P1') is tag
+
+    registry.add_person(person('P2'))
+    registry.assign_tag('P2', 'TAG001')  # Tag P1'den P2'ye geçer
+    assert registry.person_for_tag('TAG001')['id'] == 'P2'
+    assert registry.get_person('P1')['tag_id'] is None
+    assert registry.tag_for_person('P1') is None
+
+    registry.remove_tag('TAG001')
+    assert registry.person_for_tag('TAG001') is None
+    assert registry.get_statistics() == {'anchors': 0, 'tags': 0, 'personnel': 2, 'assigned_tags': 0}
@@ -0,0 +1,65 @@
+"""Ingest metrikleri - shard sayaçları, kayan hızlar ve gecikme histogramı"""
+import pytest
+
+from services.binary_protocol import decode_report, encode_report
+from services.ingest_metrics import IngestMetrics, IngestShard, LatencyHistogram, RollingCounter
+from services.payload_decoder import MeasurementReport
+
+
+def test_rolling_counter_uses_completed_seconds_only():
+    counter = RollingCounter()
+    for second in range(100, 110):
+        counter.add(5, second)
+    counter.add(1000, 110)  # Yarım kalmış saniye
+    assert counter.rate(1, 110) == 5
+    assert counter.rate(10, 110) == 5
+    assert counter.rate(60, 110) == pytest.approx(50 / 60)
+
+
+def test_shard_records_each_payload_type():
+    shard = IngestShard('tcp')
+    shard.record(MeasurementReport('ANC001', 1, None, ['TAG001', 'TAG002'], [1.0, 2.0], [None, None]), 10.0)
+    shard.record(decode_report(encode_report(2, [(1, 1000, -60, 0)])), 10.0)
+    shard.record({'anchor_id': 'ANC003', 'measurements': [{}, {}, {}]}, 10.0)
+    assert shard.packets == 3
+    assert shard.measurements == 6
+    assert shard.anchor_rates_snapshot(window=1, now=11.0) == {'ANC001': 2.0, 'ANC002': 1.0, 'ANC003': 3.0}
+
+
+@pytest.mark.parametrize('payload, measurements', [
+    ({'anchor_id': 'ANC001', 'measurements': 5}, 0),
+    ({'anchor_id': {'id': 1}, 'measurements': [{}]}, 1),
+    ({'anchor_id': ['ANC001'], 'measurements': 'abc'}, 0),
+    ([1, 2, 3], 0),
+])
+def test_malformed_payload_is_counted_without_raising(payload, measurements):
+    shard = IngestShard('udp')
+    shard.record(payload, 10.0)
+    assert shard.packets == 1
+    assert shard.measurements == measurements
+    assert all(isinstance(anchor_id, str) for anchor_id in shard.anchor_rates)
+
+
+def test_latency_percentiles_within_bucket_error():
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.record(i / 1000.0)  # 1 ms - 1 s
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.04)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.04)
+    assert histogram.snapshot()['max'] == pytest.approx(1.0)
+    histogram.reset()
+    assert histogram.percentile(50) == 0.0
+
+
+def test_snapshot_sums_shards():
+    metrics = IngestMetrics()
+    assert metrics.shard('tcp') is metrics.shard('tcp')
+    metrics.shard('tcp').record_packet('ANC001', 2, now=5.0)
+    metrics.shard('udp').record_packet('ANC001', 3, now=5.0)
+    metrics.shard('udp').add_bytes(100)
+    snapshot = metrics.snapshot(now=6.0)
+    assert snapshot['packets'] == 2
+    assert snapshot['measurements'] == 5
+    assert snapshot['bytes'] == 100
+    assert snapshot['rate_1s'] == 2.0
+    assert snapshot['anchor_rates']['ANC001'] == pytest.approx(0.5)
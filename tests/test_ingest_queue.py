@@ -0,0 +1,144 @@
+"""BoundedIngestQueue - taşma politikaları, (anchor, tag) birleştirme ve SOS kuyruğu"""
+import pytest
+
+from services.binary_protocol import decode_report, encode_report
+from services.ingest_queue import BoundedIngestQueue, without_tags
+from services.payload_decoder import MeasurementReport
+
+
+def report(anchor_id, sequence, tags, distance=1.0):
+    return MeasurementReport(anchor_id, sequence, None, list(tags), [distance] * len(tags), [None] * len(tags))
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedIngestQueue(policy='fifo')
+
+
+def test_drop_oldest_evicts_oldest_packet_when_full():
+    queue = BoundedIngestQueue(capacity=2, policy='drop_oldest')
+    queue.put(report('ANC001', 1, ['TAG001']), 1.0)
+    queue.put(report('ANC002', 1, ['TAG002']), 2.0)
+    queue.put(report('ANC003', 1, ['TAG003']), 3.0)
+    payloads, received_at = queue.take_batch(with_timestamps=True)
+    assert [p.anchor_id for p in payloads] == ['ANC002', 'ANC003']
+    assert received_at == [2.0, 3.0]
+    assert queue.get_statistics()['dropped_oldest'] == 1
+
+
+def test_drop_oldest_prefers_same_pair():
+    queue = BoundedIngestQueue(capacity=2, policy='drop_oldest')
+    queue.put(report('ANC001', 1, ['TAG001']), 1.0)
+    queue.put(report('ANC002', 1, ['TAG002']), 2.0)
+    queue.put(report('ANC002', 2, ['TAG002']), 3.0)
+    payloads = queue.take_batch()
+    assert [(p.anchor_id, p.sequence) for p in payloads] == [('ANC001', 1), ('ANC002', 2)]
+    assert queue.get_statistics()['dropped_oldest'] == 0
+
+
+def test_drop_oldest_keeps_other_tags_of_multi_tag_packet():
+    queue = BoundedIngestQueue(capacity=2, policy='drop_oldest')
+    queue.put(report('ANC001', 1, ['TAG001', 'TAG002', 'TAG003']), 1.0)
+    queue.put(report('ANC002', 1, ['TAG009']), 2.0)
+    queue.put(report('ANC002', 2, ['TAG009']), 3.0)
+    queue.put(report('ANC001', 2, ['TAG001', 'TAG002', 'TAG003']), 4.0)
+    payloads = queue.take_batch()
+    assert [(p.anchor_id, p.sequence) for p in payloads] == [('ANC002', 2), ('ANC001', 2)]
+
+
+def test_latest_replaces_pending_measurement_per_pair():
+    queue = BoundedIngestQueue(capacity=10, policy='latest')
+    queue.put(report('ANC001', 1, ['TAG001', 'TAG002', 'TAG003'], 1.0), 1.0)
+    queue.put(report('ANC001', 2, ['TAG001'], 2.0), 2.0)
+    payloads, received_at = queue.take_batch(with_timestamps=True)
+    # TAG001'in eski ölçümü çıkarıldı; TAG002 / TAG003 kaldı
+    assert [(p.sequence, p.tag_ids) for p in payloads] == [(1, ['TAG002', 'TAG003']), (2, ['TAG001'])]
+    assert received_at == [1.0, 2.0]
+    assert queue.get_statistics()['coalesced'] == 1
+
+
+def test_latest_same_tag_set_updates_in_place_with_new_timestamp():
+    queue = BoundedIngestQueue(capacity=10, policy='latest')
+    queue.put(report('ANC001', 1, ['TAG001', 'TAG002']), 1.0)
+    queue.put(report('ANC002', 1, ['TAG001']), 1.5)
+    queue.put(report('ANC001', 2, ['TAG002', 'TAG001']), 2.0)
+    payloads, received_at = queue.take_batch(with_timestamps=True)
+    assert [(p.anchor_id, p.sequence) for p in payloads] == [('ANC001', 2), ('ANC002', 1)]
+    assert received_at == [2.0, 1.5]
+    assert len(queue) == 0
+
+
+def test_latest_coalesces_binary_reports_per_tag():
+    queue = BoundedIngestQueue(capacity=10, policy='latest')
+    queue.put(decode_report(encode_report(1, [(1, 1000, -60, 0), (2, 2000, -61, 0)], sequence=1)), 1.0)
+    queue.put(decode_report(encode_report(1, [(2, 2500, -62, 0)], sequence=2)), 2.0)
+    first, second = queue.take_batch()
+    assert first.records['tag'].tolist() == [1]
+    assert second.records['distance_mm'].tolist() == [2500]
+
+
+def test_pause_policy_never_drops_and_signals_pause():
+    queue = BoundedIngestQueue(capacity=2, policy='pause')
+    assert queue.put(report('ANC001', 1, ['TAG001'])) is False
+    assert queue.put(report('ANC001', 2, ['TAG001'])) is False
+    assert queue.put(report('ANC001', 3, ['TAG001'])) is True
+    assert queue.paused
+    assert [p.sequence for p in queue.take_batch()] == [1, 2, 3]
+    assert not queue.paused
+    stats = queue.get_statistics()
+    assert stats['pause_count'] == 1
+    assert stats['dropped_oldest'] == stats['coalesced'] == 0
+
+
+@pytest.mark.parametrize('policy', ['drop_oldest', 'latest', 'pause'])
+def test_sos_payloads_bypass_capacity_and_come_first(policy):
+    queue = BoundedIngestQueue(capacity=1, policy=policy)
+    queue.put(report('ANC001', 1, ['TAG001']), 1.0)
+    queue.put(report('ANC001', 2, ['TAG001']), 2.0)
+    alarm = {'anchor_id': 'ANC001', 'type': 'SOS', 'tag_id': 'TAG001'}
+    flagged = {'anchor_id': 'ANC001', 'measurements': [{'tag_id': 'TAG001', 'distance': 1, 'sos': 'true'}]}
+    queue.put(alarm, 3.0)
+    queue.put(flagged, 4.0)
+    payloads = queue.take_batch()
+    assert payloads[:2] == [alarm, flagged]
+    assert queue.get_statistics()['priority'] == 2
+
+
+def test_false_string_flag_is_not_priority():
+    queue = BoundedIngestQueue(capacity=1, policy='drop_oldest')
+    queue.put({'anchor_id': 'ANC001', 'sos': 'false', 'measurements': []})
+    assert queue.get_statistics()['priority'] == 0
+
+
+def test_batch_is_due_by_size_or_delay():
+    queue = BoundedIngestQueue(capacity=100, max_batch_size=3, max_delay_ms=25)
+    assert not queue.is_due(now=0.0)
+    queue.put(report('ANC001', 1, ['TAG001']), 0.0)
+    assert not queue.is_due(now=0.01)
+    assert queue.time_until_due(now=0.01) == pytest.approx(0.015)
+    assert queue.is_due(now=0.03)
+    queue.put(report('ANC002', 1, ['TAG001']), 0.0)
+    queue.put(report('ANC003', 1, ['TAG001']), 0.0)
+    assert queue.is_due(now=0.0)
+
+
+def test_without_tags_keeps_remaining_measurements():
+    payload = {'anchor_id': 'ANC001', 'measurements': [{'tag_id': 'TAG001'}, {'tag_id': 'TAG002'}]}
+    assert without_tags(payload, {'TAG001'})['measurements'] == [{'tag_id': 'TAG002'}]
+    assert without_tags(report('ANC001', 1, ['TAG001', 'TAG002']), {'TAG002'}).tag_ids == ['TAG001']
+
+
+@pytest.mark.parametrize('policy', ['drop_oldest', 'latest'])
+@pytest.mark.parametrize('payload', [
+    {'anchor_id': 'ANC001', 'measurements': [{'tag_id': {}}]},
+    {'anchor_id': ['ANC001'], 'measurements': [{'tag_id': 'TAG001'}]},
+    {'anchor_id': 'ANC001', 'measurements': 5},
+    {'measurements': [{'tag_id': 'TAG001', 'sos': {}}]},
+])
+def test_malformed_passthrough_payload_is_kept_without_key(policy, payload):
+    queue = BoundedIngestQueue(capacity=2, policy=policy)
+    queue.put(report('ANC001', 1, ['TAG001']), 1.0)
+    queue.put(payload, 2.0)
+    queue.put(dict(payload), 3.0)
+    assert queue.take_batch() == [payload, payload]
+    assert queue.get_statistics()['priority'] == 0
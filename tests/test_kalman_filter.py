@@ -0,0 +1,59 @@
+"""KalmanFilterBank - tek filtreli KalmanFilter2D / 3D ile aynı sonuçlar"""
+import numpy as np
+import pytest
+
+from services.kalman_filter import KalmanFilter2D, KalmanFilter3D, KalmanFilterBank
+
+
+@pytest.mark.parametrize('filter_class', [KalmanFilter2D, KalmanFilter3D])
+def test_bank_matches_individual_filters(filter_class):
+    dim = filter_class.dim
+    rng = np.random.default_rng(7)
+    tags = [f'TAG{i:03d}' for i in range(5)]
+    starts = rng.uniform(0, 50, size=(len(tags), dim))
+
+    bank = KalmanFilterBank(dim=dim, process_variance=0.05, measurement_variance=0.4, capacity=2)
+    filters = {}
+    for tag_id, start in zip(tags, starts):
+        bank.add(tag_id, start, timestamp=0.0)
+        filters[tag_id] = filter_class(process_variance=0.05, measurement_variance=0.4,
+                                       initial_value=tuple(start), timestamp=0.0)
+    assert bank.capacity >= len(tags)
+
+    clock = np.zeros(len(tags))
+    for _ in range(30):
+        # Düzensiz aralıklar ve her adımda farklı tag alt kümesi
+        chosen = np.flatnonzero(rng.random(len(tags)) < 0.7)
+        if not len(chosen):
+            continue
+        clock[chosen] += rng.uniform(0.05, 0.5, size=len(chosen))
+        measurements = starts[chosen] + rng.normal(0, 1, size=(len(chosen), dim))
+        ids = [tags[i] for i in chosen]
+        filtered = bank.update(ids, measurements, clock[chosen])
+        expected = [filters[tag_id].update(tuple(m), t) for tag_id, m, t in zip(ids, measurements, clock[chosen])]
+        np.testing.assert_allclose(filtered, expected, rtol=1e-9, atol=1e-9)
+
+    for tag_id in tags:
+        slot = bank.slots([tag_id])[0]
+        np.testing.assert_allclose(bank.state[slot], filters[tag_id].state, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(bank.P[slot], filters[tag_id].P, rtol=1e-9, atol=1e-9)
+
+
+def test_bank_reuses_removed_slots():
+    bank = KalmanFilterBank(capacity=2)
+    bank.add('TAG001', (1.0, 1.0))
+    bank.add('TAG002', (2.0, 2.0))
+    slot = bank.slots(['TAG001'])[0]
+    bank.remove('TAG001')
+    bank.add('TAG003', (3.0, 3.0))
+    assert bank.slots(['TAG003'])[0] == slot
+    assert bank.capacity == 2
+    assert bank.get_position('TAG003') == (3.0, 3.0)
+
+
+def test_out_of_order_timestamp_does_not_predict_backwards():
+    bank = KalmanFilterBank()
+    bank.add('TAG001', (0.0, 0.0), timestamp=10.0)
+    single = KalmanFilter2D(initial_value=(0.0, 0.0), timestamp=10.0)
+    np.testing.assert_allclose(bank.update(['TAG001'], [[1.0, 1.0]], 9.0)[0], single.update((1.0, 1.0), 9.0))
+    assert bank.last_timestamp[bank.slots(['TAG001'])[0]] == 10.0
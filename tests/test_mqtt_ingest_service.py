@@ -0,0 +1,110 @@
+"""MQTTIngestService - süreç içi LocalBroker ile abonelik, birleştirme ve yeniden bağlanma"""
+import json
+import time
+
+import pytest
+
+from services.mqtt_ingest_service import LocalBroker, MQTTIngestService, topic_matches
+
+
+def report(anchor_id, *measurements, **extra):
+    return json.dumps({'anchor_id': anchor_id, **extra,
+                       'measurements': [{'tag_id': tag_id, 'distance': distance}
+                                        for tag_id, distance in measurements]})
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Koşul zaman aşımında sağlanmadı")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def broker():
+    return LocalBroker()
+
+
+@pytest.fixture
+def service(broker):
+    service = MQTTIngestService(client_factory=broker.client, batch_interval_ms=200,
+                                reconnect_delay=0.01)
+    service.start()
+    wait_until(lambda: service.connected)
+    yield service
+    service.stop()
+    service.wait(5000)
+
+
+@pytest.mark.parametrize('pattern, topic, expected', [
+    ('minetracker/+/ranges', 'minetracker/GW01/ranges', True),
+    ('minetracker/+/ranges', 'minetracker/GW01/alerts', False),
+    ('minetracker/+/ranges', 'minetracker/GW01/ranges/raw', False),
+    ('minetracker/#', 'minetracker/GW01/ranges/raw', True),
+    ('minetracker/GW01/ranges', 'minetracker/GW01/ranges', True),
+    ('+/+', 'minetracker', False),
+])
+def test_topic_matches(pattern, topic, expected):
+    assert topic_matches(pattern, topic) is expected
+
+
+def test_wildcard_subscriptions_receive_matching_topics_only(broker, service):
+    assert broker.publish('minetracker/GW01/ranges', report('ANC001', ('TAG001', 1.0))) == 1
+    assert broker.publish('minetracker/GW02/alerts', json.dumps({'type': 'sos', 'tag_id': 'TAG002'})) == 1
+    assert broker.publish('minetracker/GW01/ranges/raw', report('ANC003', ('TAG003', 3.0))) == 0
+    assert broker.publish('other/GW01/ranges', report('ANC004', ('TAG004', 4.0))) == 0
+    wait_until(lambda: service.total_messages == 2)
+
+    batch = service.take_batch()
+    assert batch[0] == {'type': 'sos', 'tag_id': 'TAG002'}  # Öncelik kuyruğu önce
+    assert [(p.anchor_id, p.tag_ids) for p in batch[1:]] == [('ANC001', ['TAG001'])]
+
+
+def test_latest_reading_per_anchor_and_tag_wins(broker, service):
+    broker.publish('minetracker/GW01/ranges', report('ANC001', ('TAG001', 1.0), ('TAG002', 2.0)))
+    broker.publish('minetracker/GW01/ranges', report('ANC001', ('TAG001', 1.5)))
+    broker.publish('minetracker/GW01/ranges', report('ANC001', ('TAG001', 1.7)))
+    broker.publish('minetracker/GW02/ranges', report('ANC002', ('TAG001', 9.0)))
+    wait_until(lambda: service.total_messages == 4)
+
+    readings = {(p.anchor_id, p.tag_ids[0]): p.distances[0] for p in service.take_batch()}
+    assert readings == {('ANC001', 'TAG001'): 1.7, ('ANC001', 'TAG002'): 2.0, ('ANC002', 'TAG001'): 9.0}
+    assert service.get_statistics()['coalesced'] == 2
+
+
+def test_retained_reading_is_delivered_on_subscribe(broker):
+    broker.publish('minetracker/GW01/ranges', report('ANC001', ('TAG001', 4.0)), retain=True)
+    broker.publish('minetracker/GW01/ranges', report('ANC001', ('TAG001', 4.5)), retain=True)
+    service = MQTTIngestService(client_factory=broker.client, batch_interval_ms=200)
+    service.start()
+    try:
+        wait_until(lambda: service.total_messages == 1)
+        assert [p.distances for p in service.take_batch()] == [[4.5]]
+    finally:
+        service.stop()
+        service.wait(5000)
+
+
+def test_reconnect_resubscribes_and_coalesces_redelivered_retained(broker, service):
+    topic = 'minetracker/GW01/ranges'
+    broker.publish(topic, report('ANC001', ('TAG001', 2.0)), retain=True)
+    wait_until(lambda: service.total_messages == 1)
+
+    broker.disconnect_all()
+    wait_until(lambda: service.reconnects == 1 and service.connected)
+    # Yeniden abonelikte saklı mesaj tekrar gelir; bekleyen okumayla birleşir
+    wait_until(lambda: service.total_messages == 2)
+    assert broker.publish(topic, report('ANC001', ('TAG001', 2.5))) == 1
+    wait_until(lambda: service.total_messages == 3)
+
+    assert [p.distances for p in service.take_batch()] == [[2.5]]
+    stats = service.get_statistics()
+    assert stats['reconnects'] == 1
+    assert stats['coalesced'] == 2
+
+
+def test_empty_retained_message_clears_topic(broker):
+    broker.publish('minetracker/GW01/ranges', report('ANC001', ('TAG001', 4.0)), retain=True)
+    broker.publish('minetracker/GW01/ranges', b'', retain=True)
+    assert broker.retained == {}
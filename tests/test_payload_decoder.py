@@ -0,0 +1,55 @@
+"""Ölçüm çözme - katı bayraklar, alan önceliği ve iki sütun yolunun eşdeğerliği"""
+import pytest
+
+from services.payload_decoder import is_flag_set, is_priority_payload, plain_columns, schema_columns
+from utils.validators import ValidationError, to_bool
+
+
+@pytest.mark.parametrize('value, expected', [
+    (True, True), (False, False), (1, True), (0, False),
+    ('true', True), (' Yes ', True), ('ON', True), ('1', True),
+    ('false', False), ('No', False), ('off', False), ('0', False),
+])
+def test_to_bool_accepts_known_values(value, expected):
+    assert to_bool(value) is expected
+
+
+@pytest.mark.parametrize('value', ['', 'maybe', 2, -1, 1.5, None, [], {}])
+def test_to_bool_rejects_everything_else(value):
+    with pytest.raises(ValidationError):
+        to_bool(value)
+
+
+def test_flags_are_read_strictly():
+    assert is_flag_set('true') and is_flag_set(1)
+    assert not is_flag_set('false') and not is_flag_set('garbage') and not is_flag_set(None)
+    assert is_priority_payload({'emergency': 'yes'})
+    assert not is_priority_payload({'sos': 'false', 'measurements': [{'sos': '0'}]})
+
+
+def test_nested_distance_takes_precedence():
+    measurements = [
+        {'tag_id': 'TAG001', 'distance(m)': {'distance': 4.5}, 'distance': 9.0},
+        {'tag_id': 'TAG002', 'distance': 3.0, 'distance_m': 7.0},
+        {'tag_id': 'TAG003', 'distance_m': 2.0},
+    ]
+    for columns in (schema_columns, plain_columns):
+        tag_ids, distances, _, invalid = columns(measurements)
+        assert tag_ids == ['TAG001', 'TAG002', 'TAG003']
+        assert distances == [4.5, 3.0, 2.0]
+        assert invalid == 0
+
+
+def test_plain_and_schema_columns_agree():
+    measurements = [
+        {'tag_id': 'TAG001', 'distance': '1.25', 'rssi': -70},
+        {'tag_id': 7, 'distance': 2, 'rssi': 'weak'},
+        {'tag_id': 'TAG003', 'distance': -1},
+        {'tag_id': None, 'distance': 1},
+        {'tag': 'TAG005', 'distance': float('inf')},
+        {'distance': 3},
+        'not a measurement',
+    ]
+    assert plain_columns(measurements) == schema_columns(measurements)
+    assert plain_columns([{'tag_id': 'TAG001', 'distance': 1, 'sos': 'on'}]) is None
+    assert schema_columns([{'tag_id': 'TAG001', 'distance': 1, 'sos': 'on'}]) is None
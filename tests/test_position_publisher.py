@@ -0,0 +1,188 @@
+"""PositionPublisherService - sürümlü delta, snapshot ile yeniden eşitleme, ortak çerçeve ve yavaş istemci"""
+import asyncio
+import json
+
+import pytest
+
+from services.position_publisher import PositionPublisherService, _Subscriber
+
+
+class FakeTransport:
+    def __init__(self, buffered=0):
+        self.buffered = buffered
+        self.aborted = False
+
+    def is_closing(self):
+        return self.aborted
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def abort(self):
+        self.aborted = True
+
+
+class FakeConnection:
+    def __init__(self, buffered=0):
+        self.transport = FakeTransport(buffered)
+        self.sent = []
+
+    async def send(self, frame):
+        self.sent.append(json.loads(frame))
+
+
+def subscriber(buffered=0):
+    return _Subscriber(FakeConnection(buffered), 'test')
+
+
+def publish(service, tag_id, x, accuracy=0.5):
+    service.publish({'tag_id': tag_id, 'final': (x, 2.0, 0.0), 'accuracy': accuracy, 'person_id': None})
+
+
+def run_ticks(service, count=1):
+    async def ticks():
+        for _ in range(count):
+            service._tick()
+        await asyncio.sleep(0)  # Kuyruklanan _send'ler çalışsın
+    asyncio.run(ticks())
+
+
+def test_advance_state_versions_only_real_changes():
+    service = PositionPublisherService()
+    publish(service, 'TAG001', 1.0)
+    publish(service, 'TAG002', 5.0)
+    service._advance_state()
+    assert service.version == 1
+    # Yuvarlama altındaki titreşim değişiklik değildir
+    publish(service, 'TAG001', 1.001)
+    publish(service, 'TAG002', 6.0)
+    service._advance_state()
+    assert service.version == 2
+    assert list(service._history) == [(1, ['TAG001', 'TAG002']), (2, ['TAG002'])]
+    service._advance_state()  # Bekleyen yok: sürüm artmaz
+    assert service.version == 2
+
+
+def test_changed_since_returns_delta_or_none_when_history_is_short():
+    service = PositionPublisherService(rate_hz=1.0, history_seconds=2.0)  # 2 tick geçmiş
+    for version, x in enumerate([1.0, 2.0, 3.0], start=1):
+        publish(service, f'TAG00{version}', x)
+        service._advance_state()
+    assert service._changed_since(3) == set()
+    assert service._changed_since(2) == {'TAG003'}
+    assert service._changed_since(1) == {'TAG002', 'TAG003'}
+    assert service._changed_since(0) is None  # Sürüm 1 geçmişten düştü
+
+
+def test_build_frame_applies_filter_and_skips_empty_delta():
+    service = PositionPublisherService()
+    publish(service, 'TAG001', 1.0)
+    publish(service, 'TAG002', 5.0)
+    service._advance_state()
+    snapshot = json.loads(service._build_frame('snapshot', None, frozenset({'TAG002'})))
+    assert snapshot['type'] == 'snapshot' and snapshot['version'] == 1
+    assert snapshot['positions'] == {'TAG002': [5.0, 2.0, 0.0, 0.5, None]}
+    delta = json.loads(service._build_frame('delta', {'TAG001'}, None))
+    assert list(delta['positions']) == ['TAG001']
+    assert service._build_frame('delta', {'TAG001'}, frozenset({'TAG002'})) is False
+
+
+def test_subscriber_gets_snapshot_then_deltas():
+    service = PositionPublisherService()
+    client = subscriber()
+    service.subscribers.add(client)
+    publish(service, 'TAG001', 1.0)
+    publish(service, 'TAG002', 5.0)
+    run_ticks(service)
+    publish(service, 'TAG002', 6.0)
+    run_ticks(service)
+    run_ticks(service)  # Değişiklik yok: çerçeve yok
+    frames = client.connection.sent
+    assert [frame['type'] for frame in frames] == ['snapshot', 'delta']
+    assert set(frames[0]['positions']) == {'TAG001', 'TAG002'}
+    assert frames[1]['positions'] == {'TAG002': [6.0, 2.0, 0.0, 0.5, None]}
+    assert client.version == service.version == 2
+
+
+def test_subscribers_at_same_version_and_filter_share_frame():
+    service = PositionPublisherService()
+    clients = [subscriber() for _ in range(3)]
+    service.subscribers.update(clients)
+    publish(service, 'TAG001', 1.0)
+    run_ticks(service)
+    publish(service, 'TAG001', 2.0)
+    run_ticks(service)
+    assert service.frames_shared == 4  # Tick başına 3 abone, 1 kodlama
+    assert service.frames_sent == 6
+    assert all(client.connection.sent == clients[0].connection.sent for client in clients)
+
+
+def test_slow_client_accumulates_delta_and_resyncs_with_snapshot():
+    service = PositionPublisherService(rate_hz=10.0, history_seconds=0.2, max_lag_seconds=60.0)
+    client = subscriber()
+    service.subscribers.add(client)
+    publish(service, 'TAG001', 1.0)
+    run_ticks(service)
+
+    client.connection.transport.buffered = service.write_limit + 1
+    for x in (2.0, 3.0):
+        publish(service, 'TAG001', x)
+        run_ticks(service)
+    assert service.skipped_busy == 2
+    assert len(client.connection.sent) == 1
+
+    # Tampon boşaldı; kaçırılan sürümler hâlâ geçmişte: birikmiş delta
+    client.connection.transport.buffered = 0
+    run_ticks(service)
+    assert client.connection.sent[-1]['type'] == 'delta'
+    assert client.connection.sent[-1]['positions']['TAG001'][0] == 3.0
+
+    client.connection.transport.buffered = service.write_limit + 1
+    for x in (4.0, 5.0, 6.0):
+        publish(service, 'TAG001', x)
+        run_ticks(service)
+    client.connection.transport.buffered = 0
+    run_ticks(service)
+    # Geçmiş (2 tick) aşıldı: tam snapshot
+    assert client.connection.sent[-1]['type'] == 'snapshot'
+    assert client.snapshots == 2
+
+
+def test_client_stuck_past_max_lag_is_disconnected(monkeypatch):
+    service = PositionPublisherService(max_lag_seconds=1.0)
+    client = subscriber(buffered=10 ** 9)
+    service.subscribers.add(client)
+    clock = iter([100.0, 100.5, 101.6])
+    monkeypatch.setattr('services.position_publisher.time.monotonic', lambda: next(clock))
+    # Dolu tamponlu aboneye çerçeve kuyruklanmaz; olay döngüsü gerekmez
+    service._tick()
+    service._tick()
+    assert not client.connection.transport.aborted
+    service._tick()
+    assert client.connection.transport.aborted
+    assert service.slow_disconnects == 1
+
+
+@pytest.mark.parametrize('tags, expected', [
+    (['TAG001', 'TAG002'], frozenset({'TAG001', 'TAG002'})),
+    (['TAG001', {'x': 1}, 7], frozenset({'TAG001'})),
+    (None, None),
+])
+def test_filter_request_sets_tag_set(tags, expected):
+    service = PositionPublisherService()
+    client = subscriber()
+    client.needs_snapshot = False
+    service._handle_request(client, json.dumps({'type': 'filter', 'tags': tags}))
+    assert client.tags == expected
+    assert client.needs_snapshot
+
+
+@pytest.mark.parametrize('tags', ['TAG001', 5, {'TAG001': True}])
+def test_filter_request_with_non_list_tags_is_ignored(tags):
+    service = PositionPublisherService()
+    client = subscriber()
+    client.tags = frozenset({'TAG009'})
+    client.needs_snapshot = False
+    service._handle_request(client, json.dumps({'type': 'filter', 'tags': tags}))
+    assert client.tags == frozenset({'TAG009'})
+    assert not client.needs_snapshot
@@ -0,0 +1,96 @@
+"""SequenceTracker - kayıp, tekrar, yeniden sıralama, taşma ve sıfırlama"""
+from services.udp_listener_service import SEQUENCE_MODULO, SequenceTracker
+
+
+def push_all(tracker, sequences, anchor_id='ANC001', start=0.0, step=0.02):
+    released = []
+    for index, sequence in enumerate(sequences):
+        released.extend(tracker.push(anchor_id, sequence, sequence, now=start + index * step))
+    return released
+
+
+def test_in_order_stream_is_released_immediately():
+    tracker = SequenceTracker()
+    assert push_all(tracker, range(10, 20)) == list(range(10, 20))
+    stats = tracker.get_statistics()
+    assert stats['received'] == 10
+    assert stats['lost'] == stats['duplicates'] == stats['reordered'] == stats['resets'] == 0
+
+
+def test_reordered_packet_is_held_until_gap_fills():
+    tracker = SequenceTracker(window=8)
+    assert push_all(tracker, [0, 1, 3, 4]) == [0, 1]
+    assert tracker.push('ANC001', 2, 2, now=0.1) == [2, 3, 4]
+    assert tracker.get_statistics()['reordered'] == 1
+    assert tracker.get_statistics()['lost'] == 0
+
+
+def test_gap_is_counted_lost_after_max_hold():
+    tracker = SequenceTracker(window=8, max_hold_ms=50)
+    assert push_all(tracker, [0, 1, 4, 5], step=0.001) == [0, 1]
+    assert tracker.expire(now=0.01) == []
+    assert tracker.expire(now=0.1) == [4, 5]
+    assert tracker.get_statistics()['lost'] == 2
+    assert tracker.get_statistics()['pending'] == 0
+
+
+def test_jump_beyond_window_skips_gap_without_waiting():
+    tracker = SequenceTracker(window=4)
+    assert push_all(tracker, [0, 10]) == [0, 10]
+    assert tracker.get_statistics()['lost'] == 9
+
+
+def test_duplicates_inside_window_are_dropped():
+    tracker = SequenceTracker(window=8)
+    push_all(tracker, [0, 1, 2, 4])
+    assert tracker.push('ANC001', 1, 1, now=0.1) == []  # Zaten teslim edildi
+    assert tracker.push('ANC001', 4, 4, now=0.1) == []  # Bekliyor
+    assert tracker.get_statistics()['duplicates'] == 2
+    assert tracker.get_statistics()['resets'] == 0
+
+
+def test_wraparound_is_continuous():
+    tracker = SequenceTracker()
+    sequences = [(SEQUENCE_MODULO - 3 + i) % SEQUENCE_MODULO for i in range(6)]
+    assert push_all(tracker, sequences) == sequences
+    stats = tracker.get_statistics()
+    assert stats['lost'] == stats['duplicates'] == stats['resets'] == 0
+
+
+def test_large_backward_jump_resets_stream():
+    """Anchor yeniden başladı: 100000+ ardından 0'dan başlayan sıra tekrar sayılmaz."""
+    tracker = SequenceTracker()
+    first = push_all(tracker, range(100000, 100200))
+    second = push_all(tracker, range(500), start=4.0)
+    assert first == list(range(100000, 100200))
+    assert second == list(range(500))
+    stats = tracker.get_statistics()
+    assert stats['resets'] == 1
+    assert stats['duplicates'] == 0
+    assert stats['lost'] == 0
+
+
+def test_reset_releases_pending_packets_in_order():
+    tracker = SequenceTracker(window=8)
+    assert push_all(tracker, [1000, 1002, 1003]) == [1000]
+    assert tracker.push('ANC001', 0, 0, now=1.0) == [1002, 1003, 0]
+    assert tracker.get_statistics()['resets'] == 1
+    assert tracker.push('ANC001', 1, 1, now=1.02) == [1]
+
+
+def test_idle_gap_resets_stream():
+    tracker = SequenceTracker(idle_reset_ms=2000)
+    push_all(tracker, range(50))
+    # 10 s sessizlikten sonra ileri sıçrama: kayıp değil, yeni akış
+    assert tracker.push('ANC001', 5000, 5000, now=11.0) == [5000]
+    stats = tracker.get_statistics()
+    assert stats['resets'] == 1
+    assert stats['lost'] == 0
+
+
+def test_anchors_are_tracked_independently():
+    tracker = SequenceTracker()
+    assert tracker.push('ANC001', 5, 'a5', now=0.0) == ['a5']
+    assert tracker.push('ANC002', 90, 'b90', now=0.0) == ['b90']
+    assert tracker.push('ANC001', 6, 'a6', now=0.01) == ['a6']
+    assert tracker.push('ANC002', 91, 'b91', now=0.01) == ['b91']
@@ -0,0 +1,154 @@
+"""Stream Capture - kayıt/okuma gidiş-dönüşü, yarım kayıt, çoklu oturum ve birleştirme"""
+import socket
+import threading
+
+import pytest
+
+from services import stream_capture
+from services.stream_capture import (FILE_HEADER, REC_CLOSE, REC_DATA, REC_OPEN, CaptureFormatError,
+                                     StreamRecorder, StreamReplayer, merge_captures, read_capture)
+
+
+class Clock:
+    """time.monotonic / time.time yerine elle ilerletilen saat"""
+
+    def __init__(self, wall=1000.0):
+        self.now = 0.0
+        self.wall = wall
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.wall + self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(stream_capture.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(stream_capture.time, 'time', clock.time)
+    return clock
+
+
+def record_session(path, clock, events):
+    clock.now = 0.0  # Her kayıt tutucu monotonic saati kendi başlangıcından sayar
+    recorder = StreamRecorder(str(path))
+    for at, method, *args in events:
+        clock.now = at
+        getattr(recorder, method)(*args)
+    recorder.close()
+    return recorder
+
+
+def test_round_trip_preserves_records_and_chunks(tmp_path, clock):
+    path = tmp_path / 'a.cap'
+    recorder = record_session(path, clock, [
+        (0.0, 'connection_opened', 7, '10.0.0.5:4000'),
+        (0.5, 'data_received', 7, b'{"anchor_id":'),
+        (0.75, 'data_received', 7, b'"ANC001"}\n'),
+        (1.0, 'connection_closed', 7),
+    ])
+    records = list(read_capture(str(path)))
+    assert [(r.kind, r.connection, r.timestamp, r.data) for r in records] == [
+        (REC_OPEN, 7, 0.0, b'10.0.0.5:4000'),
+        (REC_DATA, 7, 0.5, b'{"anchor_id":'),
+        (REC_DATA, 7, 0.75, b'"ANC001"}\n'),
+        (REC_CLOSE, 7, 1.0, b''),
+    ]
+    assert recorder.records == 4
+    assert recorder.bytes_recorded == len(b'10.0.0.5:4000{"anchor_id":"ANC001"}\n')
+
+
+@pytest.mark.parametrize('cut', [1, 5, 17, 20])
+def test_truncated_final_record_stops_at_last_complete_record(tmp_path, clock, cut):
+    path = tmp_path / 'crash.cap'
+    record_session(path, clock, [
+        (0.0, 'connection_opened', 1, 'anchor'),
+        (0.1, 'data_received', 1, b'x' * 10),
+    ])
+    data = path.read_bytes()
+    # Son kayıt (17 byte header + 10 byte veri) içinde bir yerden kes
+    path.write_bytes(data[:len(data) - 27 + cut])
+    assert [r.kind for r in read_capture(str(path))] == [REC_OPEN]
+
+
+def test_header_only_and_truncated_header(tmp_path, clock):
+    path = tmp_path / 'empty.cap'
+    record_session(path, clock, [])
+    assert list(read_capture(str(path))) == []
+    # İkinci oturumun header'ı yazılırken kesildi
+    with open(path, 'ab') as f:
+        f.write(FILE_HEADER.pack(b'MTCAP', 1, 2000.0)[:8])
+    assert list(read_capture(str(path))) == []
+
+
+def test_invalid_files_raise_format_error(tmp_path):
+    foreign = tmp_path / 'foreign.cap'
+    foreign.write_bytes(b'\x00' * 40)
+    with pytest.raises(CaptureFormatError):
+        list(read_capture(str(foreign)))
+    future = tmp_path / 'future.cap'
+    future.write_bytes(FILE_HEADER.pack(b'MTCAP', 99, 0.0))
+    with pytest.raises(CaptureFormatError):
+        list(read_capture(str(future)))
+
+
+def test_appended_sessions_keep_wall_clock_gap(tmp_path, clock):
+    path = tmp_path / 'multi.cap'
+    record_session(path, clock, [(0.0, 'connection_opened', 1, 'a'), (2.0, 'data_received', 1, b'1')])
+    # İkinci oturum 10 s sonra başlar; monotonic saat yeniden başlatılmış gibi
+    clock.wall = 1010.0
+    record_session(path, clock, [(0.0, 'connection_opened', 1, 'b'), (3.0, 'data_received', 1, b'2')])
+    records = list(read_capture(str(path)))
+    assert [r.timestamp for r in records] == [0.0, 2.0, 10.0, 13.0]
+    assert [r.data for r in records] == [b'a', b'1', b'b', b'2']
+
+
+def test_merge_orders_by_time_and_renumbers_connections(tmp_path, clock):
+    first, second = tmp_path / 'w0.cap', tmp_path / 'w1.cap'
+    record_session(first, clock, [(0.0, 'connection_opened', 1, 'a'), (0.2, 'data_received', 1, b'a1'),
+                                  (0.4, 'data_received', 2, b'a2')])
+    record_session(second, clock, [(0.1, 'connection_opened', 1, 'b'), (0.3, 'data_received', 1, b'b1')])
+    merged = list(merge_captures([str(first), str(second)]))
+    assert [r.data for r in merged] == [b'a', b'b', b'a1', b'b1', b'a2']
+    # (dosya, bağlantı) -> ilk görülme sırasıyla 0, 1, 2
+    assert [r.connection for r in merged] == [0, 1, 0, 1, 2]
+
+
+def test_replayer_sends_recorded_bytes_per_connection(tmp_path, clock):
+    path = tmp_path / 'replay.cap'
+    record_session(path, clock, [
+        (0.0, 'connection_opened', 1, 'a'), (0.0, 'connection_opened', 2, 'b'),
+        (0.1, 'data_received', 1, b'hello '), (0.2, 'data_received', 2, b'other'),
+        (0.3, 'data_received', 1, b'world'), (0.4, 'connection_closed', 1), (0.5, 'connection_closed', 2),
+    ])
+    server = socket.create_server(('127.0.0.1', 0))
+    received = []
+
+    def accept():
+        for _ in range(2):
+            conn, _ = server.accept()
+            threading.Thread(target=lambda c=conn: received.append(read_all(c))).start()
+
+    def read_all(conn):
+        chunks = []
+        while chunk := conn.recv(4096):
+            chunks.append(chunk)
+        conn.close()
+        return b''.join(chunks)
+
+    acceptor = threading.Thread(target=accept)
+    acceptor.start()
+    replayer = StreamReplayer(str(path), port=server.getsockname()[1], speed=None)
+    stats = replayer.replay()
+    acceptor.join(5.0)
+    server.close()
+    for _ in range(100):
+        if len(received) == 2:
+            break
+        threading.Event().wait(0.01)
+    assert sorted(received) == [b'hello world', b'other']
+    assert stats['connections'] == 2
+    assert stats['bytes_sent'] == len(b'hello worldother')
+    assert stats['records'] == 7
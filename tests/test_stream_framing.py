@@ -0,0 +1,165 @@
+"""Framer'lar - brace / ndjson / length, parçalı okumalar, boyut sınırı ve ReceiveBuffer"""
+import json
+import struct
+
+import pytest
+
+from services.stream_framing import (FrameTooLargeError, ReceiveBuffer, create_framer, decode_json_frame,
+                                     sniff_framing)
+
+PAYLOADS = [
+    {'anchor_id': 'ANC001', 'measurements': [{'tag_id': 'TAG001', 'distance': 1.5}]},
+    {'anchor_id': 'ANC002', 'note': 'köşeli { } ve "tırnak" \\ içerir'},
+    {'anchor_id': 'ANC003', 'nested': {'a': {'b': [1, 2, {'c': 3}]}}},
+]
+
+
+def encode(framing, payloads):
+    chunks = []
+    for payload in payloads:
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        if framing == 'length':
+            chunks.append(struct.pack('!I', len(data)) + data)
+        elif framing == 'ndjson':
+            chunks.append(data + b'\n')
+        else:
+            chunks.append(data + b' \r\n')
+    return b''.join(chunks)
+
+
+def feed_all(framer, stream, chunk_size):
+    decoded = []
+    for i in range(0, len(stream), chunk_size):
+        decoded.extend(decode_json_frame(frame) for frame in framer.feed(stream[i:i + chunk_size]))
+    return decoded
+
+
+@pytest.mark.parametrize('framing', ['brace', 'ndjson', 'length'])
+def test_single_read_yields_all_frames(framing):
+    framer = create_framer(framing)
+    assert feed_all(framer, encode(framing, PAYLOADS), 1 << 20) == PAYLOADS
+    assert framer.pending == 0
+
+
+@pytest.mark.parametrize('framing', ['brace', 'ndjson', 'length'])
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64])
+def test_frames_split_across_chunks(framing, chunk_size):
+    framer = create_framer(framing)
+    assert feed_all(framer, encode(framing, PAYLOADS * 3), chunk_size) == PAYLOADS * 3
+
+
+def test_brace_framer_handles_escaped_quotes_across_chunks():
+    framer = create_framer('brace')
+    payload = {'text': 'a\\"}{b\\\\', 'ok': True}
+    stream = json.dumps(payload).encode()
+    # Kaçış dizisinin ortasından bölünür
+    split = stream.index(b'\\') + 1
+    assert framer.feed(stream[:split]) == []
+    assert [decode_json_frame(f) for f in framer.feed(stream[split:])] == [payload]
+
+
+def test_unknown_framing_is_rejected():
+    with pytest.raises(ValueError):
+        create_framer('xml')
+
+
+@pytest.mark.parametrize('framing', ['brace', 'ndjson', 'length'])
+def test_oversized_frame_keeps_completed_frames(framing):
+    framer = create_framer(framing, max_frame_size=256)
+    huge = {'anchor_id': 'ANC009', 'blob': 'x' * 1000}
+    # Büyük paketin yalnızca başı gelmiş: tamamlanmadan sınırı aşar
+    stream = encode(framing, PAYLOADS[:2]) + encode(framing, [huge])[:600]
+    with pytest.raises(FrameTooLargeError) as error:
+        framer.feed(stream)
+    assert [decode_json_frame(frame) for frame in error.value.frames] == PAYLOADS[:2]
+    # Sınır aşımından sonra akış temiz tampondan devam eder
+    assert framer.pending == 0
+    assert feed_all(framer, encode(framing, PAYLOADS[:1]), 1 << 20) == PAYLOADS[:1]
+
+
+def test_sniff_framing():
+    assert sniff_framing(b'{"anchor') == 'brace'
+    assert sniff_framing(b'\x00\x00\x01\x00') == 'length'
+    assert sniff_framing(b'MT\x01\x01') == 'binary'
+
+
+class ChunkSocket:
+    """recv_into'yu kayıtlı parçalarla besleyen sahte soket (parça tampona sığmazsa bölünür)"""
+
+    def __init__(self, chunks):
+        self.chunks = [bytes(chunk) for chunk in chunks]
+        self.reads = []
+
+    def recv_into(self, view):
+        if not self.chunks:
+            return 0
+        chunk = self.chunks.pop(0)
+        size = min(len(view), len(chunk))
+        view[:size] = chunk[:size]
+        if size < len(chunk):
+            self.chunks.insert(0, chunk[size:])
+        self.reads.append(len(view))
+        return size
+
+
+def test_receive_buffer_compacts_pending_bytes_to_front():
+    buf = ReceiveBuffer(initial_size=64, min_free=16)
+    sock = ChunkSocket([b'a' * 40, b'b' * 10, b'c' * 16])
+    assert buf.recv_into(sock) == 40
+    buf.consume(35)
+    assert buf.recv_into(sock) == 10  # 24 byte boş: kaydırma yok
+    assert (buf.start, buf.end) == (35, 50)
+    # 14 byte boş < min_free: bekleyen 15 byte başa taşınır, kapasite aynı kalır
+    assert buf.recv_into(sock) == 16
+    assert buf.capacity == 64
+    assert (buf.start, buf.end) == (0, 31)
+    assert bytes(buf.view(0, len(buf))) == b'a' * 5 + b'b' * 10 + b'c' * 16
+
+
+def test_receive_buffer_grows_for_large_partial_frame_and_shrinks_when_drained():
+    buf = ReceiveBuffer(initial_size=32, min_free=8)
+    sock = ChunkSocket([b'x' * 100])
+    while sock.chunks:
+        buf.recv_into(sock, max_read=32)
+    assert len(buf) == 100
+    assert buf.capacity >= 100
+    assert bytes(buf.view(0, 100)) == b'x' * 100
+    buf.consume(100)
+    assert buf.capacity == 32
+
+
+def test_receive_buffer_read_size_adapts_to_full_reads():
+    buf = ReceiveBuffer(initial_size=16, min_free=16)
+    sock = ChunkSocket([b'z' * 1000])
+    for _ in range(4):
+        buf.recv_into(sock, max_read=64)
+        buf.consume(len(buf))
+    # Her okuma boş alanı doldurdu: okuma boyutu max_read'e kadar katlanır
+    assert sock.reads == [16, 32, 64, 64]
+    assert buf.capacity == 64
+
+
+def test_views_survive_reallocation_to_larger_buffer():
+    buf = ReceiveBuffer(initial_size=16, min_free=8)
+    buf.write(b'0123456789')
+    frame = buf.view(0, 4)
+    buf.write(b'x' * 40)  # Yeni, daha büyük tampon
+    assert bytes(frame) == b'0123'
+    assert bytes(buf.view(0, 10)) == b'0123456789'
+
+
+@pytest.mark.parametrize('framing', ['brace', 'ndjson', 'length'])
+@pytest.mark.parametrize('chunk_size', [5, 13, 29, 61])
+def test_recv_into_frames_spanning_buffer_boundary(framing, chunk_size):
+    stream = encode(framing, PAYLOADS * 4)
+    framer = create_framer(framing, buffer_size=32)
+    sock = ChunkSocket(stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size))
+    decoded = []
+    while True:
+        size = framer.buffer.recv_into(sock, max_read=48)
+        if size == 0:
+            break
+        # Paketler bir sonraki recv_into'ya kadar geçerli: hemen çözülür
+        decoded.extend(decode_json_frame(frame) for frame in framer.parse_received(size))
+    assert decoded == PAYLOADS * 4
+    assert framer.pending == 0
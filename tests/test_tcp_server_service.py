@@ -0,0 +1,28 @@
+"""TCPServerService - bozuk paket event loop'u durdurmaz"""
+from services.payload_decoder import MeasurementReport
+from services.tcp_server_service import TCPServerService
+
+
+def test_failing_message_is_counted_and_dropped(monkeypatch):
+    service = TCPServerService(port=0)
+    good = MeasurementReport('ANC001', 1, None, ['TAG001'], [1.0], [None])
+
+    def broken_put(payload, received_at=None):
+        raise TypeError("unhashable type: 'dict'")
+
+    monkeypatch.setattr(service.queue, 'put', broken_put)
+    service._on_message({'anchor_id': 'ANC001', 'measurements': [{'tag_id': {}}]}, '127.0.0.1:5000')
+    assert service.rejected_messages == 1
+
+    monkeypatch.undo()
+    service._on_message(good, '127.0.0.1:5000')
+    assert service.take_batch() == [good]
+    assert service.get_statistics()['rejected_messages'] == 1
+
+
+def test_malformed_ids_reach_the_queue():
+    service = TCPServerService(port=0)
+    payload = {'measurements': [{'tag_id': {}}]}
+    service._on_message(payload, '127.0.0.1:5000')
+    assert service.rejected_messages == 0
+    assert service.take_batch() == [payload]
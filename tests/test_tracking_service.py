@@ -0,0 +1,11 @@
+"""TrackingService - geriye dönük uyumlu gateways görünümü"""
+from services.tracking_service import TrackingService
+
+
+def test_gateways_follows_set_anchors():
+    service = TrackingService()
+    service.update_timer.stop()
+    assert service.gateways is service.anchors
+    service.registry.set_anchors([{'id': 'ANC100', 'name': 'Yeni Anchor', 'x': 0, 'y': 0, 'z': 0}])
+    assert [anchor['id'] for anchor in service.gateways] == ['ANC100']
+    assert service.get_gateways() is service.gateways
@@ -0,0 +1,73 @@
+"""Trajectory Smoother - blok tarama ve RTS'nin adım adım başvuru çözümüyle karşılaştırması"""
+import numpy as np
+import pytest
+
+from services.kalman_filter import process_noise_blocks
+from services.trajectory_smoother import _affine_scan, smooth_trajectory
+
+
+def affine_loop(A, b):
+    x = [b[0]]
+    for k in range(1, len(b)):
+        x.append(A[k] @ x[-1] + b[k])
+    return np.array(x)
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 10, 17, 64, 101])
+def test_affine_scan_matches_step_loop(count):
+    rng = np.random.default_rng(count)
+    A = rng.normal(0, 0.5, size=(count, 3, 3))  # Spektral yarıçap < 1: değerler patlamaz
+    b = rng.normal(size=(count, 3, 2))
+    np.testing.assert_allclose(_affine_scan(A, b), affine_loop(A, b), rtol=1e-9, atol=1e-12)
+
+
+def reference_rts(timestamps, positions, q, r, velocity_variance):
+    """Tek eksenli sabit hız modeli için klasik ileri Kalman + geri RTS döngüsü."""
+    H = np.array([[1.0, 0.0]])
+    x = np.array([positions[0], 0.0])
+    P = np.diag([r, velocity_variance])
+    xs, Ps, xp, Pp, Fs = [x], [P], [None], [None], [None]
+    for k in range(1, len(timestamps)):
+        dt = timestamps[k] - timestamps[k - 1]
+        F = np.array([[1.0, dt], [0.0, 1.0]])
+        pp, pv, vv = process_noise_blocks(q, dt)
+        x_pred = F @ x
+        P_pred = F @ P @ F.T + np.array([[pp, pv], [pv, vv]])
+        K = P_pred @ H.T / (H @ P_pred @ H.T + r)
+        x = x_pred + (K * (positions[k] - x_pred[0])).ravel()
+        P = (np.eye(2) - K @ H) @ P_pred
+        xs.append(x), Ps.append(P), xp.append(x_pred), Pp.append(P_pred), Fs.append(F)
+
+    smoothed = [xs[-1]]
+    variance = [Ps[-1][0, 0]]
+    P_s = Ps[-1]
+    for k in range(len(timestamps) - 2, -1, -1):
+        C = Ps[k] @ Fs[k + 1].T @ np.linalg.inv(Pp[k + 1])
+        smoothed.append(xs[k] + C @ (smoothed[-1] - xp[k + 1]))
+        P_s = Ps[k] + C @ (P_s - Pp[k + 1]) @ C.T
+        variance.append(P_s[0, 0])
+    return np.array(smoothed[::-1]), np.array(variance[::-1])
+
+
+def test_smoother_matches_reference_rts():
+    rng = np.random.default_rng(3)
+    timestamps = np.cumsum(rng.uniform(0.05, 1.5, size=80))
+    truth = np.stack([np.sin(timestamps / 5) * 20, timestamps * 0.8], axis=1)
+    positions = truth + rng.normal(0, 0.7, size=truth.shape)
+
+    track = smooth_trajectory(timestamps, positions, process_variance=0.05, measurement_variance=0.5,
+                              initial_velocity_variance=1.0)
+    for axis in range(2):
+        states, variances = reference_rts(timestamps, positions[:, axis], 0.05, 0.5, 1.0)
+        np.testing.assert_allclose(track.positions[:, axis], states[:, 0], rtol=1e-8, atol=1e-8)
+        np.testing.assert_allclose(track.velocities[:, axis], states[:, 1], rtol=1e-8, atol=1e-8)
+        np.testing.assert_allclose(track.variances, variances, rtol=1e-8, atol=1e-10)
+
+
+def test_smoother_sorts_timestamps_and_handles_short_tracks():
+    track = smooth_trajectory([2.0, 0.0, 1.0], [[2.0, 0.0], [0.0, 0.0], [1.0, 0.0]])
+    assert track.timestamps.tolist() == [0.0, 1.0, 2.0]
+    assert np.all(np.diff(track.positions[:, 0]) > 0)
+    assert smooth_trajectory([], np.zeros((0, 2))).positions.shape == (0, 2)
+    single = smooth_trajectory([5.0], [[1.0, 2.0]])
+    assert single.positions.tolist() == [[1.0, 2.0]]
@@ -0,0 +1,154 @@
+"""Trilateration - bilinen geometriye karşı toplu çözümler ve geometri önbelleği"""
+import numpy as np
+
+from services.trilateration import (AnchorGeometryCache, multilaterate, multilaterate_batch, robust_multilaterate_batch,
+                                    trilaterate_2d, trilaterate_2d_batch)
+
+ANCHORS = np.array([[0.0, 0.0], [20.0, 0.0], [0.0, 15.0], [20.0, 15.0], [10.0, -5.0]])
+
+
+def ranges(points, anchors=ANCHORS):
+    return np.linalg.norm(points[:, None, :] - anchors[None, :, :], axis=-1)
+
+
+def test_batch_recovers_known_positions():
+    rng = np.random.default_rng(1)
+    points = rng.uniform([1, 1], [19, 14], size=(50, 2))
+    positions, residuals, singular = trilaterate_2d_batch(ANCHORS, ranges(points))
+    assert not singular.any()
+    np.testing.assert_allclose(positions, points, atol=1e-9)
+    np.testing.assert_allclose(residuals, 0.0, atol=1e-9)
+
+
+def test_batch_uses_first_three_valid_anchors_per_row():
+    points = np.array([[5.0, 5.0], [12.0, 3.0], [8.0, 9.0]])
+    distances = ranges(points)
+    valid = np.ones_like(distances, dtype=bool)
+    valid[0, 0] = False
+    distances[1, 1] = np.nan
+    valid[2, :3] = False  # Yalnızca iki anchor kaldı
+    positions, _, singular = trilaterate_2d_batch(ANCHORS, distances, valid)
+    assert singular.tolist() == [False, False, True]
+    np.testing.assert_allclose(positions[:2], points[:2], atol=1e-9)
+    assert np.isnan(positions[2]).all()
+
+
+def test_collinear_anchors_are_singular():
+    anchors = np.array([[0.0, 0.0], [5.0, 0.0], [10.0, 0.0]])
+    result = trilaterate_2d_batch(anchors, ranges(np.array([[3.0, 4.0]]), anchors))
+    assert result.singular.tolist() == [True]
+
+
+def test_per_tag_anchor_sets():
+    points = np.array([[2.0, 3.0], [7.0, 1.0]])
+    anchors = np.stack([ANCHORS[:3], ANCHORS[2:5]])
+    distances = np.linalg.norm(points[:, None, :] - anchors, axis=-1)
+    positions, _, singular = trilaterate_2d_batch(anchors, distances)
+    assert not singular.any()
+    np.testing.assert_allclose(positions, points, atol=1e-9)
+
+
+def test_scalar_wrapper_matches_batch():
+    point = np.array([[6.0, 4.0]])
+    x, y = trilaterate_2d(ANCHORS[:3].tolist(), ranges(point)[0, :3].tolist())
+    assert np.allclose((x, y), point[0])
+    assert trilaterate_2d(ANCHORS[:2].tolist(), [1.0, 2.0]) is None
+
+
+def test_least_squares_uses_all_anchors_in_3d():
+    anchors = np.array([[0.0, 0.0, 0.5], [30.0, 0.0, 3.0], [0.0, 20.0, 3.0],
+                        [30.0, 20.0, 0.5], [15.0, 10.0, 4.0]])
+    points = np.array([[10.0, 8.0, 1.5], [22.0, 12.0, 1.0], [5.0, 15.0, 2.2]])
+    result = multilaterate_batch(anchors, ranges(points, anchors), max_iterations=20)
+    assert not result.singular.any()
+    np.testing.assert_allclose(result.positions, points, atol=1e-3)
+    assert (result.iterations <= 20).all()
+
+
+def test_warm_start_converges_in_fewer_iterations():
+    anchors = np.array([[0.0, 0.0], [30.0, 0.0], [0.0, 20.0], [30.0, 20.0]])
+    points = np.array([[12.0, 7.0], [25.0, 18.0]])
+    distances = ranges(points, anchors) + np.array([[0.1, -0.1, 0.05, 0.0], [0.0, 0.1, -0.1, 0.05]])
+    cold = multilaterate_batch(anchors, distances)
+    warm = multilaterate_batch(anchors, distances, initial=cold.positions)
+    np.testing.assert_allclose(warm.positions, cold.positions, atol=1e-3)
+    assert (warm.iterations <= cold.iterations).all()
+
+
+def test_too_few_anchors_is_singular():
+    anchors = np.array([[0.0, 0.0], [30.0, 0.0], [0.0, 20.0]])
+    distances = np.array([[5.0, np.nan, 7.0]])
+    assert multilaterate_batch(anchors, distances).singular.tolist() == [True]
+    assert multilaterate(anchors[:2].tolist(), [1.0, 2.0]) is None
+
+
+def test_robust_solution_rejects_nlos_range():
+    anchors = np.array([[0.0, 0.0], [30.0, 0.0], [0.0, 20.0],
+                        [30.0, 20.0], [15.0, -5.0], [15.0, 25.0]])
+    points = np.array([[10.0, 8.0], [22.0, 12.0], [5.0, 15.0]])
+    distances = ranges(points, anchors)
+    distances[0, 1] += 6.0  # NLOS: mesafe uzar
+    distances[2, 4] += 4.0
+    result = robust_multilaterate_batch(anchors, distances, threshold=0.5)
+    assert not result.singular.any()
+    assert result.rejected.sum(axis=1).tolist() == [1, 0, 1]
+    assert result.rejected[0, 1] and result.rejected[2, 4]
+    np.testing.assert_allclose(result.positions, points, atol=1e-3)
+    assert (result.residuals < 1e-3).all()
+
+
+def test_robust_solution_without_outliers_keeps_all_ranges():
+    anchors = np.array([[0.0, 0.0], [30.0, 0.0], [0.0, 20.0], [30.0, 20.0]])
+    points = np.array([[12.0, 7.0]])
+    result = robust_multilaterate_batch(anchors, ranges(points, anchors))
+    assert not result.rejected.any()
+    np.testing.assert_allclose(result.positions, points, atol=1e-3)
+
+
+def resolver(positions):
+    return lambda anchor_id: positions.get(anchor_id)
+
+
+def test_geometry_cache_reuses_pinv_until_anchor_moves():
+    positions = {f'ANC{i + 1:03d}': (x, y, 0.0) for i, (x, y) in enumerate(ANCHORS.tolist())}
+    cache = AnchorGeometryCache()
+    key = ('ANC001', 'ANC002', 'ANC003', 'ANC004')
+    other = ('ANC002', 'ANC003', 'ANC005')
+    tag = np.array([[7.0, 6.0]])
+    geometry = cache.get(key, resolver(positions))
+    untouched = cache.get(other, resolver(positions))
+    assert cache.get(key, resolver(positions)) is geometry
+    np.testing.assert_allclose(cache.solve(geometry, ranges(tag, ANCHORS[:4])), tag, atol=1e-9)
+
+    # ANC001 taşındı: önbellek geçersiz kılınmadan eski pinv kullanılır
+    positions['ANC001'] = (-4.0, -3.0, 0.0)
+    moved = np.array([[x, y] for x, y, _ in (positions[anchor_id] for anchor_id in key)])
+    assert cache.get(key, resolver(positions)) is geometry
+    assert not np.allclose(cache.solve(geometry, ranges(tag, moved)), tag, atol=1e-3)
+
+    cache.invalidate('ANC001')
+    refreshed = cache.get(key, resolver(positions))
+    assert refreshed is not geometry
+    np.testing.assert_allclose(refreshed.positions[0], positions['ANC001'])
+    np.testing.assert_allclose(cache.solve(refreshed, ranges(tag, moved)), tag, atol=1e-9)
+    # ANC001'i içermeyen alt küme önbellekte kalır
+    assert cache.get(other, resolver(positions)) is untouched
+    stats = cache.get_statistics()
+    assert stats['invalidations'] == 1
+    assert stats['misses'] == 3
+
+
+def test_geometry_cache_invalidate_all_and_offline_anchor():
+    positions = {f'ANC{i + 1:03d}': (x, y, 0.0) for i, (x, y) in enumerate(ANCHORS.tolist())}
+    cache = AnchorGeometryCache()
+    key = ('ANC001', 'ANC002', 'ANC003')
+    geometry = cache.get(key, resolver(positions))
+    assert geometry.pinv is not None
+
+    # Çevrimdışı anchor çözümden düşer; 2 anchor ile lineer sistem kurulamaz
+    del positions['ANC003']
+    cache.invalidate()
+    degraded = cache.get(key, resolver(positions))
+    assert degraded.anchor_ids == ('ANC001', 'ANC002')
+    assert degraded.pinv is None
+    assert cache.solve(degraded, [[1.0, 1.0]]) is None
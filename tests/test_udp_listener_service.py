@@ -0,0 +1,52 @@
+"""UDPListenerService - datagram işleme: bozuk sıra numaraları ve SOS paketleri"""
+import json
+
+import pytest
+
+from services.binary_protocol import encode_report
+from services.udp_listener_service import UDPListenerService
+
+
+def datagram(payload):
+    return memoryview(json.dumps(payload).encode())
+
+
+@pytest.fixture
+def listener():
+    return UDPListenerService(port=0, reorder_window=8)
+
+
+@pytest.mark.parametrize('payload', [
+    {'anchor_id': 'ANC001', 'seq': 'x'},
+    {'anchor_id': 'ANC001', 'seq': [1]},
+    {'anchor_id': 'ANC001', 'seq': True},
+])
+def test_invalid_sequence_is_a_decode_error(listener, payload):
+    listener._handle_datagram(datagram(payload))
+    assert listener.decode_errors == 1
+    assert listener.take_batch() == []
+
+
+def test_malformed_measurements_do_not_raise(listener):
+    payload = {'anchor_id': 'ANC001', 'measurements': 5}
+    listener._handle_datagram(datagram(payload))
+    assert listener.decode_errors == 0
+    assert listener.take_batch() == [payload]
+
+
+def test_sos_with_sequence_bypasses_reorder_window(listener):
+    listener._handle_datagram(memoryview(encode_report(1, [(1, 1000, -60, 0)], sequence=10)))
+    listener._handle_datagram(memoryview(encode_report(1, [(1, 1000, -60, 0)], sequence=12)))  # 11 bekleniyor
+    alarm = {'anchor_id': 'ANC001', 'seq': 12, 'type': 'SOS', 'tag_id': 'TAG001'}
+    listener._handle_datagram(datagram(alarm))
+    batch = listener.take_batch()
+    # SOS hem bekletilmedi hem de 12 tekrarı olarak atılmadı
+    assert batch[0] == alarm
+    assert [p.sequence for p in batch[1:]] == [10]
+    assert listener.sequences.get_statistics()['duplicates'] == 0
+
+
+def test_string_sequence_is_accepted(listener):
+    for seq in ('5', 6, '7'):
+        listener._handle_datagram(datagram({'anchor_id': 'ANC001', 'seq': seq, 'type': 'heartbeat'}))
+    assert [p['seq'] for p in listener.take_batch()] == ['5', 6, '7']
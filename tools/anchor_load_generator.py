@@ -0,0 +1,366 @@
+"""Sentetik anchor filosu yük üreteci
+
+M anchor bağlantısı açar ve N hareketli tag için gerçekçi mesafe raporları
+gönderir. Anchor'lar istemci süreçlerine dağıtılır; her anchor rate Hz ile
+menzilindeki tüm tag'lerin mesafelerini tek pakette yollar.
+
+Tag hareketi zamanın deterministik bir fonksiyonudur (sabit hız, saha
+sınırlarında yansıma); tüm süreçler aynı tohumla aynı tag konumlarını görür.
+
+Yerleşim:
+    --layout site   AdvancedTrackingService'in 6 anchor'ı (services.site_layout)
+    --layout grid   --anchors adet, --spacing aralıklı ızgara (kapasite planlama)
+
+Yük deseni:
+    steady   Sabit hız
+    burst    Her --burst-period saniyede --burst-length saniye boyunca
+             hız --burst-factor katına çıkar
+    storm    Her --burst-period saniyede tüm bağlantılar aynı anda kopar ve
+             yeniden bağlanır (güç kesintisi sonrası)
+
+--self-host ile ingest + tracking hattı bu süreçte GUI'siz çalıştırılır ve
+uçtan uca gecikme (gönderim → position_calculated) ölçülür. Gönderim zaman
+damgaları istemcinin saatidir; bu yüzden uçtan uca ölçüm yalnızca aynı
+makinede anlamlıdır.
+
+Kullanım:
+    python -m tools.anchor_load_generator --layout grid --anchors 200 --tags 5000 \\
+        --rate 10 --protocol binary --processes 4 --duration 30 --self-host
+    python -m tools.anchor_load_generator --host 10.0.0.5 --port 8888 --pattern storm
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import time
+from collections import deque
+
+import numpy as np
+
+from services.binary_protocol import RECORD_DTYPE, encode_report, id_to_number
+from services.site_layout import default_anchor_layout, generate_grid_layout, layout_bounds
+
+WALK_SPEED = 1.4  # m/s, yürüyüş hızı üst sınırı
+SITE_MARGIN = 5.0  # Tag'ler sahanın bu kadar dışına çıkabilir
+
+
+class TagFleet:
+    """Konumları zamanın fonksiyonu olan N tag (sınırlarda yansıyan doğrusal hareket)."""
+
+    def __init__(self, count, bounds, seed):
+        rng = np.random.default_rng(seed)
+        min_x, min_y, max_x, max_y = bounds
+        self.low = np.array([min_x - SITE_MARGIN, min_y - SITE_MARGIN])
+        self.span = np.maximum(np.array([max_x - min_x, max_y - min_y]) + 2 * SITE_MARGIN, 1.0)
+        self.start = self.low + rng.random((count, 2)) * self.span
+        heading = rng.uniform(0, 2 * np.pi, count)
+        speed = rng.uniform(0.2, WALK_SPEED, count)
+        self.velocity = np.column_stack((np.cos(heading), np.sin(heading))) * speed[:, None]
+
+    def positions(self, t):
+        """t anındaki (N, 2) konumlar."""
+        unfolded = self.start - self.low + self.velocity * t
+        folded = np.mod(unfolded, 2 * self.span)
+        return self.low + self.span - np.abs(folded - self.span)
+
+
+def rate_factor(pattern, elapsed, period, length, factor):
+    """Desenin o andaki hız çarpanı."""
+    if pattern == 'burst' and (elapsed % period) < length:
+        return factor
+    return 1.0
+
+
+def run_anchor_client(index, anchors, options, start_at, results):
+    """Alt süreç: verilen anchor'lar için bağlantı aç ve rapor gönder."""
+    fleet = TagFleet(options['tags'], options['bounds'], options['seed'])
+    noise = np.random.default_rng(options['seed'] + 1 + index)
+    tag_ids = [f'TAG{i + 1:03d}' for i in range(options['tags'])]
+    tag_numbers = np.arange(1, options['tags'] + 1, dtype=np.uint32)
+
+    anchor_xy = np.array([[a['x'], a['y']] for a in anchors], dtype=np.float64)
+    anchor_z = np.array([a['z'] for a in anchors], dtype=np.float64)
+    anchor_numbers = [id_to_number(a['id']) for a in anchors]
+    max_range = options['range']
+    binary = options['protocol'] == 'binary'
+
+    def connect_all():
+        return [socket.create_connection((options['host'], options['port'])) for _ in anchors]
+
+    sockets = connect_all()
+    sequences = [0] * len(anchors)
+    stats = {'packets': 0, 'measurements': 0, 'bytes': 0, 'ticks': 0, 'late_ticks': 0,
+             'reconnects': 0, 'errors': 0}
+
+    time.sleep(max(0.0, start_at - time.time()))
+    end_at = start_at + options['duration']
+    interval = 1.0 / options['rate']
+    next_tick = start_at
+    storm_epoch = 0
+
+    while True:
+        now = time.time()
+        if now >= end_at:
+            break
+        elapsed = now - start_at
+
+        if options['pattern'] == 'storm' and int(elapsed // options['burst_period']) > storm_epoch:
+            storm_epoch = int(elapsed // options['burst_period'])
+            for sock in sockets:
+                sock.close()
+            sockets = connect_all()
+            stats['reconnects'] += len(sockets)
+
+        positions = fleet.positions(elapsed)
+        delta = positions[None, :, :] - anchor_xy[:, None, :]
+        distances = np.sqrt(np.einsum('ijk,ijk->ij', delta, delta) + anchor_z[:, None] ** 2)
+        distances += noise.normal(0.0, 0.05, distances.shape)
+        timestamp_ms = int(now * 1000)
+
+        for a, sock in enumerate(sockets):
+            visible = np.flatnonzero(distances[a] <= max_range)
+            if binary:
+                records = np.zeros(visible.size, dtype=RECORD_DTYPE)
+                records['tag'] = tag_numbers[visible]
+                records['distance_mm'] = np.maximum(distances[a, visible], 0) * 1000
+                records['rssi'] = -60
+                records['timestamp_ms'] = timestamp_ms
+                packet = encode_report(anchor_numbers[a], records, sequences[a])
+            else:
+                packet = json.dumps({
+                    'anchor_id': anchors[a]['id'],
+                    'seq': sequences[a],
+                    'timestamp': now,
+                    'measurements': [{'tag_id': tag_ids[t], 'distance': round(d, 3)}
+                                     for t, d in zip(visible.tolist(), distances[a, visible].tolist())]
+                }).encode('utf-8')
+            sequences[a] += 1
+
+            try:
+                sock.sendall(packet)
+            except OSError:
+                stats['errors'] += 1
+                continue
+            stats['packets'] += 1
+            stats['measurements'] += visible.size
+            stats['bytes'] += len(packet)
+
+        stats['ticks'] += 1
+        factor = rate_factor(options['pattern'], elapsed, options['burst_period'],
+                             options['burst_length'], options['burst_factor'])
+        next_tick += interval / factor
+        delay = next_tick - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -interval:
+            # Hedef hıza yetişilemiyor; birikmiş tick'leri atla
+            stats['late_ticks'] += 1
+            next_tick = time.time()
+
+    for sock in sockets:
+        sock.close()
+    results.put(stats)
+
+
+class SelfHost:
+    """
+    Ingest + tracking hattını bu süreçte çalıştırır ve uçtan uca gecikmeyi ölçer.
+
+    Alınan paketler küçük dilimler halinde işlenir; hat yüke yetişemezse
+    araç yine de süresinde biter ve işlenemeyen birikimi raporlar.
+    """
+
+    SLICE = 32
+
+    def __init__(self, port, layout, workers, dimensions=2):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt6.QtCore import QCoreApplication
+        from services.advanced_tracking_service import AdvancedTrackingService
+        from services.tcp_server_service import TCPServerService
+        from services.ingest_metrics import LatencyHistogram
+        from services.binary_protocol import RangeReport
+        from services.payload_decoder import MeasurementReport
+
+        self.RangeReport = RangeReport
+        self.MeasurementReport = MeasurementReport
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.tracking = AdvancedTrackingService(mode='tcp', dimensions=dimensions)
+        self.tracking.set_anchors(layout)
+        self.server = TCPServerService(host='127.0.0.1', port=port, workers=workers,
+                                       metrics=self.tracking.metrics)
+        self.pending = deque()  # (paket, alınma zamanı)
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+        # Uçtan uca gecikme yalnızca personele bağlı tag'ler için (konum sinyali onlarda)
+        self.sample_tags = {p['tag_id'] for p in self.tracking.personnel}
+        self.sample_numbers = np.array([id_to_number(t) for t in self.sample_tags], dtype=np.uint32)
+        self.sent_at = {}
+        self.end_to_end = LatencyHistogram()
+
+        self.server.batch_ready.connect(self.on_batch_ready)
+        self.tracking.position_calculated.connect(self.on_position)
+
+    def start(self):
+        self.server.start()
+        deadline = time.time() + 15
+        while not self.server.running and time.time() < deadline:
+            self.process_events(0.01)
+
+    def process_events(self, seconds):
+        until = time.time() + seconds
+        while time.time() < until:
+            self.app.processEvents()
+            if self.pending:
+                self.process_slice()
+            else:
+                time.sleep(0.001)
+
+    def on_batch_ready(self):
+        batch, received_at = self.server.take_batch(with_timestamps=True)
+        self.pending.extend(zip(batch, received_at))
+
+    def process_slice(self):
+        started = time.perf_counter()
+        count = min(self.SLICE, len(self.pending))
+        batch, received_at = zip(*(self.pending.popleft() for _ in range(count)))
+        for payload in batch:
+            if isinstance(payload, self.RangeReport):
+                records = payload.records
+                hits = records[np.isin(records['tag'], self.sample_numbers)]
+                for tag_number, timestamp_ms in zip(hits['tag'].tolist(), hits['timestamp_ms'].tolist()):
+                    self.sent_at[f'TAG{tag_number:03d}'] = timestamp_ms / 1000.0
+            elif isinstance(payload, self.MeasurementReport) and payload.timestamp is not None:
+                for tag_id in payload.tag_ids:
+                    if tag_id in self.sample_tags:
+                        self.sent_at[tag_id] = payload.timestamp
+        self.tracking.process_tcp_batch(list(batch), list(received_at))
+        self.processed += count
+        self.busy_seconds += time.perf_counter() - started
+
+    def on_position(self, data):
+        sent = self.sent_at.pop(data['tag_id'], None)
+        if sent is not None:
+            self.end_to_end.record(time.time() - sent)
+
+    def stop(self):
+        stats = self.server.get_statistics()
+        self.server.stop()
+        self.server.wait(5000)
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8888)
+    parser.add_argument('--layout', choices=('site', 'grid'), default='grid')
+    parser.add_argument('--anchors', type=int, default=200, help='Izgara anchor sayısı')
+    parser.add_argument('--spacing', type=float, default=10.0, help='Izgara aralığı (m)')
+    parser.add_argument('--tags', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=10.0, help='Anchor başına rapor/s')
+    parser.add_argument('--range', type=float, default=None,
+                        help='Anchor menzili (m); varsayılan coverage_radius')
+    parser.add_argument('--protocol', choices=('json', 'binary'), default='json')
+    parser.add_argument('--pattern', choices=('steady', 'burst', 'storm'), default='steady')
+    parser.add_argument('--burst-period', type=float, default=10.0)
+    parser.add_argument('--burst-length', type=float, default=2.0)
+    parser.add_argument('--burst-factor', type=float, default=5.0)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--self-host', action='store_true', help='Hattı bu süreçte çalıştır')
+    parser.add_argument('--workers', type=int, default=0, help='Self-host ingest worker sayısı')
+    parser.add_argument('--dimensions', type=int, choices=(2, 3), default=2, help='Self-host konumlama boyutu')
+    args = parser.parse_args()
+
+    layout = default_anchor_layout() if args.layout == 'site' else \
+        generate_grid_layout(args.anchors, spacing=args.spacing)
+    max_range = args.range or layout[0]['coverage_radius']
+
+    options = {
+        'host': '127.0.0.1' if args.self_host else args.host,
+        'port': args.port,
+        'tags': args.tags,
+        'bounds': layout_bounds(layout),
+        'seed': args.seed,
+        'range': max_range,
+        'rate': args.rate,
+        'protocol': args.protocol,
+        'pattern': args.pattern,
+        'burst_period': args.burst_period,
+        'burst_length': args.burst_length,
+        'burst_factor': args.burst_factor,
+        'duration': args.duration,
+    }
+
+    print(f"🎯 Hedef: {len(layout)} anchor × {args.rate:g} Hz = {len(layout) * args.rate:.0f} paket/s, "
+          f"{args.tags} tag, menzil {max_range:g} m, {args.protocol}, desen: {args.pattern}")
+
+    host = None
+    if args.self_host:
+        host = SelfHost(args.port, layout, args.workers, args.dimensions)
+        host.start()
+
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    processes = min(args.processes, len(layout))
+    start_at = time.time() + 2.0 + 0.2 * processes
+    procs = [ctx.Process(target=run_anchor_client,
+                         args=(i, layout[i::processes], options, start_at, results), daemon=True)
+             for i in range(processes)]
+    for proc in procs:
+        proc.start()
+
+    collected = []
+    deadline = start_at + args.duration + 30
+    while len(collected) < processes and time.time() < deadline:
+        if host is not None:
+            host.process_events(0.05)
+        while not results.empty():
+            collected.append(results.get())
+        if host is None and len(collected) < processes:
+            time.sleep(0.05)
+    for proc in procs:
+        proc.join(timeout=5)
+
+    totals = {key: sum(stats[key] for stats in collected) for key in collected[0]} if collected else {}
+    if not totals:
+        print("❌ İstemci sonuçları alınamadı")
+        return
+
+    duration = args.duration
+    print(f"📤 Gönderilen: {totals['packets']} paket ({totals['packets'] / duration:.0f}/s), "
+          f"{totals['measurements']} ölçüm ({totals['measurements'] / duration:.0f}/s), "
+          f"{totals['bytes'] / 1e6:.1f} MB ({totals['bytes'] * 8 / duration / 1e6:.1f} Mbit/s)")
+    late = totals['late_ticks'] / totals['ticks'] * 100 if totals['ticks'] else 0
+    print(f"   Geç kalan tick: %{late:.1f}  yeniden bağlanma: {totals['reconnects']}  "
+          f"gönderim hatası: {totals['errors']}")
+
+    if host is not None:
+        host.process_events(1.0)
+        stats = host.stop()
+        snapshot = host.tracking.metrics.snapshot()
+        latency = snapshot['latency']
+        print(f"📥 Alınan: {stats['total_messages']} paket ({stats['total_messages'] / duration:.0f}/s), "
+              f"atılan: {stats['dropped_oldest']}, birleştirilen: {stats['coalesced']}")
+        rate = host.processed / host.busy_seconds if host.busy_seconds else 0
+        print(f"⚙️  İşlenen: {host.processed} paket ({rate:.0f}/s hat kapasitesi), "
+              f"işlenemeyen birikim: {len(host.pending)}")
+        print(f"📍 Hesaplanan konum: {host.tracking.positions_emitted}")
+        selection = host.tracking.anchor_selector.get_statistics()
+        if selection['lookups']:
+            print(f"📐 GDOP alt küme seçimi: {selection['selected']}/{selection['lookups']} "
+                  f"(ızgara {selection['cells']} hücre, kurulum {selection['last_build_ms']:.0f} ms)")
+        if latency['count']:
+            print(f"⏳ Alım → konum: p50 {latency['p50'] * 1000:.1f} ms  p99 {latency['p99'] * 1000:.1f} ms  "
+                  f"max {latency['max'] * 1000:.1f} ms")
+        e2e = host.end_to_end.snapshot()
+        if e2e['count']:
+            print(f"⏳ Gönderim → konum: p50 {e2e['p50'] * 1000:.1f} ms  p99 {e2e['p99'] * 1000:.1f} ms  "
+                  f"max {e2e['max'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
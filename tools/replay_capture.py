@@ -0,0 +1,115 @@
+"""Capture dosyasını yeniden oynat - ingest → trilateration → Kalman hattı
+
+İki mod:
+    Canlı: Kayıt çalışan uygulamanın (veya başka bir sunucunun) TCP portuna
+           gönderilir.
+    --headless: Bu süreçte GUI'siz bir TCPServerService + AdvancedTrackingService
+           başlatılır, kayıt buna oynatılır ve hattın performansı raporlanır
+           (paket/s, hesaplanan konum, alım → konum gecikmesi).
+
+Kayıt almak için uygulamayı MINETRACKER_CAPTURE=<dosya> ile başlatın veya
+TCPServerService(capture_path=...) kullanın.
+
+Kullanım:
+    python -m tools.replay_capture kayit.mtcap --speed 1
+    python -m tools.replay_capture kayit.mtcap --speed 10 --port 8888
+    python -m tools.replay_capture kayit.mtcap.0 kayit.mtcap.1 --headless --speed max
+"""
+import argparse
+import os
+import threading
+import time
+
+from services.stream_capture import StreamReplayer
+
+
+def parse_speed(value):
+    if value == 'max':
+        return None
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("Hız pozitif olmalı")
+    return speed
+
+
+def run_headless(args):
+    """Hattı bu süreçte kur, kaydı oynat ve sonuçları yazdır."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtCore import QCoreApplication
+    from services.advanced_tracking_service import AdvancedTrackingService
+    from services.tcp_server_service import TCPServerService
+
+    app = QCoreApplication([])
+    tracking = AdvancedTrackingService(mode='tcp')
+    server = TCPServerService(host='127.0.0.1', port=args.port, metrics=tracking.metrics,
+                              workers=args.workers)
+    server.batch_ready.connect(
+        lambda: tracking.process_tcp_batch(*server.take_batch(with_timestamps=True)))
+    server.start()
+
+    deadline = time.time() + 15
+    while not server.running and time.time() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+    replayer = StreamReplayer(args.captures, host='127.0.0.1', port=args.port, speed=args.speed)
+    thread = threading.Thread(target=replayer.replay, daemon=True)
+    started = time.perf_counter()
+    thread.start()
+
+    while thread.is_alive():
+        app.processEvents()
+        time.sleep(0.001)
+
+    # Kuyrukta kalanları işle; son ilerlemeden 200 ms sonra bitmiş say
+    processed = -1
+    last_progress = time.perf_counter()
+    while time.perf_counter() - last_progress < 0.2:
+        app.processEvents()
+        time.sleep(0.005)
+        current = (server.total_messages, tracking.positions_emitted)
+        if current != processed or len(server.queue):
+            processed = current
+            last_progress = time.perf_counter()
+    elapsed = last_progress - started
+
+    stats = server.get_statistics()
+    snapshot = tracking.metrics.snapshot()
+    latency = snapshot['latency']
+    server.stop()
+    server.wait(3000)
+
+    print(f"📼 Oynatılan kayıt: {replayer.records_replayed}  bağlantı: {replayer.connections_opened}  "
+          f"veri: {replayer.bytes_sent / 1024:.1f} KB")
+    print(f"⏱️  Süre: {elapsed:.2f} s")
+    print(f"📨 Paket: {stats['total_messages']}  ({stats['total_messages'] / elapsed:.0f}/s)  "
+          f"ölçüm: {snapshot['measurements']}")
+    print(f"📍 Hesaplanan konum: {tracking.positions_emitted}")
+    print(f"🗑️  Atılan: {stats['dropped_oldest']}  birleştirilen: {stats['coalesced']}")
+    if latency['count']:
+        print(f"⏳ Gecikme: p50 {latency['p50'] * 1000:.2f} ms  p90 {latency['p90'] * 1000:.2f} ms  "
+              f"p99 {latency['p99'] * 1000:.2f} ms  max {latency['max'] * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('captures', nargs='+', help='Capture dosya(lar)ı')
+    parser.add_argument('--speed', type=parse_speed, default=1.0, help="1, 10, ... veya 'max'")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8888)
+    parser.add_argument('--headless', action='store_true', help='Hattı bu süreçte çalıştır')
+    parser.add_argument('--workers', type=int, default=0, help='Headless modda ingest worker sayısı')
+    args = parser.parse_args()
+
+    if args.headless:
+        run_headless(args)
+        return
+
+    replayer = StreamReplayer(args.captures, host=args.host, port=args.port, speed=args.speed)
+    stats = replayer.replay()
+    print(f"📼 {stats['records']} kayıt, {stats['connections']} bağlantı, "
+          f"{stats['bytes_sent'] / 1024:.1f} KB, {stats['elapsed_seconds']:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
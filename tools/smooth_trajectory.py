@@ -0,0 +1,69 @@
+"""Konum geçmişinden yumuşatılmış iz çıkarımı (olay incelemesi / vardiya sonrası)
+
+location_history tablosundaki kayıtlar personel başına okunur, çevrimdışı
+RTS yumuşatıcıdan (services.trajectory_smoother) geçirilir ve CSV olarak
+yazılır. Birden fazla personel süreç havuzunda paralel işlenir.
+
+Kullanım:
+    python -m tools.smooth_trajectory --db /app/data/minetracker.db --output iz.csv
+    python -m tools.smooth_trajectory --db minetracker.db --person P001 P002 \\
+        --since "2024-01-15 06:00:00" --until "2024-01-15 14:00:00" --dimensions 3
+"""
+import argparse
+import csv
+import sys
+import time
+
+from services.db.database import DatabaseService
+from services.trajectory_smoother import load_location_history, smooth_trajectories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default='/app/data/minetracker.db')
+    parser.add_argument('--person', nargs='+', help='Personel ID (varsayılan: tümü)')
+    parser.add_argument('--since', help="Başlangıç ('YYYY-MM-DD HH:MM:SS', UTC)")
+    parser.add_argument('--until', help="Bitiş ('YYYY-MM-DD HH:MM:SS', UTC)")
+    parser.add_argument('--dimensions', type=int, choices=(2, 3), default=2)
+    parser.add_argument('--process-variance', type=float, default=0.05)
+    parser.add_argument('--measurement-variance', type=float, default=0.5)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--output', help='CSV dosyası (varsayılan: stdout)')
+    args = parser.parse_args()
+
+    database = DatabaseService(args.db)
+    person_ids = args.person or [person['id'] for person in database.get_all_personnel()]
+    tracks = load_location_history(database, person_ids, args.since, args.until, args.dimensions)
+    database.close()
+    if not tracks:
+        print("⚠️ Seçilen aralıkta konum kaydı yok", file=sys.stderr)
+        return
+
+    started = time.perf_counter()
+    smoothed = smooth_trajectories(tracks, processes=args.processes,
+                                   process_variance=args.process_variance,
+                                   measurement_variance=args.measurement_variance)
+    elapsed = time.perf_counter() - started
+    points = sum(len(track.timestamps) for track in smoothed.values())
+    print(f"✅ {len(smoothed)} personel, {points} nokta yumuşatıldı ({elapsed * 1000:.0f} ms)",
+          file=sys.stderr)
+
+    axes = ('x', 'y', 'z')[:args.dimensions]
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        writer = csv.writer(output)
+        writer.writerow(['person_id', 'timestamp', *axes, *(f'v{axis}' for axis in axes), 'variance'])
+        for person_id, track in smoothed.items():
+            for timestamp, position, velocity, variance in zip(
+                    track.timestamps.tolist(), track.positions.tolist(),
+                    track.velocities.tolist(), track.variances.tolist()):
+                writer.writerow([person_id, f'{timestamp:.3f}',
+                                 *(f'{value:.3f}' for value in position),
+                                 *(f'{value:.3f}' for value in velocity), f'{variance:.4f}'])
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
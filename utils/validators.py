@@ -0,0 +1,259 @@
+"""Validators - Başlangıçta bir kez derlenen kayıt şemaları
+
+Şema, alanların ve her alanın kabul edilen kaynak anahtarlarının (takma
+adlar, iç içe yollar) listesidir. RecordSchema kurulurken şemaya özel bir
+normalize fonksiyonu üretilir; mesaj başına şema yorumlanmaz, sonuç alan
+sırasında düz bir değer demetidir.
+
+Örnek:
+    schema = RecordSchema([
+        Field('tag_id', str, required=True),
+        Field('distance', 'float', aliases=('distance_m', ('distance(m)', 'distance'))),
+    ])
+    tag_id, distance = schema.normalize({'tag_id': 'TAG001', 'distance(m)': {'distance': 4.2}})
+"""
+import math
+
+class ValidationError(ValueError):
+    """Kayıt şemaya uymuyor."""
+
+
+def to_str(value):
+    if isinstance(value, str):
+        return value
+    raise ValidationError(f"Metin bekleniyordu: {value!r}")
+
+
+def to_float(value):
+    """Sonlu sayı (sayısal metinler kabul edilir, bool edilmez)."""
+    if isinstance(value, bool):
+        raise ValidationError(f"Sayı bekleniyordu: {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"Sayı bekleniyordu: {value!r}") from None
+    if not math.isfinite(number):
+        raise ValidationError(f"Sonlu sayı bekleniyordu: {value!r}")
+    return number
+
+
+def to_non_negative(value):
+    number = to_float(value)
+    if number < 0:
+        raise ValidationError(f"Negatif olamaz: {value!r}")
+    return number
+
+
+def to_int(value):
+    if isinstance(value, bool):
+        raise ValidationError(f"Tamsayı bekleniyordu: {value!r}")
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValidationError(f"Tamsayı bekleniyordu: {value!r}") from None
+
+
+_TRUE_TEXTS = frozenset(('true', '1', 'yes', 'on'))
+_FALSE_TEXTS = frozenset(('false', '0', 'no', 'off'))
+
+
+def to_bool(value):
+    """bool, 0 / 1 veya 'true' / 'false' / 'yes' / 'no' / 'on' / 'off' ('false' metni False'tur)."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return value == 1
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in _TRUE_TEXTS:
+            return True
+        if text in _FALSE_TEXTS:
+            return False
+    raise ValidationError(f"Bool bekleniyordu: {value!r}")
+
+
+def to_list(value):
+    if isinstance(value, list):
+        return value
+    raise ValidationError(f"Liste bekleniyordu: {type(value).__name__}")
+
+
+# Dönüştürücüyü atlamak için satır içi kontroller (derlenmiş normalize'da)
+_FAST_CHECKS = {
+    to_str: 'value.__class__ is str',
+    to_float: 'value.__class__ is float and -_INF < value < _INF',
+    to_non_negative: 'value.__class__ is float and 0.0 <= value < _INF',
+    to_int: 'value.__class__ is int',
+    to_bool: 'value.__class__ is bool',
+    to_list: 'value.__class__ is list',
+}
+
+CONVERTERS = {
+    str: to_str,
+    'str': to_str,
+    float: to_float,
+    'float': to_float,
+    'non_negative': to_non_negative,
+    int: to_int,
+    'int': to_int,
+    bool: to_bool,
+    'bool': to_bool,
+    list: to_list,
+    'list': to_list,
+}
+
+
+class Field:
+    """
+    Şema alanı.
+
+    Args:
+        name: Alan adı (aynı zamanda birincil kaynak anahtarı)
+        kind: CONVERTERS anahtarı veya değer -> değer dönüştürücü (hata: ValidationError);
+            dönüştürücünün fast_check özniteliği ('value' üzerinde ifade) varsa
+            derlenmiş kodda çağrıdan önce satır içi denenir
+        aliases: Ek kaynak anahtarları; ('dış', 'iç') çifti iç içe sözlük yoludur.
+            Ad aliases içinde de geçiyorsa kaynak sırası aliases'taki sıradır
+            (ör. iç içe yol alanın kendi anahtarından önce denenir)
+        required: Eksik / geçersizse kayıt reddedilir; değilse default kullanılır
+        default: İsteğe bağlı alanların varsayılanı
+    """
+
+    __slots__ = ('name', 'convert', 'sources', 'required', 'default')
+
+    def __init__(self, name, kind=str, aliases=(), required=False, default=None):
+        self.name = name
+        self.convert = CONVERTERS.get(kind, kind)
+        if not callable(self.convert):
+            raise ValueError(f"Bilinmeyen alan türü: {kind!r}")
+        aliases = tuple(aliases)
+        self.sources = aliases if name in aliases else (name,) + aliases
+        self.required = required
+        self.default = default
+
+
+class RecordSchema:
+    """
+    Derlenmiş kayıt şeması.
+
+    Kurucu, şemaya özel normalize / columns fonksiyonlarını üretir (exec): her kaynak
+    anahtarı sabit bir dict.get() ile okunur, yerleşik türler için tür
+    kontrolü satır içidir ve dönüştürücü yalnızca hızlı kontrol başarısız
+    olursa çağrılır. Bir alanın birden fazla kaynağı varsa Field'daki
+    sırayla ilk bulunan kullanılır. Bilinmeyen anahtarlar yok sayılır.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.names = tuple(field.name for field in self.fields)
+        seen = set()
+        for field in self.fields:
+            for source in field.sources:
+                key = source[0] if isinstance(source, tuple) else source
+                if key in seen:
+                    raise ValueError(f"Kaynak anahtarı iki alanda kullanılmış: {key}")
+                seen.add(key)
+        self.normalize, self.columns = self._compile()
+        self.normalize.__doc__ = """
+        Kaydı alan sırasında değer demetine çevir.
+
+        Raises:
+            ValidationError: Kayıt sözlük değil veya zorunlu alan eksik / geçersiz
+        """
+        self.columns.__doc__ = """
+        Kayıt listesini alan başına paralel listelere çevir (tek derlenmiş döngü).
+
+        Returns:
+            (sütunlar, geçersiz kayıt sayısı) - geçersiz kayıtlar atlanır
+        """
+
+    def _compile(self):
+        """Şemaya özel normalize() ve columns() fonksiyonlarını üret."""
+        namespace = {'ValidationError': ValidationError, '_INF': math.inf}
+        for index, field in enumerate(self.fields):
+            namespace[f'c{index}'] = field.convert
+            namespace[f'd{index}'] = field.default
+        values = ''.join(f'v{index}, ' for index in range(len(self.fields)))
+
+        lines = [
+            'def normalize(record):',
+            '    if record.__class__ is not dict and not isinstance(record, dict):',
+            '        raise ValidationError(f"Nesne bekleniyordu: {type(record).__name__}")',
+            '    get = record.get',
+        ]
+        lines += self._field_lines('    ')
+        lines.append(f'    return ({values})')
+
+        columns = ', '.join(f'l{index}' for index in range(len(self.fields)))
+        lines += [
+            '',
+            'def columns(records):',
+            *(f'    l{index} = []; a{index} = l{index}.append' for index in range(len(self.fields))),
+            '    invalid = 0',
+            '    for record in records:',
+            '        if record.__class__ is not dict and not isinstance(record, dict):',
+            '            invalid += 1',
+            '            continue',
+            '        get = record.get',
+            '        try:',
+        ]
+        lines += self._field_lines('            ')
+        lines += [
+            '        except ValidationError:',
+            '            invalid += 1',
+            '            continue',
+            *(f'        a{index}(v{index})' for index in range(len(self.fields))),
+            f'    return ({columns},), invalid',
+        ]
+        exec('\n'.join(lines), namespace)
+        return namespace['normalize'], namespace['columns']
+
+    def _field_lines(self, indent):
+        """Her alan için kaynak zinciri + dönüştürme; sonuç v<indeks> değişkenlerinde."""
+        lines = []
+        for index, field in enumerate(self.fields):
+            # Kaynak zinciri: ilk bulunan kazanır
+            for position, source in enumerate(field.sources):
+                inner_indent = indent + '    ' * position
+                if position:
+                    lines.append(f'{inner_indent[4:]}if value is None:')
+                if isinstance(source, tuple):
+                    key, inner = source
+                    lines += [f'{inner_indent}value = get({key!r})',
+                              f'{inner_indent}value = value.get({inner!r}) if isinstance(value, dict) else None']
+                else:
+                    lines.append(f'{inner_indent}value = get({source!r})')
+
+            if field.required:
+                lines += [f'{indent}if value is None:',
+                          f'{indent}    raise ValidationError("Zorunlu alan eksik: {field.name}")']
+                lines += self._convert_lines(index, field, indent)
+            else:
+                lines += [f'{indent}if value is None:',
+                          f'{indent}    value = d{index}',
+                          f'{indent}else:']
+                lines += self._convert_lines(index, field, indent + '    ')
+            lines.append(f'{indent}v{index} = value')
+        return lines
+
+    @staticmethod
+    def _convert_lines(index, field, indent):
+        """Dönüştürme bloğu; yerleşik türlerde hızlı kontrol geçerse çağrı yapılmaz."""
+        if field.required:
+            body = [f'value = c{index}(value)']
+        else:
+            # Geçersiz isteğe bağlı alan varsayılana düşer
+            body = ['try:',
+                    f'    value = c{index}(value)',
+                    'except ValidationError:',
+                    f'    value = d{index}']
+        check = _FAST_CHECKS.get(field.convert) or getattr(field.convert, 'fast_check', None)
+        if check is None:
+            return [indent + line for line in body]
+        return [f'{indent}if not ({check}):'] + [indent + '    ' + line for line in body]
+
+    def normalize_dict(self, record):
+        """normalize() sonucunu alan adlarıyla sözlük olarak döndür."""
+        return dict(zip(self.names, self.normalize(record)))